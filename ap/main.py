@@ -1,9 +1,17 @@
 from network import WLAN
+from array import array
 import pycom
 import time
 import usocket
+import uselect
+import ustruct
 import _thread
 
+try:
+    from ubinascii import crc32
+except ImportError:
+    crc32 = None
+
 pycom.heartbeat(False)
 
 SSID = 'LoPy4-Network'
@@ -13,11 +21,79 @@ CHANNEL = 7
 CLIENT_PORT = 12345
 PC_PORT = 12346
 
-last_rssi = None
-last_rtt = 0
-last_count = 0
-last_update_time = 0
-client_connected = False
+# Olcum halka tamponu: acilista bir kez ayrilir, calisirken bellek ayrilmaz.
+# Her PC baglantisi tamponu kendi okuma konumundan bosaltir; geride kalan
+# baglanti RING_SIZE'dan eski olcumleri kaybeder ve OVERFLOW ile bildirilir.
+RING_SIZE = 256
+# Tek yazimda gonderilen en fazla olcum
+BATCH_SIZE = 32
+# Tampon bosken PC gonderim dongusunun bekleme suresi (ms); bekleme PC
+# soketinde yapilir, PC'den gelen istek beklemeyi keser
+DRAIN_MS = 50
+# Bu sure (s) olcum gelmeyen cihaz kopmus sayilir
+DEVICE_TIMEOUT = 5
+# Cihaz numarasi tamponda tek baytla tutulur
+MAX_DEVICES = 255
+# Kalici istemci oturumunda bu sure (s) veri gelmezse baglanti kapatilir
+CLIENT_TIMEOUT = 10
+# Ayni anda acik tutulan en fazla istemci soketi; fazlasi reddedilir
+MAX_CLIENTS = 8
+# Satir sonu olmayan DATA mesajindan sonra bu sure (ms) susan baglanti
+# eski istemci sayilir
+LEGACY_WAIT_MS = 500
+# Cihaz kimligi PC'de oturum dosyasi adina girer: en fazla 32 karakter,
+# sadece bu karakterler (protocol/frame.py DEVICE_ID ile ayni kural)
+MAX_DEVICE_ID = 32
+DEVICE_ID_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.:-'
+
+NAN = float('nan')
+
+# PC akisi icin ikili cerceve (protocol/frame.py ile ayni duzen):
+#   <BBBB 0xA5, surum, tur, govde uzunlugu + govde + <I CRC32(baslik + govde)
+# PC baglaninca FORMAT:BIN2 satiri gonderirse ikili cerceveye gecilir,
+# istemeyen PC metin satirlari almaya devam eder.
+FRAME_MAGIC = 0xA5
+FRAME_VERSION = 2
+FRAME_DATA = 1
+FRAME_STATUS = 2
+FRAME_OVERFLOW = 3
+JITTER_UNKNOWN = 0xFFFF
+FORMAT_REQUEST = b'FORMAT:BIN2'
+
+ring_rssi = array('h', [0] * RING_SIZE)
+ring_rtt = array('l', [0] * RING_SIZE)
+ring_count = array('L', [0] * RING_SIZE)
+# AP'nin olcumu aldigi an (time.ticks_ms)
+ring_tick = array('L', [0] * RING_SIZE)
+ring_device = array('B', [0] * RING_SIZE)
+# Istemcinin RTT sondalarindan hesapladigi jitter (ms); eski istemcide NaN
+ring_jitter = array('f', [0] * RING_SIZE)
+ring_lock = _thread.allocate_lock()
+# Tampona yazilan toplam olcum; n. olcum n % RING_SIZE konumundadir
+ring_head = 0
+
+# cihaz -> [cihaz numarasi, son guncelleme zamani]
+devices = {}
+# cihaz numarasi -> cihaz
+device_names = []
+# cihaz numarasi -> cihaz kimligi baytlari (ikili cerceveler icin)
+device_keys = []
+
+if crc32 is None:
+    # ubinascii.crc32 olmayan surumler icin 16 girdili tabloyla CRC32
+    CRC_TABLE = array('L', [0] * 16)
+    for i in range(16):
+        c = i
+        for _ in range(4):
+            c = (c >> 1) ^ (0xEDB88320 if c & 1 else 0)
+        CRC_TABLE[i] = c
+
+    def crc32(data, crc=0):
+        crc ^= 0xFFFFFFFF
+        for b in data:
+            crc = CRC_TABLE[(crc ^ b) & 15] ^ (crc >> 4)
+            crc = CRC_TABLE[(crc ^ (b >> 4)) & 15] ^ (crc >> 4)
+        return crc ^ 0xFFFFFFFF
 
 print('Wi-Fi Access Point + RSSI + RTT Relay baslatiliyor...')
 print('SSID:', SSID)
@@ -30,42 +106,230 @@ print('Access Point aktif!')
 print('IP:', wlan.ifconfig(id=1)[0])
 
 
+def ring_push(device_id, rssi, rtt, count, jitter=NAN):
+    global ring_head
+
+    ring_lock.acquire()
+    state = devices.get(device_id)
+    if state is None:
+        if len(device_names) >= MAX_DEVICES:
+            ring_lock.release()
+            print('Cihaz siniri asildi, olcum atlandi:', device_id)
+            return
+        device_names.append(device_id)
+        device_keys.append(device_id.encode())
+        state = devices[device_id] = [len(device_names) - 1, 0]
+
+    i = ring_head % RING_SIZE
+    ring_rssi[i] = rssi
+    ring_rtt[i] = rtt
+    ring_count[i] = count
+    ring_tick[i] = time.ticks_ms()
+    ring_device[i] = state[0]
+    ring_jitter[i] = jitter
+    ring_head += 1
+    # Durum ayni kilit icinde guncellenir; tampondan okunan her olcumun
+    # cihazi PC dongusunde bagli gorunur
+    state[1] = time.time()
+    ring_lock.release()
+
+
+def ring_read(cursor, limit):
+    # cursor'dan itibaren en fazla limit olcum; tampon kilitliyken yalnizca
+    # degerler kopyalanir, satirlar kilit disinda olusturulur
+    ring_lock.acquire()
+    head = ring_head
+    dropped = 0
+    if head - cursor > RING_SIZE:
+        dropped = head - RING_SIZE - cursor
+        cursor = head - RING_SIZE
+    end = min(head, cursor + limit)
+    rows = []
+    for n in range(cursor, end):
+        i = n % RING_SIZE
+        rows.append((ring_device[i], ring_rssi[i], ring_rtt[i], ring_count[i], ring_tick[i], ring_jitter[i]))
+    ring_lock.release()
+    return rows, dropped, end
+
+
+def send_all(sock, data):
+    view = memoryview(data)
+    while view:
+        sent = sock.send(view)
+        view = view[sent:]
+
+
+def valid_device_id(device_id):
+    if not 0 < len(device_id) <= MAX_DEVICE_ID:
+        return False
+    for c in device_id:
+        if c not in DEVICE_ID_CHARS:
+            return False
+    return True
+
+
+def handle_message(client, addr, msg):
+    if msg.startswith(b'PING:'):
+        # RTT sondasi: sira numarasi aynen geri gonderilir
+        send_all(client, b'PONG:' + msg[5:] + b'\n')
+
+    elif msg.startswith(b'RSSI:'):
+        # Eski istemci: baglanti kurma + ACK suresi RTT sayilir
+        client.send(b'ACK')
+
+    elif msg.startswith(b'DATA:'):
+        # DATA:<rssi>,<rtt>,<sayac>[,<cihaz>[,<jitter>]]; kimlik gondermeyen
+        # eski istemciler IP adresiyle ayrilir. Bozuk satir sadece kendisi
+        # atlanir; kalici oturum ve tamponundaki sonraki satirlar surer
+        try:
+            parts = msg[5:].decode().split(',')
+            if len(parts) < 3:
+                return
+            device_id = parts[3] if len(parts) >= 4 and parts[3] else addr[0]
+            rssi = int(parts[0])
+            rtt = int(parts[1])
+            count = int(parts[2])
+            jitter = float(parts[4]) if len(parts) >= 5 and parts[4] else NAN
+        except (ValueError, UnicodeError):
+            print('[CLIENT] Gecersiz satir atlandi:', addr[0], msg[:64])
+            return
+        if not valid_device_id(device_id):
+            print('[CLIENT] Gecersiz cihaz kimligi reddedildi:', addr[0])
+            return
+        ring_push(device_id, rssi, rtt, count, jitter)
+        print('[CLIENT] {} #{} RSSI: {} dBm, RTT: {} ms'.format(
+            device_id, count, rssi, rtt))
+
+
+def close_client(poller, sessions, client):
+    poller.unregister(client)
+    del sessions[client]
+    client.close()
+
+
+def client_accept(server, poller, sessions):
+    client, addr = server.accept()
+    if len(sessions) >= MAX_CLIENTS:
+        print('[CLIENT] Istemci siniri dolu, baglanti reddedildi:', addr[0])
+        client.close()
+        return
+    # PONG yaniti bloklayarak gonderilir; takilan istemci donguyu en fazla
+    # CLIENT_TIMEOUT kadar tutar
+    client.settimeout(CLIENT_TIMEOUT)
+    poller.register(client, uselect.POLLIN)
+    sessions[client] = [addr, b'', False, time.ticks_ms()]
+
+
+def client_read(poller, sessions, client):
+    session = sessions[client]
+    addr = session[0]
+    data = client.recv(256)
+    if not data:
+        # Eski DATA istemcisi satir sonu olmayan tek mesajini gonderip kapatir
+        if session[1] and not session[2]:
+            handle_message(client, addr, session[1].strip())
+        close_client(poller, sessions, client)
+        return
+
+    buffer = session[1] + data
+    session[3] = time.ticks_ms()
+    if not session[2]:
+        if b'\n' in buffer:
+            # Satir sonlu mesaj kalici oturumdur; kalici istemci RSSI
+            # gondermez, ilk mesaji PING'dir
+            session[2] = True
+        elif buffer.startswith(b'RSSI:'):
+            # Eski istemci ACK'i bekler, RTT'ye AP'nin bekleme suresi girmesin
+            handle_message(client, addr, buffer.strip())
+            close_client(poller, sessions, client)
+            return
+        else:
+            # Parcali ilk mesaj: satir sonu, kapanis ya da LEGACY_WAIT_MS
+            # beklenir
+            session[1] = buffer
+            return
+
+    while b'\n' in buffer:
+        line, buffer = buffer.split(b'\n', 1)
+        handle_message(client, addr, line.strip())
+    session[1] = buffer
+
+
+def client_expire(poller, sessions):
+    now = time.ticks_ms()
+    for client, session in list(sessions.items()):
+        idle = time.ticks_diff(now, session[3])
+        if session[2] or not session[1].startswith(b'DATA:'):
+            if idle < CLIENT_TIMEOUT * 1000:
+                continue
+            print('[CLIENT] Istemci oturumu zaman asimi:', session[0][0])
+        elif idle < LEGACY_WAIT_MS:
+            continue
+        else:
+            # Satir sonu gelmeden susan DATA istemcisi eski istemcidir;
+            # kalici istemcinin ilk mesaji PING'dir
+            handle_message(client, session[0], session[1].strip())
+        close_client(poller, sessions, client)
+
+
 def client_server():
-    global last_rssi, last_rtt, last_count, last_update_time, client_connected
     server = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
     server.setsockopt(usocket.SOL_SOCKET, usocket.SO_REUSEADDR, 1)
     server.bind(('192.168.4.1', CLIENT_PORT))
     server.listen(5)
     print('Client Server port {} dinleniyor...'.format(CLIENT_PORT))
 
+    # Tum istemci soketleri bu thread'de tek poll dongusuyle okunur;
+    # istemci basina thread (ve yigin) ayrilmaz.
+    # soket -> [adres, tampon, kalici oturum mu, son veri zamani (ticks_ms)]
+    sessions = {}
+    poller = uselect.poll()
+    poller.register(server, uselect.POLLIN)
+
     while True:
         try:
-            client, addr = server.accept()
-            data = client.recv(64)
-            if data:
-                msg = data.decode().strip()
-
-                if msg.startswith('RSSI:'):
-                    client.send(b'ACK')
-
-                elif msg.startswith('DATA:'):
-                    parts = msg[5:].split(',')
-                    if len(parts) >= 3:
-                        last_rssi = int(parts[0])
-                        last_rtt = int(parts[1])
-                        last_count = int(parts[2])
-                        last_update_time = time.time()
-                        client_connected = True
-                        print('[CLIENT] #{} RSSI: {} dBm, RTT: {} ms'.format(
-                            last_count, last_rssi, last_rtt))
-
-            client.close()
+            for event in poller.poll(LEGACY_WAIT_MS):
+                sock = event[0]
+                if sock is server:
+                    client_accept(server, poller, sessions)
+                    continue
+                try:
+                    client_read(poller, sessions, sock)
+                except Exception as e:
+                    print('Istemci oturumu kapandi:', sessions[sock][0][0], e)
+                    close_client(poller, sessions, sock)
+            client_expire(poller, sessions)
         except Exception as e:
             print('Client server hatasi:', e)
 
 
+def frame(kind, body):
+    data = ustruct.pack('<BBBB', FRAME_MAGIC, FRAME_VERSION, kind, len(body)) + body
+    return data + ustruct.pack('<I', crc32(data) & 0xFFFFFFFF)
+
+
+def status_changes(was_connected):
+    # Baglanti durumu degisen cihazlar: [(cihaz, bagli mi)]
+    changes = []
+    current_time = time.time()
+
+    for device_id, state in list(devices.items()):
+        is_connected = current_time - state[1] < DEVICE_TIMEOUT
+
+        if was_connected.get(device_id) and not is_connected:
+            changes.append((device_id, False))
+            print('[PC] Client koptu bildirimi gonderildi:', device_id)
+
+        elif not was_connected.get(device_id) and is_connected:
+            changes.append((device_id, True))
+            print('[PC] Client baglandi bildirimi gonderildi:', device_id)
+
+        was_connected[device_id] = is_connected
+
+    return changes
+
+
 def pc_server():
-    global last_rssi, last_rtt, last_count, last_update_time, client_connected
     server = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
     server.setsockopt(usocket.SOL_SOCKET, usocket.SO_REUSEADDR, 1)
     server.bind(('192.168.4.1', PC_PORT))
@@ -77,39 +341,67 @@ def pc_server():
             client, addr = server.accept()
             print('[PC] Bilgisayar baglandi:', addr[0])
 
-            prev_count = -1
-            was_connected = False
-            disconnect_sent = False
+            # Bu bilgisayar baglantisi icin tampon konumu ve cihaz durumlari;
+            # baglanti anindan sonra gelen olcumler gonderilir
+            cursor = ring_head
+            overflow_total = 0
+            was_connected = {}
+            binary = False
+            poller = uselect.poll()
+            poller.register(client, uselect.POLLIN)
 
             while True:
                 try:
-                    current_time = time.time()
-                    elapsed = current_time - last_update_time if last_update_time > 0 else 999
-
-                    is_connected = elapsed < 5
+                    # Once tampon okunur: okunan olcumlerin cihazlari durum
+                    # mesajlarinda bagli gorunur, STATUS DATA'dan once gider
+                    rows, dropped, cursor = ring_read(cursor, BATCH_SIZE)
+                    chunks = []
 
-                    if was_connected and not is_connected and not disconnect_sent:
-                        client_connected = False
-                        msg = 'STATUS:DISCONNECTED\n'
-                        client.send(msg.encode())
-                        print('[PC] Client koptu bildirimi gonderildi')
-                        disconnect_sent = True
+                    for device_id, connected in status_changes(was_connected):
+                        if binary:
+                            chunks.append(frame(FRAME_STATUS, (b'\x01' if connected else b'\x00')
+                                                + device_id.encode()))
+                        else:
+                            chunks.append('STATUS:{},{}\n'.format(
+                                'CONNECTED' if connected else 'DISCONNECTED', device_id).encode())
 
-                    elif not was_connected and is_connected:
-                        client_connected = True
-                        msg = 'STATUS:CONNECTED\n'
-                        client.send(msg.encode())
-                        print('[PC] Client baglandi bildirimi gonderildi')
-                        disconnect_sent = False
+                    if dropped:
+                        overflow_total += dropped
+                        if binary:
+                            chunks.append(frame(FRAME_OVERFLOW, ustruct.pack('<II', dropped, overflow_total)))
+                        else:
+                            chunks.append('OVERFLOW:{},{}\n'.format(dropped, overflow_total).encode())
+                        print('[PC] Tampon tasti, {} olcum atlandi'.format(dropped))
 
-                    was_connected = is_connected
+                    if binary:
+                        # <IIhiH sayac, tick, rssi, rtt (isaretli, metindeki
+                        # degerle ayni), jitter (0.1 ms) + cihaz
+                        for device, rssi, rtt, count, tick, jitter in rows:
+                            chunks.append(frame(FRAME_DATA, ustruct.pack(
+                                '<IIhiH', count, tick, rssi, rtt,
+                                min(int(jitter * 10 + 0.5), JITTER_UNKNOWN - 1) if jitter == jitter
+                                else JITTER_UNKNOWN) + device_keys[device]))
+                    else:
+                        # DATA:<rssi>,<rtt>,<sayac>,<cihaz>,<AP tick ms>,<jitter>
+                        for device, rssi, rtt, count, tick, jitter in rows:
+                            chunks.append('DATA:{},{},{},{},{},{}\n'.format(
+                                rssi, rtt, count, device_names[device], tick,
+                                '{:.1f}'.format(jitter) if jitter == jitter else '').encode())
 
-                    if last_rssi is not None and last_count != prev_count:
-                        msg = 'DATA:{},{},{}\n'.format(last_rssi, last_rtt, last_count)
-                        client.send(msg.encode())
-                        prev_count = last_count
+                    # Birikmis mesajlar tek yazimda gonderilir
+                    if chunks:
+                        send_all(client, b''.join(chunks))
 
-                    time.sleep(0.5)
+                    # Tampon bosken PC soketinde beklenir: bicim istegi ve
+                    # baglanti kapanisi bekleme suresini beklemeden gorulur
+                    if poller.poll(0 if len(rows) == BATCH_SIZE else DRAIN_MS):
+                        request = client.recv(64)
+                        if not request:
+                            raise OSError('baglanti kapandi')
+                        if request.startswith(FORMAT_REQUEST):
+                            send_all(client, FORMAT_REQUEST + b'\n')
+                            binary = True
+                            print('[PC] Ikili cerceve bicimine gecildi')
                 except:
                     print('[PC] Bilgisayar baglantisi kesildi')
                     break
@@ -126,7 +418,8 @@ print('- LoPy4 Client RSSI + RTT gonderecek (port {})'.format(CLIENT_PORT))
 print('- Bilgisayar veri alacak (port {})'.format(PC_PORT))
 
 while True:
-    if last_rssi is not None and (time.time() - last_update_time) < 10:
+    now = time.time()
+    if any(now - state[1] < 10 for state in list(devices.values())):
         pycom.rgbled(0x00FF00)
     else:
         pycom.rgbled(0xFF8000)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.upy_stubs import install, run_firmware
+from protocol import ApClock, TICKS_PERIOD, StreamDecoder, Measurement, Overflow, FORMAT_REQUEST
+
+AP_FIRMWARE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ap', 'main.py')
+AP_IP = '192.168.4.1'
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+class Receiver:
+
+    # PC tarafi: AP'nin port 12346 akisini okur ve her olcumun alinma
+    # zamanini ve AP tick damgasindan cevrilen zamanini saklar. binary ise
+    # ikili cerceve istenir (eski AP istegi yok sayar).
+    # Okuma paused ile durdurulabilir (yavas PC); alma tamponu kucuk
+    # tutulur ki AP'nin gonderimi TCP penceresiyle beklesin.
+
+    def __init__(self, port, binary=True):
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        deadline = time.time() + 10
+        while True:
+            try:
+                self.sock.connect(('127.0.0.1', port))
+                break
+            except ConnectionRefusedError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.05)
+        if binary:
+            self.sock.sendall(FORMAT_REQUEST)
+
+        self.clock = ApClock()
+        self.decoder = StreamDecoder()
+        self.bytes = 0
+        # cihaz -> sayac -> (alinma zamani, AP zamani)
+        self.received = {}
+        self.overflow = 0
+        self.reads = 0
+        self.data_lines = 0
+        self.last_line = time.time()
+        self.running = threading.Event()
+        self.running.set()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.running.wait()
+            data = self.sock.recv(65536)
+            if not data:
+                return
+            received = time.time()
+            self.reads += 1
+            self.bytes += len(data)
+            for event in self.decoder.feed(data):
+                if isinstance(event, Overflow):
+                    self.overflow += event.dropped
+                elif isinstance(event, Measurement):
+                    ap_time = self.clock.to_unix(event.tick, received) if event.tick is not None else None
+                    self.received.setdefault(event.device, {})[event.count] = (received, ap_time)
+                    self.data_lines += 1
+                    self.last_line = received
+
+    def wait_idle(self, quiet=1.0, timeout=30):
+        # quiet saniye yeni satir gelmeyene kadar bekler
+        start = time.time()
+        while time.time() - max(self.last_line, start) < quiet and time.time() < start + timeout:
+            time.sleep(0.05)
+
+
+def send_measurement(port, device, count, ping=True):
+    # client/main.py gibi: RSSI/ACK ile RTT olcumu, ardindan ayri baglantida DATA
+    start = time.time()
+    if ping:
+        s = socket.create_connection(('127.0.0.1', port))
+        s.send('RSSI:-60,{}'.format(count).encode())
+        s.recv(16)
+        s.close()
+    rtt = int((time.time() - start) * 1000)
+    s = socket.create_connection(('127.0.0.1', port))
+    sent = time.time()
+    s.send('DATA:{},{},{},{}'.format(-50 - count % 30, rtt, count, device).encode())
+    s.close()
+    return sent
+
+
+def run_rate(client_port, receiver, rate, devices, duration):
+    names = ['{}hz-{}'.format(int(rate), i) for i in range(devices)]
+    sent = {name: {} for name in names}
+    total = int(duration * rate)
+
+    def device_loop(name):
+        interval = 1.0 / rate
+        next_time = time.perf_counter()
+        for count in range(1, total + 1):
+            sent[name][count] = send_measurement(client_port, name, count)
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    overflow = receiver.overflow
+    reads = receiver.reads
+    lines = receiver.data_lines
+    threads = [threading.Thread(target=device_loop, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    receiver.wait_idle()
+
+    delays, ap_errors = [], []
+    for name in names:
+        received = receiver.received.get(name, {})
+        for count, sent_time in sent[name].items():
+            if count in received:
+                received_time, ap_time = received[count]
+                delays.append(received_time - sent_time)
+                if ap_time is not None:
+                    ap_errors.append(abs(ap_time - sent_time))
+
+    delivered = len(delays)
+    delays = np.array(delays) * 1000
+    return {
+        'rate': rate,
+        'sent': total * devices,
+        'delivered': delivered,
+        'overflow': receiver.overflow - overflow,
+        'p50': np.percentile(delays, 50) if delivered else float('nan'),
+        'p99': np.percentile(delays, 99) if delivered else float('nan'),
+        'per_read': (receiver.data_lines - lines) / max(receiver.reads - reads, 1),
+        'ap_error': np.percentile(np.array(ap_errors) * 1000, [50, 99]) if ap_errors else None
+    }
+
+
+def run_burst(firmware, receiver, count, stall):
+    # Okumasi durmus PC varken count olcum dogrudan tampona yazilir (istemci
+    # baglantilari bu hizi tasiyamaz: AP'nin listen kuyrugu 5). Tamponu asan
+    # olcumler kaybolur ve sayisi OVERFLOW ile bildirilmelidir.
+    if 'ring_push' not in firmware:
+        print('\nYavas PC testi atlandi: yazilimda olcum tamponu yok')
+        return
+
+    overflow = receiver.overflow
+    receiver.running.clear()
+    for i in range(1, count + 1):
+        firmware['ring_push']('burst', -60, 10, i)
+    time.sleep(stall)
+    receiver.running.set()
+    receiver.wait_idle()
+
+    delivered = len(receiver.received.get('burst', {}))
+    print('\nYavas PC ({} s duraklama): {} olcum, {} ulasti, {} kayip, {} OVERFLOW ile bildirildi'.format(
+        stall, count, delivered, count - delivered, receiver.overflow - overflow))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AP yaziliminin (CPython taklit modulleriyle) olcum iletim testi')
+    parser.add_argument('--rates', default='10,20,50', help='Cihaz basina olcum hizlari (Hz)')
+    parser.add_argument('--devices', type=int, default=1, help='Cihaz sayisi')
+    parser.add_argument('--duration', type=float, default=10, help='Hiz basina sure (s)')
+    parser.add_argument('--burst', type=int, default=100000, help='Yavas PC testi olcum sayisi (0 = atla)')
+    parser.add_argument('--stall', type=float, default=1, help='Yavas PC testinde okuma duraklamasi (s)')
+    parser.add_argument('--tick-wrap', action='store_true', help='ticks_ms testin basinda basa sarsin')
+    parser.add_argument('--firmware', default=AP_FIRMWARE, help='AP yazilimi (ornegin eski surum)')
+    parser.add_argument('--text', action='store_true', help='Ikili cerceve isteme, metin satirlari al')
+    args = parser.parse_args()
+
+    client_port, pc_port = free_port(), free_port()
+    install({(AP_IP, 12345): ('127.0.0.1', client_port), (AP_IP, 12346): ('127.0.0.1', pc_port)},
+            tick_offset=TICKS_PERIOD - 2000 if args.tick_wrap else 0)
+    firmware = run_firmware(args.firmware)
+    receiver = Receiver(pc_port, binary=not args.text)
+    print('Yazilim:', os.path.relpath(args.firmware))
+
+    print('\n{:>6} {:>10} {:>8} {:>8} {:>8} {:>16} {:>12} {:>18}'.format(
+        'Hz', 'gonderilen', 'ulasan', 'kayip', 'tasma', 'gecikme p50/p99', 'satir/okuma', 'AP damgasi p50/p99'))
+    for rate in [float(r) for r in args.rates.split(',')]:
+        r = run_rate(client_port, receiver, rate, args.devices, args.duration)
+        print('{:>6.0f} {:>10} {:>8} {:>8} {:>8} {:>8.1f}/{:<7.1f} {:>12.1f} {:>18}'.format(
+            r['rate'], r['sent'], r['delivered'], r['sent'] - r['delivered'], r['overflow'],
+            r['p50'], r['p99'], r['per_read'],
+            '{:.1f}/{:.1f}'.format(*r['ap_error']) if r['ap_error'] is not None else '-'))
+
+    if args.burst:
+        run_burst(firmware, receiver, args.burst, args.stall)
+
+    stats = receiver.decoder.get_stats()
+    print('\nAkis bicimi: {}, {} olcum, olcum basina {:.1f} bayt'.format(
+        'ikili' if stats['binary'] else 'metin', receiver.data_lines,
+        receiver.bytes / max(receiver.data_lines, 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+from web import create_app
+from web.socket_client import APSocketClient
+from web.ingest import AsyncAPClient
+
+FAKE_AP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_ap.py')
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def start_fake_aps(count, rate, devices, lines, prefix):
+    processes = []
+    addresses = []
+    for i in range(count):
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, FAKE_AP, '--port', str(port), '--rate', str(rate), '--devices', str(devices),
+             '--lines', str(lines), '--prefix', '{}{}'.format(prefix, i)],
+            stdout=subprocess.PIPE, text=True)
+        # Sunucu dinlemeye baslayana kadar beklenir
+        while 'dinleniyor' not in process.stdout.readline():
+            pass
+        processes.append(process)
+        addresses.append(('127.0.0.1', port))
+    return processes, addresses
+
+
+def processed_lines(prefix):
+    dm = data_manager.DataManager()
+    return sum(len(device.rssi_stats) for device_id, device in list(dm.devices.items())
+               if device_id.startswith(prefix))
+
+
+def run(mode, aps, rate, devices, lines, prefix, timeout):
+    processes, addresses = start_fake_aps(aps, rate, devices, lines, prefix)
+    expected = aps * lines
+
+    if mode == 'async':
+        client = AsyncAPClient(addresses)
+    else:
+        client = APSocketClient(*addresses[0])
+
+    start = time.perf_counter()
+    client.start()
+    try:
+        while processed_lines(prefix) < expected and time.perf_counter() - start < timeout:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        done = processed_lines(prefix)
+    finally:
+        client.stop()
+        for p in processes:
+            p.terminate()
+            p.wait()
+
+    status = client.get_status()
+    return {
+        'lines': done,
+        'expected': expected,
+        'lines_per_sec': done / elapsed,
+        'max_queue_depth': status.get('max_queue_depth', '-')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='asyncio AP istemcisi alim testi')
+    parser.add_argument('--rate', type=float, default=10000, help='Sahte AP basina satir/s')
+    parser.add_argument('--lines', type=int, default=50000, help='Sahte AP basina satir')
+    parser.add_argument('--devices', type=int, default=20, help='Sahte AP basina cihaz')
+    parser.add_argument('--aps', default='1,4', help='Sahte AP sayilari')
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+    # Alim hattinin kendisi olculur; ML tahmini bu testin disinda
+    data_manager.ML_MODEL_PATH = None
+
+    try:
+        create_app()
+        print('Sahte AP basina {} satir, {:.0f} satir/s, {} cihaz\n'.format(args.lines, args.rate, args.devices))
+        print('{:>6} {:>10} {:>10} {:>12} {:>12}'.format('AP', 'Istemci', 'Islenen', 'Satir/s', 'Maks. kuyruk'))
+
+        run_index = 0
+        for aps in [int(a) for a in args.aps.split(',')]:
+            modes = ['blocking', 'async'] if aps == 1 else ['async']
+            for mode in modes:
+                prefix = 'b{}-'.format(run_index)
+                run_index += 1
+                r = run(mode, aps, args.rate, args.devices, args.lines, prefix, args.timeout)
+                print('{:>6} {:>10} {:>10} {:>12.0f} {:>12}'.format(
+                    aps, mode, '{}/{}'.format(r['lines'], r['expected']), r['lines_per_sec'], r['max_queue_depth']))
+
+        data_manager.DataManager().close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
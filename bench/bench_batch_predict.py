@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.predictor import ConnectionPredictor
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'rssi_data.csv')
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'ml', 'model.pkl')
+
+
+def optional(value):
+    return None if np.isnan(value) else int(value)
+
+
+def replay_streaming(predictor, df):
+    levels = []
+    sources = []
+    probabilities = []
+
+    for _, session in df.groupby('session_id', sort=False):
+        predictor.clear()
+        for rssi, rtt, latency, quality_score in zip(session['rssi'], session['rtt'],
+                                                     session['latency'], session['quality_score']):
+            result = predictor.predict(rssi=optional(rssi), rtt=optional(rtt),
+                                       latency=optional(latency), quality_score=optional(quality_score))
+            levels.append(result['warning_level'])
+            sources.append(result['source'])
+            probabilities.append(np.nan if result['ml_probability'] is None else result['ml_probability'])
+
+    return np.array(levels), np.array(sources, dtype=object), np.array(probabilities)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Akan ve toplu tahmin karsilastirmasi')
+    parser.add_argument('--no-model', action='store_true', help='Sadece kural tabanli karsilastir')
+    args = parser.parse_args()
+
+    df = pd.read_csv(DATA_FILE)
+    df = df[df['event_type'] == 'DATA']
+    print('Olcum sayisi:', len(df))
+
+    predictor = ConnectionPredictor(model_path=None if args.no_model else MODEL_FILE)
+    print('Mod:', predictor.get_status()['mode'])
+
+    start = time.perf_counter()
+    levels, sources, probabilities = replay_streaming(predictor, df)
+    streaming_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = predictor.replay_session(df)
+    batch_time = time.perf_counter() - start
+
+    level_diff = int(np.sum(levels != result['warning_level'].to_numpy()))
+    source_diff = int(np.sum(sources != result['source'].to_numpy()))
+    batch_probabilities = result['ml_probability'].to_numpy()
+    probability_diff = np.nanmax(np.abs(probabilities - batch_probabilities)) if np.any(~np.isnan(probabilities)) else 0.0
+    missing_diff = int(np.sum(np.isnan(probabilities) != np.isnan(batch_probabilities)))
+
+    print('\nSure:')
+    print('  Akan (predict):        {:8.3f} s  ({:.1f} us/olcum)'.format(streaming_time, streaming_time / len(df) * 1e6))
+    print('  Toplu (replay_session): {:7.3f} s  ({:.1f} us/olcum)'.format(batch_time, batch_time / len(df) * 1e6))
+    print('  Hizlanma:               {:7.1f}x'.format(streaming_time / batch_time))
+
+    print('\nFarklar:')
+    print('  Uyari seviyesi:         {}'.format(level_diff))
+    print('  Kaynak:                 {}'.format(source_diff))
+    print('  Olasilik var/yok:       {}'.format(missing_diff))
+    print('  Maks. olasilik farki:   {:.3e}'.format(probability_diff))
+
+    if level_diff or source_diff or missing_diff:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
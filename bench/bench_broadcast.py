@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+import web.socket_client as socket_client
+from web import create_app, socketio
+
+
+def legacy_process(client, line):
+    # Eski davranis: her DATA satirinda tam olcum + tam istatistik yayini
+    parts = line[5:].split(',')
+    result = client.data_manager.add_measurement(int(parts[0]), int(parts[1]), int(parts[2]))
+    socketio.emit('new_measurement', result)
+
+    dm = client.data_manager
+    socketio.emit('stats_update', dm.get_stats_snapshot())
+
+
+def run(app, browsers, mode, rate, duration, max_rate):
+    dm = data_manager.DataManager()
+    socket_client._broadcaster = socket_client.BroadcastScheduler(dm, max_rate=max_rate)
+    socket_client._broadcaster.start()
+
+    clients = [socketio.test_client(app) for _ in range(browsers)]
+    for c in clients:
+        c.get_received()
+
+    client = socket_client.APSocketClient('127.0.0.1', 0)
+    process = client._process_message if mode == 'scheduled' else (lambda line: legacy_process(client, line))
+
+    rng = random.Random(0)
+    count = dm.find_device().measurement_count
+    interval = 1.0 / rate
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    next_time = start
+    while time.perf_counter() - start < duration:
+        count += 1
+        process('DATA:{},{},{}'.format(rng.randint(-90, -40), rng.randint(5, 150), count))
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    # Son birlestirilmis yayinin da gitmesi beklenir
+    time.sleep(socket_client._broadcaster.interval + 0.05)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    events = 0
+    total_bytes = 0
+    by_event = {}
+    for c in clients:
+        for message in c.get_received():
+            size = len(json.dumps(message['args'], ensure_ascii=False).encode())
+            events += 1
+            total_bytes += size
+            by_event[message['name']] = by_event.get(message['name'], 0) + size
+        c.disconnect()
+
+    socket_client._broadcaster.stop()
+    return {
+        'events_per_sec': events / elapsed,
+        'bytes_per_sec': total_bytes / elapsed,
+        'cpu_percent': cpu / elapsed * 100,
+        'by_event': {name: size / elapsed for name, size in by_event.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Socket.IO yayin yuk testi')
+    parser.add_argument('--rate', type=float, default=20, help='Olcum hizi (satir/s)')
+    parser.add_argument('--duration', type=float, default=5, help='Her senaryonun suresi (s)')
+    parser.add_argument('--max-rate', type=float, default=socket_client.BROADCAST_HZ,
+                        help='stats_update en yuksek yayin hizi (Hz)')
+    parser.add_argument('--browsers', default='1,10,100', help='Tarayici sayilari')
+    args = parser.parse_args()
+
+    # Olcumler gercek veri dosyasina degil gecici dizine yazilir
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+
+    try:
+        app = create_app()
+        print('Olcum hizi {:.0f} satir/s, stats_update en fazla {:.1f} Hz\n'.format(args.rate, args.max_rate))
+        print('{:>9} {:>10} {:>12} {:>14} {:>8}'.format('Tarayici', 'Mod', 'Olay/s', 'Bayt/s', 'CPU %'))
+
+        for browsers in [int(b) for b in args.browsers.split(',')]:
+            for mode in ('legacy', 'scheduled'):
+                r = run(app, browsers, mode, args.rate, args.duration, args.max_rate)
+                print('{:>9} {:>10} {:>12.0f} {:>14.0f} {:>8.1f}'.format(
+                    browsers, mode, r['events_per_sec'], r['bytes_per_sec'], r['cpu_percent']))
+                details = ', '.join('{} {:.0f}'.format(name, size) for name, size in sorted(r['by_event'].items()))
+                print('{:>22} {}'.format('', details))
+
+        data_manager.DataManager().close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import socket
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.upy_stubs import RADIO, TRAFFIC, install, run_firmware
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+AP_FIRMWARE = os.path.join(ROOT, 'ap', 'main.py')
+CLIENT_FIRMWARE = os.path.join(ROOT, 'client', 'main.py')
+AP_IP = '192.168.4.1'
+
+# Hat bayti tahmini: her TCP segmenti icin IP + TCP basligi, her baglanti
+# icin kurma ve kapatma segmentleri (SYN, SYN-ACK, ACK, FIN, ACK, FIN, ACK)
+HEADER_BYTES = 40
+CONNECTION_SEGMENTS = 7
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Istemci olcum dongusu: olcum/s ve olcum basina bayt (CPython taklit modulleriyle)')
+    parser.add_argument('--firmware', default=CLIENT_FIRMWARE, help='Istemci yazilimi (ornegin eski surum)')
+    parser.add_argument('--duration', type=float, default=10, help='Olcum suresi (s)')
+    parser.add_argument('--interval', type=float, default=0, help='Olcum araligi (s); 0 = olabildigince hizli')
+    parser.add_argument('--link-rtt', type=float, default=5, help='Taklit Wi-Fi RTT (ms)')
+    parser.add_argument('--scan-ms', type=float, default=1500, help='Taklit wlan.scan() suresi (ms)')
+    args = parser.parse_args()
+
+    client_port, pc_port = free_port(), free_port()
+    install({(AP_IP, 12345): ('127.0.0.1', client_port), (AP_IP, 12346): ('127.0.0.1', pc_port)},
+            wifi_addresses={(AP_IP, 12345)}, link_rtt=args.link_rtt / 1000)
+    RADIO['scan_seconds'] = args.scan_ms / 1000
+
+    ap = run_firmware(AP_FIRMWARE)
+    wait_for(lambda: 'ring_head' in ap)
+    time.sleep(0.2)
+    # Eski istemcide sabit 1 s bekleme de araliga baglanir
+    client = run_firmware(args.firmware, constants={'MEASURE_INTERVAL': args.interval},
+                          replace=[('time.sleep(1)\n', 'time.sleep(MEASURE_INTERVAL)\n')])
+
+    # Ilk olcum (oturum kurulumu) sayilmaz
+    wait_for(lambda: ap['ring_head'] > 0)
+    start_count = ap['ring_head']
+    start_traffic = dict(TRAFFIC)
+    start_scans = client['wlan'].scans
+    start = time.perf_counter()
+    time.sleep(args.duration)
+    elapsed = time.perf_counter() - start
+    count = ap['ring_head'] - start_count
+    traffic = {key: TRAFFIC[key] - start_traffic[key] for key in TRAFFIC}
+
+    if count == 0:
+        print('Olcum alinamadi')
+        return
+
+    payload = traffic['sent_bytes'] + traffic['received_bytes']
+    segments = traffic['sends'] + traffic['recvs'] + traffic['connections'] * CONNECTION_SEGMENTS
+    recent = [i % ap['RING_SIZE'] for i in range(max(start_count, ap['ring_head'] - ap['RING_SIZE']), ap['ring_head'])]
+    rtts = [ap['ring_rtt'][i] for i in recent]
+    jitters = [ap['ring_jitter'][i] for i in recent if ap['ring_jitter'][i] == ap['ring_jitter'][i]]
+
+    print('Yazilim:            ', os.path.relpath(args.firmware))
+    print('Taklit Wi-Fi RTT:    {:.1f} ms, tarama {:.0f} ms'.format(args.link_rtt, args.scan_ms))
+    print('Olcum araligi:       {}'.format('{} s'.format(args.interval) if args.interval else 'yok (azami hiz)'))
+    print()
+    print('Olcum/s:             {:.2f}'.format(count / elapsed))
+    print('TCP baglanti/olcum:  {:.2f}'.format(traffic['connections'] / count))
+    print('wlan.scan()/olcum:   {:.2f}'.format((client['wlan'].scans - start_scans) / count))
+    print('Veri bayti/olcum:    {:.0f} (gonderilen {}, alinan {})'.format(
+        payload / count, traffic['sent_bytes'], traffic['received_bytes']))
+    print('Hat bayti/olcum:     ~{:.0f} ({} bayt baslik x {:.1f} segment)'.format(
+        (payload + segments * HEADER_BYTES) / count, HEADER_BYTES, segments / count))
+    print('Bildirilen RTT:      ort. {:.1f} ms'.format(sum(rtts) / len(rtts)))
+    if jitters:
+        print('Bildirilen jitter:   ort. {:.2f} ms'.format(sum(jitters) / len(jitters)))
+
+
+if __name__ == '__main__':
+    main()
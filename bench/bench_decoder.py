@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol.frame import StreamDecoder, encode_data, encode_status
+
+
+def make_stream(count, devices, binary, seed=0):
+    # AP'nin gonderecegi akis: cihaz basina bir STATUS, ardindan sirayla DATA
+    rng = random.Random(seed)
+    names = ['lopy-{:02x}{:02x}'.format(i // 256, i % 256) for i in range(devices)]
+    parts = []
+    for name in names:
+        parts.append(encode_status(name, True) if binary else 'STATUS:CONNECTED,{}\n'.format(name).encode())
+    for n in range(count):
+        name = names[n % devices]
+        rssi, rtt, tick, jitter = rng.randint(-90, -40), rng.randint(2, 150), 1000 + n * 20, rng.randint(0, 200) / 10
+        if binary:
+            parts.append(encode_data(name, rssi, rtt, n // devices + 1, tick, jitter))
+        else:
+            parts.append('DATA:{},{},{},{},{},{:.1f}\n'.format(rssi, rtt, n // devices + 1, name, tick, jitter).encode())
+    return b''.join(parts)
+
+
+def chunks(stream, size):
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+
+def legacy_decode(pieces):
+    # Onceki PC yolu: parca str'ye cevrilir, satirlara bolunur, her alan
+    # split ve int ile ayrilir
+    buffer = ''
+    events = 0
+    for data in pieces:
+        buffer += data.decode()
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        for line in lines:
+            line = line.strip()
+            if line.startswith('DATA:'):
+                parts = line[5:].split(',')
+                (int(parts[0]), int(parts[1]), int(parts[2]), parts[3], int(parts[4]),
+                 float(parts[5]) if parts[5] else None)
+                events += 1
+            elif line.startswith('STATUS:'):
+                line[7:].partition(',')
+                events += 1
+    return events
+
+
+def stream_decode(pieces):
+    decoder = StreamDecoder()
+    events = 0
+    for data in pieces:
+        events += len(decoder.feed(data))
+    return events, decoder
+
+
+def corrupt(stream, rate, seed=1):
+    # Rastgele baytlar degistirilir (bozuk baglanti)
+    rng = random.Random(seed)
+    data = bytearray(stream)
+    for _ in range(int(len(data) * rate)):
+        data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+    return bytes(data)
+
+
+def timed(function, pieces, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(pieces)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AP akisi cozme hizi: metin satiri ve ikili cerceve')
+    parser.add_argument('--messages', type=int, default=200000, help='DATA mesaji sayisi')
+    parser.add_argument('--devices', type=int, default=20, help='Cihaz sayisi')
+    parser.add_argument('--chunks', default='1024,4096,65536', help='Okuma parcasi boyutlari (bayt)')
+    parser.add_argument('--repeat', type=int, default=3, help='Tekrar (en iyisi alinir)')
+    parser.add_argument('--corrupt', type=float, default=0.0001, help='Bozuk bayt orani (0 = atla)')
+    args = parser.parse_args()
+
+    text = make_stream(args.messages, args.devices, False)
+    binary = make_stream(args.messages, args.devices, True)
+    total = args.messages + args.devices
+    print('{} mesaj, {} cihaz'.format(total, args.devices))
+    print('Metin: {:.1f} bayt/mesaj, ikili: {:.1f} bayt/mesaj\n'.format(len(text) / total, len(binary) / total))
+
+    print('{:>8} {:<28} {:>12} {:>10}'.format('Parca', 'Cozucu', 'mesaj/s', 'us/mesaj'))
+    for size in [int(c) for c in args.chunks.split(',')]:
+        text_pieces, binary_pieces = chunks(text, size), chunks(binary, size)
+        runs = (
+            ('eski metin (str split)', legacy_decode, text_pieces),
+            ('StreamDecoder metin', lambda p: stream_decode(p)[0], text_pieces),
+            ('StreamDecoder ikili', lambda p: stream_decode(p)[0], binary_pieces),
+        )
+        for label, function, pieces in runs:
+            events, seconds = timed(function, pieces, args.repeat)
+            if events != total:
+                print('HATA: {} mesaj bekleniyordu, {} cozuldu ({})'.format(total, events, label))
+            print('{:>8} {:<28} {:>12.0f} {:>10.2f}'.format(size, label, events / seconds, seconds / events * 1e6))
+        print()
+
+    if args.corrupt:
+        print('Bozuk akis (bayt orani {}):'.format(args.corrupt))
+        for label, stream in (('metin', text), ('ikili', binary)):
+            events, decoder = stream_decode(chunks(corrupt(stream, args.corrupt), 4096))
+            stats = decoder.get_stats()
+            print('  {:<6} {} / {} mesaj cozuldu, {} hata'.format(label, events, total, stats['errors']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import bisect
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.rf_scenarios import ScenarioServer, SCENARIOS
+
+MODEL_FILE = os.path.join(ROOT, 'ml', 'model.pkl')
+RESULTS_DIR = os.path.join(ROOT, 'bench', 'results')
+
+# Her tuketici ayri bir surecte calisir; CPU ve bellek o surecin kendisidir.
+# Kod tuketicinin giris noktasini gecici veri dizini ve sentetik AP ile
+# kurar, olcum alindigi ani kaydeder ve READY yazar. stdin kapaninca
+# sonuclari JSON dosyasina yazip cikar.
+#   pc:  pc/main.py, alinma ani DATA satirinin kayda yazildigi an (tek cihaz
+#        izlenir: DEVICE_ID)
+#   web: web/app.py'nin AsyncAPClient'i, alinma ani new_measurement emit
+#        cagrisi (HTTP/Socket.IO sunucusu baslatilmaz, tarayici yok)
+PC_CONSUMER = '''
+import os, sys, time
+sys.path.insert(0, {root!r})
+os.environ['DEVICE_ID'] = {device!r}
+import pc.main as pc
+pc.DATA_DIR = {directory!r}
+pc.CSV_FILE = os.path.join(pc.DATA_DIR, 'rssi_data.csv')
+pc.COLUMNAR_DIR = os.path.join(pc.DATA_DIR, 'columnar')
+pc.AP_IP, pc.AP_PORT = '127.0.0.1', {port}
+pc.ML_MODEL_PATH = {model!r}
+
+received = []
+write_data_row = pc.write_data_row
+
+def traced(store, session_id, measurement_id, event_type, *args, **kwargs):
+    if event_type == 'DATA':
+        received.append(({device!r}, measurement_id, time.time()))
+    return write_data_row(store, session_id, measurement_id, event_type, *args, **kwargs)
+
+pc.write_data_row = traced
+consume = pc.main
+'''
+
+WEB_CONSUMER = '''
+import os, sys, time
+sys.path.insert(0, {root!r})
+import web.data_manager as data_manager
+data_manager.CSV_FILE = os.path.join({directory!r}, 'rssi_data.csv')
+data_manager.COLUMNAR_DIR = os.path.join({directory!r}, 'columnar')
+data_manager.ML_MODEL_PATH = {model!r}
+from web import create_app, socketio
+from web.socket_client import set_client
+from web.ingest import AsyncAPClient
+create_app()
+
+received = []
+emit = socketio.emit
+
+def traced(event, *args, **kwargs):
+    if event == 'new_measurement':
+        received.append((kwargs['to'][0][len('device:'):], args[0]['count'], time.time()))
+    return emit(event, *args, **kwargs)
+
+socketio.emit = traced
+
+def consume():
+    client = AsyncAPClient([('127.0.0.1', {port})])
+    set_client(client)
+    client.start()
+'''
+
+RUN_CONSUMER = '''
+import json, resource, threading
+if {model!r}:
+    from ml.loader import warm_up_model
+    warm_up_model({model!r}, background=False)
+
+def rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return None
+
+before = resource.getrusage(resource.RUSAGE_SELF)
+print('READY', flush=True)
+sys.stdout = open(os.devnull, 'w')
+started = time.time()
+threading.Thread(target=consume, daemon=True).start()
+sys.stdin.read()
+
+after = resource.getrusage(resource.RUSAGE_SELF)
+with open({result!r}, 'w') as f:
+    json.dump({{
+        'received': received,
+        'wall': time.time() - started,
+        'cpu_seconds': (after.ru_utime + after.ru_stime) - (before.ru_utime + before.ru_stime),
+        'rss_kb': rss_kb(),
+        'max_rss_kb': after.ru_maxrss
+    }}, f)
+os._exit(0)
+'''
+
+CONSUMERS = {'pc': PC_CONSUMER, 'web': WEB_CONSUMER}
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', None
+
+
+def match_latencies(sent, received):
+    # Her alinan olcum, ayni (cihaz, sayac) ile ondan once gonderilen son
+    # olcumle eslesir (sayac sifirlaninca ayni anahtar tekrar gonderilir)
+    latencies = []
+    for device, count, at in received:
+        times = sent.get((device, count))
+        if not times:
+            continue
+        i = bisect.bisect_right(times, at)
+        if i:
+            latencies.append(at - times[i - 1])
+    return np.array(latencies) * 1000
+
+
+def run(consumer, args, rate, directory):
+    server = ScenarioServer(args.scenario, args.devices, rate, args.duration,
+                            seed=args.seed, text=args.format == 'text', record=True, quiet=True)
+    port = server.start_thread()
+    tracked = '{}-000'.format(server.prefix)
+    result_path = os.path.join(directory, 'result.json')
+    code = CONSUMERS[consumer].format(root=ROOT, directory=directory, port=port, model=args.model,
+                                      device=tracked)
+    code += RUN_CONSUMER.format(model=args.model, result=result_path)
+
+    env = dict(os.environ, RSSI_AP_FORMAT=args.format)
+    with open(os.path.join(directory, 'stderr.log'), 'w') as log:
+        process = subprocess.Popen([sys.executable, '-c', code], cwd=ROOT, env=env, text=True,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=log)
+        while True:
+            line = process.stdout.readline()
+            if not line or line.startswith('READY'):
+                break
+
+        # Akis bitene kadar beklenir; yeniden baglanan istemciye ikinci akis
+        # gonderilmesin diye sunucu kapatilir, ardindan kuyruklar bosalir
+        deadline = time.time() + args.duration + 30
+        while not (server.connections and server.connections[0]['end']) and time.time() < deadline:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        server.stop()
+        time.sleep(args.drain)
+
+        try:
+            process.communicate(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+
+    if not os.path.exists(result_path):
+        with open(os.path.join(directory, 'stderr.log')) as f:
+            raise RuntimeError('{} tuketicisi sonuc yazmadi:\n{}'.format(consumer, f.read()[-2000:]))
+    with open(result_path) as f:
+        result = json.load(f)
+
+    connection = server.connections[0] if server.connections else {}
+    sent = server.sent
+    if consumer == 'pc':
+        sent = {key: times for key, times in sent.items() if key[0] == tracked}
+    sent_count = sum(len(times) for times in sent.values())
+    received = result['received']
+    latencies = match_latencies(sent, received)
+
+    first_sent = min((times[0] for times in sent.values()), default=None)
+    last_sent = max((times[-1] for times in sent.values()), default=None)
+    last_received = max((at for _, _, at in received), default=None)
+    window = last_received - first_sent if received and first_sent else None
+
+    return {
+        'consumer': consumer,
+        'scenario': args.scenario,
+        'format': 'binary' if connection.get('binary') else 'text',
+        'devices': args.devices,
+        'tracked_devices': 1 if consumer == 'pc' else args.devices,
+        'offered_rate': rate,
+        'sent': sent_count,
+        'sent_rate': round(sent_count / (connection['end'] - connection['start']), 1) if connection.get('end') else None,
+        'received': len(received),
+        'matched': len(latencies),
+        'status_messages': connection.get('status', 0),
+        'bytes_sent': connection.get('bytes', 0),
+        'ingest_rate': round(len(latencies) / window, 1) if window else 0.0,
+        'drain_s': round(last_received - last_sent, 3) if received and last_sent else None,
+        'latency_ms': {
+            'p50': round(float(np.percentile(latencies, 50)), 3),
+            'p90': round(float(np.percentile(latencies, 90)), 3),
+            'p99': round(float(np.percentile(latencies, 99)), 3),
+            'max': round(float(latencies.max()), 3),
+            'mean': round(float(latencies.mean()), 3)
+        } if len(latencies) else None,
+        'cpu_seconds': round(result['cpu_seconds'], 3),
+        'cpu_percent': round(100 * result['cpu_seconds'] / result['wall'], 1),
+        'rss_mb': round(result['rss_kb'] / 1024, 1) if result['rss_kb'] else None,
+        'max_rss_mb': round(result['max_rss_kb'] / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sentetik RF senaryosuyla uctan uca alim testi (pc/main.py, web)')
+    parser.add_argument('--consumers', default='pc,web', help='Tuketiciler (pc, web)')
+    parser.add_argument('--scenario', default='mixed', choices=sorted(SCENARIOS), help='RF senaryosu')
+    parser.add_argument('--rates', default='100,1000,5000', help='Toplam olcum/s degerleri')
+    parser.add_argument('--devices', type=int, default=20, help='Cihaz sayisi')
+    parser.add_argument('--duration', type=float, default=10, help='Hiz basina akis suresi (s)')
+    parser.add_argument('--drain', type=float, default=2, help='Akis bittikten sonra bekleme (s)')
+    parser.add_argument('--format', default='binary', choices=('binary', 'text'), help='AP akis bicimi')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-model', action='store_true', help='ML modeli olmadan (kural tabanli)')
+    parser.add_argument('--output', help='JSON sonuc dosyasi (varsayilan bench/results/end_to_end_<commit>.json)')
+    args = parser.parse_args()
+
+    args.model = None if args.no_model or not os.path.exists(MODEL_FILE) else MODEL_FILE
+    commit, dirty = git_revision()
+    output = args.output or os.path.join(RESULTS_DIR, 'end_to_end_{}{}.json'.format(commit, '-dirty' if dirty else ''))
+
+    print('Senaryo: {}, {} cihaz, {} s, {} bicim, model: {}\n'.format(
+        args.scenario, args.devices, args.duration, args.format, 'var' if args.model else 'yok'))
+    print('{:<5} {:>7} {:>15} {:>9} {:>22} {:>7} {:>8} {:>8}'.format(
+        'Tuk.', 'olcum/s', 'alinan/gonder.', 'alim/s', 'gecikme p50/p99/max', 'CPU %', 'RSS MB', 'bosalma'))
+
+    runs = []
+    for consumer in [c.strip() for c in args.consumers.split(',') if c.strip()]:
+        for rate in [float(r) for r in args.rates.split(',')]:
+            directory = tempfile.mkdtemp(prefix='rssi_e2e_')
+            try:
+                r = run(consumer, args, rate, directory)
+            finally:
+                shutil.rmtree(directory)
+            runs.append(r)
+            latency = r['latency_ms'] or {}
+            print('{:<5} {:>7.0f} {:>15} {:>9.0f} {:>22} {:>7.1f} {:>8} {:>8}'.format(
+                consumer, rate, '{}/{}'.format(r['matched'], r['sent']), r['ingest_rate'],
+                '{:.1f}/{:.1f}/{:.1f}'.format(latency['p50'], latency['p99'], latency['max']) if latency else '-',
+                r['cpu_percent'], r['max_rss_mb'],
+                '{:.2f}s'.format(r['drain_s']) if r['drain_s'] is not None else '-'))
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'hostname': socket.gethostname()
+        },
+        'config': dict({name: value for name, value in vars(args).items() if name not in ('output', 'model')},
+                       model=os.path.relpath(args.model, ROOT) if args.model else None),
+        'runs': runs
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('\nSonuclar:', output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import argparse
+import warnings
+import subprocess
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.forest import PackedForest, packed_path, verification_inputs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_FILE = os.path.join(ROOT, 'ml', 'model.pkl')
+
+# Ayri surecte: import + yukleme + ilk tahmin suresi (soguk baslangic)
+LOAD_SKLEARN = '''
+import time, warnings
+start = time.perf_counter()
+warnings.simplefilter('ignore')
+import joblib, numpy as np
+model = joblib.load({path!r})
+model.predict_proba(np.zeros((1, model.n_features_in_)))
+print(time.perf_counter() - start)
+'''
+
+LOAD_PACKED = '''
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import numpy as np
+from ml.forest import PackedForest
+model = PackedForest.load({path!r})
+model.predict_proba(np.zeros((1, model.n_features_in_)))
+print(time.perf_counter() - start, 'sklearn' in sys.modules)
+'''
+
+
+def measure(predict, X, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def cold_start(code):
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return output.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Paketli orman ve sklearn predict_proba karsilastirmasi')
+    parser.add_argument('--model', default=MODEL_FILE, help='sklearn model dosyasi (.pkl)')
+    parser.add_argument('--rows', type=int, default=10000, help='Toplu tahmin satir sayisi')
+    parser.add_argument('--repeats', type=int, default=20, help='Olcum tekrari')
+    args = parser.parse_args()
+
+    import joblib
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = joblib.load(args.model)
+    forest = PackedForest.from_sklearn(model)
+
+    X = verification_inputs(forest, rows=args.rows)
+    same = np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    print('{} agac, derinlik {}, paketli dizi {:.0f} KB'.format(
+        forest.n_estimators, forest.depth, forest.memory_bytes() / 1024))
+    print('{} satirda olasiliklar ayni: {}\n'.format(len(X), 'evet' if same else 'HAYIR'))
+
+    print('{:<22} {:>12} {:>12} {:>12} {:>12}'.format('Senaryo', 'sklearn p50', 'p99', 'paketli p50', 'p99'))
+    for label, rows, repeats in (('1 satir', X[:1], args.repeats * 10), ('{} satir'.format(len(X)), X, args.repeats)):
+        sk50, sk99 = measure(model.predict_proba, rows, repeats)
+        pk50, pk99 = measure(forest.predict_proba, rows, repeats)
+        print('{:<22} {:>10.3f}ms {:>10.3f}ms {:>10.3f}ms {:>10.3f}ms'.format(label, sk50, sk99, pk50, pk99))
+
+    packed = packed_path(args.model)
+    if os.path.exists(packed):
+        sklearn_time = float(cold_start(LOAD_SKLEARN.format(path=args.model))[0])
+        packed_time, imported = cold_start(LOAD_PACKED.format(root=ROOT, path=packed))
+        print('\nSoguk baslangic (import + yukleme + ilk tahmin):')
+        print('  sklearn: {:.0f} ms'.format(sklearn_time * 1000))
+        print('  paketli: {:.0f} ms (sklearn import edildi: {})'.format(float(packed_time) * 1000, imported))
+
+
+if __name__ == '__main__':
+    main()
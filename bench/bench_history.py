@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.columnar import RECORD_DTYPE, FILE_SUFFIX, _header, map_session, session_files, write_index
+from storage.timeseries import TimeSeriesIndex, DATA_CODE
+
+START_TIME = 1767225600.0  # 2026-01-01
+
+
+def generate(directory, rows, days, device, seed=0):
+    # Her gun icin bir oturum dosyasi (sunucu her gun yeniden baslatilmis gibi)
+    rng = np.random.default_rng(seed)
+    per_day = rows // days
+    interval = 86400.0 / per_day
+
+    for day in range(days):
+        count = per_day if day < days - 1 else rows - per_day * (days - 1)
+        start = START_TIME + day * 86400
+        session_id = time.strftime('%Y%m%d_%H%M%S', time.gmtime(start)) + '_' + device
+
+        records = np.zeros(count, dtype=RECORD_DTYPE)
+        records['unix_time'] = start + np.arange(count) * interval
+        records['measurement_id'] = np.arange(1, count + 1)
+        records['event_type'] = np.where(rng.random(count) < 0.01, 1, DATA_CODE)
+        records['rssi'] = rng.integers(-95, -30, count)
+        records['rtt'] = rng.integers(5, 300, count)
+        records['latency'] = records['rtt'] // 2
+        records['quality_score'] = rng.integers(0, 5, count)
+        records['disconnect_duration'] = np.nan
+
+        path = os.path.join(directory, session_id + FILE_SUFFIX)
+        with open(path, 'wb') as f:
+            f.write(_header())
+            f.write(records.tobytes())
+        write_index(path, records)
+
+    return START_TIME, START_TIME + days * 86400
+
+
+def full_scan(directory, t_from, t_to):
+    # Karsilastirma: indeks kullanmadan tum oturumlarin zaman sutunu taranir
+    parts = []
+    for path in session_files(directory):
+        records = map_session(path)
+        mask = (records['unix_time'] >= t_from) & (records['unix_time'] <= t_to)
+        parts.append(records[mask])
+    return np.concatenate(parts)
+
+
+def percentiles(samples):
+    samples = np.array(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99), samples.max()
+
+
+def run_queries(index, device, t_min, t_max, span, repeats, rng):
+    latencies = []
+    points = 0
+    for _ in range(repeats):
+        t_from = rng.uniform(t_min, t_max - span)
+        start = time.perf_counter()
+        result = index.query(device, t_from, t_from + span)
+        json.dumps(result)
+        latencies.append(time.perf_counter() - start)
+        points = len(result['time'])
+    return latencies, points
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zaman araligi gecmis sorgusu gecikme testi')
+    parser.add_argument('--rows', type=int, default=50000000, help='Toplam kayit sayisi')
+    parser.add_argument('--days', type=int, default=31, help='Veri kac gune yayilacak')
+    parser.add_argument('--hour-repeats', type=int, default=200, help='1 saatlik sorgu tekrari')
+    parser.add_argument('--month-repeats', type=int, default=10, help='30 gunluk sorgu tekrari')
+    parser.add_argument('--scan-repeats', type=int, default=3, help='Tam tarama karsilastirma tekrari')
+    parser.add_argument('--dir', help='Veri dizini (verilmezse gecici dizin olusturulup silinir)')
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix='rssi_bench_')
+    device = 'bench'
+
+    try:
+        if not session_files(directory):
+            print('Veri uretiliyor: {} kayit, {} gun...'.format(args.rows, args.days))
+            start = time.perf_counter()
+            generate(directory, args.rows, args.days, device)
+            print('  {:.1f} s\n'.format(time.perf_counter() - start))
+
+        paths = session_files(directory)
+        rows = sum(len(map_session(p)) for p in paths)
+        t_min = min(map_session(p)['unix_time'][0] for p in paths)
+        t_max = max(map_session(p)['unix_time'][-1] for p in paths)
+        size = sum(os.path.getsize(p) for p in paths)
+        print('{} kayit, {} oturum, {:.0f} MB\n'.format(rows, len(paths), size / 1e6))
+
+        index = TimeSeriesIndex(directory)
+        rng = np.random.default_rng(1)
+
+        print('{:<24} {:>8} {:>10} {:>10} {:>10}'.format('Sorgu', 'Nokta', 'p50 ms', 'p99 ms', 'maks ms'))
+
+        latencies, points = run_queries(index, device, t_min, t_max, 3600, args.hour_repeats, rng)
+        print('{:<24} {:>8} {:>10.2f} {:>10.2f} {:>10.2f}'.format('1 saat (indeks)', points, *percentiles(latencies)))
+
+        month = min(30 * 86400, t_max - t_min)
+        latencies, points = run_queries(index, device, t_min, t_max, month, args.month_repeats, rng)
+        print('{:<24} {:>8} {:>10.2f} {:>10.2f} {:>10.2f}'.format('30 gun (indeks)', points, *percentiles(latencies)))
+
+        latencies = []
+        for _ in range(args.scan_repeats):
+            t_from = rng.uniform(t_min, t_max - 3600)
+            start = time.perf_counter()
+            full_scan(directory, t_from, t_from + 3600)
+            latencies.append(time.perf_counter() - start)
+        print('{:<24} {:>8} {:>10.2f} {:>10.2f} {:>10.2f}'.format('1 saat (tam tarama)', '-', *percentiles(latencies)))
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
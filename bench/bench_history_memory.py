@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.history import MeasurementHistory
+
+
+class LegacyHistory:
+
+    # Eski DataManager gecmisi: nokta basina iki sozluk ve ISO metni
+    def __init__(self, capacity):
+        self.rssi_history = deque(maxlen=capacity)
+        self.rtt_history = deque(maxlen=capacity)
+        self.time_history = deque(maxlen=capacity)
+
+    def append(self, unix_time, rssi, rtt, latency, quality_score, flags):
+        timestamp = datetime.fromtimestamp(unix_time).isoformat(timespec='milliseconds')
+        self.rssi_history.append({'time': timestamp, 'value': rssi})
+        self.rtt_history.append({'time': timestamp, 'value': rtt})
+        self.time_history.append(timestamp)
+
+    def points(self, *fields):
+        return {'rssi': list(self.rssi_history), 'rtt': list(self.rtt_history)}
+
+
+def measurements(count, seed=0):
+    rng = random.Random(seed)
+    start = time.time()
+    result = []
+    for i in range(count):
+        rtt = rng.randint(5, 300)
+        result.append((start + i * 0.1, rng.randint(-95, -30), rtt, rtt // 2, rng.randint(0, 4), 0))
+    return result
+
+
+def measure_memory(factory, capacity, rows):
+    # Tampon dolana kadar eklenir; sonra ayni sayida ekleme daha yapilip
+    # bellegin sabit kaldigi kontrol edilir
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    history = factory(capacity)
+    for row in rows[:capacity]:
+        history.append(*row)
+    full = tracemalloc.get_traced_memory()[0] - before
+    for row in rows[capacity:]:
+        history.append(*row)
+    after = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return full, after
+
+
+def measure_speed(factory, capacity, rows, repeats):
+    history = factory(capacity)
+    start = time.perf_counter()
+    for row in rows:
+        history.append(*row)
+    append_time = (time.perf_counter() - start) / len(rows)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        json.dumps(history.points('rssi', 'rtt'))
+    encode_time = (time.perf_counter() - start) / repeats
+    return append_time, encode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Olcum gecmisi bellek testi')
+    parser.add_argument('--capacity', default='300,10000', help='Tampon boyutlari')
+    parser.add_argument('--repeats', type=int, default=200, help='JSON uretim tekrari')
+    args = parser.parse_args()
+
+    print('{:>8} {:>8} {:>14} {:>14} {:>12} {:>12}'.format(
+        'Boyut', 'Yapi', 'Bayt/olcum', 'Dolu+N (KB)', 'Ekleme us', 'JSON ms'))
+
+    for capacity in [int(c) for c in args.capacity.split(',')]:
+        rows = measurements(capacity * 2)
+        for name, factory in (('eski', LegacyHistory), ('dizi', MeasurementHistory)):
+            full, after = measure_memory(factory, capacity, rows)
+            append_time, encode_time = measure_speed(factory, capacity, rows, args.repeats)
+            print('{:>8} {:>8} {:>14.1f} {:>7.0f}/{:<6.0f} {:>12.2f} {:>12.2f}'.format(
+                capacity, name, full / capacity, full / 1024, after / 1024,
+                append_time * 1e6, encode_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
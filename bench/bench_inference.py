@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+from ml.inference import get_inference_worker
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'ml', 'model.pkl')
+
+
+def run(sessions, count, rate, seed=0):
+    # Olcumler sabit hizla tum cihazlara gelir; gecikme add_measurement
+    # cagrisinin suresidir
+    rng = random.Random(seed)
+    latencies = []
+    interval = 1.0 / rate if rate > 0 else 0
+    next_at = time.perf_counter()
+    for i in range(1, count + 1):
+        for session in sessions:
+            start = time.perf_counter()
+            session.add_measurement(rng.randint(-90, -40), rng.randint(5, 300), i)
+            latencies.append(time.perf_counter() - start)
+
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    # Kuyrukta kalan tahminler biter
+    deadline = time.perf_counter() + 5
+    while any(s.predictor.get_status()['inference']['pending'] for s in sessions) \
+            and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+    return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senkron ve arka plan ML tahmini olcum gecikmesi')
+    parser.add_argument('--count', type=int, default=300, help='Olcum sayisi')
+    parser.add_argument('--rate', type=float, default=20, help='Olcum hizi (Hz)')
+    parser.add_argument('--devices', type=int, default=1, help='Ayni isciyi paylasan cihaz sayisi')
+    parser.add_argument('--deadline', type=float, default=None, help='ML sure siniri (ms)')
+    args = parser.parse_args()
+
+    if not os.path.exists(MODEL_FILE):
+        print('Model bulunamadi:', MODEL_FILE)
+        return
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+    data_manager.ML_MODEL_PATH = MODEL_FILE
+
+    try:
+        dm = data_manager.DataManager()
+        worker = get_inference_worker()
+        if args.deadline is not None:
+            worker.deadline = args.deadline / 1000.0
+
+        print('\n{} olcum x {} cihaz, {:.0f} Hz, sure siniri {:.0f} ms\n'.format(
+            args.count, args.devices, args.rate, worker.deadline * 1000))
+        print('{:<12} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}'.format(
+            'Mod', 'p50 ms', 'p99 ms', 'max ms', 'ML p99', 'ML tamam', 'Atilan'))
+
+        for name, asynchronous in (('senkron', False), ('arka plan', True)):
+            data_manager.ML_ASYNC = asynchronous
+            sessions = [dm.get_device('{}-{}'.format(name.replace(' ', '_'), i)) for i in range(args.devices)]
+            samples = run(sessions, args.count, args.rate)
+
+            statuses = [s.predictor.get_status()['inference'] for s in sessions]
+            p99 = max((s['p99_ms'] or 0) for s in statuses)
+            print('{:<12} {:>10.2f} {:>10.2f} {:>10.2f} {:>10} {:>10} {:>10}'.format(
+                name, np.percentile(samples, 50), np.percentile(samples, 99), samples.max(),
+                p99 if asynchronous else '-',
+                sum(s['completed'] for s in statuses) if asynchronous else '-',
+                sum(s['dropped'] for s in statuses) if asynchronous else '-'))
+
+        print('\nIsci:', worker.get_stats())
+        dm.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
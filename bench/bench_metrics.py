@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+import web.socket_client as socket_client
+from web import create_app
+from web.metrics import STAGES, COUNTERS, get_metrics, render_prometheus
+from ml.stats import LatencyHistogram
+from protocol.frame import StreamDecoder, encode_data, encode_status
+
+# AsyncAPClient yolunda olcum basina eklenen cagrilar: perf_counter
+# (kuyruk 1, add_measurement 7, predict 3, yayin 2), histograma ekleme
+# (queue, lock_wait, predict, store, stats, emit, total, rules, ml) ve
+# sayac (emits, measurements). Parca basina olanlar (parse, bytes) haric.
+TIMERS_PER_MEASUREMENT = 13
+OBSERVES_PER_MEASUREMENT = 9
+INCS_PER_MEASUREMENT = 2
+
+
+class NullHistogram:
+
+    def observe(self, seconds):
+        pass
+
+
+class NullMetrics:
+
+    # Karsilastirma icin: zaman damgalari alinir ama histograma yazilmaz
+    # (sayaclar ayri bir sozlukte artmaya devam eder)
+
+    def __init__(self):
+        self.stages = {name: NullHistogram() for name in STAGES}
+        self.counters = dict.fromkeys((name for name, _ in COUNTERS), 0)
+
+
+def per_call(function, n):
+    # Cagri basina sure (ns); bos cagri dongusu cikarilir
+    def loop(f):
+        start = time.perf_counter()
+        for _ in range(n):
+            f()
+        return time.perf_counter() - start
+
+    empty = min(loop(lambda: None) for _ in range(3))
+    return max(0.0, min(loop(function) for _ in range(3)) - empty) / n * 1e9
+
+
+def make_stream(prefix, devices, count, first, seed=0):
+    rng = random.Random(seed)
+    names = ['{}-{:03d}'.format(prefix, i) for i in range(devices)]
+    parts = [encode_status(name, True) for name in names]
+    for n in range(count):
+        parts.append(encode_data(names[n % devices], rng.randint(-90, -40), rng.randint(2, 150),
+                                 first + n // devices, 1000 + n * 20, rng.randint(0, 200) / 10))
+    return b''.join(parts)
+
+
+def run(client, stream, chunk):
+    decoder = StreamDecoder()
+    events = 0
+    start = time.perf_counter()
+    for i in range(0, len(stream), chunk):
+        arrived = time.perf_counter()
+        for event in client._decode(decoder, stream[i:i + chunk], arrived):
+            client._process_event(event, received=time.time(), arrived=arrived)
+            events += 1
+    elapsed = time.perf_counter() - start
+    client.data_manager.store.flush()
+    return elapsed, events
+
+
+def set_metrics(client, enabled):
+    metrics = get_metrics() if enabled else NullMetrics()
+    client.metrics = metrics
+    for device in client.data_manager.devices.values():
+        device.metrics = metrics
+        device.predictor.stage_latency = {
+            name: LatencyHistogram() if enabled else NullHistogram()
+            for name in device.predictor.stage_latency
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Olcum hatti asama olcumlerinin (/api/metrics) maliyeti')
+    parser.add_argument('--messages', type=int, default=20000, help='Tur basina DATA mesaji')
+    parser.add_argument('--devices', type=int, default=20, help='Cihaz sayisi')
+    parser.add_argument('--chunk', type=int, default=4096, help='Okuma parcasi (bayt)')
+    parser.add_argument('--rounds', type=int, default=5, help='Tur sayisi (acik/kapali sirayla, en iyisi alinir)')
+    parser.add_argument('--model', action='store_true',
+                        help='ML modeliyle calis (varsayilan: sadece kural tabanli)')
+    args = parser.parse_args()
+
+    # Olcumler gercek veri dosyasina degil gecici dizine yazilir
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+    if not args.model:
+        data_manager.ML_MODEL_PATH = None
+
+    try:
+        create_app()
+        client = socket_client.APSocketClient('127.0.0.1', 0)
+
+        histogram = LatencyHistogram()
+        metrics = get_metrics()
+        timer = per_call(time.perf_counter, 200000)
+        observe = per_call(lambda: histogram.observe(0.00004), 200000)
+        counters = metrics.counters
+
+        def increment():
+            counters['emits'] += 1
+
+        inc = per_call(increment, 200000)
+        estimate = (TIMERS_PER_MEASUREMENT * timer + OBSERVES_PER_MEASUREMENT * observe
+                    + INCS_PER_MEASUREMENT * inc) / 1000
+        print('Cagri basina: perf_counter {:.0f} ns, histogram {:.0f} ns, sayac {:.0f} ns'.format(timer, observe, inc))
+        print('Olcum basina tahmini ek yuk ({} zaman, {} histogram, {} sayac): {:.2f} us\n'.format(
+            TIMERS_PER_MEASUREMENT, OBSERVES_PER_MEASUREMENT, INCS_PER_MEASUREMENT, estimate))
+
+        # Cihazlar ve model olcum disinda kurulur
+        run(client, make_stream('bench', args.devices, args.devices, 1), args.chunk)
+
+        best = {True: None, False: None}
+        first = 2
+        for _ in range(args.rounds):
+            for enabled in (False, True):
+                set_metrics(client, enabled)
+                stream = make_stream('bench', args.devices, args.messages, first)
+                first += args.messages // args.devices + 1
+                elapsed, events = run(client, stream, args.chunk)
+                per_event = elapsed / events * 1e6
+                best[enabled] = per_event if best[enabled] is None else min(best[enabled], per_event)
+
+        print('{} mesaj/tur, {} cihaz, {} tur, model: {}'.format(
+            args.messages, args.devices, args.rounds, 'acik' if args.model else 'kapali'))
+        print('{:<28} {:>12} {:>10}'.format('Hat', 'mesaj/s', 'us/mesaj'))
+        for label, enabled in (('kayit kapali (NullMetrics)', False), ('kayit acik', True)):
+            print('{:<28} {:>12.0f} {:>10.2f}'.format(label, 1e6 / best[enabled], best[enabled]))
+        print('Fark: {:+.2f} us/mesaj (zaman damgalari ve sayaclar her iki hatta da)'.format(best[True] - best[False]))
+
+        set_metrics(client, True)
+        body = render_prometheus(metrics, list(client.data_manager.devices.values()), client)
+        start = time.perf_counter()
+        render_prometheus(metrics, list(client.data_manager.devices.values()), client)
+        print('\n/api/metrics govdesi: {} satir, {:.1f} KB, {:.2f} ms'.format(
+            body.count('\n'), len(body) / 1024, (time.perf_counter() - start) * 1000))
+
+        client.data_manager.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.forest import packed_path
+from ml.registry import ModelRegistry
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'ml', 'model.pkl')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Olcum akarken model yeniden yukleme (hot-reload)')
+    parser.add_argument('--reloads', type=int, default=5, help='Model degistirme sayisi')
+    parser.add_argument('--rate', type=float, default=50, help='Olcum hizi (Hz)')
+    parser.add_argument('--poll', type=float, default=0.2, help='Dosya yoklama araligi (s)')
+    parser.add_argument('--sklearn', action='store_true', help='model.npz olmadan (sklearn modeli)')
+    args = parser.parse_args()
+
+    if not os.path.exists(MODEL_FILE):
+        print('Model bulunamadi:', MODEL_FILE)
+        return
+
+    os.environ['RSSI_MODEL_POLL_S'] = str(args.poll)
+    from ml.predictor import ConnectionPredictor
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    try:
+        # Gecici dizinde iki surumlu kayit: ayni model iki kez yayinlanir,
+        # surumler arasinda gidip gelinir (her seferinde dosya degisir)
+        model_path = os.path.join(directory, 'model.pkl')
+        shutil.copy(MODEL_FILE, model_path)
+        if not args.sklearn and os.path.exists(packed_path(MODEL_FILE)):
+            shutil.copy(packed_path(MODEL_FILE), packed_path(model_path))
+        registry = ModelRegistry(os.path.join(directory, 'models'), model_path)
+        registry.publish('a')
+        registry.publish('b')
+
+        predictor = ConnectionPredictor(model_path=model_path, watch=True)
+        latencies = []
+        running = True
+
+        def measure():
+            i = 0
+            interval = 1.0 / args.rate
+            while running:
+                start = time.perf_counter()
+                predictor.predict(-60 - i % 30, 20 + i % 200, 10, 80 - i % 50, on_ml_result=lambda r: None)
+                latencies.append((start, time.perf_counter() - start))
+                i += 1
+                time.sleep(interval)
+
+        thread = threading.Thread(target=measure)
+        thread.start()
+        time.sleep(1)
+
+        reload_windows = []
+        for i in range(args.reloads):
+            swaps = predictor.model_swaps
+            start = time.perf_counter()
+            registry.activate(2 - i % 2)
+            while predictor.model_swaps == swaps and time.perf_counter() - start < 30:
+                time.sleep(0.01)
+            reload_windows.append((start, time.perf_counter()))
+            status = predictor.get_status()['model']
+            print('Yukleme #{}: dosyadan devreye {:.0f} ms, yukleme {} ms, durus {} ms'.format(
+                status['generation'], (time.perf_counter() - start) * 1000,
+                status['load_ms'], status['swap_pause_ms']))
+            time.sleep(0.5)
+
+        running = False
+        thread.join()
+
+        during = np.array([s for t, s in latencies if any(a <= t <= b for a, b in reload_windows)]) * 1000
+        other = np.array([s for t, s in latencies if not any(a <= t <= b for a, b in reload_windows)]) * 1000
+        status = predictor.get_status()
+
+        print('\n{:<22} {:>8} {:>10} {:>10} {:>10}'.format('predict() gecikmesi', 'adet', 'p50 ms', 'p99 ms', 'max ms'))
+        for label, samples in (('yukleme sirasinda', during), ('diger', other)):
+            if len(samples):
+                print('{:<22} {:>8} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+                    label, len(samples), np.percentile(samples, 50), np.percentile(samples, 99), samples.max()))
+
+        inference = status['inference']
+        print('\nML tahmini: {} tamam, {} atilan, {} bekleyen'.format(
+            inference['completed'], inference['dropped'], inference['pending']))
+        print('Model:', status['model'])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+import web.socket_client as socket_client
+from web import create_app
+
+
+def generate_lines(prefix, devices, lines_per_device, seed=0):
+    # Cihazlarin satirlari AP'deki gibi karisik sirayla gelir; %1 paket kaybi
+    rng = random.Random(seed)
+    counts = [0] * devices
+    rssi = [rng.randint(-80, -45) for _ in range(devices)]
+
+    lines = []
+    for _ in range(lines_per_device):
+        for i in range(devices):
+            counts[i] += 2 if rng.random() < 0.01 else 1
+            rssi[i] = max(-95, min(-30, rssi[i] + rng.randint(-2, 2)))
+            lines.append('DATA:{},{},{},{}-{}'.format(rssi[i], rng.randint(5, 150), counts[i], prefix, i))
+    return lines
+
+
+def run(client, prefix, devices, lines_per_device):
+    dm = client.data_manager
+    lines = generate_lines(prefix, devices, lines_per_device)
+
+    start = time.perf_counter()
+    for line in lines:
+        client._process_message(line)
+    elapsed = time.perf_counter() - start
+
+    # Kuyruktaki satirlar diske yazilana kadar beklenir
+    start = time.perf_counter()
+    dm.store.flush()
+    drain = time.perf_counter() - start
+
+    registered = [d for d in dm.devices if d.startswith(prefix + '-')]
+    lost = sum(dm.devices[d].lost_packets for d in registered)
+    return {
+        'lines_per_sec': len(lines) / elapsed,
+        'drain': drain,
+        'registered': len(registered),
+        'lost_packets': lost
+    }
+
+
+def measure_memory(client, prefix, devices, lines_per_device):
+    # tracemalloc yavaslattigi icin hiz olcumunden ayri, yeni cihazlarla yapilir
+    lines = generate_lines(prefix, devices, lines_per_device)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for line in lines:
+        client._process_message(line)
+    client.data_manager.store.flush()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / devices
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coklu cihaz yuk testi')
+    parser.add_argument('--devices', default='1,10,100,300', help='Cihaz sayilari')
+    parser.add_argument('--lines', type=int, default=300, help='Cihaz basina satir sayisi')
+    parser.add_argument('--model', action='store_true',
+                        help='ML modeliyle calis (varsayilan: sadece kural tabanli)')
+    args = parser.parse_args()
+
+    # Olcumler gercek veri dosyasina degil gecici dizine yazilir
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+    if not args.model:
+        data_manager.ML_MODEL_PATH = None
+
+    try:
+        create_app()
+        client = socket_client.APSocketClient('127.0.0.1', 0)
+        # Model ve ortak yapilar olcum disinda bir kez yuklenir
+        client._process_message('DATA:-60,20,1,warmup')
+
+        print('Cihaz basina {} satir, model: {}\n'.format(args.lines, 'acik' if args.model else 'kapali'))
+        print('{:>8} {:>12} {:>10} {:>14} {:>8}'.format('Cihaz', 'Satir/s', 'Bosalma', 'Bellek/cihaz', 'Kayip'))
+
+        for run_index, devices in enumerate(int(d) for d in args.devices.split(',')):
+            r = run(client, 'r{}'.format(run_index), devices, args.lines)
+            assert r['registered'] == devices
+            memory = measure_memory(client, 'm{}'.format(run_index), devices, args.lines)
+            print('{:>8} {:>12.0f} {:>9.2f}s {:>11.1f} KB {:>8}'.format(
+                devices, r['lines_per_sec'], r['drain'], memory / 1024, r['lost_packets']))
+
+        stats = client.data_manager.store.get_stats()
+        print('\nYazici: {} satir, {} toplu yazma, ort. gecikme {} ms'.format(
+            stats['rows_written'], stats['commits'], stats['avg_write_latency_ms']))
+
+        client.data_manager.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
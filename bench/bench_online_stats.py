@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.stats import OnlineStats
+
+
+def sorted_stats(values):
+    # Eski calculate_stats: her cagrida tum listeyi siralar
+    n = len(values)
+    sorted_vals = sorted(values)
+    avg = sum(values) / n
+    variance = sum((x - avg) ** 2 for x in values) / n
+    median = sorted_vals[n // 2] if n % 2 == 1 else (sorted_vals[n // 2 - 1] + sorted_vals[n // 2]) / 2
+    return {'min': min(values), 'max': max(values), 'avg': avg, 'std': variance ** 0.5, 'median': median}
+
+
+def run_lists(samples, every):
+    values = []
+    start = time.perf_counter()
+    for i, value in enumerate(samples, 1):
+        values.append(value)
+        if i % every == 0:
+            sorted_stats(values)
+    return time.perf_counter() - start, sorted_stats(values)
+
+
+def run_online(samples, every):
+    stats = OnlineStats()
+    start = time.perf_counter()
+    for i, value in enumerate(samples, 1):
+        stats.add(value)
+        if i % every == 0:
+            stats.summary()
+    return time.perf_counter() - start, stats.summary()
+
+
+def measure_memory(factory, samples):
+    tracemalloc.start()
+    holder = factory(samples)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del holder
+    return current
+
+
+def fill_list(samples):
+    values = []
+    for value in samples:
+        values.append(value)
+    return values
+
+
+def fill_online(samples):
+    stats = OnlineStats()
+    for value in samples:
+        stats.add(value)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Oturum istatistikleri benchmark')
+    parser.add_argument('--rows', type=int, default=100000, help='Olcum sayisi')
+    parser.add_argument('--every', type=int, default=10, help='Kac olcumde bir istatistik hesaplanacagi')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-95, -20, args.rows).tolist()
+
+    list_time, list_result = run_lists(samples, args.every)
+    online_time, online_result = run_online(samples, args.every)
+
+    for key in list_result:
+        if abs(list_result[key] - online_result[key]) > 1e-6:
+            print('UYUMSUZ {}: {} != {}'.format(key, list_result[key], online_result[key]))
+
+    print('{} olcum, her {} olcumde bir istatistik:'.format(args.rows, args.every))
+    print('  Liste + siralama: {:8.3f} s'.format(list_time))
+    print('  OnlineStats:      {:8.3f} s'.format(online_time))
+    print('  Hizlanma:         {:8.1f}x'.format(list_time / online_time))
+
+    print('\nBellek (tracemalloc):')
+    print('  Liste:            {:8.1f} KB'.format(measure_memory(fill_list, samples) / 1024))
+    print('  OnlineStats:      {:8.1f} KB'.format(measure_memory(fill_online, samples) / 1024))
+
+
+if __name__ == '__main__':
+    main()
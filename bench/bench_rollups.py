@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+from storage.columnar import RECORD_DTYPE, FILE_SUFFIX, _header, write_index
+from storage.rollup import Rollups
+from storage.timeseries import TimeSeriesIndex, DATA_CODE
+
+START_TIME = 1767225600.0  # 2026-01-01
+
+
+def synthetic(days, rate, seed=0):
+    # Gunluk dalgalanan RSSI, rastgele RTT; 1 Hz'de bir aylik veri
+    rng = np.random.default_rng(seed)
+    count = int(days * 86400 * rate)
+    times = START_TIME + np.arange(count) / rate
+    rssi = np.round(-65 + 10 * np.sin(times / 86400 * 2 * np.pi) + rng.normal(0, 4, count)).astype(int)
+    rtt = rng.integers(5, 200, count)
+    return times, rssi, rtt
+
+
+def write_columnar(directory, device, times, rssi, rtt):
+    records = np.zeros(len(times), dtype=RECORD_DTYPE)
+    records['unix_time'] = times
+    records['measurement_id'] = np.arange(1, len(times) + 1)
+    records['event_type'] = DATA_CODE
+    records['rssi'] = rssi
+    records['rtt'] = rtt
+    records['latency'] = rtt // 2
+    records['disconnect_duration'] = np.nan
+
+    path = os.path.join(directory, time.strftime('%Y%m%d_%H%M%S', time.gmtime(times[0])) + '_' + device + FILE_SUFFIX)
+    with open(path, 'wb') as f:
+        f.write(_header())
+        f.write(records.tobytes())
+    write_index(path, records)
+
+
+def measure(query, repeats):
+    latencies = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = query()
+        body = json.dumps(result)
+        latencies.append(time.perf_counter() - start)
+    samples = np.array(latencies) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99), len(result['time']), result.get('source'), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ozet katmanlari bellek ve sorgu testi')
+    parser.add_argument('--days', type=float, default=30, help='Veri suresi (gun)')
+    parser.add_argument('--rate', type=float, default=1, help='Olcum hizi (Hz)')
+    parser.add_argument('--points', type=int, default=2000, help='Yanittaki en fazla nokta')
+    parser.add_argument('--repeats', type=int, default=20, help='Sorgu tekrari')
+    args = parser.parse_args()
+
+    times, rssi, rtt = synthetic(args.days, args.rate)
+    values = list(zip(times.tolist(), rssi.tolist(), rtt.tolist()))
+    print('{} olcum ({:.0f} gun, {:.0f} Hz)\n'.format(len(values), args.days, args.rate))
+
+    # Ekleme maliyeti ve bellek ayri olculur (tracemalloc yavaslatir)
+    rollups = Rollups()
+    start = time.perf_counter()
+    for t, r, q in values:
+        rollups.add(t, r, q, q // 2)
+    add_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    measured = Rollups()
+    for t, r, q in values:
+        measured.add(t, r, q, q // 2)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del measured
+
+    print('Ekleme: {:.2f} us/olcum'.format(add_time / len(values) * 1e6))
+    print('Bellek: {:.0f} KB (dizi: {:.0f} KB), kova: {}'.format(
+        memory / 1024, rollups.memory_bytes() / 1024, rollups.get_status()))
+    print('Ham veri karsiligi: {:.0f} MB (kolonlu kayit)\n'.format(len(values) * RECORD_DTYPE.itemsize / 1e6))
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.ML_MODEL_PATH = None
+    try:
+        write_columnar(directory, 'bench', times, rssi, rtt)
+        index = TimeSeriesIndex(directory)
+        device = data_manager.DeviceSession('bench', 'bench', None)
+        device.rollups = rollups
+
+        end = float(times[-1])
+        print('{:<10} {:<8} {:>8} {:>10} {:>10} {:>10}'.format('Aralik', 'Kaynak', 'Nokta', 'p50 ms', 'p99 ms', 'JSON KB'))
+        for label, span in [('6 saat', 6 * 3600), ('1 gun', 86400), ('7 gun', 7 * 86400), ('30 gun', 30 * 86400)]:
+            span = min(span, end - START_TIME)
+            t_from = end - span
+            for query in (lambda: device.query_rollups(t_from, end, None, args.points),
+                          lambda: index.query('bench', t_from, end, None, args.points)):
+                p50, p99, points, source, size = measure(query, args.repeats)
+                print('{:<10} {:<8} {:>8} {:>10.2f} {:>10.2f} {:>10.1f}'.format(
+                    label, source, points, p50, p99, size / 1024))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
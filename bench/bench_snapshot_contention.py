@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web.data_manager as data_manager
+
+
+class LockedSession(data_manager.DeviceSession):
+
+    # Eski okuma yolu: her okuma data_lock'u alip sozlugu degisken
+    # alanlardan kurar; olcum thread'i (tahmin + disk kuyrugu) bu sirada bekler
+    def get_current_data(self, state=None):
+        with self.data_lock:
+            return {
+                'device': self.device_id,
+                'session_id': self.session_id,
+                'duration': self.get_duration_formatted(),
+                'duration_seconds': self.get_session_duration(),
+                'connection_status': self.connection_status,
+                'current': {
+                    'rssi': self.current_rssi,
+                    'rtt': self.current_rtt,
+                    'latency': self.current_latency,
+                    'quality': self.current_quality,
+                    'count': self.measurement_count
+                },
+                'stats': {
+                    'rssi': self.calculate_stats(self.rssi_stats),
+                    'rtt': self.calculate_stats(self.rtt_stats),
+                    'latency': self.calculate_stats(self.latency_stats)
+                },
+                'quality_distribution': dict(self.quality_counts),
+                'issues': self._get_issues(),
+                'warnings': list(self.warnings),
+                'warning_counts': dict(self.warning_counts),
+                'predictor': self.predictor.get_status(),
+                'chart_data': self.history.points('rssi', 'rtt')
+            }
+
+
+def run(session, readers, count, rate, seed=0):
+    rng = random.Random(seed)
+    for i in range(1, data_manager.HISTORY_SIZE + 1):
+        session.add_measurement(rng.randint(-90, -40), rng.randint(5, 150), i)
+
+    stop = threading.Event()
+    reads = [0] * readers
+
+    def reader(index):
+        while not stop.is_set():
+            session.get_current_data()
+            reads[index] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(readers)]
+    for t in threads:
+        t.start()
+
+    # Olcumler sabit hizla gelir; gecikme add_measurement cagrisinin suresidir
+    latencies = []
+    interval = 1.0 / rate if rate > 0 else 0
+    start = time.perf_counter()
+    next_at = start
+    for i in range(count):
+        index = data_manager.HISTORY_SIZE + 1 + i
+        t0 = time.perf_counter()
+        session.add_measurement(rng.randint(-90, -40), rng.randint(5, 150), index)
+        latencies.append(time.perf_counter() - t0)
+
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for t in threads:
+        t.join()
+
+    samples = np.array(latencies) * 1000
+    return {
+        'p50': np.percentile(samples, 50),
+        'p99': np.percentile(samples, 99),
+        'max': samples.max(),
+        'reads': sum(reads) / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Okuyucu/olcum kilit cekismesi testi')
+    parser.add_argument('--readers', type=int, default=50, help='get_current_data cagiran thread')
+    parser.add_argument('--count', type=int, default=500, help='Olcum sayisi')
+    parser.add_argument('--rate', type=float, default=50, help='Olcum hizi (Hz)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+    data_manager.ML_MODEL_PATH = None
+
+    try:
+        dm = data_manager.DataManager()
+        print('{} olcum, {:.0f} Hz, {} okuyucu thread\n'.format(args.count, args.rate, args.readers))
+        print('{:<22} {:>10} {:>10} {:>10} {:>12}'.format('Senaryo', 'p50 ms', 'p99 ms', 'max ms', 'Okuma/s'))
+
+        for name, factory, readers in [
+            ('okuyucu yok', data_manager.DeviceSession, 0),
+            ('kilitli okuma', LockedSession, args.readers),
+            ('degismez goruntu', data_manager.DeviceSession, args.readers),
+        ]:
+            session = factory(name, 'bench_' + name.replace(' ', '_'), dm.store)
+            r = run(session, readers, args.count, args.rate)
+            print('{:<22} {:>10.3f} {:>10.3f} {:>10.3f} {:>12.0f}'.format(
+                name, r['p50'], r['p99'], r['max'], r['reads']))
+
+        dm.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_FILE = os.path.join(ROOT, 'ml', 'model.pkl')
+
+# Her senaryo ayri bir surecte calisir. Kod, ilgili giris noktasinin
+# baslangictaki import ve kurulum adimlarini izler; sonra ilk tahminin
+# (kural tabanli) ve hibrit moda gecisin suresini yazar.
+PC_STARTUP = '''
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import pc.main
+from ml.predictor import ConnectionPredictor
+imported = time.perf_counter()
+predictor = ConnectionPredictor(model_path={model!r}, background={background})
+predict = lambda i: predictor.predict(rssi=-60 - i % 20, rtt=20 + i, latency=10, quality_score=80)
+'''
+
+WEB_STARTUP = '''
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import web.app
+import web.data_manager as data_manager
+imported = time.perf_counter()
+web.app.create_app()
+data_manager.CSV_FILE = {directory!r} + '/rssi_data.csv'
+data_manager.COLUMNAR_DIR = {directory!r} + '/columnar'
+data_manager.ML_MODEL_PATH = {model!r}
+
+class Predictor(data_manager.ConnectionPredictor):
+    def __init__(self, model_path=None, thresholds=None, background=True, watch=False):
+        super().__init__(model_path, thresholds, background={background}, watch=watch)
+
+
+data_manager.ConnectionPredictor = Predictor
+device = data_manager.DataManager().get_device('bench')
+predictor = device.predictor
+predict = lambda i: device.add_measurement(-60 - i % 20, 20 + i, i + 1)
+'''
+
+FIRST_PREDICTION = '''
+predict(0)
+first = time.perf_counter()
+i = 1
+while not predictor.ml_enabled and time.perf_counter() - start < 30:
+    predict(i)
+    i += 1
+    time.sleep(0.002)
+hybrid = time.perf_counter()
+print('RESULT', imported - start, first - start, hybrid - start, predictor.ml_enabled, 'sklearn' in sys.modules)
+'''
+
+
+def run(code, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    start = time.perf_counter()
+    output = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    wall = time.perf_counter() - start
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1])
+
+    result = [line for line in output.stdout.splitlines() if line.startswith('RESULT')][-1].split()[1:]
+    return wall, result, output.stderr
+
+
+def top_imports(stderr, count, depth=1):
+    # -X importtime satirlari: "import time: self | kumulatif | modul"; modul
+    # adindaki her iki bosluk bir alt seviyedir. Giris kodunun import ettigi
+    # moduller ve onlarin dogrudan importlari listelenir.
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level <= depth:
+            imports.append((int(cumulative), '  ' * level + name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='pc/main.py ve web/app.py baslangic suresi')
+    parser.add_argument('--model', default=MODEL_FILE, help='Model dosyasi')
+    parser.add_argument('--repeats', type=int, default=3, help='Senaryo basina tekrar')
+    parser.add_argument('--top', type=int, default=12, help='Gosterilecek en yavas import sayisi')
+    parser.add_argument('--sklearn', action='store_true',
+                        help='model.npz olmadan (joblib + sklearn ile) yukleme')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    try:
+        if args.sklearn:
+            # Yaninda model.npz olmayan kopya: paketli model yerine sklearn yuklenir
+            args.model = shutil.copy(args.model, os.path.join(directory, 'model.pkl'))
+
+        for name, template in (('pc/main.py', PC_STARTUP), ('web/app.py', WEB_STARTUP)):
+            print('\n' + '=' * 70)
+            print(name)
+            print('=' * 70)
+            print('{:<14} {:>10} {:>10} {:>12} {:>12} {:>10}'.format(
+                'Yukleme', 'import ms', 'ilk tahmin', 'hibrit ms', 'surec ms', 'sklearn'))
+
+            for background in (True, False):
+                code = template.format(root=ROOT, model=args.model, directory=directory,
+                                       background=background) + FIRST_PREDICTION
+                runs = [run(code) for _ in range(args.repeats)]
+                wall, result, _ = sorted(runs, key=lambda r: float(r[1][1]))[len(runs) // 2]
+                imported, first, hybrid, enabled, sklearn = result
+                print('{:<14} {:>10.0f} {:>10.0f} {:>12} {:>12.0f} {:>10}'.format(
+                    'arka plan' if background else 'senkron', float(imported) * 1000, float(first) * 1000,
+                    '{:.0f}'.format(float(hybrid) * 1000) if enabled == 'True' else '-',
+                    wall * 1000, 'evet' if sklearn == 'True' else 'hayir'))
+
+            code = template.format(root=ROOT, model=args.model, directory=directory,
+                                   background=True) + FIRST_PREDICTION
+            _, _, stderr = run(code, importtime=True)
+            print('\nEn yavas importlar (-X importtime, kumulatif):')
+            for cumulative, module in top_imports(stderr, args.top):
+                print('  {:>8.1f} ms  {}'.format(cumulative / 1000, module))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
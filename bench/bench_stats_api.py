@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import http.client
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def poll(port, path, pollers, duration, etag, results):
+    # Ayri surecte: her poller kalici bir HTTP/1.1 baglantisiyla art arda istek atar
+    counts = [0] * pollers
+    statuses = {}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        last_etag = None
+        local = []
+        while time.perf_counter() < deadline:
+            headers = {'If-None-Match': last_etag} if etag and last_etag else {}
+            start = time.perf_counter()
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            if response.status == 200:
+                last_etag = response.getheader('ETag')
+            counts[index] += 1
+            with lock:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(pollers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    results.put({
+        'requests': sum(counts),
+        'elapsed': elapsed,
+        'statuses': statuses,
+        'p50': latencies[len(latencies) // 2] if latencies else 0,
+        'p99': latencies[int(len(latencies) * 0.99)] if latencies else 0
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/stats istek/s testi')
+    parser.add_argument('--pollers', type=int, default=100, help='Eszamanli istemci')
+    parser.add_argument('--duration', type=float, default=5, help='Her senaryonun suresi (s)')
+    parser.add_argument('--rate', type=float, default=10, help='Olcum hizi (satir/s)')
+    args = parser.parse_args()
+
+    import web.data_manager as data_manager
+    from flask import jsonify
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from web import create_app
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    data_manager.CSV_FILE = os.path.join(directory, 'rssi_data.csv')
+    data_manager.COLUMNAR_DIR = os.path.join(directory, 'columnar')
+    data_manager.ML_MODEL_PATH = None
+
+    try:
+        app = create_app()
+        dm = data_manager.DataManager()
+
+        # Eski davranis: her istekte kilit altinda sozluk + stdlib jsonify
+        app.add_url_rule('/bench/legacy_stats', 'legacy_stats',
+                         lambda: jsonify(dm.find_device().get_current_data()))
+
+        rng = random.Random(0)
+        for count in range(1, 301):
+            dm.add_measurement(rng.randint(-90, -40), rng.randint(5, 150), count)
+
+        class QuietHandler(WSGIRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        stop = threading.Event()
+
+        def ingest():
+            count = 300
+            while not stop.wait(1.0 / args.rate):
+                count += 1
+                dm.add_measurement(rng.randint(-90, -40), rng.randint(5, 150), count)
+
+        threading.Thread(target=ingest, daemon=True).start()
+
+        print('{} poller, olcum {:.0f} satir/s, {} s\n'.format(args.pollers, args.rate, args.duration))
+        print('{:<24} {:>10} {:>10} {:>10} {:>16}'.format('Senaryo', 'Istek/s', 'p50 ms', 'p99 ms', 'Durumlar'))
+
+        context = multiprocessing.get_context('spawn')
+        for name, path, etag in [
+            ('eski (jsonify)', '/bench/legacy_stats', False),
+            ('onbellek', '/api/stats', False),
+            ('onbellek + ETag', '/api/stats', True),
+        ]:
+            results = context.Queue()
+            process = context.Process(target=poll, args=(port, path, args.pollers, args.duration, etag, results))
+            process.start()
+            r = results.get()
+            process.join()
+            statuses = ' '.join('{}:{}'.format(k, v) for k, v in sorted(r['statuses'].items()))
+            print('{:<24} {:>10.0f} {:>10.2f} {:>10.2f} {:>16}'.format(
+                name, r['requests'] / r['elapsed'], r['p50'] * 1000, r['p99'] * 1000, statuses))
+
+        stop.set()
+        server.shutdown()
+        dm.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CSVStore
+from storage.columnar import ColumnarStore, RECORD_DTYPE, EVENT_TYPES, FILE_SUFFIX, QUALITY_LABELS, load_columnar, _header
+
+
+def synthetic_records(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    records = np.zeros(rows, dtype=RECORD_DTYPE)
+    records['unix_time'] = 1767794939.0 + np.arange(rows) * 1.0
+    records['measurement_id'] = np.arange(1, rows + 1)
+    records['event_type'] = np.where(rng.random(rows) < 0.02, 2, 0)
+    records['rssi'] = rng.integers(-95, -20, rows)
+    records['rtt'] = rng.integers(1, 400, rows)
+    records['latency'] = records['rtt'] // 2
+    records['quality_score'] = rng.integers(0, 5, rows)
+    records['disconnect_duration'] = np.nan
+    return records
+
+
+def bench_writes(directory, rows):
+    records = synthetic_records(rows)
+    measurements = list(zip(records['unix_time'].tolist(), records['measurement_id'].tolist(),
+                            records['rssi'].astype(int).tolist(), records['rtt'].astype(int).tolist(),
+                            records['latency'].astype(int).tolist(), records['quality_score'].tolist()))
+
+    results = []
+    for name, factory in [
+        ('CSV, her satir flush', lambda: CSVStore(os.path.join(directory, 'a.csv'), buffer_rows=1)),
+        ('CSV, 1024 satir', lambda: CSVStore(os.path.join(directory, 'b.csv'), buffer_rows=1024)),
+        ('Kolonlu, her satir flush', lambda: ColumnarStore(os.path.join(directory, 'c'), buffer_rows=1)),
+        ('Kolonlu, 1024 satir', lambda: ColumnarStore(os.path.join(directory, 'd'), buffer_rows=1024)),
+    ]:
+        store = factory()
+        start = time.perf_counter()
+        for unix_time, measurement_id, rssi, rtt, latency, quality_score in measurements:
+            store.append('bench', unix_time, measurement_id, 'DATA', rssi=rssi, rtt=rtt, latency=latency,
+                         quality=QUALITY_LABELS[quality_score], quality_score=quality_score)
+        store.close()
+        results.append((name, time.perf_counter() - start))
+
+    return results
+
+
+def bench_loads(directory, rows):
+    records = synthetic_records(rows)
+
+    columnar_dir = os.path.join(directory, 'load')
+    os.makedirs(columnar_dir)
+    with open(os.path.join(columnar_dir, 'bench' + FILE_SUFFIX), 'wb') as f:
+        f.write(_header())
+        f.write(records.tobytes())
+
+    csv_path = os.path.join(directory, 'load.csv')
+    df = pd.DataFrame({
+        'session_id': 'bench',
+        'timestamp': '',
+        'unix_time': records['unix_time'],
+        'measurement_id': records['measurement_id'],
+        'event_type': np.array(EVENT_TYPES)[records['event_type']],
+        'rssi': records['rssi'].astype(int),
+        'rtt': records['rtt'].astype(int),
+        'latency': records['latency'].astype(int),
+        'quality': '',
+        'quality_score': records['quality_score'],
+        'disconnect_duration': '',
+    })
+    df.to_csv(csv_path, index=False)
+
+    start = time.perf_counter()
+    pd.read_csv(csv_path)
+    csv_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_columnar(columnar_dir)
+    columnar_time = time.perf_counter() - start
+
+    sizes = (os.path.getsize(csv_path), os.path.getsize(os.path.join(columnar_dir, 'bench' + FILE_SUFFIX)))
+    return csv_time, columnar_time, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV ve kolonlu depolama benchmark')
+    parser.add_argument('--rows', type=int, default=10000000, help='Yukleme testi satir sayisi')
+    parser.add_argument('--write-rows', type=int, default=1000000, help='Yazma testi satir sayisi')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    try:
+        print('Yazma hizi ({} satir, satir basina append):'.format(args.write_rows))
+        for name, elapsed in bench_writes(directory, args.write_rows):
+            print('  {:26s} {:10.0f} satir/s'.format(name, args.write_rows / elapsed))
+
+        csv_time, columnar_time, sizes = bench_loads(directory, args.rows)
+        print('\nYukleme suresi ({} satir):'.format(args.rows))
+        print('  pd.read_csv:              {:8.3f} s  ({:.1f} MB)'.format(csv_time, sizes[0] / 1e6))
+        print('  load_columnar (memmap):   {:8.3f} s  ({:.1f} MB)'.format(columnar_time, sizes[1] / 1e6))
+        print('  Hizlanma:                 {:8.1f}x'.format(csv_time / columnar_time))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.features import extract_features, features_to_array, RollingFeatures, FEATURE_NAMES
+from ml.predictor import ConnectionPredictor
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'rssi_data.csv')
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'ml', 'model.pkl')
+WINDOW_SIZE = 10
+
+
+def load_measurements(repeat):
+    df = pd.read_csv(DATA_FILE)
+    df = df[df['event_type'] == 'DATA']
+    rows = []
+    for rssi, rtt, quality_score in zip(df['rssi'], df['rtt'], df['quality_score']):
+        rows.append((
+            int(rssi),
+            int(rtt) if not np.isnan(rtt) else None,
+            int(quality_score) if not np.isnan(quality_score) else None,
+        ))
+    return rows * repeat
+
+
+def run_legacy(rows):
+    # Eski ConnectionPredictor penceresi: list + pop(0) + extract_features
+    window = []
+    vectors = []
+    start = time.perf_counter()
+    for rssi, rtt, quality_score in rows:
+        window.append({'rssi': rssi, 'rtt': rtt, 'latency': None, 'quality_score': quality_score})
+        if len(window) > WINDOW_SIZE:
+            window.pop(0)
+        if len(window) >= WINDOW_SIZE:
+            vectors.append(features_to_array(extract_features(window)))
+    return time.perf_counter() - start, vectors
+
+
+def run_rolling(rows):
+    features = RollingFeatures(WINDOW_SIZE)
+    vectors = []
+    start = time.perf_counter()
+    for rssi, rtt, quality_score in rows:
+        features.update(rssi, rtt, quality_score)
+        if features.is_full():
+            vectors.append(features.as_array().copy())
+    return time.perf_counter() - start, vectors
+
+
+def run_predictor(rows):
+    predictor = ConnectionPredictor(model_path=MODEL_FILE)
+    start = time.perf_counter()
+    for rssi, rtt, quality_score in rows:
+        predictor.predict(rssi=rssi, rtt=rtt, latency=rtt // 2 if rtt else None,
+                          quality_score=quality_score)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Akan ozellik hesaplama benchmark')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='CSV olcumlerinin kac kez tekrar oynatilacagi')
+    parser.add_argument('--with-model', action='store_true',
+                        help='ConnectionPredictor.predict toplam suresini de olc')
+    args = parser.parse_args()
+
+    rows = load_measurements(args.repeat)
+    print('Olcum sayisi:', len(rows))
+
+    legacy_time, legacy_vectors = run_legacy(rows)
+    rolling_time, rolling_vectors = run_rolling(rows)
+
+    print('\nOlcum basina gecikme:')
+    print('  Eski (list + extract_features): {:8.2f} us'.format(legacy_time / len(rows) * 1e6))
+    print('  RollingFeatures:                {:8.2f} us'.format(rolling_time / len(rows) * 1e6))
+    print('  Hizlanma:                       {:8.1f}x'.format(legacy_time / rolling_time))
+
+    diff = np.abs(np.array(legacy_vectors) - np.array(rolling_vectors)).max(axis=0)
+    print('\nMaksimum mutlak fark:')
+    for name, value in zip(FEATURE_NAMES, diff):
+        print('  {:15s} {:.3e}'.format(name, value))
+
+    if args.with_model:
+        predict_time = run_predictor(rows)
+        print('\nConnectionPredictor.predict (model ile): {:.2f} us/olcum'.format(
+            predict_time / len(rows) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
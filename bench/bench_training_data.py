@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.features import create_training_data, extract_features, features_to_array, FEATURE_NAMES
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'rssi_data.csv')
+
+
+def legacy_create_training_data(df, window_size=10, prediction_horizon=5):
+    # Vektorlestirme oncesi referans uygulama (karsilastirma icin).
+    data_df = df[df['event_type'] == 'DATA'].copy()
+    data_df = data_df.reset_index(drop=True)
+
+    problem_indices = set()
+    for idx, row in df.iterrows():
+        if row['event_type'] in ['DISCONNECTED', 'PACKET_LOST']:
+            problem_time = row['unix_time']
+            for data_idx, data_row in data_df.iterrows():
+                if data_row['unix_time'] < problem_time:
+                    time_diff = problem_time - data_row['unix_time']
+                    estimated_measurements = time_diff / 4
+                    if estimated_measurements <= prediction_horizon:
+                        problem_indices.add(data_idx)
+
+    X = []
+    y = []
+
+    for i in range(window_size, len(data_df)):
+        window = data_df.iloc[i-window_size:i]
+
+        window_data = []
+        for _, row in window.iterrows():
+            window_data.append({
+                'rssi': row['rssi'] if not np.isnan(row['rssi']) else None,
+                'rtt': row['rtt'] if not np.isnan(row['rtt']) else None,
+                'latency': row['latency'] if not np.isnan(row['latency']) else None,
+                'quality_score': row['quality_score'] if not np.isnan(row['quality_score']) else None,
+            })
+
+        features = extract_features(window_data)
+        feature_vector = features_to_array(features)
+
+        label = 1 if i in problem_indices else 0
+
+        X.append(feature_vector)
+        y.append(label)
+
+    return np.array(X), np.array(y)
+
+
+def scale_dataframe(df, factor):
+    # CSV'yi factor kez arka arkaya ekler; her kopya zamanda kaydirilir ve
+    # ayri oturum kimligi alir.
+    span = df['unix_time'].max() - df['unix_time'].min() + 60
+    copies = []
+    for i in range(factor):
+        copy = df.copy()
+        copy['unix_time'] = copy['unix_time'] + i * span
+        copy['session_id'] = copy['session_id'].astype(str) + '_{}'.format(i)
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(X_old, y_old, X_new, y_new):
+    if X_old.shape != X_new.shape or not np.array_equal(y_old, y_new):
+        return False
+    for i, name in enumerate(FEATURE_NAMES):
+        if not np.array_equal(X_old[:, i], X_new[:, i]):
+            print('  Farkli ozellik:', name)
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='create_training_data benchmark')
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--legacy-max-rows', type=int, default=5000,
+                        help='Eski uygulama bu satir sayisinin ustunde calistirilmaz')
+    args = parser.parse_args()
+
+    base = pd.read_csv(DATA_FILE)
+
+    print('{:>8} {:>10} {:>12} {:>12} {:>10} {:>8}'.format(
+        'Olcek', 'Satir', 'Eski (s)', 'Yeni (s)', 'Hizlanma', 'Esit'))
+
+    for factor in sorted({1, args.scale}):
+        df = scale_dataframe(base, factor)
+
+        (X_new, y_new), new_time = timed(create_training_data, df)
+
+        if len(df) <= args.legacy_max_rows:
+            (X_old, y_old), old_time = timed(legacy_create_training_data, df)
+            equal = 'evet' if compare(X_old, y_old, X_new, y_new) else 'HAYIR'
+            print('{:>8} {:>10} {:>12.3f} {:>12.3f} {:>9.0f}x {:>8}'.format(
+                factor, len(df), old_time, new_time, old_time / new_time, equal))
+        else:
+            print('{:>8} {:>10} {:>12} {:>12.3f} {:>10} {:>8}'.format(
+                factor, len(df), 'atlandi', new_time, '-', '-'))
+
+
+if __name__ == '__main__':
+    main()
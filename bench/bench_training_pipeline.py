@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.features import create_training_data
+from ml.feature_cache import FeatureCache
+import ml.train as train
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'rssi_data.csv')
+
+
+def make_day(df, day):
+    # Ornek veriden bir gunluk kopya: oturum kimlikleri ve zamanlar kaydirilir,
+    # RSSI'ya +-2 dBm eklenir (ayni pencereler tekrarlanmasin; trend
+    # hesabi ayni pencereleri bir kez hesaplar)
+    rng = np.random.default_rng(day)
+    copy = df.copy()
+    copy['session_id'] = copy['session_id'] + '_d{:03d}'.format(day)
+    copy['unix_time'] = copy['unix_time'] + day * 86400
+    copy['rssi'] = copy['rssi'] + rng.integers(-2, 3, len(copy))
+    return copy
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Egitim hatti: ozellik onbellegi ve paralel egitim sureleri')
+    parser.add_argument('--days', type=int, default=30, help='Sentetik gun sayisi (ornek veri kopyasi)')
+    parser.add_argument('--jobs', type=int, default=-1, help='Paralel egitim is sayisi')
+    parser.add_argument('--skip-fit', action='store_true', help='Yalnizca ozellik asamasini olc')
+    args = parser.parse_args()
+
+    base = pd.read_csv(DATA_FILE, dtype={'session_id': str})
+    directory = tempfile.mkdtemp(prefix='rssi_bench_')
+    try:
+        csv_path = os.path.join(directory, 'rssi_data.csv')
+        cache_dir = os.path.join(directory, 'feature_cache')
+        pd.concat([make_day(base, day) for day in range(args.days)]).to_csv(csv_path, index=False)
+        print('{} gun, {} satir, {:.1f} MB'.format(
+            args.days, len(base) * args.days, os.path.getsize(csv_path) / 1e6))
+
+        def full():
+            df = pd.read_csv(csv_path)
+            return create_training_data(df)
+
+        def cached():
+            cache = FeatureCache(cache_dir)
+            cache.update_from_csv(csv_path)
+            return cache.dataset(), cache.stats
+
+        (X_full, _), full_time = timed(full)
+        (_, stats), cold_time = timed(cached)
+        make_day(base, args.days).to_csv(csv_path, mode='a', header=False, index=False)
+        (_, stats), incremental_time = timed(cached)
+        ((X, y, groups), _), _ = timed(cached)
+
+        print('\n{:<40} {:>10}'.format('Ozellik asamasi', 'sure'))
+        print('{:<40} {:>9.2f}s'.format('tum CSV + create_training_data', full_time))
+        print('{:<40} {:>9.2f}s'.format('onbellek, ilk kurulum', cold_time))
+        print('{:<40} {:>9.2f}s  ({} oturum yeniden, {} onbellekten, {} satir)'.format(
+            '+1 gun sonra (artimli)', incremental_time, stats['computed'], stats['reused'], stats['rows_read']))
+
+        if args.skip_fit:
+            return
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            split = train.make_splits(y, groups, 'session')
+            train_rows, _, folds = split
+            tasks = [(train_rows, None)] + list(folds)
+
+            print('\n{:<40} {:>10}'.format('Egitim + {} CV katmani'.format(len(folds)), 'sure'))
+            _, sequential = timed(lambda: [train._fit(X, y, a, b) for a, b in tasks])
+            print('{:<40} {:>9.2f}s'.format('sirali (n_jobs=1)', sequential))
+            _, parallel = timed(lambda: train.joblib.Parallel(n_jobs=args.jobs, prefer='threads')(
+                train.joblib.delayed(train._fit)(X, y, a, b) for a, b in tasks))
+            print('{:<40} {:>9.2f}s  ({} cekirdek)'.format(
+                'paralel (n_jobs={})'.format(args.jobs), parallel, os.cpu_count()))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol.frame import FORMAT_REQUEST, encode_data, encode_status
+
+# Port 12346 protokolunu konusan sahte AP. Her PC baglantisina --devices
+# cihaz icin sirayla DATA mesajlari gonderir; toplam hiz --rate mesaj/s.
+# PC FORMAT:BIN2 isterse ikili cerceve gonderilir (--text ile istek yok
+# sayilir, eski AP gibi).
+# Ornek: python bench/fake_ap.py --port 12346 --rate 10000 --devices 50
+
+# Baglantidan sonra PC'nin bicim istegi bu kadar (s) beklenir
+FORMAT_WAIT = 0.2
+
+
+def make_lines(devices, prefix, legacy, seed=0, binary=False):
+    rng = random.Random(seed)
+    counts = [0] * devices
+    rssi = [rng.randint(-80, -45) for _ in range(devices)]
+    names = ['{}-{}'.format(prefix, i) for i in range(devices)]
+
+    def batch(size, start):
+        lines = []
+        for n in range(size):
+            i = (start + n) % devices
+            counts[i] += 1
+            rssi[i] = max(-95, min(-30, rssi[i] + rng.randint(-2, 2)))
+            if binary:
+                lines.append(encode_data(names[i], rssi[i], rng.randint(5, 150), counts[i],
+                                         int(time.monotonic() * 1000) % (1 << 30)))
+            elif legacy:
+                lines.append('DATA:{},{},{}\n'.format(rssi[i], rng.randint(5, 150), counts[i]))
+            else:
+                lines.append('DATA:{},{},{},{}\n'.format(rssi[i], rng.randint(5, 150), counts[i], names[i]))
+        if binary:
+            return b''.join(lines)
+        return ''.join(lines).encode()
+
+    return batch
+
+
+async def serve_client(reader, writer, args):
+    print('[FakeAP] PC baglandi:', writer.get_extra_info('peername'), flush=True)
+    try:
+        request = await asyncio.wait_for(reader.read(64), FORMAT_WAIT)
+    except asyncio.TimeoutError:
+        request = b''
+    binary = request.startswith(FORMAT_REQUEST) and not args.text and not args.legacy
+    if binary:
+        writer.write(FORMAT_REQUEST)
+    batch = make_lines(args.devices, args.prefix, args.legacy, binary=binary)
+
+    for i in range(args.devices):
+        if binary:
+            writer.write(encode_status('{}-{}'.format(args.prefix, i), True))
+            continue
+        device = '' if args.legacy else ',{}-{}'.format(args.prefix, i)
+        writer.write('STATUS:CONNECTED{}\n'.format(device).encode())
+
+    # 10 ms'lik dilimlerde toplu yazilir
+    tick = 0.01
+    per_tick = args.rate * tick
+    sent = 0
+    owed = 0.0
+    start = time.perf_counter()
+    next_time = start
+
+    try:
+        while (args.lines == 0 or sent < args.lines) and not writer.is_closing():
+            owed += per_tick
+            size = int(owed)
+            if args.lines:
+                size = min(size, args.lines - sent)
+            if size:
+                writer.write(batch(size, sent))
+                await writer.drain()
+                sent += size
+                owed -= size
+
+            next_time += tick
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        elapsed = time.perf_counter() - start
+        print('[FakeAP] {} {} {:.2f} s ({:.0f}/s)'.format(
+            sent, 'cerceve' if binary else 'satir', elapsed, sent / elapsed), flush=True)
+        # Baglanti acik kalir; PC tarafi kapatana kadar beklenir
+        await reader.read()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main_async(args):
+    server = await asyncio.start_server(lambda r, w: serve_client(r, w, args), args.host, args.port)
+    print('[FakeAP] {}:{} dinleniyor'.format(args.host, args.port), flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sahte AP sunucusu (port 12346 protokolu)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12346)
+    parser.add_argument('--rate', type=float, default=10000, help='Baglanti basina satir/s')
+    parser.add_argument('--devices', type=int, default=10, help='Cihaz sayisi')
+    parser.add_argument('--lines', type=int, default=0, help='Baglanti basina toplam satir (0 = sinirsiz)')
+    parser.add_argument('--prefix', default='fake', help='Cihaz kimligi oneki')
+    parser.add_argument('--legacy', action='store_true', help='Cihaz kimligi olmadan gonder')
+    parser.add_argument('--text', action='store_true', help='Ikili cerceve istegini yok say, metin gonder')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
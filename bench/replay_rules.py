@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.rules import RuleBasedPredictor
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'rssi_data.csv')
+
+
+class LegacyRuleBasedPredictor(RuleBasedPredictor):
+
+    # Halka tampon oncesi liste tabanli uygulama; predict() ortak, yalnizca
+    # gecmis ve pencere hesaplari eski haliyle.
+
+    def add_measurement(self, rssi, rtt, latency, quality_score):
+        self.history.append({
+            'rssi': rssi,
+            'rtt': rtt,
+            'latency': latency,
+            'quality_score': quality_score
+        })
+
+        if len(self.history) > self.max_history:
+            self.history.pop(0)
+
+    def get_rssi_trend(self):
+        window = self.thresholds['window_size']
+        if len(self.history) < window:
+            return 0
+
+        recent = self.history[-window:]
+        rssi_values = [m['rssi'] for m in recent if m['rssi'] is not None]
+
+        if len(rssi_values) < 2:
+            return 0
+
+        trend = (rssi_values[-1] - rssi_values[0]) / (len(rssi_values) - 1)
+        return trend
+
+    def get_rssi_delta(self):
+        window = self.thresholds['window_size']
+        if len(self.history) < window:
+            return 0
+
+        recent = self.history[-window:]
+        rssi_values = [m['rssi'] for m in recent if m['rssi'] is not None]
+
+        if len(rssi_values) < 2:
+            return 0
+
+        return rssi_values[-1] - rssi_values[0]
+
+    def get_rssi_std(self):
+        window = self.thresholds['window_size']
+        if len(self.history) < window:
+            return 0
+
+        recent = self.history[-window:]
+        rssi_values = [m['rssi'] for m in recent if m['rssi'] is not None]
+
+        if len(rssi_values) < 2:
+            return 0
+
+        avg = sum(rssi_values) / len(rssi_values)
+        variance = sum((x - avg) ** 2 for x in rssi_values) / len(rssi_values)
+        return variance ** 0.5
+
+    def get_quality_trend(self):
+        window = self.thresholds['window_size']
+        if len(self.history) < window:
+            return 0
+
+        recent = self.history[-window:]
+        quality_values = [m['quality_score'] for m in recent if m['quality_score'] is not None]
+
+        if len(quality_values) < 2:
+            return 0
+
+        return quality_values[-1] - quality_values[0]
+
+    def get_rtt_trend(self):
+        window = self.thresholds['window_size']
+        if len(self.history) < window:
+            return 0
+
+        recent = self.history[-window:]
+        rtt_values = [m['rtt'] for m in recent if m['rtt'] is not None and m['rtt'] > 0]
+
+        if len(rtt_values) < 2:
+            return 0
+
+        return rtt_values[-1] - rtt_values[0]
+
+    def clear_history(self):
+        self.history = []
+
+
+def load_measurements():
+    rows = []
+    with open(DATA_FILE, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['event_type'] != 'DATA':
+                continue
+            rows.append((
+                int(row['rssi']),
+                int(row['rtt']) if row['rtt'] else None,
+                int(row['latency']) if row['latency'] else None,
+                int(row['quality_score']) if row['quality_score'] else None,
+            ))
+    return rows
+
+
+def random_measurements(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        rtt = rng.choice([None, -3, 0, rng.randint(1, 400)])
+        rows.append((
+            rng.randint(-95, -20),
+            rtt,
+            rtt // 2 if rtt is not None else None,
+            rng.choice([None, 0, 1, 2, 3, 4]),
+        ))
+    return rows
+
+
+def replay(predictor, rows):
+    results = []
+    start = time.perf_counter()
+    for rssi, rtt, latency, quality_score in rows:
+        results.append(predictor.predict(rssi=rssi, rtt=rtt, latency=latency,
+                                         quality_score=quality_score))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kural motoru tekrar oynatma kontrolu')
+    parser.add_argument('--random', type=int, default=20000,
+                        help='CSV disinda eklenecek rastgele olcum sayisi')
+    args = parser.parse_args()
+
+    datasets = [('rssi_data.csv', load_measurements())]
+    if args.random:
+        datasets.append(('rastgele', random_measurements(args.random, seed=42)))
+
+    failed = False
+    for name, rows in datasets:
+        for window_size in (2, 5, 10):
+            thresholds = {'window_size': window_size}
+            expected, legacy_time = replay(LegacyRuleBasedPredictor(thresholds), rows)
+            actual, new_time = replay(RuleBasedPredictor(thresholds), rows)
+
+            mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+            failed = failed or mismatches > 0
+
+            print('{:14s} pencere={:2d}  olcum={:6d}  fark={:4d}  eski={:6.2f} us  yeni={:6.2f} us'.format(
+                name, window_size, len(rows), mismatches,
+                legacy_time / len(rows) * 1e6, new_time / len(rows) * 1e6))
+
+    if failed:
+        print('\nHATA: Uyari seviyeleri/mesajlari farkli!')
+        sys.exit(1)
+
+    print('\nTum uyari seviyeleri ve mesajlari ayni.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import math
+import time
+import random
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol.clock import TICKS_PERIOD
+from protocol.frame import FORMAT_REQUEST, encode_data, encode_status
+
+# Senaryo tabanli sentetik RF ureteci. Port 12346'da gercek AP'nin
+# protokolunu konusur (metin satirlari ya da istenirse ikili cerceve); her
+# PC baglantisina --devices cihazin olcumlerini toplam --rate olcum/s ile
+# gonderir. Cihazlarin RSSI/RTT degerleri asagidaki etkilerden uretilir.
+# Ornek: python bench/rf_scenarios.py --scenario mixed --devices 20 --rate 200
+#        AP_IP=127.0.0.1 python web/app.py
+
+# Log-mesafe yol kaybi: 1 m'de P0 dBm, ustel n
+PATH_LOSS_P0 = -40.0
+PATH_LOSS_EXPONENT = 2.7
+# Golgeleme (yavas degisen log-normal) standart sapmasi (dB) ve suresi (s)
+SHADOWING_DB = 3.0
+SHADOWING_S = 5.0
+# Cok yollu sonumlenmenin (Rayleigh) uyum suresi (s)
+COHERENCE_S = 0.3
+# Bu RSSI'nin altinda baglanti kopar, RECONNECT_DBM ustunde geri gelir
+SENSITIVITY_DBM = -92
+RECONNECT_DBM = -88
+# Temel RTT (ms, log-normal medyan) ve yayilimi
+RTT_MEDIAN_MS = 8.0
+RTT_SIGMA = 0.35
+
+EFFECTS = ('walk', 'fading', 'interference', 'spikes', 'disconnects', 'resets')
+SCENARIOS = {
+    'steady': (),
+    # Cihaz AP'den uzaklasip geri gelir; uzakta baglanti kopar
+    'walkaway': ('walk',),
+    # Cok yollu sonumlenme: olcumden olcume 10-20 dB dalgalanma
+    'fading': ('fading',),
+    # Girisim patlamalari: RTT/jitter artar, olcumler kaybolur
+    'interference': ('interference',),
+    # Seyrek RTT sicramalari (200-800 ms)
+    'rtt_spikes': ('spikes',),
+    # Zorunlu kopmalar (1-5 s)
+    'disconnects': ('disconnects',),
+    # Client yeniden baslar, sayac 1'den baslar
+    'counter_reset': ('resets',),
+    'mixed': EFFECTS,
+}
+
+# Olay sikliklari (cihaz basina, olay/s) ve sureleri (s)
+INTERFERENCE_RATE = 1 / 20.0
+INTERFERENCE_S = (1.0, 4.0)
+INTERFERENCE_LOSS = 0.3
+SPIKE_PROBABILITY = 0.02
+DISCONNECT_RATE = 1 / 30.0
+DISCONNECT_S = (1.0, 5.0)
+RESET_RATE = 1 / 60.0
+
+
+def chance(rng, rate, interval):
+    # Poisson sureci: interval icinde en az bir olay olasiligi
+    return rng.random() < 1.0 - math.exp(-rate * interval)
+
+
+class RadioDevice:
+
+    # Tek bir client'in sentetik olcum sureci. step() bir olcum araligi
+    # ilerler ve AP'nin PC'ye gonderecegi olaylari dondurur:
+    # ('STATUS', bagli mi) ve ('DATA', rssi, rtt, sayac, jitter). Kayip
+    # olcumde sayac ilerler ama DATA gonderilmez (PC'de kayip gorunur).
+
+    def __init__(self, name, effects, interval, seed=0):
+        self.name = name
+        self.effects = set(effects)
+        self.interval = interval
+        self.rng = random.Random(seed)
+
+        rng = self.rng
+        self.time = 0.0
+        self.count = 0
+        self.connected = False
+        self.distance = rng.uniform(2.0, 5.0)
+        self.walk_range = rng.uniform(60.0, 120.0)
+        self.walk_speed = rng.uniform(0.8, 1.5)
+        self.shadow = 0.0
+        self.fade = complex(1.0, 0.0)
+        self.burst_until = -1.0
+        self.down_until = -1.0
+
+    def _distance(self):
+        if 'walk' not in self.effects:
+            return self.distance
+        # Ucgen dalga: baslangic noktasindan walk_range metreye gidip donus
+        period = 2 * self.walk_range / self.walk_speed
+        phase = (self.time % period) / period
+        return self.distance + self.walk_range * (1 - abs(1 - 2 * phase))
+
+    def _rssi(self):
+        rng = self.rng
+        rssi = PATH_LOSS_P0 - 10 * PATH_LOSS_EXPONENT * math.log10(self._distance())
+
+        # Golgeleme: AR(1) log-normal
+        rho = math.exp(-self.interval / SHADOWING_S)
+        self.shadow = rho * self.shadow + math.sqrt(1 - rho * rho) * rng.gauss(0, SHADOWING_DB)
+        rssi += self.shadow
+
+        if 'fading' in self.effects:
+            # Rayleigh: zaman korelasyonlu karmasik Gauss kanal kazanci
+            rho = math.exp(-self.interval / COHERENCE_S)
+            scale = math.sqrt((1 - rho * rho) / 2)
+            self.fade = rho * self.fade + complex(rng.gauss(0, scale), rng.gauss(0, scale))
+            rssi += max(20 * math.log10(abs(self.fade) + 1e-9), -30.0)
+
+        return int(round(max(-100.0, min(-20.0, rssi))))
+
+    def step(self):
+        rng = self.rng
+        interval = self.interval
+        self.time += interval
+        events = []
+
+        if 'disconnects' in self.effects and self.time >= self.down_until \
+                and chance(rng, DISCONNECT_RATE, interval):
+            self.down_until = self.time + rng.uniform(*DISCONNECT_S)
+        if 'resets' in self.effects and chance(rng, RESET_RATE, interval):
+            # Yeniden baslatma: kisa kopma ve sayac sifirlanir
+            self.count = 0
+            self.down_until = max(self.down_until, self.time + 1.0)
+
+        rssi = self._rssi()
+        threshold = SENSITIVITY_DBM if self.connected else RECONNECT_DBM
+        link_up = self.time >= self.down_until and rssi > threshold
+        if link_up != self.connected:
+            self.connected = link_up
+            events.append(('STATUS', link_up))
+        if not link_up:
+            return events
+
+        self.count += 1
+        rtt = RTT_MEDIAN_MS * math.exp(rng.gauss(0, RTT_SIGMA))
+        jitter = rtt * 0.1
+
+        if 'interference' in self.effects:
+            if self.time >= self.burst_until and chance(rng, INTERFERENCE_RATE, interval):
+                self.burst_until = self.time + rng.uniform(*INTERFERENCE_S)
+            if self.time < self.burst_until:
+                if rng.random() < INTERFERENCE_LOSS:
+                    return events
+                rtt += rng.uniform(30, 200)
+                jitter += rng.uniform(10, 60)
+
+        if 'spikes' in self.effects and rng.random() < SPIKE_PROBABILITY:
+            rtt += rng.uniform(200, 800)
+
+        events.append(('DATA', rssi, int(rtt), self.count, round(jitter, 1)))
+        return events
+
+
+def make_devices(scenario, devices, rate, prefix='sim', seed=0):
+    effects = SCENARIOS[scenario]
+    interval = devices / float(rate)
+    return [RadioDevice('{}-{:03d}'.format(prefix, i), effects, interval, seed * 100003 + i)
+            for i in range(devices)]
+
+
+def encode(device, event, tick, binary):
+    # AP'nin gonderdigi bicim (ap/main.py)
+    if event[0] == 'STATUS':
+        if binary:
+            return encode_status(device, event[1])
+        return 'STATUS:{},{}\n'.format('CONNECTED' if event[1] else 'DISCONNECTED', device).encode()
+
+    _, rssi, rtt, count, jitter = event
+    if binary:
+        return encode_data(device, rssi, rtt, count, tick, jitter)
+    return 'DATA:{},{},{},{},{},{:.1f}\n'.format(rssi, rtt, count, device, tick, jitter).encode()
+
+
+class ScenarioServer:
+
+    # Port 12346 sunucusu. Her baglanti kendi cihaz kumesiyle (ayni tohum)
+    # baslar; duration saniye sonra (0: sinirsiz) baglanti kapatilir.
+    # record ise her DATA'nin gonderim zamani (time.time) sent'e yazilir:
+    # (cihaz, sayac) -> [zaman, ...] (sayac sifirlanirsa birden fazla).
+
+    def __init__(self, scenario='mixed', devices=10, rate=100.0, duration=0.0,
+                 prefix='sim', seed=0, text=False, record=False, quiet=False):
+        if scenario not in SCENARIOS:
+            raise ValueError('Bilinmeyen senaryo: {}'.format(scenario))
+        self.scenario = scenario
+        self.devices = devices
+        self.rate = rate
+        self.duration = duration
+        self.prefix = prefix
+        self.seed = seed
+        self.text = text
+        self.record = record
+        self.quiet = quiet
+
+        self.sent = {}
+        self.connections = []
+        self.port = None
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+
+    async def handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.read(64), 0.2)
+        except asyncio.TimeoutError:
+            request = b''
+        binary = request.startswith(FORMAT_REQUEST) and not self.text
+        if binary:
+            writer.write(FORMAT_REQUEST)
+
+        devices = make_devices(self.scenario, self.devices, self.rate, self.prefix, self.seed)
+        stats = {'binary': binary, 'data': 0, 'status': 0, 'bytes': 0, 'start': time.time(), 'end': None}
+        self.connections.append(stats)
+        if not self.quiet:
+            print('[RF] PC baglandi ({}, {}, {} cihaz, {:.0f} olcum/s)'.format(
+                self.scenario, 'ikili' if binary else 'metin', self.devices, self.rate), flush=True)
+
+        # 10 ms'lik dilimlerde toplu yazilir
+        slice_s = 0.01
+        per_slice = self.rate * slice_s
+        owed = 0.0
+        index = 0
+        start = time.monotonic()
+        next_time = start
+        try:
+            while not writer.is_closing() and (not self.duration or time.monotonic() - start < self.duration):
+                owed += per_slice
+                chunks = []
+                now = time.time()
+                tick = int((time.monotonic() - start) * 1000) % TICKS_PERIOD
+                while owed >= 1:
+                    device = devices[index % len(devices)]
+                    index += 1
+                    owed -= 1
+                    for event in device.step():
+                        chunks.append(encode(device.name, event, tick, binary))
+                        if event[0] == 'DATA':
+                            stats['data'] += 1
+                            if self.record:
+                                self.sent.setdefault((device.name, event[3]), []).append(now)
+                        else:
+                            stats['status'] += 1
+                if chunks:
+                    data = b''.join(chunks)
+                    stats['bytes'] += len(data)
+                    writer.write(data)
+                    await writer.drain()
+
+                next_time += slice_s
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            stats['end'] = time.time()
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=12346):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self.handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def start_thread(self, host='127.0.0.1', port=0):
+        # Arka plan thread'inde calistirir; dinlenen portu dondurur
+        threading.Thread(target=lambda: asyncio.run(self.serve(host, port)), name='RFScenario', daemon=True).start()
+        self._ready.wait()
+        return self.port
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senaryo tabanli sentetik AP (port 12346 protokolu)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12346)
+    parser.add_argument('--scenario', default='mixed', choices=sorted(SCENARIOS), help='RF senaryosu')
+    parser.add_argument('--devices', type=int, default=10, help='Cihaz sayisi')
+    parser.add_argument('--rate', type=float, default=10, help='Baglanti basina toplam olcum/s')
+    parser.add_argument('--duration', type=float, default=0, help='Baglanti basina sure (s, 0 = sinirsiz)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix', default='sim', help='Cihaz kimligi oneki')
+    parser.add_argument('--text', action='store_true', help='Ikili cerceve istegini yok say, metin gonder')
+    args = parser.parse_args()
+
+    server = ScenarioServer(args.scenario, args.devices, args.rate, args.duration,
+                            args.prefix, args.seed, args.text)
+    print('[RF] {}:{} dinleniyor'.format(args.host, args.port), flush=True)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+import re
+import sys
+import time
+import types
+import random
+import socket
+import select
+import struct
+import binascii
+import threading
+from collections import namedtuple
+
+from protocol.clock import TICKS_PERIOD
+
+# LoPy4 yazilimlarini (ap/main.py, client/main.py) CPython'da calistirmak
+# icin pycom, network, usocket, uselect, ustruct, machine ve ubinascii
+# yerine gecen moduller.
+# _thread icin CPython'un kendi modulu ayni API'yi (start_new_thread,
+# allocate_lock) sunar. usocket, yazilimdaki adresleri ADDRESS_MAP ile yerel
+# adreslere cevirir; WIFI_ADDRESSES'e giden/gelen baglantilarda Wi-Fi
+# gecikmesi (LINK['rtt']) eklenir ve istemci tarafi trafik TRAFFIC'e yazilir.
+
+ADDRESS_MAP = {}
+WIFI_ADDRESSES = set()
+LINK = {'rtt': 0.0}
+TRAFFIC = {'connections': 0, 'sends': 0, 'recvs': 0, 'sent_bytes': 0, 'received_bytes': 0}
+LED = {'color': None}
+# ESP32 aktif tarama: 13 kanal x ~120 ms
+RADIO = {'scan_seconds': 1.5, 'rssi': -60}
+
+ScanResult = namedtuple('ScanResult', ('ssid', 'bssid', 'sec', 'channel', 'rssi'))
+
+
+class USocket(socket.socket):
+
+    # Wi-Fi gecikmesi kabaca taklit edilir: baglanti kurma bir RTT, her
+    # gonderim yarim RTT bekler (istek + yanit = bir RTT)
+    wifi = False
+    client_side = False
+
+    def bind(self, address):
+        self.wifi = tuple(address) in WIFI_ADDRESSES
+        super().bind(ADDRESS_MAP.get(tuple(address), address))
+
+    def connect(self, address):
+        self.wifi = self.client_side = tuple(address) in WIFI_ADDRESSES
+        if self.wifi:
+            TRAFFIC['connections'] += 1
+            time.sleep(LINK['rtt'])
+        super().connect(ADDRESS_MAP.get(tuple(address), address))
+
+    def accept(self):
+        # socket.accept() her zaman socket.socket dondurur
+        fd, address = self._accept()
+        sock = USocket(self.family, self.type, self.proto, fileno=fd)
+        if socket.getdefaulttimeout() is None and self.gettimeout():
+            sock.setblocking(True)
+        sock.wifi = self.wifi
+        return sock, address
+
+    def send(self, data):
+        if self.wifi:
+            time.sleep(LINK['rtt'] / 2)
+        sent = super().send(data)
+        if self.client_side:
+            TRAFFIC['sends'] += 1
+            TRAFFIC['sent_bytes'] += sent
+        return sent
+
+    def recv(self, size):
+        data = super().recv(size)
+        if self.client_side:
+            TRAFFIC['recvs'] += 1
+            TRAFFIC['received_bytes'] += len(data)
+        return data
+
+
+class WLAN:
+
+    AP = 2
+    STA = 1
+    WPA2 = 3
+
+    def __init__(self, mode=None, ssid=None, auth=None, channel=None, **kwargs):
+        self.mode = mode
+        self.ssid = ssid
+        self.config = {}
+        self.scans = 0
+
+    def ifconfig(self, id=0, config=None):
+        if config is None:
+            return self.config.get(id, ('127.0.0.1', '255.255.255.0', '127.0.0.1', '127.0.0.1'))
+        self.config[id] = config
+
+    def connect(self, ssid=None, auth=None, **kwargs):
+        self.ssid = ssid
+
+    def isconnected(self):
+        return True
+
+    def _rssi(self):
+        # Yavas degisen sinyal
+        RADIO['rssi'] = max(-95, min(-35, RADIO['rssi'] + random.randint(-2, 2)))
+        return RADIO['rssi']
+
+    def scan(self):
+        self.scans += 1
+        time.sleep(RADIO['scan_seconds'])
+        return [ScanResult(self.ssid, b'\x00' * 6, 3, 7, self._rssi())]
+
+    def joined_ap_info(self):
+        return (b'\x00' * 6, self.ssid, 7, self._rssi())
+
+
+class Poll:
+
+    # MicroPython poll.poll() olaylari (nesne, olay) olarak dondurur;
+    # select.poll dosya numarasi dondurdugu icin nesneler burada tutulur
+    def __init__(self):
+        self.poll_object = select.poll()
+        self.objects = {}
+
+    def register(self, obj, eventmask=select.POLLIN | select.POLLOUT):
+        self.objects[obj.fileno()] = obj
+        self.poll_object.register(obj, eventmask)
+
+    def unregister(self, obj):
+        self.objects.pop(obj.fileno(), None)
+        self.poll_object.unregister(obj)
+
+    def poll(self, timeout=-1):
+        return [(self.objects[fd], event) for fd, event in self.poll_object.poll(timeout)]
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install(address_map=None, tick_offset=0, wifi_addresses=(), link_rtt=0.0, unique_id=b'\x70\xb3\xd5\x49\x00\x01'):
+    # tick_offset: ticks_ms baslangici; sarmayi denemek icin 2^30'a yakin verilir
+    ADDRESS_MAP.update(address_map or {})
+    WIFI_ADDRESSES.update(wifi_addresses)
+    LINK['rtt'] = link_rtt
+    start = time.monotonic()
+
+    def ticks_ms():
+        return (int((time.monotonic() - start) * 1000) + tick_offset) % TICKS_PERIOD
+
+    def ticks_us():
+        return int((time.monotonic() - start) * 1000000) % TICKS_PERIOD
+
+    def ticks_diff(a, b):
+        half = TICKS_PERIOD // 2
+        return (a - b + half) % TICKS_PERIOD - half
+
+    # MicroPython time modulunun ek fonksiyonlari
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_diff = ticks_diff
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000.0)
+
+    sys.modules['usocket'] = _module(
+        'usocket', socket=USocket, getaddrinfo=socket.getaddrinfo,
+        AF_INET=socket.AF_INET, SOCK_STREAM=socket.SOCK_STREAM,
+        SOL_SOCKET=socket.SOL_SOCKET, SO_REUSEADDR=socket.SO_REUSEADDR,
+        IPPROTO_TCP=socket.IPPROTO_TCP, TCP_NODELAY=socket.TCP_NODELAY)
+    sys.modules['network'] = _module('network', WLAN=WLAN)
+    sys.modules['pycom'] = _module(
+        'pycom', heartbeat=lambda enabled=None: None,
+        rgbled=lambda color: LED.update(color=color))
+    sys.modules['machine'] = _module('machine', unique_id=lambda: unique_id)
+    sys.modules['ubinascii'] = _module('ubinascii', hexlify=binascii.hexlify, unhexlify=binascii.unhexlify,
+                                       crc32=binascii.crc32)
+    sys.modules['ustruct'] = struct
+    sys.modules['uselect'] = _module(
+        'uselect', poll=Poll, POLLIN=select.POLLIN, POLLOUT=select.POLLOUT,
+        POLLERR=select.POLLERR, POLLHUP=select.POLLHUP)
+
+
+def run_firmware(path, quiet=True, constants=None, replace=()):
+    # Yazilim sonsuz ana dongusuyle birlikte arka plan thread'inde calisir;
+    # quiet ise yazilimin print ciktilari atilir. constants, yazilimdaki
+    # "AD = deger" satirlarinin yerine gecer (yazilimda yoksa global olarak
+    # verilir); replace (eski, yeni) metin degisiklikleridir. Donen sozluk
+    # yazilimin global degiskenleridir (sayaclar, tampon).
+    with open(path) as f:
+        source = f.read()
+    for old, new in replace:
+        source = source.replace(old, new)
+
+    namespace = {'__name__': 'firmware', '__file__': path}
+    for name, value in (constants or {}).items():
+        source = re.sub(r'(?m)^{} = .*$'.format(name), '{} = {!r}'.format(name, value), source)
+        namespace[name] = value
+    if quiet:
+        namespace['print'] = lambda *args, **kwargs: None
+
+    code = compile(source, path, 'exec')
+    thread = threading.Thread(target=exec, args=(code, namespace), name='Firmware', daemon=True)
+    thread.start()
+    return namespace
@@ -1,6 +1,8 @@
 from network import WLAN
+import machine
 import pycom
 import time
+import ubinascii
 import usocket
 
 pycom.heartbeat(False)
@@ -10,10 +12,27 @@ PASSWORD = 'lopy4pass123'
 AP_IP = '192.168.4.1'
 AP_PORT = 12345
 
+# Olcum araligi (s)
+MEASURE_INTERVAL = 1
+# Olcum basina RTT sondasi: RTT sondalarin ortalamasi, jitter ardisik
+# sondalar arasindaki farklarin ortalamasidir
+PROBES = 4
+# Sonda yaniti icin bekleme suresi (s)
+PROBE_TIMEOUT = 0.5
+
 measurement_count = 0
+probe_seq = 0
+
+# AP ile kalici oturum; koparsa bir sonraki olcumde yeniden acilir
+sock = None
+rx_buffer = b''
+
+# AP ve bilgisayar tarafinda olcumler bu kimlikle ayrilir
+DEVICE_ID = ubinascii.hexlify(machine.unique_id()).decode()
 
 print('Wi-Fi Client + RSSI + RTT Monitor baslatiliyor...')
 print('Baglanilacak ag:', SSID)
+print('Cihaz ID:', DEVICE_ID)
 
 pycom.rgbled(0xFF0000)
 
@@ -33,6 +52,13 @@ print('IP:', wlan.ifconfig()[0])
 
 
 def get_rssi():
+    # Bagli olunan AP'nin RSSI'si tarama yapmadan okunur (joined_ap_info:
+    # bssid, ssid, kanal, rssi); okunamazsa tam tarama yapilir
+    try:
+        return wlan.joined_ap_info()[3]
+    except Exception:
+        pass
+
     try:
         networks = wlan.scan()
         for net in networks:
@@ -43,48 +69,119 @@ def get_rssi():
         return None
 
 
-def send_rssi_with_rtt(rssi, count):
+def open_session():
+    global sock, rx_buffer
+    sock = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
+    sock.settimeout(PROBE_TIMEOUT)
     try:
-        sock = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
-        sock.settimeout(3)
-
-        t1 = time.ticks_ms()
-
-        sock.connect((AP_IP, AP_PORT))
-
-        msg = 'RSSI:{}'.format(rssi)
-        sock.send(msg.encode())
-
-        ack = sock.recv(16)
-
-        t2 = time.ticks_ms()
-        rtt = time.ticks_diff(t2, t1)
+        # Yanitsiz DATA satirindan sonraki sonda, Nagle nedeniyle AP'nin
+        # gecikmeli ACK'ini beklemesin
+        sock.setsockopt(usocket.IPPROTO_TCP, usocket.TCP_NODELAY, 1)
+    except Exception:
+        pass
+    sock.connect((AP_IP, AP_PORT))
+    rx_buffer = b''
+    print('AP oturumu acildi')
+
+
+def close_session():
+    global sock
+    if sock is not None:
+        try:
+            sock.close()
+        except:
+            pass
+        sock = None
+
+
+def send_all(data):
+    view = memoryview(data)
+    while view:
+        sent = sock.send(view)
+        view = view[sent:]
+
+
+def read_line():
+    global rx_buffer
+    while b'\n' not in rx_buffer:
+        data = sock.recv(64)
+        if not data:
+            raise OSError('AP oturumu kapatti')
+        rx_buffer += data
+    line, rx_buffer = rx_buffer.split(b'\n', 1)
+    return line
+
+
+def probe():
+    # PING:<sira> gonderilir, ayni siradaki PONG beklenir; zaman asimina
+    # ugramis onceki sondalarin gec gelen yanitlari atlanir
+    global probe_seq
+    probe_seq += 1
+    expected = 'PONG:{}'.format(probe_seq).encode()
+
+    start = time.ticks_us()
+    send_all('PING:{}\n'.format(probe_seq).encode())
+    while read_line() != expected:
+        pass
+    return time.ticks_diff(time.ticks_us(), start) / 1000
+
+
+def measure_rtt():
+    rtts = []
+    for i in range(PROBES):
+        try:
+            rtts.append(probe())
+        except OSError:
+            pass
+
+    if not rtts:
+        return None
 
-        sock.close()
+    rtt = sum(rtts) / len(rtts)
+    jitter = 0
+    if len(rtts) > 1:
+        jitter = sum(abs(rtts[i] - rtts[i - 1]) for i in range(1, len(rtts))) / (len(rtts) - 1)
+    return rtt, jitter, PROBES - len(rtts)
 
-        sock2 = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
-        sock2.settimeout(3)
-        sock2.connect((AP_IP, AP_PORT))
-        msg2 = 'DATA:{},{},{}'.format(rssi, rtt, count)
-        sock2.send(msg2.encode())
-        sock2.close()
 
-        return rtt
+def send_report(rssi, count):
+    # Sondalarin ardindan rapor ayni oturumdan, yanit beklenmeden gonderilir
+    try:
+        if sock is None:
+            open_session()
+
+        result = measure_rtt()
+        if result is None:
+            # Hicbir sonda yanitlanmadi: oturum yeniden acilir, olcum
+            # gonderilmez (PC tarafinda kayip olarak gorunur)
+            close_session()
+            return None
+
+        rtt, jitter, lost = result
+        send_all('DATA:{},{},{},{},{:.1f}\n'.format(
+            rssi, int(rtt + 0.5), count, DEVICE_ID, jitter).encode())
+        return result
     except Exception as e:
         print('Gonderme hatasi:', e)
+        close_session()
         return None
 
 
 print('RSSI + RTT olcumu basliyor...')
 
 while True:
+    loop_start = time.ticks_ms()
+
     if wlan.isconnected():
         rssi = get_rssi()
         if rssi is not None:
             measurement_count += 1
-            rtt = send_rssi_with_rtt(rssi, measurement_count)
-            if rtt is not None:
-                print('[#{}] RSSI: {} dBm, RTT: {} ms'.format(measurement_count, rssi, rtt))
+            result = send_report(rssi, measurement_count)
+            if result is not None:
+                rtt, jitter, lost = result
+                print('[#{}] RSSI: {} dBm, RTT: {:.1f} ms, jitter: {:.1f} ms{}'.format(
+                    measurement_count, rssi, rtt, jitter,
+                    ', {} sonda kayip'.format(lost) if lost else ''))
             else:
                 print('[#{}] RSSI: {} dBm, RTT: hata'.format(measurement_count, rssi))
             pycom.rgbled(0x0000FF)
@@ -93,7 +190,11 @@ while True:
             pycom.rgbled(0xFFFF00)
     else:
         print('Baglanti kesildi!')
+        close_session()
         pycom.rgbled(0xFF0000)
         wlan.connect(ssid=SSID, auth=(WLAN.WPA2, PASSWORD))
 
-    time.sleep(1)
+    # Olcum suresi araliktan dusulur; olcum hizi sabit kalir
+    elapsed = time.ticks_diff(time.ticks_ms(), loop_start) / 1000
+    if elapsed < MEASURE_INTERVAL:
+        time.sleep(MEASURE_INTERVAL - elapsed)
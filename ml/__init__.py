@@ -1,5 +1,19 @@
-from .predictor import ConnectionPredictor
-from .rules import RuleBasedPredictor
-from .features import extract_features
+import importlib
 
-__all__ = ['ConnectionPredictor', 'RuleBasedPredictor', 'extract_features']
+# Alt moduller ilk erisimde import edilir; "import ml" numpy/sklearn yuklemez
+_EXPORTS = {
+    'ConnectionPredictor': '.predictor',
+    'RuleBasedPredictor': '.rules',
+    'extract_features': '.features',
+    'RollingFeatures': '.features',
+}
+
+__all__ = ['ConnectionPredictor', 'RuleBasedPredictor', 'extract_features', 'RollingFeatures']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
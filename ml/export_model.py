@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.forest import export_forest, packed_path, verification_inputs
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), 'model.pkl')
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_FILE
+    target = sys.argv[2] if len(sys.argv) > 2 else packed_path(model_path)
+
+    if not os.path.exists(model_path):
+        print('HATA: Model dosyasi bulunamadi:', model_path)
+        sys.exit(1)
+
+    import joblib
+    with warnings.catch_warnings():
+        # Farkli sklearn surumunde kaydedilmis model uyarisi
+        warnings.simplefilter('ignore')
+        model = joblib.load(model_path)
+
+    print('Model:', model_path)
+    print('Hedef:', target)
+
+    forest = export_forest(model, target, source_path=model_path)
+    samples = verification_inputs(forest)
+    if not np.array_equal(forest.predict_proba(samples), model.predict_proba(samples)):
+        os.remove(target)
+        print('HATA: Olasiliklar sklearn ile ayni degil')
+        sys.exit(1)
+
+    print('{} agac, derinlik {}, {:.0f} KB; {} ornekte ayni olasiliklar'.format(
+        forest.n_estimators, forest.depth, os.path.getsize(target) / 1024, len(samples)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+import io
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from .features import (FEATURE_NAMES, extract_window_features, label_problem_rows,
+                       series_training_data)
+
+CACHE_FORMAT = 1
+INDEX_FILE = 'index.json'
+# CSV'nin islenmis kisminin basi ve sonu bu kadar baytla ozetlenir; dosya
+# yeniden yazilmis ya da kisalmissa onbellek bastan kurulur
+CHECK_BYTES = 4096
+
+PROBLEM_EVENTS = ('DISCONNECTED', 'PACKET_LOST')
+RAW_FIELDS = ('unix_time', 'is_data', 'is_problem', 'rssi', 'rtt', 'quality_score')
+
+
+def _processed_digests(f, offset):
+    # Dosyanin [0, offset) kisminin ilk ve son CHECK_BYTES bayti
+    digests = []
+    for start in (0, max(0, offset - CHECK_BYTES)):
+        f.seek(start)
+        digests.append(hashlib.sha256(f.read(min(CHECK_BYTES, offset - start))).hexdigest())
+    return digests
+
+
+class FeatureCache:
+
+    # Oturum basina egitim ozellikleri. Her oturum icin ham sutunlar ve
+    # hesaplanmis (X, y) <oturum>.npz olarak saklanir. Kaynak yeniden
+    # okundugunda yalnizca yeni satir gelen oturumlar islenir: CSV'de
+    # dosyanin islenmis ofsetinden sonrasi okunur ve oturumun sadece yeni
+    # kuyrugu hesaplanir, kolonlu kayitta boyutu/zamani degisen oturum
+    # dosyalari bastan hesaplanir.
+
+    def __init__(self, directory, window_size=10, prediction_horizon=5):
+        self.directory = directory
+        self.window_size = window_size
+        self.prediction_horizon = prediction_horizon
+        self.params = {
+            'format': CACHE_FORMAT,
+            'window_size': window_size,
+            'prediction_horizon': prediction_horizon,
+            'features': FEATURE_NAMES
+        }
+        self.index = self._load_index()
+        self.stats = {'sessions': 0, 'reused': 0, 'computed': 0, 'appended': 0, 'rows_read': 0, 'rebuilt': False}
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                index = json.load(f)
+            if index.get('params') == self.params:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'params': self.params, 'source': None, 'sessions': {}}
+
+    def _reset(self, source):
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                os.remove(os.path.join(self.directory, name))
+        self.index = {'params': self.params, 'source': source, 'sessions': {}}
+        self.stats['rebuilt'] = True
+
+    def _session_path(self, session_id):
+        return os.path.join(self.directory, '{}.npz'.format(session_id))
+
+    def _load_session(self, session_id):
+        with np.load(self._session_path(session_id)) as data:
+            return {name: data[name] for name in data.files}
+
+    def _store_session(self, session_id, raw):
+        # Oturum satirlari zaman sirasina konur ve ozellikler hesaplanir
+        order = np.argsort(raw['unix_time'], kind='stable')
+        raw = {name: np.asarray(raw[name])[order] for name in RAW_FIELDS}
+        X, y = series_training_data(*(raw[name] for name in RAW_FIELDS),
+                                    window_size=self.window_size,
+                                    prediction_horizon=self.prediction_horizon)
+        self._write_session(session_id, raw, X.reshape(-1, len(FEATURE_NAMES)), y)
+
+    def _write_session(self, session_id, raw, X, y):
+        temp = self._session_path(session_id) + '.tmp.npz'
+        np.savez(temp, X=X, y=y.astype(np.int8), **raw)
+        os.replace(temp, self._session_path(session_id))
+
+        self.index['sessions'][session_id] = {
+            'start': float(raw['unix_time'][0]) if len(raw['unix_time']) else 0.0,
+            'rows': len(raw['unix_time']),
+            'samples': len(X),
+            'data': int(raw['is_data'].sum()),
+            'problems': int(raw['is_problem'].sum())
+        }
+        self.stats['computed'] += 1
+
+    def _append_session(self, session_id, old, new):
+        # Sona eklenen satirlar icin yalnizca kuyruk hesaplanir: yeni
+        # ornekler son window_size eski DATA satirini pencere olarak kullanir;
+        # yeni problem olaylari ufuk icindeki eski satirlarin etiketlerini
+        # 1 yapabilir (etiket olaylar uzerinden VEYA), digerleri degismez.
+        # Yeni satirlar eskilerden once geliyorsa oturum bastan hesaplanir.
+        order = np.argsort(new['unix_time'], kind='stable')
+        new = {name: np.asarray(new[name])[order] for name in RAW_FIELDS}
+        if len(old['unix_time']) == 0 or not new['unix_time'][0] >= old['unix_time'][-1]:
+            return False
+
+        raw = {name: np.concatenate([old[name], new[name]]) for name in RAW_FIELDS}
+        window = self.window_size
+        is_data = raw['is_data'].astype(bool)
+        data_times = raw['unix_time'][is_data]
+        old_data = int(old['is_data'].astype(bool).sum())
+        total = len(data_times)
+        first = max(window, old_data)
+
+        y = np.zeros(max(0, total - window), dtype=int)
+        y[:len(old['y'])] = old['y']
+        events = new['unix_time'][new['is_problem'].astype(bool)]
+        events = events[~np.isnan(events)]
+        if len(events) and len(y):
+            # Sinir duzeltmesi icin ufkun bir olcum oncesinden baslanir
+            start = int(np.searchsorted(data_times, events.min() - 4 * (self.prediction_horizon + 1)))
+            start = max(start, window)
+            y[start - window:] |= label_problem_rows(data_times[start:], events, self.prediction_horizon)
+
+        X = old['X'].reshape(-1, len(FEATURE_NAMES))
+        if total > first:
+            tail = [np.asarray(raw[name], dtype=float)[is_data][first - window:]
+                    for name in ('rssi', 'rtt', 'quality_score')]
+            X = np.vstack([X, extract_window_features(*tail, window_size=window)[:-1]])
+
+        self._write_session(session_id, raw, X, y)
+        self.stats['appended'] += 1
+        return True
+
+    def _save_index(self):
+        temp = os.path.join(self.directory, INDEX_FILE + '.tmp')
+        with open(temp, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(temp, os.path.join(self.directory, INDEX_FILE))
+
+    def _merge(self, session_id, new):
+        # Oturumun onbellekteki ham satirlarina yenileri eklenir
+        if session_id in self.index['sessions'] and os.path.exists(self._session_path(session_id)):
+            old = self._load_session(session_id)
+            if self._append_session(session_id, old, new):
+                return
+            new = {name: np.concatenate([old[name], new[name]]) for name in RAW_FIELDS}
+        self._store_session(session_id, new)
+
+    def update_from_csv(self, path):
+        import pandas as pd
+        from storage import CSV_HEADERS
+
+        os.makedirs(self.directory, exist_ok=True)
+        source = self.index['source'] or {}
+        size = os.path.getsize(path)
+
+        with open(path, 'rb') as f:
+            offset = source.get('offset', 0) if source.get('kind') == 'csv' else 0
+            # Islenmis kisim degismemis olmali (ayni bas ve son bloklar)
+            if offset and (size < offset
+                           or _processed_digests(f, offset) != [source.get('head'), source.get('tail')]):
+                offset = 0
+            if offset == 0:
+                self._reset({'kind': 'csv'})
+
+            f.seek(offset)
+            chunk = f.read()
+            # Yazimi surmekte olan son satir bir sonraki sefere kalir
+            chunk = chunk[:chunk.rfind(b'\n') + 1]
+
+            header = offset == 0
+            if chunk:
+                df = pd.read_csv(io.BytesIO(chunk), header=0 if header else None,
+                                 names=None if header else CSV_HEADERS, dtype={'session_id': str})
+                self.stats['rows_read'] = len(df)
+                for session_id, rows in df.groupby('session_id', sort=False):
+                    self._merge(session_id, {
+                        'unix_time': rows['unix_time'].to_numpy(dtype=float),
+                        'is_data': (rows['event_type'] == 'DATA').to_numpy(),
+                        'is_problem': rows['event_type'].isin(PROBLEM_EVENTS).to_numpy(),
+                        'rssi': rows['rssi'].to_numpy(dtype=float),
+                        'rtt': rows['rtt'].to_numpy(dtype=float),
+                        'quality_score': rows['quality_score'].to_numpy(dtype=float),
+                    })
+
+            offset += len(chunk)
+            head, tail = _processed_digests(f, offset)
+            self.index['source'] = {
+                'kind': 'csv',
+                'path': os.path.abspath(path),
+                'offset': offset,
+                'head': head,
+                'tail': tail
+            }
+
+        self._finish()
+
+    def update_from_columnar(self, directory):
+        from storage.columnar import EVENT_CODES, FILE_SUFFIX, map_session, session_files
+
+        os.makedirs(self.directory, exist_ok=True)
+        source = self.index['source'] or {}
+        if source.get('kind') != 'columnar':
+            self._reset({'kind': 'columnar'})
+        files = self.index['source'].get('files', {})
+
+        seen = {}
+        problem_codes = [EVENT_CODES[name] for name in PROBLEM_EVENTS]
+        for path in session_files(directory):
+            session_id = os.path.basename(path)[:-len(FILE_SUFFIX)]
+            stat = os.stat(path)
+            signature = [stat.st_size, stat.st_mtime_ns]
+            seen[session_id] = signature
+            if files.get(session_id) == signature and session_id in self.index['sessions']:
+                continue
+
+            # Kolonlu oturum dosyasi memmap ile okundugundan tamami yeniden islenir
+            records = map_session(path)
+            self.stats['rows_read'] += len(records)
+            self._store_session(session_id, {
+                'unix_time': records['unix_time'],
+                'is_data': records['event_type'] == EVENT_CODES['DATA'],
+                'is_problem': np.isin(records['event_type'], problem_codes),
+                'rssi': records['rssi'].astype(float),
+                'rtt': records['rtt'].astype(float),
+                'quality_score': np.where(records['quality_score'] >= 0, records['quality_score'], np.nan),
+            })
+
+        # Silinmis oturumlar onbellekten cikarilir
+        for session_id in set(self.index['sessions']) - set(seen):
+            del self.index['sessions'][session_id]
+            if os.path.exists(self._session_path(session_id)):
+                os.remove(self._session_path(session_id))
+
+        self.index['source'] = {'kind': 'columnar', 'path': os.path.abspath(directory), 'files': seen}
+        self._finish()
+
+    def _finish(self):
+        self._save_index()
+        self.stats['sessions'] = len(self.index['sessions'])
+        self.stats['reused'] = self.stats['sessions'] - self.stats['computed']
+
+    def counts(self):
+        # (DATA, DISCONNECTED + PACKET_LOST) satir sayilari
+        sessions = self.index['sessions'].values()
+        return sum(s['data'] for s in sessions), sum(s['problems'] for s in sessions)
+
+    def sessions(self):
+        # Baslangic zamanina gore sirali oturum kimlikleri
+        return sorted(self.index['sessions'], key=lambda s: (self.index['sessions'][s]['start'], s))
+
+    def dataset(self):
+        # Tum oturumlarin ornekleri zaman sirasiyla; groups her ornegin
+        # oturumunun sira numarasidir (oturum bazli bolme icin)
+        X, y, groups = [], [], []
+        for number, session_id in enumerate(self.sessions()):
+            if self.index['sessions'][session_id]['samples'] == 0:
+                continue
+            with np.load(self._session_path(session_id)) as data:
+                X.append(data['X'])
+                y.append(data['y'].astype(int))
+            groups.append(np.full(len(y[-1]), number))
+
+        if not X:
+            return np.zeros((0, len(FEATURE_NAMES))), np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        return np.vstack(X), np.concatenate(y), np.concatenate(groups)
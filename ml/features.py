@@ -1,4 +1,7 @@
+from collections import deque
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 FEATURE_NAMES = [
     'rssi_mean',
@@ -71,42 +74,295 @@ def features_to_array(features):
     return np.array([features.get(name, 0) for name in FEATURE_NAMES])
 
 
+class _RollingSeries:
+
+    # Pencere icindeki gecerli degerler icin artimli istatistikler. x ekseni
+    # extract_features'taki gibi gecerli degerlerin sirasidir (0..n-1).
+    # Ortalama ve varyans cikarmali Welford ile guncellenir; egim icin
+    # tutulan toplamlar REBASE_INTERVAL eklemede bir pencereden yeniden
+    # hesaplanir (uzun calismada kayan nokta hatasi birikmez).
+
+    REBASE_INTERVAL = 1000
+
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.values = deque()
+        self.min_queue = deque()
+        self.max_queue = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.total_xy = 0.0
+        self.added = 0
+
+    def _rebase(self):
+        values = [v for _, v in self.values]
+        n = len(values)
+        self.total = float(sum(values))
+        self.total_xy = float(sum(i * v for i, v in enumerate(values)))
+        self.mean = self.total / n if n else 0.0
+        self.m2 = sum((v - self.mean) ** 2 for v in values)
+
+    def update(self, seq, value):
+        oldest = seq - self.window_size
+
+        if self.values and self.values[0][0] <= oldest:
+            old = self.values.popleft()[1]
+            self.total -= old
+            # Kalan degerlerin sirasi bir azalir
+            self.total_xy -= self.total
+            n = len(self.values)
+            if n:
+                mean = self.mean + (self.mean - old) / n
+                self.m2 -= (old - self.mean) * (old - mean)
+                self.mean = mean
+            else:
+                self.mean = self.m2 = 0.0
+        if self.min_queue and self.min_queue[0][0] <= oldest:
+            self.min_queue.popleft()
+        if self.max_queue and self.max_queue[0][0] <= oldest:
+            self.max_queue.popleft()
+
+        if value is None:
+            return
+
+        self.total_xy += len(self.values) * value
+        self.total += value
+        self.values.append((seq, value))
+        delta = value - self.mean
+        self.mean += delta / len(self.values)
+        self.m2 += delta * (value - self.mean)
+
+        self.added += 1
+        if self.added >= self.REBASE_INTERVAL:
+            self.added = 0
+            self._rebase()
+
+        while self.min_queue and self.min_queue[-1][1] >= value:
+            self.min_queue.pop()
+        self.min_queue.append((seq, value))
+
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.max_queue.append((seq, value))
+
+    def stats(self):
+        # (mean, std, min, max, trend, delta)
+        n = len(self.values)
+        if n == 0:
+            return 0, 0, 0, 0, 0, 0
+
+        first = self.values[0][1]
+        if n == 1:
+            return first, 0, first, first, 0, 0
+
+        low, high = self.min_queue[0][1], self.max_queue[0][1]
+        # Sabit pencerede cikarma artigi yerine tam sifir
+        std = max(self.m2 / n, 0.0) ** 0.5 if low != high else 0.0
+
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        trend = (n * self.total_xy - sum_x * self.total) / (n * sum_xx - sum_x * sum_x)
+
+        return (self.mean, std, low, high, trend, self.values[-1][1] - first)
+
+
+_RSSI_COLUMNS = slice(FEATURE_NAMES.index('rssi_mean'), FEATURE_NAMES.index('rssi_delta') + 1)
+_RTT_COLUMNS = slice(FEATURE_NAMES.index('rtt_mean'), FEATURE_NAMES.index('rtt_trend') + 1)
+_QUALITY_COLUMNS = slice(FEATURE_NAMES.index('quality_mean'), FEATURE_NAMES.index('quality_std') + 1)
+
+
+class RollingFeatures:
+
+    # Son window_size olcum uzerinde extract_features ile ayni ozellikleri
+    # olcum basina sabit zamanda gunceller. as_array() sonucu her cagrida
+    # ayni on-tahsisli diziye yazilir.
+
+    def __init__(self, window_size=10):
+        self.window_size = window_size
+        self.vector = np.zeros(len(FEATURE_NAMES))
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.rssi = _RollingSeries(self.window_size)
+        self.rtt = _RollingSeries(self.window_size)
+        self.quality = _RollingSeries(self.window_size)
+
+    def __len__(self):
+        return min(self.count, self.window_size)
+
+    def is_full(self):
+        return self.count >= self.window_size
+
+    def update(self, rssi, rtt, quality_score):
+        seq = self.count
+        self.count += 1
+
+        self.rssi.update(seq, rssi)
+        self.rtt.update(seq, rtt if rtt is not None and rtt > 0 else None)
+        self.quality.update(seq, quality_score)
+
+    def as_array(self):
+        self.vector[_RSSI_COLUMNS] = self.rssi.stats()
+        self.vector[_RTT_COLUMNS] = self.rtt.stats()[:5]
+        self.vector[_QUALITY_COLUMNS] = self.quality.stats()[:2]
+        return self.vector
+
+
+def _polyfit_slopes(values):
+    # np.polyfit(x, y, 1)[0] ile bit-bit ayni sonuc: polyfit'in olceklenmis
+    # vander matrisi bir kez kurulur, lstsq her pencere icin tek RHS ile
+    # cagrilir (cok RHS'li lstsq son bitlerde farkli sonuc verebiliyor).
+    # Ayni degerlere sahip pencereler bir kez hesaplanir.
+    count = values.shape[1]
+    x = np.arange(count) + 0.0
+    lhs = np.vander(x, 2)
+    scale = np.sqrt((lhs * lhs).sum(axis=0))
+    lhs /= scale
+    rcond = count * np.finfo(x.dtype).eps
+
+    unique_values, inverse = np.unique(values, axis=0, return_inverse=True)
+    slopes = np.empty(len(unique_values))
+    for i, row in enumerate(unique_values):
+        slopes[i] = np.linalg.lstsq(lhs, row, rcond)[0][0] / scale[0]
+    return slopes[inverse.reshape(-1)]
+
+
+def _fill_window_stats(out, windows, valid, prefix):
+    # Her pencere, gecerli deger sayisina gore gruplanir; ayni uzunluktaki
+    # pencereler tek bir 2B dizi uzerinde hesaplanir. Tek degerli pencerelerde
+    # std/trend/delta sifir kalir.
+    columns = {name[len(prefix) + 1:]: i for i, name in enumerate(FEATURE_NAMES)
+               if name.startswith(prefix + '_')}
+    counts = valid.sum(axis=1)
+
+    for count in np.unique(counts):
+        if count == 0:
+            continue
+
+        rows = np.flatnonzero(counts == count)
+        values = windows[rows][valid[rows]].reshape(len(rows), count)
+
+        if count == 1:
+            stats = {'mean': values[:, 0], 'min': values[:, 0], 'max': values[:, 0]}
+        else:
+            stats = {
+                'mean': np.mean(values, axis=1),
+                'std': np.std(values, axis=1),
+                'min': np.min(values, axis=1),
+                'max': np.max(values, axis=1),
+                'delta': values[:, -1] - values[:, 0],
+            }
+            if 'trend' in columns:
+                stats['trend'] = _polyfit_slopes(values)
+
+        for name, column in columns.items():
+            if name in stats:
+                out[rows, column] = stats[name]
+
+
+def extract_window_features(rssi, rtt, quality, window_size=10):
+    # Her kayan pencere icin extract_features ciktisinin matris hali.
+    # Eksik degerler NaN olarak verilir; j. satir [j, j + window_size)
+    # araligindaki olcumlere karsilik gelir.
+    rssi = np.asarray(rssi, dtype=float)
+    rtt = np.asarray(rtt, dtype=float)
+    quality = np.asarray(quality, dtype=float)
+
+    if len(rssi) < window_size:
+        return np.zeros((0, len(FEATURE_NAMES)))
+
+    features = np.zeros((len(rssi) - window_size + 1, len(FEATURE_NAMES)))
+
+    windows = sliding_window_view(rssi, window_size)
+    _fill_window_stats(features, windows, ~np.isnan(windows), 'rssi')
+
+    windows = sliding_window_view(rtt, window_size)
+    _fill_window_stats(features, windows, windows > 0, 'rtt')
+
+    windows = sliding_window_view(quality, window_size)
+    _fill_window_stats(features, windows, ~np.isnan(windows), 'quality')
+
+    return features
+
+
+def label_problem_rows(data_times, event_times, prediction_horizon=5):
+    # Bir problem olayindan once en fazla prediction_horizon olcum
+    # (olcum basina ~4 sn) icinde kalan DATA satirlari 1 ile isaretlenir.
+    data_times = np.asarray(data_times, dtype=float)
+    event_times = np.asarray(event_times, dtype=float)
+    event_times = event_times[~np.isnan(event_times)]
+
+    labels = np.zeros(len(data_times), dtype=int)
+    if len(data_times) == 0 or len(event_times) == 0:
+        return labels
+
+    order = np.argsort(data_times, kind='stable')
+    times = data_times[order]
+
+    def in_horizon(index):
+        return (event_times - times[index]) / 4 <= prediction_horizon
+
+    hi = np.searchsorted(times, event_times, side='left')
+    lo = np.searchsorted(times, event_times - 4 * prediction_horizon, side='left')
+    lo = np.minimum(lo, hi)
+
+    # Kayan nokta yuvarlamasi sinirda bir iki satir kaydirabilir; eski
+    # karsilastirma ile birebir ayni olmasi icin sinirlar duzeltilir.
+    while True:
+        step = (lo > 0) & in_horizon(np.maximum(lo - 1, 0))
+        if not step.any():
+            break
+        lo[step] -= 1
+
+    while True:
+        step = (lo < hi) & ~in_horizon(np.minimum(lo, len(times) - 1))
+        if not step.any():
+            break
+        lo[step] += 1
+
+    coverage = np.zeros(len(times) + 1, dtype=int)
+    np.add.at(coverage, lo, 1)
+    np.add.at(coverage, hi, -1)
+    labels[order] = np.cumsum(coverage[:-1]) > 0
+    return labels
+
+
+def series_training_data(unix_time, is_data, is_problem, rssi, rtt, quality_score,
+                         window_size=10, prediction_horizon=5):
+    # create_training_data'nin DataFrame'siz hali: satirlar zaman sirasinda,
+    # is_data DATA satirlarini, is_problem DISCONNECTED/PACKET_LOST olaylarini
+    # isaretler. Egitim onbellegi her oturum icin bunu cagirir.
+    unix_time = np.asarray(unix_time, dtype=float)
+    is_data = np.asarray(is_data, dtype=bool)
+
+    labels = label_problem_rows(unix_time[is_data], unix_time[np.asarray(is_problem, dtype=bool)],
+                                prediction_horizon)
+
+    if is_data.sum() <= window_size:
+        return np.array([]), np.array([])
+
+    # i. ornek [i - window_size, i) penceresinden uretilir ve i. satirin
+    # etiketini alir; son pencere (n - window_size, n] kullanilmaz.
+    X = extract_window_features(
+        np.asarray(rssi, dtype=float)[is_data],
+        np.asarray(rtt, dtype=float)[is_data],
+        np.asarray(quality_score, dtype=float)[is_data],
+        window_size
+    )[:-1]
+    y = labels[window_size:]
+
+    return X, y
+
+
 def create_training_data(df, window_size=10, prediction_horizon=5):
-    data_df = df[df['event_type'] == 'DATA'].copy()
-    data_df = data_df.reset_index(drop=True)
-
-    problem_indices = set()
-    for idx, row in df.iterrows():
-        if row['event_type'] in ['DISCONNECTED', 'PACKET_LOST']:
-            problem_time = row['unix_time']
-            for data_idx, data_row in data_df.iterrows():
-                if data_row['unix_time'] < problem_time:
-                    time_diff = problem_time - data_row['unix_time']
-                    estimated_measurements = time_diff / 4
-                    if estimated_measurements <= prediction_horizon:
-                        problem_indices.add(data_idx)
-
-    X = []
-    y = []
-
-    for i in range(window_size, len(data_df)):
-        window = data_df.iloc[i-window_size:i]
-
-        window_data = []
-        for _, row in window.iterrows():
-            window_data.append({
-                'rssi': row['rssi'] if not np.isnan(row['rssi']) else None,
-                'rtt': row['rtt'] if not np.isnan(row['rtt']) else None,
-                'latency': row['latency'] if not np.isnan(row['latency']) else None,
-                'quality_score': row['quality_score'] if not np.isnan(row['quality_score']) else None,
-            })
-
-        features = extract_features(window_data)
-        feature_vector = features_to_array(features)
-
-        label = 1 if i in problem_indices else 0
-
-        X.append(feature_vector)
-        y.append(label)
-
-    return np.array(X), np.array(y)
+    return series_training_data(
+        df['unix_time'].to_numpy(dtype=float),
+        (df['event_type'] == 'DATA').to_numpy(),
+        df['event_type'].isin(['DISCONNECTED', 'PACKET_LOST']).to_numpy(),
+        df['rssi'].to_numpy(dtype=float),
+        df['rtt'].to_numpy(dtype=float),
+        df['quality_score'].to_numpy(dtype=float),
+        window_size, prediction_horizon
+    )
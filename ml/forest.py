@@ -0,0 +1,238 @@
+import os
+import hashlib
+
+import numpy as np
+
+FOREST_FORMAT = 1
+FOREST_SUFFIX = '.npz'
+
+# Cok satirli tahminde (agac, satir) dugum dizileri bu kadar satirlik parcalarla
+CHUNK_ROWS = 512
+
+
+def packed_path(model_path):
+    # model.pkl -> model.npz
+    return os.path.splitext(model_path)[0] + FOREST_SUFFIX
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Tam ikili agac yerlesimi 2^derinlik buyudugu icin paketlenebilecek en
+# derin agac (train.py max_depth=10 kullanir)
+MAX_PACKED_DEPTH = 14
+
+NODE_DTYPE = np.dtype([('threshold', '<f4'), ('feature', '<i4')])
+
+
+def _float32_floor(threshold):
+    # float32 x icin x <= t (float64) ile x <= t32 ayni sonucu verir; t32,
+    # t'yi asmayan en buyuk float32'dir
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class PackedForest:
+
+    # sklearn RandomForestClassifier'in duz NumPy dizilerine acilmis hali.
+    # Her agac max_depth derinliginde tam ikili agaca genisletilir: i.
+    # dugumun cocuklari 2i+1 / 2i+2'dir, cocuk indeksi okunmaz. Erken biten
+    # yapraklarin altina hep sola giden dolgu dugumleri (sifir sutunu, esik
+    # +inf) konur ve yaprak degeri alttaki tum konumlara yazilir. Boylece
+    # tum agaclar ve satirlar derinlik kadar adimda birlikte ilerletilir.
+    #
+    # Sonuc predict_proba ile bit-bit aynidir: esikler float32 girdiyle
+    # ayni karsilastirmayi veren float32'ye yuvarlanir, NaN girdiler
+    # missing_go_to_left'e gore yonlenir, agac olasiliklari ayni sirayla
+    # toplanir. sklearn gerektirmez.
+
+    def __init__(self, threshold, feature, missing_left, value, classes,
+                 n_features, depth, source_digest=''):
+        if int(depth) < 1:
+            raise ValueError('Paketli agac derinligi en az 1 olmali: {}'.format(int(depth)))
+        self.n_features_in_ = int(n_features)
+        self.depth = int(depth)
+        self.classes_ = classes
+        self.value = value
+        self.missing_left = missing_left
+        self.source_digest = source_digest
+
+        self.nodes = np.empty(len(threshold), dtype=NODE_DTYPE)
+        self.nodes['threshold'] = threshold
+        self.nodes['feature'] = feature
+
+        size = 2 ** self.depth - 1
+        trees = len(threshold) // size
+        # Dugum indeksi agaclar arasi ortak; bir adimda i -> 2i + step + sag
+        self.tree_base = (np.arange(trees, dtype=np.int32) * size)[:, np.newaxis]
+        self.step = 1 - self.tree_base
+        # Son adimdan sonra ortak indeks -> value satiri
+        self.leaf_offset = (np.arange(trees, dtype=np.int32) * 2 ** self.depth)[:, np.newaxis] \
+            - self.tree_base - size
+
+    @classmethod
+    def from_sklearn(cls, model, source_digest=''):
+        # Tum agaclari tek yaprak olan orman da bir dolgu dugumuyle derinlik 1
+        # olarak paketlenir (kok yapragin degeri iki konuma yazilir)
+        depth = max(1, max(estimator.tree_.max_depth for estimator in model.estimators_))
+        if depth > MAX_PACKED_DEPTH:
+            raise ValueError('Agac derinligi {} > {}; paketlenemez'.format(depth, MAX_PACKED_DEPTH))
+
+        trees = len(model.estimators_)
+        n_features = model.n_features_in_
+        n_classes = len(model.classes_)
+        size = 2 ** depth - 1
+
+        threshold = np.full((trees, size), np.inf)
+        feature = np.full((trees, size), n_features, dtype=np.int32)
+        missing_left = np.zeros((trees, size), dtype=bool)
+        value = np.zeros((trees, 2 ** depth, n_classes))
+
+        for index, estimator in enumerate(model.estimators_):
+            tree = estimator.tree_
+            stack = [(0, 0, 0)]
+            while stack:
+                node, position, level = stack.pop()
+                left = tree.children_left[node]
+                if left == -1:
+                    # Yaprak: alttaki tum son seviye konumlari ayni deger
+                    first = last = position
+                    for _ in range(depth - level):
+                        first, last = 2 * first + 1, 2 * last + 2
+                    value[index, first - size:last - size + 1] = tree.value[node, 0, :n_classes]
+                    continue
+
+                threshold[index, position] = tree.threshold[node]
+                feature[index, position] = tree.feature[node]
+                missing_left[index, position] = tree.missing_go_to_left[node]
+                stack.append((left, 2 * position + 1, level + 1))
+                stack.append((tree.children_right[node], 2 * position + 2, level + 1))
+
+        return cls(
+            _float32_floor(threshold.ravel()), feature.ravel(), missing_left.ravel(),
+            value.reshape(-1, n_classes), np.asarray(model.classes_), n_features, depth, source_digest
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != FOREST_FORMAT:
+                raise ValueError('Desteklenmeyen paketli model surumu: {}'.format(int(data['format'])))
+            return cls(
+                data['threshold'], data['feature'], data['missing_left'], data['value'],
+                data['classes'], data['n_features'], data['depth'], str(data['source_digest'])
+            )
+
+    def save(self, path):
+        # Tam agac yerlesimindeki tekrarlanan yaprak degerleri iyi sikisir.
+        # np.savez dosya adina .npz ekler; gecici dosya adi buna gore secilir.
+        temp = path + '.tmp' + FOREST_SUFFIX
+        np.savez_compressed(
+            temp, format=FOREST_FORMAT, threshold=self.nodes['threshold'], feature=self.nodes['feature'],
+            missing_left=self.missing_left, value=self.value, classes=self.classes_,
+            n_features=self.n_features_in_, depth=self.depth, source_digest=np.array(self.source_digest)
+        )
+        os.replace(temp, path)
+
+    @property
+    def n_estimators(self):
+        return len(self.tree_base)
+
+    def memory_bytes(self):
+        return self.nodes.nbytes + self.missing_left.nbytes + self.value.nbytes
+
+    def _predict_chunk(self, X):
+        # Sona eklenen sifir sutunu dolgu dugumlerinin okudugu ozelliktir
+        rows = len(X)
+        padded = np.zeros((rows, self.n_features_in_ + 1), dtype=np.float32)
+        padded[:, :self.n_features_in_] = X
+        flat = padded.ravel()
+        row_base = (np.arange(rows, dtype=np.int32) * (self.n_features_in_ + 1))[np.newaxis, :]
+        has_nan = np.isnan(X).any()
+
+        # (agac, satir) ortak dugum indeksleri
+        node = np.repeat(self.tree_base, rows, axis=1)
+        for _ in range(self.depth):
+            record = self.nodes.take(node)
+            x = flat.take(record['feature'] + row_base)
+            right = x > record['threshold']
+            if has_nan:
+                right |= np.isnan(x) & ~self.missing_left.take(node)
+            node *= 2
+            node += self.step
+            node += right
+
+        # (agac, satir, sinif); ilk eksen boyunca toplama agaclari sirayla
+        # ekler (sklearn'deki += dongusuyle ayni yuvarlama)
+        return self.value[node + self.leaf_offset].sum(axis=0) / self.n_estimators
+
+    def predict_proba(self, X):
+        # sklearn agaclari girdiyi float32 olarak karsilastirir
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError('{} ozellik bekleniyordu, {} verildi'.format(self.n_features_in_, X.shape[1]))
+
+        if len(X) <= CHUNK_ROWS:
+            return self._predict_chunk(X)
+
+        result = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), CHUNK_ROWS):
+            result[start:start + CHUNK_ROWS] = self._predict_chunk(X[start:start + CHUNK_ROWS])
+        return result
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def export_forest(model, path, source_path=None):
+    # Egitilmis modeli paketli bicimde yazar; source_path (model.pkl) verilirse
+    # ozeti saklanir ve yukleme sirasinda eskimis paket ayirt edilir
+    digest = file_digest(source_path) if source_path and os.path.exists(source_path) else ''
+    forest = PackedForest.from_sklearn(model, source_digest=digest)
+    forest.save(path)
+    return forest
+
+
+def verification_inputs(forest, rows=4000, seed=0):
+    # Dogrulama girdileri: her ozellik icin esik degerlerinin kendisi (esitlik
+    # siniri), aralarina dusen rastgele degerler ve bir miktar NaN
+    rng = np.random.default_rng(seed)
+    thresholds = forest.nodes['threshold'].astype(np.float64)
+    columns = []
+    for index in range(forest.n_features_in_):
+        used = thresholds[forest.nodes['feature'] == index]
+        if len(used) == 0:
+            used = np.zeros(1)
+        values = np.concatenate([used, rng.uniform(used.min() - 1, used.max() + 1, len(used) + 100)])
+        column = rng.choice(values, rows)
+        column[rng.random(rows) < 0.02] = np.nan
+        columns.append(column)
+    return np.column_stack(columns)
+
+
+def model_available(model_path):
+    return os.path.exists(model_path) or os.path.exists(packed_path(model_path))
+
+
+def load_model(model_path):
+    # Yaninda ayni model.pkl'den uretilmis model.npz varsa sklearn hic
+    # yuklenmeden o kullanilir; yoksa ya da paket eskiyse joblib ile yuklenir.
+    packed = packed_path(model_path)
+    if os.path.exists(packed):
+        try:
+            forest = PackedForest.load(packed)
+            if model_path == packed or not os.path.exists(model_path) \
+                    or forest.source_digest == file_digest(model_path):
+                return forest
+            print('[ML] Paketli model eski, sklearn modeli yukleniyor:', packed)
+        except (OSError, ValueError, KeyError) as e:
+            print('[ML] Paketli model okunamadi:', e)
+
+    import joblib
+    return joblib.load(model_path)
@@ -0,0 +1,174 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+
+# ML sonucunun olcumden sonra gecerli sayildigi sure (ms); asan sonuc atilir
+ML_DEADLINE_MS = float(os.environ.get('RSSI_ML_DEADLINE_MS', '500'))
+# Bekleyen tahmin kuyrugu kapasitesi; doluysa yeni istek atilir
+ML_QUEUE_SIZE = int(os.environ.get('RSSI_ML_QUEUE', '256'))
+ML_WORKERS = int(os.environ.get('RSSI_ML_WORKERS', '1'))
+
+LATENCY_WINDOW = 1024
+
+
+class LatencyWindow:
+
+    # Son LATENCY_WINDOW gecikme (s); yuzdelikler durum sorgusunda hesaplanir,
+    # yeni ornek gelene kadar sonuc tekrar kullanilir
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self._summary = None
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self._summary = None
+
+    def summary(self):
+        if self._summary is None:
+            samples = sorted(self.samples)
+            self._summary = {
+                'p50_ms': _percentile_ms(samples, 0.5),
+                'p99_ms': _percentile_ms(samples, 0.99)
+            }
+        return dict(self._summary)
+
+
+def _percentile_ms(samples, q):
+    if not samples:
+        return None
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 2)
+
+
+class InferenceWorker:
+
+    # predict_proba cagrilarini olcum thread'inden alir. Istekler sinirli
+    # bir kuyruktan ML_WORKERS thread'ine dagitilir; kuyruk doluysa ya da
+    # istek isleme alinmadan / sonuclanmadan once suresi dolmussa sonuc
+    # atilir ve on_drop cagrilir. Tum cihazlar ayni isciyi paylasir.
+
+    def __init__(self, workers=ML_WORKERS, max_queue=ML_QUEUE_SIZE, deadline_ms=ML_DEADLINE_MS):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.deadline = deadline_ms / 1000.0
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.latency = LatencyWindow()
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped_full = 0
+        self.dropped_deadline = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+
+        self.running = False
+        self._threads = []
+
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name='InferenceWorker-{}'.format(i), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        if not self.running:
+            return
+
+        self.running = False
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, model, features, on_result, on_drop=None):
+        # features olcum thread'inde kopyalanmis (1, n) dizi olmali
+        start = time.perf_counter()
+        try:
+            self.queue.put_nowait((start, start + self.deadline, model, features, on_result, on_drop))
+        except queue.Full:
+            with self.lock:
+                self.dropped_full += 1
+            if on_drop is not None:
+                on_drop()
+            return False
+
+        with self.lock:
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return True
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+
+            start, deadline, model, features, on_result, on_drop = job
+            probability = None
+            if time.perf_counter() <= deadline:
+                try:
+                    probability = float(model.predict_proba(features)[0][1])
+                except Exception as e:
+                    with self.lock:
+                        self.errors += 1
+                    print('[ML] Tahmin hatasi:', e)
+                    if on_drop is not None:
+                        on_drop()
+                    continue
+
+            elapsed = time.perf_counter() - start
+            if probability is None or elapsed > self.deadline:
+                with self.lock:
+                    self.dropped_deadline += 1
+                if on_drop is not None:
+                    on_drop()
+                continue
+
+            with self.lock:
+                self.completed += 1
+                self.latency.add(elapsed)
+
+            try:
+                on_result(probability, elapsed)
+            except Exception as e:
+                print('[ML] Sonuc isleme hatasi:', e)
+
+    def get_stats(self):
+        with self.lock:
+            stats = {
+                'workers': self.workers,
+                'deadline_ms': self.deadline * 1000,
+                'queue_depth': self.queue.qsize(),
+                'queue_max': self.max_queue,
+                'max_queue_depth': self.max_queue_depth,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'dropped_queue_full': self.dropped_full,
+                'dropped_deadline': self.dropped_deadline,
+                'errors': self.errors
+            }
+            stats.update(self.latency.summary())
+        return stats
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_inference_worker():
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = InferenceWorker()
+                _worker.start()
+    return _worker
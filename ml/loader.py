@@ -0,0 +1,218 @@
+import os
+import time
+import weakref
+import threading
+
+# Model dosyasi degisikligi icin yoklama araligi (s)
+MODEL_POLL_INTERVAL = float(os.environ.get('RSSI_MODEL_POLL_S', '2'))
+# Yeni model, tahminleyicilerin son bu kadar ozellik penceresiyle denenir
+VALIDATION_WINDOWS = 64
+
+
+def file_signature(path):
+    # model.pkl ve yanindaki model.npz icin (inode, mtime, boyut); os.replace
+    # ile yazilan dosyada inode, yerinde yazilanda mtime/boyut degisir
+    from .forest import packed_path
+
+    signature = []
+    for name in (path, packed_path(path)):
+        try:
+            stat = os.stat(name)
+            signature.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class ModelLoad:
+
+    # Bir model dosyasinin tek bir yuklenmesi. generation, ayni dosyanin
+    # kacinci yuklenmesi oldugudur (model kaydindaki surum degil). signature
+    # yukleme baslamadan alinir, boylece yukleme sirasinda yazilan dosya bir
+    # sonraki yoklamada yeniden yuklenir.
+
+    def __init__(self, path, generation=1):
+        self.path = path
+        self.generation = generation
+        self.model = None
+        self.error = None
+        self.seconds = None
+        self.signature = None
+        self.validation = None
+        self.done = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            # Yaninda guncel model.npz varsa sklearn'siz paketli orman yuklenir
+            from .forest import PackedForest, load_model, model_available
+            self.signature = file_signature(self.path)
+            if model_available(self.path):
+                self.model = load_model(self.path)
+                kind = 'paketli' if isinstance(self.model, PackedForest) else 'sklearn'
+                print('[ML] Model yuklendi ({}, #{}, {:.0f} ms):'.format(
+                    kind, self.generation, (time.perf_counter() - start) * 1000), self.path)
+        except Exception as e:
+            self.error = e
+            print('[ML] Model yuklenemedi:', e)
+        self.seconds = time.perf_counter() - start
+        self.done.set()
+
+
+def validate_model(model, windows, reference=None):
+    # Yeni modeli son ozellik pencereleri uzerinde dener. Etiket olmadigindan
+    # dogruluk olculmez; model calismali, iki sinifli ve gecerli olasilik
+    # donmelidir. Eski modelle olasilik farki rapora yazilir.
+    import numpy as np
+
+    features = getattr(model, 'n_features_in_', None)
+    if reference is not None and features != reference.n_features_in_:
+        raise ValueError('Ozellik sayisi {} != {}'.format(features, reference.n_features_in_))
+    if len(getattr(model, 'classes_', ())) != 2:
+        raise ValueError('Iki sinifli model bekleniyordu')
+
+    X = np.array(windows, dtype=float) if windows else np.zeros((1, features))
+    start = time.perf_counter()
+    probability = model.predict_proba(X)
+    seconds = time.perf_counter() - start
+    if probability.shape != (len(X), 2) or not np.all(np.isfinite(probability)) \
+            or probability.min() < 0 or probability.max() > 1:
+        raise ValueError('Gecersiz olasilik ciktisi')
+
+    report = {
+        'windows': len(windows),
+        'predict_ms': round(seconds * 1000, 2),
+        'mean_probability': round(float(probability[:, 1].mean()), 4)
+    }
+    if reference is not None and windows:
+        difference = np.abs(probability[:, 1] - reference.predict_proba(X)[:, 1])
+        report['mean_abs_diff'] = round(float(difference.mean()), 4)
+        report['max_abs_diff'] = round(float(difference.max()), 4)
+    return report
+
+
+class ModelSlot:
+
+    # Bir model dosyasinin gecerli surumu. Tum tahminleyiciler (cihazlar) ayni
+    # slotu paylasir ve her olcumde current'i kendi modeliyle karsilastirir.
+    # Izleyici thread dosya degisince yeni ModelLoad'u arka planda yukler,
+    # dogrular ve tek atamayla current'e yayinlar; eski model ile baslamis
+    # tahminler eski modelle tamamlanir.
+
+    def __init__(self, path):
+        self.path = path
+        self.current = ModelLoad(path)
+        self.predictors = weakref.WeakSet()
+        self.lock = threading.Lock()
+
+        self.reloads = 0
+        self.rejected = 0
+        self.last_error = None
+
+        self.watching = False
+        self.stopped = threading.Event()
+
+    def register(self, predictor):
+        with self.lock:
+            self.predictors.add(predictor)
+
+    def unregister(self, predictor):
+        with self.lock:
+            self.predictors.discard(predictor)
+
+    def windows(self):
+        # Dogrulama icin kayitli tahminleyicilerin son pencereleri
+        with self.lock:
+            predictors = list(self.predictors)
+        windows = []
+        for predictor in predictors:
+            windows.extend(predictor.validation_windows())
+        return windows[-VALIDATION_WINDOWS:]
+
+    def watch(self, interval=MODEL_POLL_INTERVAL):
+        with self.lock:
+            if self.watching:
+                return
+            self.watching = True
+        threading.Thread(target=self._watch, args=(interval,), name='ModelWatcher', daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _watch(self, interval):
+        self.current.done.wait()
+        pending = None
+        while not self.stopped.wait(interval):
+            signature = file_signature(self.path)
+            if signature == self.current.signature or signature[0] is None and signature[1] is None:
+                pending = None
+                continue
+            # Degisiklik iki yoklama boyunca ayni kalmali: yerinde yazilan
+            # dosya yazim bitmeden yuklenmez
+            if signature != pending:
+                pending = signature
+                continue
+            pending = None
+            self.reload()
+
+    def reload(self):
+        previous = self.current
+        load = ModelLoad(self.path, generation=previous.generation + 1)
+        load.run()
+
+        try:
+            if load.model is None:
+                raise ValueError(load.error or 'Model dosyasi yok')
+            load.validation = validate_model(load.model, self.windows(), previous.model)
+        except Exception as e:
+            # Reddedilen dosya tekrar denenmesin; eski model kullanilmaya devam eder
+            previous.signature = load.signature
+            self.rejected += 1
+            self.last_error = str(e)
+            print('[ML] Yeni model reddedildi, #{} kullaniliyor:'.format(previous.generation), e)
+            return False
+
+        self.current = load
+        self.reloads += 1
+        self.last_error = None
+        print('[ML] Model #{} devreye alindi: {}'.format(load.generation, load.validation))
+        return True
+
+    def get_stats(self):
+        current = self.current
+        return {
+            'generation': current.generation,
+            'load_ms': round(current.seconds * 1000, 1) if current.seconds is not None else None,
+            'validation': current.validation,
+            'watching': self.watching,
+            'reloads': self.reloads,
+            'rejected': self.rejected,
+            'last_error': self.last_error
+        }
+
+
+# Ayni model dosyasi tum tahminleyiciler arasinda paylasilir
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def warm_up_model(path, background=True, watch=False):
+    # Modeli arka planda yuklemeye baslar (zaten basladiysa ayni slot doner).
+    # background=False ise ilk yukleme bitene kadar bekler; watch=True ise
+    # dosya degisiklikleri izlenir.
+    with _slots_lock:
+        slot = _slots.get(path)
+        started = slot is None
+        if started:
+            slot = _slots[path] = ModelSlot(path)
+
+    load = slot.current
+    if started and background:
+        threading.Thread(target=load.run, name='ModelWarmUp', daemon=True).start()
+    elif started:
+        load.run()
+    if not background:
+        load.done.wait()
+    if watch:
+        slot.watch()
+    return slot
@@ -1,61 +1,138 @@
 import os
+import time
+import threading
+import importlib.util
+from collections import deque
 from .rules import RuleBasedPredictor, WARNING_LEVEL_NONE, WARNING_LEVEL_INFO, WARNING_LEVEL_CAUTION, WARNING_LEVEL_WARNING, WARNING_LEVEL_CRITICAL
+from .inference import LatencyWindow, get_inference_worker
+from .stats import LatencyHistogram
+from .loader import VALIDATION_WINDOWS, warm_up_model
 
-try:
-    from .features import extract_features, features_to_array
-    NUMPY_AVAILABLE = True
-except ImportError:
-    NUMPY_AVAILABLE = False
-    extract_features = None
-    features_to_array = None
+# numpy, ozellikler ve model ilk kullanimda (ya da arka plan isinmasinda)
+# import edilir; kural tabanli tahmin bunlari beklemez
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
 
 MIN_DISCONNECTS_FOR_ML = 100
 MIN_DATA_POINTS_FOR_ML = 500
 
+PREDICT_STAGES = ('rules', 'ml', 'ml_inference')
+
+# 4 kademeli ML tahmin sistemi: (olasilik esigi, uyari seviyesi, mesaj)
+ML_RISK_LEVELS = [
+    (0.85, WARNING_LEVEL_CRITICAL, 'ML Tahmini: Çok yüksek risk (%{:.0f})! Bağlantı her an kopabilir.'),
+    (0.70, WARNING_LEVEL_WARNING, 'ML Tahmini: Yüksek kopma riski (%{:.0f}). Önlem alınması önerilir.'),
+    (0.50, WARNING_LEVEL_CAUTION, 'ML Tahmini: Bağlantı stabilitesi düşüyor (%{:.0f}). İzlenmeli.'),
+    (0.30, WARNING_LEVEL_INFO, 'ML Tahmini: Hafif dalgalanma tespit edildi (%{:.0f}).'),
+]
+
 
 class ConnectionPredictor:
 
-    def __init__(self, model_path=None, thresholds=None):
+    def __init__(self, model_path=None, thresholds=None, background=False, watch=False):
+        # background=True: model arka planda yuklenir, o sirada tahminler
+        # kural tabanli yapilir ve yukleme bitince hibrit moda gecilir.
+        # watch=True: model dosyasi degisince yeni surum yuklenip dogrulanir
+        # ve olcumler durmadan devreye alinir.
         self.rule_predictor = RuleBasedPredictor(thresholds)
         self.ml_model = None
         self.model_path = model_path
         self.ml_enabled = False
 
-        self.window = []
         self.window_size = 10
+        # Ozellik penceresi model hazir olunca kurulur; o zamana kadar son
+        # olcumler ham halde tutulur ve pencereye aktarilir
+        self.features = None
+        self.recent = deque(maxlen=self.window_size)
+        self.model_slot = None
+        self.model_active = None
+        self.model_swaps = 0
+        self.swap_pause = None
+        # Yeni model surumunun dogrulandigi son ozellik pencereleri
+        self.validation = deque(maxlen=VALIDATION_WINDOWS)
 
         self.total_predictions = 0
         self.warnings_given = 0
 
-        if model_path and os.path.exists(model_path) and NUMPY_AVAILABLE:
-            self._load_model(model_path)
-        elif model_path and os.path.exists(model_path) and not NUMPY_AVAILABLE:
+        # Arka plan ML tahminleri (predict(..., on_ml_result=...)); sayaclar
+        # inference thread'inden de guncellendigi icin kilitli
+        self.ml_lock = threading.Lock()
+        self.ml_pending = 0
+        self.ml_completed = 0
+        self.ml_dropped = 0
+        self.ml_latency = LatencyWindow()
+        self.last_probability = None
+        self.inference_worker = None
+
+        # Tahmin asamalarinin sureleri: rules kural degerlendirmesi, ml olcum
+        # thread'indeki ML isi (senkron predict_proba ya da kuyruga ekleme),
+        # ml_inference arka plan tahmininin kuyruk + calisma suresi
+        self.stage_latency = {name: LatencyHistogram() for name in PREDICT_STAGES}
+
+        if model_path and NUMPY_AVAILABLE:
+            self.model_slot = warm_up_model(model_path, background=background, watch=watch)
+            self.model_slot.register(self)
+            self._activate_model()
+        elif model_path and os.path.exists(model_path):
             print('[ML] numpy bulunamadi - sadece kural tabanli sistem aktif')
 
-    def _load_model(self, path):
-        try:
-            import joblib
-            self.ml_model = joblib.load(path)
-            self.ml_enabled = True
-            print('[ML] Model yuklendi:', path)
-        except Exception as e:
-            print('[ML] Model yuklenemedi:', e)
-            self.ml_enabled = False
+    def _activate_model(self):
+        # Olcum thread'inden cagrilir. Slottaki yukleme bittiyse model
+        # devreye alinir; ilk modelde ozellik penceresi kurulur ve bekleyen
+        # ham olcumler islenir, sonrakilerde yalnizca model referansi degisir.
+        load = self.model_slot.current
+        if not load.done.is_set():
+            return
+
+        start = time.perf_counter()
+        previous = self.model_active
+        self.model_active = load
+        if load.model is None:
+            return
+
+        if self.features is None:
+            from .features import RollingFeatures
+            features = RollingFeatures(self.window_size)
+            for rssi, rtt, quality_score in self.recent:
+                features.update(rssi, rtt, quality_score)
+            self.recent.clear()
+            self.features = features
+
+        self.ml_model = load.model
+        self.ml_enabled = True
+        if previous is not None and previous.model is not None:
+            self.model_swaps += 1
+            self.swap_pause = time.perf_counter() - start
+
+    def validation_windows(self):
+        return list(self.validation)
 
     def add_measurement(self, rssi, rtt, latency, quality_score):
-        measurement = {
-            'rssi': rssi,
-            'rtt': rtt,
-            'latency': latency,
-            'quality_score': quality_score
-        }
-
-        self.window.append(measurement)
-
-        if len(self.window) > self.window_size:
-            self.window.pop(0)
+        if self.model_slot is not None and self.model_slot.current is not self.model_active:
+            self._activate_model()
 
-    def predict(self, rssi, rtt, latency, quality_score):
+        if self.features is not None:
+            self.features.update(rssi, rtt, quality_score)
+        else:
+            self.recent.append((rssi, rtt, quality_score))
+
+    def _apply_ml(self, result, probability):
+        # ML olasiligini esiklere gore sonuca isler; kural seviyesinden
+        # yuksekse seviye yukseltilir ve mesaj eklenir
+        result['ml_probability'] = probability
+        for threshold, level, message in ML_RISK_LEVELS:
+            if probability >= threshold:
+                if result['warning_level'] < level:
+                    result['warning_level'] = level
+                    result['messages'].append(message.format(probability * 100))
+                result['source'] = 'hybrid'
+                break
+
+    def predict(self, rssi, rtt, latency, quality_score, on_ml_result=None):
+        # on_ml_result verilirse kural sonucu hemen doner, ML tahmini
+        # inference thread'inde yapilir. ML seviyeyi yukseltirse
+        # on_ml_result(sonuc) inference thread'inden cagrilir; sonuc
+        # yalnizca ML mesajlarini ve 'rule_level' alanini tasir. Sure
+        # asiminda ya da kuyruk doluyken sonuc atilir.
         self.total_predictions += 1
 
         self.add_measurement(rssi, rtt, latency, quality_score)
@@ -67,66 +144,152 @@ class ConnectionPredictor:
             'source': 'rules'
         }
 
+        start = time.perf_counter()
         rule_level, rule_messages = self.rule_predictor.predict(
             rssi=rssi,
             rtt=rtt,
             latency=latency,
             quality_score=quality_score
         )
+        ruled = time.perf_counter()
+        self.stage_latency['rules'].observe(ruled - start)
 
         result['warning_level'] = rule_level
         result['messages'] = rule_messages
 
-        if self.ml_enabled and NUMPY_AVAILABLE and len(self.window) >= self.window_size:
-            try:
-                import numpy as np
-                features = extract_features(self.window)
-                feature_vector = features_to_array(features).reshape(1, -1)
-
-                probability = self.ml_model.predict_proba(feature_vector)[0][1]
-                result['ml_probability'] = probability
-
-                # 4 kademeli ML tahmin sistemi
-                if probability >= 0.85:
-                    if result['warning_level'] < WARNING_LEVEL_CRITICAL:
-                        result['warning_level'] = WARNING_LEVEL_CRITICAL
-                        result['messages'].append(
-                            'ML Tahmini: Çok yüksek risk (%{:.0f})! Bağlantı her an kopabilir.'.format(probability * 100)
-                        )
-                    result['source'] = 'hybrid'
-
-                elif probability >= 0.70:
-                    if result['warning_level'] < WARNING_LEVEL_WARNING:
-                        result['warning_level'] = WARNING_LEVEL_WARNING
-                        result['messages'].append(
-                            'ML Tahmini: Yüksek kopma riski (%{:.0f}). Önlem alınması önerilir.'.format(probability * 100)
-                        )
-                    result['source'] = 'hybrid'
-
-                elif probability >= 0.50:
-                    if result['warning_level'] < WARNING_LEVEL_CAUTION:
-                        result['warning_level'] = WARNING_LEVEL_CAUTION
-                        result['messages'].append(
-                            'ML Tahmini: Bağlantı stabilitesi düşüyor (%{:.0f}). İzlenmeli.'.format(probability * 100)
-                        )
-                    result['source'] = 'hybrid'
-
-                elif probability >= 0.30:
-                    if result['warning_level'] < WARNING_LEVEL_INFO:
-                        result['warning_level'] = WARNING_LEVEL_INFO
-                        result['messages'].append(
-                            'ML Tahmini: Hafif dalgalanma tespit edildi (%{:.0f}).'.format(probability * 100)
-                        )
-                    result['source'] = 'hybrid'
-
-            except Exception as e:
-                pass
+        if self.ml_enabled and self.features.is_full():
+            if on_ml_result is not None:
+                # as_array ortak bir tampon doner; kuyruga kopyasi girer
+                feature_vector = self.features.as_array().reshape(1, -1).copy()
+                self.validation.append(feature_vector[0])
+                self._submit(feature_vector, result['warning_level'], on_ml_result)
+            else:
+                try:
+                    feature_vector = self.features.as_array().reshape(1, -1)
+                    self.validation.append(feature_vector[0].copy())
+                    probability = self.ml_model.predict_proba(feature_vector)[0][1]
+                    self.last_probability = float(probability)
+                    self._apply_ml(result, probability)
+                except Exception as e:
+                    pass
+            self.stage_latency['ml'].observe(time.perf_counter() - ruled)
 
         if result['warning_level'] > WARNING_LEVEL_NONE:
-            self.warnings_given += 1
+            with self.ml_lock:
+                self.warnings_given += 1
 
         return result
 
+    def _submit(self, feature_vector, rule_level, on_ml_result):
+        def on_result(probability, elapsed):
+            with self.ml_lock:
+                self.ml_pending -= 1
+                self.ml_completed += 1
+                self.ml_latency.add(elapsed)
+                self.stage_latency['ml_inference'].observe(elapsed)
+                self.last_probability = probability
+
+            result = {
+                'warning_level': rule_level,
+                'rule_level': rule_level,
+                'messages': [],
+                'ml_probability': None,
+                'source': 'rules'
+            }
+            self._apply_ml(result, probability)
+            if result['warning_level'] > rule_level:
+                if rule_level == WARNING_LEVEL_NONE:
+                    with self.ml_lock:
+                        self.warnings_given += 1
+                on_ml_result(result)
+
+        def on_drop():
+            with self.ml_lock:
+                self.ml_pending -= 1
+                self.ml_dropped += 1
+
+        with self.ml_lock:
+            self.ml_pending += 1
+        if self.inference_worker is None:
+            self.inference_worker = get_inference_worker()
+        self.inference_worker.submit(self.ml_model, feature_vector, on_result, on_drop)
+
+    def predict_batch(self, rssi, rtt, latency, quality_score):
+        # Bir oturumun tum olcumlerini, bos bir tahminleyiciye sirayla
+        # predict() ile verilmis gibi tek seferde skorlar. Pencere ozellikleri
+        # birlikte hesaplanir ve predict_proba tum matris icin bir kez cagrilir.
+        # Sayaclar ve akan pencere degismez.
+        import numpy as np
+        from .features import extract_window_features
+
+        rssi = np.asarray(rssi, dtype=float)
+        rtt = np.asarray(rtt, dtype=float)
+        latency = np.asarray(latency, dtype=float)
+        quality_score = np.asarray(quality_score, dtype=float)
+
+        levels = self.rule_predictor.predict_batch(rssi, rtt, latency, quality_score)
+        sources = np.full(len(rssi), 'rules', dtype=object)
+        probabilities = np.full(len(rssi), np.nan)
+
+        if self.ml_enabled and len(rssi) >= self.window_size:
+            features = extract_window_features(rssi, rtt, quality_score, self.window_size)
+            probability = self.ml_model.predict_proba(features)[:, 1]
+
+            scored = slice(self.window_size - 1, None)
+            probabilities[scored] = probability
+
+            ml_levels = np.select(
+                [probability >= threshold for threshold, _, _ in ML_RISK_LEVELS],
+                [level for _, level, _ in ML_RISK_LEVELS],
+                WARNING_LEVEL_NONE
+            )
+            levels[scored] = np.maximum(levels[scored], ml_levels)
+            sources[scored][probability >= ML_RISK_LEVELS[-1][0]] = 'hybrid'
+
+        return {
+            'warning_level': levels,
+            'source': sources,
+            'ml_probability': probabilities
+        }
+
+    def replay_session(self, df):
+        # Kaydedilmis CSV verisini (bir veya daha fazla oturum) yeniden skorlar.
+        # Her session_id ayri bir tahminleyici oturumu gibi ele alinir; DATA
+        # satirlari warning_level, source ve ml_probability sutunlariyla doner.
+        import numpy as np
+
+        if 'event_type' in df.columns:
+            df = df[df['event_type'] == 'DATA']
+        df = df.copy()
+
+        rssi = df['rssi'].to_numpy(dtype=float)
+        rtt = df['rtt'].to_numpy(dtype=float)
+        if 'latency' in df.columns:
+            latency = df['latency'].to_numpy(dtype=float)
+        else:
+            latency = np.floor_divide(rtt, 2)
+        quality_score = df['quality_score'].to_numpy(dtype=float)
+
+        if 'session_id' in df.columns:
+            sessions = df.groupby('session_id', sort=False).indices.values()
+        else:
+            sessions = [np.arange(len(df))]
+
+        levels = np.zeros(len(df), dtype=int)
+        sources = np.full(len(df), 'rules', dtype=object)
+        probabilities = np.full(len(df), np.nan)
+
+        for rows in sessions:
+            result = self.predict_batch(rssi[rows], rtt[rows], latency[rows], quality_score[rows])
+            levels[rows] = result['warning_level']
+            sources[rows] = result['source']
+            probabilities[rows] = result['ml_probability']
+
+        df['warning_level'] = levels
+        df['source'] = sources
+        df['ml_probability'] = probabilities
+        return df
+
     def format_warning(self, result):
         if result['warning_level'] == WARNING_LEVEL_NONE:
             return None
@@ -145,25 +308,75 @@ class ConnectionPredictor:
 
         return '{} {}'.format(prefix, ' | '.join(messages))
 
-    def get_status(self):
+    def get_status(self, inference=True):
+        # inference=False: olcum basina alinan durum goruntusu icin arka plan
+        # tahmin sayaclari ve gecikme yuzdelikleri atlanir
+        model_loading = self.model_slot is not None and self.model_active is None \
+            and not self.model_slot.current.done.is_set()
         if self.ml_enabled:
             mode = 'Hibrit (Kural + ML)'
         elif not NUMPY_AVAILABLE:
             mode = 'Kural Tabanlı (numpy yükleyin ML için)'
+        elif model_loading:
+            mode = 'Kural Tabanlı (ML modeli yükleniyor)'
         else:
             mode = 'Kural Tabanlı'
 
-        return {
+        status = {
             'ml_enabled': self.ml_enabled,
             'numpy_available': NUMPY_AVAILABLE,
-            'window_size': len(self.window),
+            'model_loading': model_loading,
+            'window_size': len(self.features) if self.features is not None else len(self.recent),
             'total_predictions': self.total_predictions,
             'warnings_given': self.warnings_given,
             'mode': mode
         }
+        if not inference:
+            return status
+
+        with self.ml_lock:
+            status['inference'] = {
+                'pending': self.ml_pending,
+                'completed': self.ml_completed,
+                'dropped': self.ml_dropped,
+                'last_probability': self.last_probability
+            }
+            status['inference'].update(self.ml_latency.summary())
+        status['latency'] = {name: histogram.summary() for name, histogram in self.stage_latency.items()}
+        if self.model_slot is not None:
+            status['model'] = self.model_slot.get_stats()
+            status['model'].update({
+                'active_generation': self.model_active.generation if self.model_active is not None else None,
+                'swaps': self.model_swaps,
+                'swap_pause_ms': round(self.swap_pause * 1000, 3) if self.swap_pause is not None else None
+            })
+        if self.inference_worker is not None:
+            worker = self.inference_worker.get_stats()
+            status['inference'].update({
+                'queue_depth': worker['queue_depth'],
+                'deadline_ms': worker['deadline_ms']
+            })
+        return status
+
+    def close(self):
+        # Kaldirilan cihazin tahminleyicisi model slotundan cikar; yeni
+        # surumler ona yuklenmez, dogrulama pencerelerine katilmaz
+        if self.model_slot is not None:
+            self.model_slot.unregister(self)
+            self.model_slot = None
 
     def clear(self):
-        self.window = []
+        if self.features is not None:
+            self.features.clear()
+        self.recent.clear()
+        self.validation.clear()
         self.rule_predictor.clear_history()
         self.total_predictions = 0
         self.warnings_given = 0
+        with self.ml_lock:
+            self.ml_completed = 0
+            self.ml_dropped = 0
+            self.ml_latency = LatencyWindow()
+            self.last_probability = None
+        for histogram in self.stage_latency.values():
+            histogram.clear()
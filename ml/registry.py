@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import shutil
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.forest import file_digest, packed_path
+
+MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model.pkl')
+# Her egitim ciktisi models/v0001/ gibi ayri bir dizinde saklanir
+REGISTRY_DIR = os.environ.get('RSSI_MODEL_REGISTRY',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+META_FILE = 'meta.json'
+
+
+def _replace(source, target):
+    # Ayni dizinde gecici kopya + os.replace: izleyen tahminleyici yarim
+    # yazilmis dosya gormez
+    temp = target + '.tmp'
+    shutil.copyfile(source, temp)
+    os.replace(temp, target)
+
+
+class ModelRegistry:
+
+    # Surumlu model dizini. Aktif model her zaman model.pkl (+ model.npz)
+    # dosyasidir; activate() bir surumu bu dosyalarin yerine yazar, calisan
+    # tahminleyiciler dosya degisikligini izleyerek yeni modele gecer.
+
+    def __init__(self, directory=REGISTRY_DIR, model_path=MODEL_FILE):
+        self.directory = directory
+        self.model_path = model_path
+
+    def versions(self):
+        if not os.path.isdir(self.directory):
+            return []
+
+        versions = []
+        for name in sorted(os.listdir(self.directory)):
+            try:
+                with open(os.path.join(self.directory, name, META_FILE)) as f:
+                    versions.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return versions
+
+    def active_version(self):
+        if not os.path.exists(self.model_path):
+            return None
+
+        digest = file_digest(self.model_path)
+        for meta in reversed(self.versions()):
+            if meta['digest'] == digest:
+                return meta['version']
+        return None
+
+    def publish(self, note=''):
+        # Aktif model dosyalarini yeni bir surum olarak kaydeder
+        versions = self.versions()
+        version = versions[-1]['version'] + 1 if versions else 1
+        directory = os.path.join(self.directory, 'v{:04d}'.format(version))
+        os.makedirs(directory)
+
+        files = [self.model_path]
+        if os.path.exists(packed_path(self.model_path)):
+            files.append(packed_path(self.model_path))
+        for path in files:
+            shutil.copyfile(path, os.path.join(directory, os.path.basename(path)))
+
+        meta = {
+            'version': version,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'digest': file_digest(self.model_path),
+            'files': [os.path.basename(path) for path in files],
+            'note': note
+        }
+        with open(os.path.join(directory, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+    def activate(self, version):
+        directory = os.path.join(self.directory, 'v{:04d}'.format(version))
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+
+        # Paketli model once yazilir; model.pkl degistiginde yanindaki npz
+        # ayni surumun ozetini tasir
+        packed = packed_path(self.model_path)
+        if os.path.basename(packed) in meta['files']:
+            _replace(os.path.join(directory, os.path.basename(packed)), packed)
+        elif os.path.exists(packed):
+            os.remove(packed)
+        _replace(os.path.join(directory, os.path.basename(self.model_path)), self.model_path)
+        return meta
+
+    def rollback(self):
+        # Aktif surumden bir onceki surume doner
+        versions = [meta['version'] for meta in self.versions()]
+        active = self.active_version()
+        older = [version for version in versions if active is None or version < active]
+        if not older:
+            raise ValueError('Geri donulecek onceki surum yok')
+        return self.activate(older[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Surumlu model kaydi')
+    parser.add_argument('--activate', type=int, metavar='SURUM', help='Surumu aktif model yap')
+    parser.add_argument('--rollback', action='store_true', help='Bir onceki surume don')
+    parser.add_argument('--publish', action='store_true', help='Aktif modeli yeni surum olarak kaydet')
+    parser.add_argument('--note', default='', help='--publish icin aciklama')
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    try:
+        if args.publish:
+            meta = registry.publish(note=args.note)
+            print('Kaydedildi: v{}'.format(meta['version']))
+        elif args.rollback:
+            meta = registry.rollback()
+            print('Aktif model: v{} ({})'.format(meta['version'], meta['created']))
+        elif args.activate is not None:
+            meta = registry.activate(args.activate)
+            print('Aktif model: v{} ({})'.format(meta['version'], meta['created']))
+    except (OSError, ValueError) as e:
+        print('HATA:', e)
+        sys.exit(1)
+
+    active = registry.active_version()
+    print('\nKayit dizini:', registry.directory)
+    for meta in registry.versions():
+        print('  {} v{:<4} {}  {}'.format('*' if meta['version'] == active else ' ',
+                                         meta['version'], meta['created'], meta['note']))
+    if active is None:
+        print('  (aktif model kayitli bir surum degil)')
+
+
+if __name__ == '__main__':
+    main()
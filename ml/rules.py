@@ -1,3 +1,5 @@
+from collections import deque
+
 WARNING_LEVEL_NONE = 0
 WARNING_LEVEL_INFO = 1
 WARNING_LEVEL_CAUTION = 2
@@ -23,6 +25,55 @@ DEFAULT_THRESHOLDS = {
 }
 
 
+class _WindowSeries:
+
+    # Son `size` olcumdeki gecerli degerlerin ilk/son degeri, sayisi ve
+    # toplamlari; her olcumde tek guncelleme ile tutulur. Son `keep`
+    # olcumun gecerli degerleri ayrica saklanir: pencere sonradan
+    # buyutulunce atilmis degerler buradan geri gelir.
+
+    def __init__(self, size, keep=0):
+        self.size = size
+        self.keep = max(size, keep)
+        self.values = deque()
+        self.history = deque()
+        self.total = 0
+        self.total_sq = 0
+
+    def update(self, seq, value):
+        while self.values and self.values[0][0] <= seq - self.size:
+            old = self.values.popleft()[1]
+            self.total -= old
+            self.total_sq -= old * old
+        while self.history and self.history[0][0] <= seq - self.keep:
+            self.history.popleft()
+
+        if value is not None:
+            self.values.append((seq, value))
+            self.history.append((seq, value))
+            self.total += value
+            self.total_sq += value * value
+
+    def resized(self, size, seq):
+        # seq: son olcumun sira numarasi; pencere ona gore kesilir
+        series = _WindowSeries(size, self.keep)
+        for item_seq, value in self.history:
+            series.update(item_seq, value)
+        series.update(seq, None)
+        return series
+
+    def count(self):
+        return len(self.values)
+
+    def delta(self):
+        return self.values[-1][1] - self.values[0][1]
+
+    def std(self):
+        n = len(self.values)
+        variance = (n * self.total_sq - self.total * self.total) / (n * n)
+        return variance ** 0.5 if variance > 0 else 0.0
+
+
 class RuleBasedPredictor:
 
     def __init__(self, thresholds=None):
@@ -30,87 +81,56 @@ class RuleBasedPredictor:
         if thresholds:
             self.thresholds.update(thresholds)
 
-        self.history = []
         self.max_history = 20
+        self.clear_history()
+
+    def _check_window_size(self):
+        if self.thresholds['window_size'] != self.window_size:
+            self._resize_windows(self.thresholds['window_size'])
 
     def add_measurement(self, rssi, rtt, latency, quality_score):
-        self.history.append({
-            'rssi': rssi,
-            'rtt': rtt,
-            'latency': latency,
-            'quality_score': quality_score
-        })
+        self._check_window_size()
 
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
+        seq = self.measurement_seq
+        self.measurement_seq += 1
 
-    def get_rssi_trend(self):
-        window = self.thresholds['window_size']
-        if len(self.history) < window:
-            return 0
+        self.rssi_window.update(seq, rssi)
+        self.rtt_window.update(seq, rtt if rtt is not None and rtt > 0 else None)
+        self.quality_window.update(seq, quality_score)
 
-        recent = self.history[-window:]
-        rssi_values = [m['rssi'] for m in recent if m['rssi'] is not None]
+    def _window_ready(self, series):
+        # Eski gecmis listesi max_history olcumle sinirliydi
+        return min(self.measurement_seq, self.max_history) >= self.window_size and series.count() >= 2
 
-        if len(rssi_values) < 2:
+    def get_rssi_trend(self):
+        if not self._window_ready(self.rssi_window):
             return 0
 
-        trend = (rssi_values[-1] - rssi_values[0]) / (len(rssi_values) - 1)
-        return trend
+        return self.rssi_window.delta() / (self.rssi_window.count() - 1)
 
     def get_rssi_delta(self):
-        window = self.thresholds['window_size']
-        if len(self.history) < window:
-            return 0
-
-        recent = self.history[-window:]
-        rssi_values = [m['rssi'] for m in recent if m['rssi'] is not None]
-
-        if len(rssi_values) < 2:
+        if not self._window_ready(self.rssi_window):
             return 0
 
-        return rssi_values[-1] - rssi_values[0]
+        return self.rssi_window.delta()
 
     def get_rssi_std(self):
-        window = self.thresholds['window_size']
-        if len(self.history) < window:
-            return 0
-
-        recent = self.history[-window:]
-        rssi_values = [m['rssi'] for m in recent if m['rssi'] is not None]
-
-        if len(rssi_values) < 2:
+        if not self._window_ready(self.rssi_window):
             return 0
 
-        avg = sum(rssi_values) / len(rssi_values)
-        variance = sum((x - avg) ** 2 for x in rssi_values) / len(rssi_values)
-        return variance ** 0.5
+        return self.rssi_window.std()
 
     def get_quality_trend(self):
-        window = self.thresholds['window_size']
-        if len(self.history) < window:
+        if not self._window_ready(self.quality_window):
             return 0
 
-        recent = self.history[-window:]
-        quality_values = [m['quality_score'] for m in recent if m['quality_score'] is not None]
-
-        if len(quality_values) < 2:
-            return 0
-
-        return quality_values[-1] - quality_values[0]
+        return self.quality_window.delta()
 
     def get_rtt_trend(self):
-        window = self.thresholds['window_size']
-        if len(self.history) < window:
+        if not self._window_ready(self.rtt_window):
             return 0
 
-        recent = self.history[-window:]
-        rtt_values = [m['rtt'] for m in recent if m['rtt'] is not None and m['rtt'] > 0]
-
-        if len(rtt_values) < 2:
-            return 0
-
-        return rtt_values[-1] - rtt_values[0]
+        return self.rtt_window.delta()
 
     def get_quality_label(self, score):
         labels = {4: 'Mükemmel', 3: 'İyi', 2: 'Orta', 1: 'Zayıf', 0: 'Çok Zayıf'}
@@ -119,6 +139,10 @@ class RuleBasedPredictor:
     def predict(self, rssi=None, rtt=None, latency=None, quality_score=None):
         if rssi is not None:
             self.add_measurement(rssi, rtt, latency, quality_score)
+        else:
+            # RSSI'siz olcum gecmise girmez; esik degisikligi yine de hemen
+            # uygulanir (eski gecmis listesi pencereyi okurken kesiyordu)
+            self._check_window_size()
 
         messages = []
         max_level = WARNING_LEVEL_NONE
@@ -209,6 +233,126 @@ class RuleBasedPredictor:
 
         return max_level, messages
 
+    def predict_batch(self, rssi, rtt=None, latency=None, quality_score=None):
+        # Bos gecmisle baslayan bir tahminleyiciye olcumler sirayla predict()
+        # ile verilmis gibi her satirin uyari seviyesini hesaplar. Eksik
+        # degerler NaN olarak verilir; mesajlar uretilmez.
+        import numpy as np
+
+        rssi = np.asarray(rssi, dtype=float)
+        n = len(rssi)
+        rtt = np.full(n, np.nan) if rtt is None else np.asarray(rtt, dtype=float)
+        latency = np.full(n, np.nan) if latency is None else np.asarray(latency, dtype=float)
+        quality_score = np.full(n, np.nan) if quality_score is None else np.asarray(quality_score, dtype=float)
+
+        t = self.thresholds
+
+        # RSSI olmayan olcumler gecmise eklenmez; pencere istatistikleri
+        # gecmise giren satirlar uzerinde hesaplanip sonraki satirlara tasinir.
+        in_history = ~np.isnan(rssi)
+        history_rows = np.flatnonzero(in_history)
+        trend, rssi_std, rtt_trend, quality_trend = self._window_stats_batch(
+            rssi[history_rows], rtt[history_rows], quality_score[history_rows])
+
+        last_history_row = np.cumsum(in_history) - 1
+        has_history = last_history_row >= 0
+        last_history_row = np.maximum(last_history_row, 0)
+
+        def spread(values):
+            if len(values) == 0:
+                return np.zeros(n)
+            return np.where(has_history, values[last_history_row], 0)
+
+        trend = spread(trend)
+        rssi_std = spread(rssi_std)
+        rtt_trend = spread(rtt_trend)
+        quality_trend = spread(quality_trend)
+
+        # RSSI seviye kontrolleri
+        rssi_level = np.select(
+            [rssi < t['rssi_danger'], rssi < t['rssi_critical'], rssi < t['rssi_warning']],
+            [WARNING_LEVEL_CRITICAL, WARNING_LEVEL_WARNING, WARNING_LEVEL_CAUTION],
+            WARNING_LEVEL_NONE
+        )
+
+        # RSSI trend analizi
+        trend_level = np.select(
+            [trend < t['rssi_trend_critical'], trend < t['rssi_trend_warning'],
+             (trend < -1) & (rssi_level == WARNING_LEVEL_NONE)],
+            [WARNING_LEVEL_WARNING, WARNING_LEVEL_CAUTION, WARNING_LEVEL_INFO],
+            WARNING_LEVEL_NONE
+        )
+        levels = np.maximum(rssi_level, trend_level)
+
+        # Sinyal stabilitesi (standart sapma)
+        levels = np.maximum(levels, np.where(rssi_std > t['rssi_std_warning'], WARNING_LEVEL_CAUTION, WARNING_LEVEL_NONE))
+
+        # RTT kontrolleri
+        valid_rtt = rtt > 0
+        levels = np.maximum(levels, np.select(
+            [valid_rtt & (rtt > t['rtt_critical']), valid_rtt & (rtt > t['rtt_warning'])],
+            [WARNING_LEVEL_WARNING, WARNING_LEVEL_CAUTION],
+            WARNING_LEVEL_NONE
+        ))
+
+        # RTT trend analizi
+        levels = np.maximum(levels, np.where(rtt_trend > t['rtt_trend_warning'], WARNING_LEVEL_CAUTION, WARNING_LEVEL_NONE))
+
+        # Latency kontrolleri
+        valid_latency = latency > 0
+        levels = np.maximum(levels, np.select(
+            [valid_latency & (latency > t['latency_critical']), valid_latency & (latency > t['latency_warning'])],
+            [WARNING_LEVEL_WARNING, WARNING_LEVEL_CAUTION],
+            WARNING_LEVEL_NONE
+        ))
+
+        # Quality score trend analizi
+        levels = np.maximum(levels, np.select(
+            [quality_trend <= -t['quality_drop_critical'], quality_trend <= -t['quality_drop_warning']],
+            [WARNING_LEVEL_WARNING, WARNING_LEVEL_CAUTION],
+            WARNING_LEVEL_NONE
+        ))
+
+        return levels
+
+    def _window_stats_batch(self, rssi, rtt, quality_score):
+        import numpy as np
+
+        window = self.thresholds['window_size']
+        m = len(rssi)
+        if m == 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0)
+
+        index = np.arange(m)
+        start = np.maximum(index - window + 1, 0)
+        ready = np.minimum(index + 1, self.max_history) >= window
+
+        def first_last(values, valid):
+            last = np.maximum.accumulate(np.where(valid, index, -1))
+            following = np.minimum.accumulate(np.where(valid, index, m)[::-1])[::-1]
+            valid_sum = np.concatenate(([0], np.cumsum(valid)))
+            count = valid_sum[index + 1] - valid_sum[start]
+            ok = ready & (count >= 2)
+            delta = values[np.maximum(last, 0)] - values[np.minimum(following[start], m - 1)]
+            return ok, count, np.where(ok, delta, 0)
+
+        rssi_valid = ~np.isnan(rssi)
+        ok, count, delta = first_last(rssi, rssi_valid)
+        trend = np.where(ok, delta / np.maximum(count - 1, 1), 0)
+
+        values = np.where(rssi_valid, rssi, 0)
+        total = np.concatenate(([0], np.cumsum(values)))
+        total_sq = np.concatenate(([0], np.cumsum(values * values)))
+        total = total[index + 1] - total[start]
+        total_sq = total_sq[index + 1] - total_sq[start]
+        variance = (count * total_sq - total * total) / np.maximum(count * count, 1)
+        rssi_std = np.where(ok & (variance > 0), np.sqrt(np.maximum(variance, 0)), 0)
+
+        _, _, rtt_trend = first_last(rtt, rtt > 0)
+        _, _, quality_trend = first_last(quality_score, ~np.isnan(quality_score))
+
+        return trend, rssi_std, rtt_trend, quality_trend
+
     def get_warning_prefix(self, level):
         prefixes = {
             WARNING_LEVEL_NONE: '',
@@ -227,4 +371,16 @@ class RuleBasedPredictor:
         return ' '.join([prefix] + messages)
 
     def clear_history(self):
-        self.history = []
+        self.window_size = self.thresholds['window_size']
+        self.measurement_seq = 0
+        self.rssi_window = _WindowSeries(self.window_size, self.max_history)
+        self.rtt_window = _WindowSeries(self.window_size, self.max_history)
+        self.quality_window = _WindowSeries(self.window_size, self.max_history)
+
+    def _resize_windows(self, size):
+        # thresholds['window_size'] sonradan degisti: pencereler son
+        # max_history olcumden yeni boyuta gore yeniden kurulur. Eski gecmis
+        # listesi gibi max_history'e kadar buyutmede pencere hemen dolu olur.
+        self.window_size = size
+        for name in ('rssi_window', 'rtt_window', 'quality_window'):
+            setattr(self, name, getattr(self, name).resized(size, self.measurement_seq - 1))
@@ -0,0 +1,171 @@
+from bisect import bisect_left
+
+# Gecikme histogrami kova ust sinirlari (s); 5 us ile 1 s arasi
+LATENCY_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class OnlineStats:
+
+    # Oturum boyunca degerleri saklamadan min/max/ortalama/std/medyan verir.
+    # Ortalama ve varyans Welford yontemiyle guncellenir. Medyan, farkli
+    # degerlerin sayaclari uzerinde tutulan bir isaretci ile hesaplanir;
+    # bellek olcum sayisiyla degil farkli deger sayisiyla (RSSI/RTT tamsayi
+    # oldugu icin sinirli) buyur.
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+        self.keys = []
+        self.counts = {}
+        # keys[mid] (n-1)//2. siradaki degeri tutar; below ondan kucuk deger sayisi
+        self.mid = 0
+        self.below = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        self._add_to_median(value)
+
+    def _add_to_median(self, value):
+        if value in self.counts:
+            self.counts[value] += 1
+        else:
+            position = bisect_left(self.keys, value)
+            self.keys.insert(position, value)
+            self.counts[value] = 1
+            if self.count > 1 and position <= self.mid:
+                self.mid += 1
+
+        if self.count == 1:
+            self.mid = 0
+            self.below = 0
+            return
+
+        if value < self.keys[self.mid]:
+            self.below += 1
+
+        # Her eklemede hedef sira en fazla bir adim kayar
+        rank = (self.count - 1) // 2
+        while self.below > rank:
+            self.mid -= 1
+            self.below -= self.counts[self.keys[self.mid]]
+        while self.below + self.counts[self.keys[self.mid]] <= rank:
+            self.below += self.counts[self.keys[self.mid]]
+            self.mid += 1
+
+    def median(self):
+        if self.count == 0:
+            return 0
+
+        lower = self.keys[self.mid]
+        if self.count % 2 == 1:
+            return lower
+
+        if self.below + self.counts[lower] > self.count // 2:
+            upper = lower
+        else:
+            upper = self.keys[self.mid + 1]
+        return (lower + upper) / 2
+
+    def variance(self):
+        return self.m2 / self.count if self.count else 0
+
+    def summary(self):
+        if self.count == 0:
+            return {'min': 0, 'max': 0, 'avg': 0, 'std': 0, 'median': 0}
+
+        return {
+            'min': self.min,
+            'max': self.max,
+            'avg': self.mean,
+            'std': max(self.variance(), 0) ** 0.5,
+            'median': self.median()
+        }
+
+
+class LatencyHistogram:
+
+    # Sabit kovali gecikme histogrami (Prometheus 'le' anlaminda: her kova
+    # sinirina esit ve kucuk degerleri sayar, son kova +Inf). observe()
+    # yalnizca kovayi bulup sayac ve toplami artirir; bellek ve sure olcum
+    # sayisindan bagimsizdir. Her histogramin tek bir yazici thread'i
+    # vardir; okuyucular kilitsiz kopya alir.
+
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.clear()
+
+    def clear(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def merge(self, other):
+        for i, n in enumerate(list(other.counts)):
+            self.counts[i] += n
+        self.sum += other.sum
+
+    def cumulative(self):
+        # (ust sinir, o sinira kadar toplam) ciftleri; son sinir inf
+        total = 0
+        result = []
+        for bound, n in zip(self.buckets + (float('inf'),), list(self.counts)):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q, counts=None):
+        # Kova icinde dogrusal yaklasim (histogram_quantile gibi); +Inf
+        # kovasina dusen yuzdelik son sinir olarak doner
+        counts = list(self.counts) if counts is None else counts
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets, counts):
+            if n and seen + n >= rank:
+                return lower + (bound - lower) * (rank - seen) / n
+            seen += n
+            lower = bound
+        return self.buckets[-1]
+
+    def summary(self):
+        counts = list(self.counts)
+        count = sum(counts)
+        p50, p99 = self.quantile(0.5, counts), self.quantile(0.99, counts)
+        return {
+            'count': count,
+            'avg_ms': round(self.sum / count * 1000, 4) if count else None,
+            'p50_ms': round(p50 * 1000, 4) if p50 is not None else None,
+            'p99_ms': round(p99 * 1000, 4) if p99 is not None else None
+        }
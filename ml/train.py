@@ -2,48 +2,93 @@
 
 import os
 import sys
-import pandas as pd
+import time
+import shutil
+import argparse
+from contextlib import contextmanager
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split, StratifiedKFold, TimeSeriesSplit
+from sklearn.metrics import classification_report, confusion_matrix, f1_score
 import joblib
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ml.features import create_training_data, FEATURE_NAMES
+from ml.features import FEATURE_NAMES
+from ml.feature_cache import FeatureCache
+from ml.forest import export_forest, packed_path, verification_inputs
+from ml.registry import ModelRegistry
+from storage import STORAGE_BACKENDS
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'rssi_data.csv')
+COLUMNAR_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'columnar')
+# Oturum basina hesaplanmis ozellikler; yalnizca yeni veri gelen oturumlar yeniden hesaplanir
+FEATURE_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'feature_cache')
 MODEL_FILE = os.path.join(os.path.dirname(__file__), 'model.pkl')
+PACKED_MODEL_FILE = packed_path(MODEL_FILE)
 WINDOW_SIZE = 10
 PREDICTION_HORIZON = 5
 MIN_SAMPLES = 100
+CV_FOLDS = 5
+TEST_SIZE = 0.2
+# Paralel egitim/CV is sayisi; -1 tum cekirdekler
+TRAIN_JOBS = int(os.environ.get('RSSI_TRAIN_JOBS', '-1'))
 
 
-def load_data():
-    if not os.path.exists(DATA_FILE):
+class StageTimer:
+
+    # Egitim asamalarinin sureleri; her asama bitince yazdirilir, sonda ozet
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.stages.append((name, elapsed))
+        print('  [{}: {:.2f} s]'.format(name, elapsed))
+
+    def print_summary(self):
+        total = sum(elapsed for _, elapsed in self.stages)
+        print('\nAsama sureleri:')
+        for name, elapsed in self.stages:
+            print('  {:28s} {:7.2f} s  {:5.1f}%'.format(name, elapsed, 100 * elapsed / total if total else 0))
+        print('  {:28s} {:7.2f} s'.format('Toplam', total))
+
+
+def load_data(rebuild=False):
+    # Veri oturum basina ozellik onbellegi uzerinden okunur
+    if rebuild and os.path.isdir(FEATURE_CACHE_DIR):
+        shutil.rmtree(FEATURE_CACHE_DIR)
+    cache = FeatureCache(FEATURE_CACHE_DIR, WINDOW_SIZE, PREDICTION_HORIZON)
+
+    if 'columnar' in STORAGE_BACKENDS.split(',') and os.path.isdir(COLUMNAR_DIR):
+        print('Kolonlu veri okunuyor (memmap):', COLUMNAR_DIR)
+        cache.update_from_columnar(COLUMNAR_DIR)
+    elif not os.path.exists(DATA_FILE):
         print('HATA: Veri dosyasi bulunamadi:', DATA_FILE)
         print('Once veri toplayin (pc/main.py calistirin)')
         sys.exit(1)
+    else:
+        cache.update_from_csv(DATA_FILE)
 
-    df = pd.read_csv(DATA_FILE)
-    print('Veri yuklendi: {} satir'.format(len(df)))
-
-    data_count = len(df[df['event_type'] == 'DATA'])
-    disconnect_count = len(df[df['event_type'] == 'DISCONNECTED'])
-    packet_loss_count = len(df[df['event_type'] == 'PACKET_LOST'])
+    stats = cache.stats
+    print('Ozellik onbellegi: {} oturum, {} yeniden hesaplandi ({} artimli), {} onbellekten{}'.format(
+        stats['sessions'], stats['computed'], stats['appended'], stats['reused'],
+        ' (bastan kuruldu)' if stats['rebuilt'] else ''))
+    print('  Okunan yeni satir: {}'.format(stats['rows_read']))
 
+    data_count, problem_count = cache.counts()
     print('\nVeri Istatistikleri:')
     print('  DATA olcumleri:', data_count)
-    print('  DISCONNECTED eventi:', disconnect_count)
-    print('  PACKET_LOST eventi:', packet_loss_count)
-
-    return df, data_count, disconnect_count, packet_loss_count
+    print('  Problem eventi (DISCONNECTED + PACKET_LOST):', problem_count)
 
+    return cache, data_count, problem_count
 
-def check_data_quality(data_count, disconnect_count, packet_loss_count):
-    total_problems = disconnect_count + packet_loss_count
 
+def check_data_quality(data_count, problem_count):
     if data_count < MIN_SAMPLES:
         print('\nUYARI: Yetersiz veri!')
         print('  Mevcut: {} olcum'.format(data_count))
@@ -51,9 +96,9 @@ def check_data_quality(data_count, disconnect_count, packet_loss_count):
         print('\nDaha fazla veri toplayin.')
         return False
 
-    if total_problems < 10:
+    if problem_count < 10:
         print('\nUYARI: Yetersiz problem ornegi!')
-        print('  Mevcut: {} problem (DISCONNECTED + PACKET_LOST)'.format(total_problems))
+        print('  Mevcut: {} problem (DISCONNECTED + PACKET_LOST)'.format(problem_count))
         print('  Onerilen: En az 10 problem')
         print('\nFarkli kosullarda daha fazla veri toplayin.')
         return False
@@ -61,24 +106,8 @@ def check_data_quality(data_count, disconnect_count, packet_loss_count):
     return True
 
 
-def train_model(X, y):
-    print('\n' + '='*50)
-    print('MODEL EGITIMI')
-    print('='*50)
-
-    print('\nVeri boyutu: {} ornek, {} ozellik'.format(X.shape[0], X.shape[1]))
-    print('Sinif dagilimi:')
-    print('  Normal (0): {}'.format(np.sum(y == 0)))
-    print('  Problem (1): {}'.format(np.sum(y == 1)))
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y if np.sum(y) > 1 else None
-    )
-
-    print('\nEgitim seti: {} ornek'.format(len(X_train)))
-    print('Test seti: {} ornek'.format(len(X_test)))
-
-    model = RandomForestClassifier(
+def make_model():
+    return RandomForestClassifier(
         n_estimators=100,
         max_depth=10,
         min_samples_split=5,
@@ -87,54 +116,161 @@ def train_model(X, y):
         class_weight='balanced'
     )
 
-    print('\nModel egitiliyor...')
-    model.fit(X_train, y_train)
-
-    print('\n' + '-'*50)
-    print('DEGERLENDIRME')
-    print('-'*50)
 
-    y_pred = model.predict(X_test)
-    print('\nSiniflandirma Raporu:')
-    print(classification_report(y_test, y_pred, target_names=['Normal', 'Problem']))
+def make_splits(y, groups, split):
+    # (egitim, test) indeksleri ve CV katlari. 'session': oturumlar baslangic
+    # zamanina gore siralanir; test son oturumlardir, CV katlari yalnizca
+    # egitim oturumlari uzerinde ileri zincirlemedir (her kat yalnizca
+    # kendinden onceki oturumlarla egitilir, test oturumlari hic gorulmez).
+    # 'random': eski davranis, karisik bolme ve katmanli CV.
+    sessions = np.unique(groups)
+    test_count = max(1, int(round(len(sessions) * TEST_SIZE)))
+    if split == 'session' and len(sessions) - test_count < CV_FOLDS + 1:
+        print('UYARI: {} oturum zaman sirali bolme icin az, rastgele bolmeye geciliyor'.format(len(sessions)))
+        split = 'random'
+
+    if split == 'session':
+        train_sessions, test_sessions = sessions[:-test_count], sessions[-test_count:]
+        is_test = np.isin(groups, test_sessions)
+        train, test = np.flatnonzero(~is_test), np.flatnonzero(is_test)
+        folds = [(np.flatnonzero(np.isin(groups, train_sessions[fold_train])),
+                  np.flatnonzero(np.isin(groups, train_sessions[fold_test])))
+                 for fold_train, fold_test in TimeSeriesSplit(n_splits=CV_FOLDS).split(train_sessions)]
+        print('Bolme: oturum bazli, zaman sirali ({} egitim / {} test oturumu)'.format(
+            len(train_sessions), len(test_sessions)))
+    else:
+        train, test = train_test_split(
+            np.arange(len(y)), test_size=TEST_SIZE, random_state=42, stratify=y if np.sum(y) > 1 else None
+        )
+        folds = list(StratifiedKFold(n_splits=CV_FOLDS).split(np.zeros(len(y)), y))
+        print('Bolme: rastgele, katmanli CV')
+
+    return train, test, folds
+
+
+def _fit(X, y, train, test=None):
+    # Tek agac ormani (n_jobs=1); paralellik katlar arasindadir
+    model = make_model()
+    model.fit(X[train], y[train])
+    if test is None:
+        return model
+    return f1_score(y[test], model.predict(X[test]), zero_division=0)
+
+
+def train_model(X, y, groups, split='session', jobs=TRAIN_JOBS, timer=None):
+    timer = timer or StageTimer()
 
-    print('\nKarisiklik Matrisi:')
-    cm = confusion_matrix(y_test, y_pred)
-    print('                 Tahmin')
-    print('               Normal  Problem')
-    print('Gercek Normal    {:4d}     {:4d}'.format(cm[0][0], cm[0][1]))
-    print('       Problem   {:4d}     {:4d}'.format(cm[1][0], cm[1][1]))
+    print('\n' + '='*50)
+    print('MODEL EGITIMI')
+    print('='*50)
 
-    print('\n5-Fold Cross Validation:')
-    cv_scores = cross_val_score(model, X, y, cv=5, scoring='f1')
-    print('  F1 Skorlari:', ['{:.3f}'.format(s) for s in cv_scores])
-    print('  Ortalama F1: {:.3f} (+/- {:.3f})'.format(cv_scores.mean(), cv_scores.std() * 2))
+    print('\nVeri boyutu: {} ornek, {} ozellik, {} oturum'.format(X.shape[0], X.shape[1], len(np.unique(groups))))
+    print('Sinif dagilimi:')
+    print('  Normal (0): {}'.format(np.sum(y == 0)))
+    print('  Problem (1): {}'.format(np.sum(y == 1)))
 
-    print('\nOzellik Onemleri:')
-    importances = sorted(zip(FEATURE_NAMES, model.feature_importances_),
-                        key=lambda x: x[1], reverse=True)
-    for name, importance in importances:
-        bar = '#' * int(importance * 50)
-        print('  {:15s} {:.3f} {}'.format(name, importance, bar))
+    with timer.stage('Bolme'):
+        train, test, folds = make_splits(y, groups, split)
+
+    print('\nEgitim seti: {} ornek'.format(len(train)))
+    print('Test seti: {} ornek'.format(len(test)))
+
+    # Son model ve CV katlari ayni anda egitilir. Agac egitimi GIL'i
+    # biraktigi icin thread'ler yeterli; veri kopyalanmaz.
+    print('\nModel ve {} CV katmani egitiliyor (n_jobs={})...'.format(len(folds), jobs))
+    with timer.stage('Egitim + CV (paralel)'):
+        results = joblib.Parallel(n_jobs=jobs, prefer='threads')(
+            [joblib.delayed(_fit)(X, y, train)] +
+            [joblib.delayed(_fit)(X, y, fold_train, fold_test) for fold_train, fold_test in folds]
+        )
+    model, cv_scores = results[0], np.array(results[1:])
+
+    with timer.stage('Degerlendirme'):
+        print('\n' + '-'*50)
+        print('DEGERLENDIRME')
+        print('-'*50)
+
+        y_pred = model.predict(X[test])
+        print('\nSiniflandirma Raporu:')
+        print(classification_report(y[test], y_pred, labels=[0, 1], target_names=['Normal', 'Problem'],
+                                    zero_division=0))
+
+        print('\nKarisiklik Matrisi:')
+        cm = confusion_matrix(y[test], y_pred, labels=[0, 1])
+        print('                 Tahmin')
+        print('               Normal  Problem')
+        print('Gercek Normal    {:4d}     {:4d}'.format(cm[0][0], cm[0][1]))
+        print('       Problem   {:4d}     {:4d}'.format(cm[1][0], cm[1][1]))
+
+        print('\n{}-Fold Cross Validation:'.format(len(folds)))
+        print('  F1 Skorlari:', ['{:.3f}'.format(s) for s in cv_scores])
+        print('  Ortalama F1: {:.3f} (+/- {:.3f})'.format(cv_scores.mean(), cv_scores.std() * 2))
+
+        print('\nOzellik Onemleri:')
+        importances = sorted(zip(FEATURE_NAMES, model.feature_importances_),
+                            key=lambda x: x[1], reverse=True)
+        for name, importance in importances:
+            bar = '#' * int(importance * 50)
+            print('  {:15s} {:.3f} {}'.format(name, importance, bar))
 
     return model
 
 
-def save_model(model):
-    joblib.dump(model, MODEL_FILE)
+def save_model(model, X):
+    # Model once gecici dosyaya yazilir ve paketli model bu dosyanin ozetiyle
+    # olusturulur; model.pkl en son tek adimda degisir. Calisan web sunucusu
+    # yarim yazilmis ya da eslesmeyen dosya gormeden yeni modele gecer.
+    temp = MODEL_FILE + '.tmp'
+    joblib.dump(model, temp)
+    export_packed_model(model, X, temp)
+    os.replace(temp, MODEL_FILE)
     print('\n' + '='*50)
     print('Model kaydedildi:', MODEL_FILE)
+
+    meta = ModelRegistry().publish(note='train.py, {} ornek'.format(len(X)))
+    print('Model kaydina eklendi: v{}'.format(meta['version']))
     print('='*50)
 
 
+def export_packed_model(model, X, source_path=MODEL_FILE):
+    # Izleme tarafi (web, pc) icin sklearn gerektirmeyen paketli orman
+    print('\nPaketli model olusturuluyor...')
+    try:
+        forest = export_forest(model, PACKED_MODEL_FILE, source_path=source_path)
+    except ValueError as e:
+        print('  Atlandi:', e)
+        return
+
+    samples = np.vstack([X, verification_inputs(forest)])
+    if not np.array_equal(forest.predict_proba(samples), model.predict_proba(samples)):
+        os.remove(PACKED_MODEL_FILE)
+        print('  HATA: Olasiliklar sklearn ile ayni degil, paketli model silindi')
+        return
+
+    print('  {} agac, derinlik {}, {:.0f} KB'.format(
+        forest.n_estimators, forest.depth, os.path.getsize(PACKED_MODEL_FILE) / 1024))
+    print('  {} ornekte sklearn ile ayni olasiliklar'.format(len(samples)))
+    print('Paketli model kaydedildi:', PACKED_MODEL_FILE)
+
+
 def main():
+    parser = argparse.ArgumentParser(description='RSSI/RTT baglanti tahmini model egitimi')
+    parser.add_argument('--split', choices=['session', 'random'], default='session',
+                        help='Test/CV bolmesi: zaman sirali oturumlar ya da rastgele')
+    parser.add_argument('--jobs', type=int, default=TRAIN_JOBS, help='Paralel is sayisi (-1: tum cekirdekler)')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Ozellik onbellegini bastan kur')
+    args = parser.parse_args()
+
     print('='*50)
     print('  RSSI/RTT Baglanti Tahmini - ML Egitimi')
     print('='*50)
 
-    df, data_count, disconnect_count, packet_loss_count = load_data()
+    timer = StageTimer()
 
-    if not check_data_quality(data_count, disconnect_count, packet_loss_count):
+    with timer.stage('Veri + ozellikler'):
+        cache, data_count, problem_count = load_data(rebuild=args.rebuild_cache)
+
+    if not check_data_quality(data_count, problem_count):
         print('\nEgitim iptal edildi.')
         sys.exit(1)
 
@@ -142,7 +278,8 @@ def main():
     print('  Pencere boyutu: {}'.format(WINDOW_SIZE))
     print('  Tahmin ufku: {} olcum'.format(PREDICTION_HORIZON))
 
-    X, y = create_training_data(df, window_size=WINDOW_SIZE, prediction_horizon=PREDICTION_HORIZON)
+    with timer.stage('Egitim verisi birlestirme'):
+        X, y, groups = cache.dataset()
 
     if len(X) < MIN_SAMPLES:
         print('\nHATA: Yeterli egitim ornegi olusturulamadi.')
@@ -150,9 +287,12 @@ def main():
         print('  Gerekli: {} ornek'.format(MIN_SAMPLES))
         sys.exit(1)
 
-    model = train_model(X, y)
+    model = train_model(X, y, groups, split=args.split, jobs=args.jobs, timer=timer)
+
+    with timer.stage('Kaydetme'):
+        save_model(model, X)
 
-    save_model(model)
+    timer.print_summary()
 
     print('\nEgitim tamamlandi!')
     print('Simdi pc/main.py calistirarak ML tahminlerini gorebilirsiniz.')
@@ -1,21 +1,25 @@
 import socket
 import sys
 import time
-import csv
 import os
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ml.predictor import ConnectionPredictor
+from ml.stats import OnlineStats
+from protocol import ApClock, StreamDecoder, Measurement, Status, Overflow, FORMAT_REQUEST, REQUEST_BINARY
+from storage import open_store
 
 AP_IP = '192.168.4.1'
 AP_PORT = 12346
 
+# Birden fazla istemci varsa izlenecek cihaz; bos ise ilk gorulen cihaz izlenir
+DEVICE_ID = os.environ.get('DEVICE_ID')
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
 CSV_FILE = os.path.join(DATA_DIR, 'rssi_data.csv')
-CSV_HEADERS = ['session_id', 'timestamp', 'unix_time', 'measurement_id', 'event_type',
-               'rssi', 'rtt', 'latency', 'quality', 'quality_score', 'disconnect_duration']
+COLUMNAR_DIR = os.path.join(DATA_DIR, 'columnar')
 
 ML_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml', 'model.pkl')
 
@@ -61,9 +65,10 @@ class SessionStatistics:
 
     def __init__(self):
         self.start_time = time.time()
-        self.rssi_values = []
-        self.rtt_values = []
-        self.latency_values = []
+        self.rssi_stats = OnlineStats()
+        self.rtt_stats = OnlineStats()
+        self.latency_stats = OnlineStats()
+        self.rssi_ranges = {'< -80': 0, '-80 ile -70': 0, '-70 ile -60': 0, '-60 ile -50': 0, '>= -50': 0}
         self.quality_counts = {
             'Mukemmel': 0,
             'Iyi': 0,
@@ -75,6 +80,7 @@ class SessionStatistics:
         self.lost_packets = 0
         self.disconnects = 0
         self.disconnect_durations = []
+        self.ap_overflows = 0
         self.warnings_by_level = {
             'DIKKAT': 0,
             'UYARI': 0,
@@ -82,9 +88,19 @@ class SessionStatistics:
         }
 
     def add_measurement(self, rssi, rtt, latency, quality):
-        self.rssi_values.append(rssi)
-        self.rtt_values.append(rtt)
-        self.latency_values.append(latency)
+        self.rssi_stats.add(rssi)
+        self.rtt_stats.add(rtt)
+        self.latency_stats.add(latency)
+        if rssi < -80:
+            self.rssi_ranges['< -80'] += 1
+        elif rssi < -70:
+            self.rssi_ranges['-80 ile -70'] += 1
+        elif rssi < -60:
+            self.rssi_ranges['-70 ile -60'] += 1
+        elif rssi < -50:
+            self.rssi_ranges['-60 ile -50'] += 1
+        else:
+            self.rssi_ranges['>= -50'] += 1
         self.quality_counts[quality] = self.quality_counts.get(quality, 0) + 1
         self.total_measurements += 1
 
@@ -120,24 +136,8 @@ class SessionStatistics:
         else:
             return '{}sn'.format(seconds)
 
-    def calculate_stats(self, values):
-        if not values:
-            return {'min': 0, 'max': 0, 'avg': 0, 'std': 0, 'median': 0}
-
-        n = len(values)
-        sorted_vals = sorted(values)
-        avg = sum(values) / n
-        variance = sum((x - avg) ** 2 for x in values) / n
-        std = variance ** 0.5
-        median = sorted_vals[n // 2] if n % 2 == 1 else (sorted_vals[n // 2 - 1] + sorted_vals[n // 2]) / 2
-
-        return {
-            'min': min(values),
-            'max': max(values),
-            'avg': avg,
-            'std': std,
-            'median': median
-        }
+    def calculate_stats(self, stats):
+        return stats.summary()
 
     def print_summary(self, csv_file_path, records_written, predictor_status):
         duration = self.get_duration()
@@ -154,44 +154,32 @@ class SessionStatistics:
             rate = self.total_measurements / duration * 60
             print('  Olcum hizi:           {:.1f} olcum/dakika'.format(rate))
 
-        if self.rssi_values:
+        if self.rssi_stats:
             print('\n--- RSSI ISTATISTIKLERI (dBm) ---')
-            rssi_stats = self.calculate_stats(self.rssi_values)
+            rssi_stats = self.calculate_stats(self.rssi_stats)
             print('  Minimum:              {} dBm'.format(rssi_stats['min']))
             print('  Maksimum:             {} dBm'.format(rssi_stats['max']))
             print('  Ortalama:             {:.1f} dBm'.format(rssi_stats['avg']))
             print('  Medyan:               {:.1f} dBm'.format(rssi_stats['median']))
             print('  Standart Sapma:       {:.2f} dBm'.format(rssi_stats['std']))
-            ranges = {'< -80': 0, '-80 ile -70': 0, '-70 ile -60': 0, '-60 ile -50': 0, '>= -50': 0}
-            for r in self.rssi_values:
-                if r < -80:
-                    ranges['< -80'] += 1
-                elif r < -70:
-                    ranges['-80 ile -70'] += 1
-                elif r < -60:
-                    ranges['-70 ile -60'] += 1
-                elif r < -50:
-                    ranges['-60 ile -50'] += 1
-                else:
-                    ranges['>= -50'] += 1
             print('  Aralik Dagilimi:')
-            for rng, cnt in ranges.items():
-                pct = (cnt / len(self.rssi_values) * 100) if self.rssi_values else 0
+            for rng, cnt in self.rssi_ranges.items():
+                pct = (cnt / len(self.rssi_stats) * 100) if self.rssi_stats else 0
                 bar = '#' * int(pct / 5)
                 print('    {:15s}  {:4d} ({:5.1f}%) {}'.format(rng, cnt, pct, bar))
 
-        if self.rtt_values:
+        if self.rtt_stats:
             print('\n--- RTT ISTATISTIKLERI (ms) ---')
-            rtt_stats = self.calculate_stats(self.rtt_values)
+            rtt_stats = self.calculate_stats(self.rtt_stats)
             print('  Minimum:              {} ms'.format(rtt_stats['min']))
             print('  Maksimum:             {} ms'.format(rtt_stats['max']))
             print('  Ortalama:             {:.1f} ms'.format(rtt_stats['avg']))
             print('  Medyan:               {:.1f} ms'.format(rtt_stats['median']))
             print('  Standart Sapma:       {:.2f} ms'.format(rtt_stats['std']))
 
-        if self.latency_values:
+        if self.latency_stats:
             print('\n--- GECIKME (LATENCY) ISTATISTIKLERI (ms) ---')
-            lat_stats = self.calculate_stats(self.latency_values)
+            lat_stats = self.calculate_stats(self.latency_stats)
             print('  Minimum:              {} ms'.format(lat_stats['min']))
             print('  Maksimum:             {} ms'.format(lat_stats['max']))
             print('  Ortalama:             {:.1f} ms'.format(lat_stats['avg']))
@@ -216,6 +204,8 @@ class SessionStatistics:
             avg_disc = sum(self.disconnect_durations) / len(self.disconnect_durations)
             print('  Ort. kopma suresi:    {:.1f} saniye'.format(avg_disc))
             print('  Toplam kopma suresi:  {:.1f} saniye'.format(sum(self.disconnect_durations)))
+        if self.ap_overflows:
+            print('  AP tampon tasmasi:    {} olcum'.format(self.ap_overflows))
 
         total_warnings = sum(self.warnings_by_level.values())
         if total_warnings > 0:
@@ -237,50 +227,31 @@ class SessionStatistics:
         print('\n' + '=' * 70)
 
 
-def init_csv_file():
+def init_store():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
         print('Veri klasoru olusturuldu:', DATA_DIR)
 
     file_exists = os.path.exists(CSV_FILE)
 
-    csv_file = open(CSV_FILE, 'a', newline='', encoding='utf-8')
-    csv_writer = csv.writer(csv_file)
+    store = open_store(csv_file=CSV_FILE, columnar_dir=COLUMNAR_DIR)
 
-    if not file_exists:
-        csv_writer.writerow(CSV_HEADERS)
-        csv_file.flush()
+    if not file_exists and os.path.exists(CSV_FILE):
         print('CSV dosyasi olusturuldu:', CSV_FILE)
-    else:
+    elif file_exists:
         print('CSV dosyasina ekleniyor:', CSV_FILE)
 
-    return csv_file, csv_writer
-
+    return store
 
-def write_data_row(csv_writer, csv_file, session_id, measurement_id, event_type,
-                   rssi=None, rtt=None, latency=None, quality=None, disconnect_duration=None):
-    now = datetime.now()
-    timestamp = now.isoformat(timespec='milliseconds')
-    unix_time = time.time()
 
-    quality_score = get_quality_score(quality) if quality else ''
+def write_data_row(store, session_id, measurement_id, event_type,
+                   rssi=None, rtt=None, latency=None, quality=None, disconnect_duration=None,
+                   unix_time=None):
+    quality_score = get_quality_score(quality) if quality else None
 
-    row = [
-        session_id,
-        timestamp,
-        unix_time,
-        measurement_id if measurement_id else '',
-        event_type,
-        rssi if rssi is not None else '',
-        rtt if rtt is not None else '',
-        latency if latency is not None else '',
-        quality if quality else '',
-        quality_score if quality_score != -1 else '',
-        disconnect_duration if disconnect_duration is not None else ''
-    ]
-
-    csv_writer.writerow(row)
-    csv_file.flush()
+    store.append(session_id, time.time() if unix_time is None else unix_time, measurement_id, event_type,
+                 rssi=rssi, rtt=rtt, latency=latency, quality=quality,
+                 quality_score=quality_score, disconnect_duration=disconnect_duration)
 
 
 def main():
@@ -294,13 +265,14 @@ def main():
     print()
 
     session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-    csv_file, csv_writer = init_csv_file()
+    store = init_store()
     records_written = 0
     print('Oturum ID:', session_id)
 
     stats = SessionStatistics()
 
-    predictor = ConnectionPredictor(model_path=ML_MODEL_PATH)
+    # Model arka planda yuklenir; hazir olana kadar kural tabanli tahmin
+    predictor = ConnectionPredictor(model_path=ML_MODEL_PATH, background=True)
     status = predictor.get_status()
     print('Tahmin sistemi:', status['mode'])
     print()
@@ -311,6 +283,10 @@ def main():
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(2)
         sock.connect((AP_IP, AP_PORT))
+        # Ikili cerceve istenir; eski AP istegi okumaz ve metin satirlari
+        # gondermeye devam eder, cozucu ikisini de okur
+        if REQUEST_BINARY:
+            sock.sendall(FORMAT_REQUEST)
 
         print('Baglanildi! Veri bekleniyor...')
         print()
@@ -320,7 +296,10 @@ def main():
         ))
         print('-' * 70)
 
-        buffer = ''
+        decoder = StreamDecoder()
+        # AP tick damgalari bu baglanti icin PC zamanina cevrilir
+        clock = ApClock()
+        device_id = DEVICE_ID
         last_count = 0
         lost_packets = 0
         disconnects = 0
@@ -330,22 +309,19 @@ def main():
 
         while True:
             try:
-                data = sock.recv(1024)
+                data = sock.recv(4096)
                 if not data:
                     print('Baglanti kesildi!')
                     break
 
-                buffer += data.decode()
-
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-
-                    if line.startswith('STATUS:'):
-                        status = line[7:]
+                received = time.time()
+                for event in decoder.feed(data):
+                    if isinstance(event, Status):
+                        if device_id and event.device and event.device != device_id:
+                            continue
                         pc_time = datetime.now().strftime('%H:%M:%S')
 
-                        if status == 'DISCONNECTED':
+                        if not event.connected:
                             is_disconnected = True
                             disconnect_time = time.time()
                             disconnects += 1
@@ -359,10 +335,10 @@ def main():
                                 '--ms',
                                 'KOPTU! (#{})'.format(disconnects)
                             ))
-                            write_data_row(csv_writer, csv_file, session_id, None, 'DISCONNECTED')
+                            write_data_row(store, session_id, None, 'DISCONNECTED')
                             records_written += 1
 
-                        elif status == 'CONNECTED':
+                        else:
                             duration = None
                             if is_disconnected and disconnect_time:
                                 duration = time.time() - disconnect_time
@@ -376,72 +352,84 @@ def main():
                                     '++ms',
                                     'DUZELD! ({:.1f}s)'.format(duration)
                                 ))
-                            write_data_row(csv_writer, csv_file, session_id, None, 'CONNECTED',
+                            write_data_row(store, session_id, None, 'CONNECTED',
                                          disconnect_duration=duration)
                             records_written += 1
                             is_disconnected = False
                             disconnect_time = None
 
-                    elif line.startswith('DATA:'):
-                        parts = line[5:].split(',')
-                        if len(parts) >= 3:
-                            rssi = int(parts[0])
-                            rtt = int(parts[1])
-                            count = int(parts[2])
-                            latency = rtt // 2
-
-                            if last_count > 0 and count > last_count + 1:
-                                missing = count - last_count - 1
-                                lost_packets += missing
-                                stats.add_packet_loss(missing)
-                                for i in range(last_count + 1, count):
-                                    pc_time = datetime.now().strftime('%H:%M:%S')
-                                    print('{:^10} {:^8} {:^8} {:^10} {:^8} {:^10} {:^10}'.format(
-                                        pc_time,
-                                        '#{}'.format(i),
-                                        '[XXXXX]',
-                                        '-- dBm',
-                                        '--ms',
-                                        '--ms',
-                                        'KAYIP!'
-                                    ))
-                                    write_data_row(csv_writer, csv_file, session_id, i, 'PACKET_LOST')
-                                    records_written += 1
-
-                            last_count = count
-
-                            quality = get_signal_quality(rssi)
-                            quality_score = get_quality_score(quality)
-                            bar = get_signal_bar(rssi)
-                            pc_time = datetime.now().strftime('%H:%M:%S')
-
-                            stats.add_measurement(rssi, rtt, latency, quality)
-
-                            print('{:^10} {:^8} {:^8} {:^10} {:^8} {:^10} {:^10}'.format(
-                                pc_time,
-                                '#{}'.format(count),
-                                bar,
-                                '{} dBm'.format(rssi),
-                                '{}ms'.format(rtt),
-                                '~{}ms'.format(latency),
-                                quality
-                            ))
+                    elif isinstance(event, Overflow):
+                        # AP tamponu tasti
+                        stats.ap_overflows += event.dropped
+                        print('AP tamponu tasti: {} olcum atlandi'.format(event.dropped))
+
+                    elif isinstance(event, Measurement):
+                        unix_time = clock.to_unix(event.tick, received) if event.tick is not None else None
+                        if event.device is not None:
+                            if device_id is None:
+                                device_id = event.device
+                                print('Izlenen cihaz:', device_id)
+                            elif event.device != device_id:
+                                continue
+
+                        rssi = event.rssi
+                        rtt = event.rtt
+                        count = event.count
+                        latency = rtt // 2
+
+                        if last_count > 0 and count > last_count + 1:
+                            missing = count - last_count - 1
+                            lost_packets += missing
+                            stats.add_packet_loss(missing)
+                            for i in range(last_count + 1, count):
+                                pc_time = datetime.now().strftime('%H:%M:%S')
+                                print('{:^10} {:^8} {:^8} {:^10} {:^8} {:^10} {:^10}'.format(
+                                    pc_time,
+                                    '#{}'.format(i),
+                                    '[XXXXX]',
+                                    '-- dBm',
+                                    '--ms',
+                                    '--ms',
+                                    'KAYIP!'
+                                ))
+                                write_data_row(store, session_id, i, 'PACKET_LOST', unix_time=unix_time)
+                                records_written += 1
 
-                            prediction = predictor.predict(
-                                rssi=rssi,
-                                rtt=rtt,
-                                latency=latency,
-                                quality_score=quality_score
-                            )
+                        last_count = count
 
-                            warning_msg = predictor.format_warning(prediction)
-                            if warning_msg:
-                                print(warning_msg)
-                                stats.add_warning(warning_msg)
+                        quality = get_signal_quality(rssi)
+                        quality_score = get_quality_score(quality)
+                        bar = get_signal_bar(rssi)
+                        pc_time = datetime.now().strftime('%H:%M:%S')
 
-                            write_data_row(csv_writer, csv_file, session_id, count, 'DATA',
-                                         rssi=rssi, rtt=rtt, latency=latency, quality=quality)
-                            records_written += 1
+                        stats.add_measurement(rssi, rtt, latency, quality)
+
+                        print('{:^10} {:^8} {:^8} {:^10} {:^8} {:^10} {:^10}'.format(
+                            pc_time,
+                            '#{}'.format(count),
+                            bar,
+                            '{} dBm'.format(rssi),
+                            '{}ms'.format(rtt),
+                            '~{}ms'.format(latency),
+                            quality
+                        ))
+
+                        prediction = predictor.predict(
+                            rssi=rssi,
+                            rtt=rtt,
+                            latency=latency,
+                            quality_score=quality_score
+                        )
+
+                        warning_msg = predictor.format_warning(prediction)
+                        if warning_msg:
+                            print(warning_msg)
+                            stats.add_warning(warning_msg)
+
+                        write_data_row(store, session_id, count, 'DATA',
+                                     rssi=rssi, rtt=rtt, latency=latency, quality=quality,
+                                     unix_time=unix_time)
+                        records_written += 1
 
             except socket.timeout:
                 continue
@@ -452,7 +440,7 @@ def main():
                 break
 
         sock.close()
-        csv_file.close()
+        store.close()
 
     except socket.timeout:
         print()
@@ -460,20 +448,20 @@ def main():
         print('Kontrol edin:')
         print('  1. Bilgisayar "LoPy4-Network" Wi-Fi agina bagli mi?')
         print('  2. LoPy4 AP cihazi calisiyor mu?')
-        csv_file.close()
+        store.close()
         sys.exit(1)
 
     except ConnectionRefusedError:
         print()
         print('HATA: Baglanti reddedildi!')
         print('LoPy4 AP cihazinin calistigini kontrol edin.')
-        csv_file.close()
+        store.close()
         sys.exit(1)
 
     except Exception as e:
         print()
         print('HATA:', str(e))
-        csv_file.close()
+        store.close()
         sys.exit(1)
 
 
@@ -0,0 +1,3 @@
+from .clock import ApClock, TICKS_PERIOD
+from .frame import (StreamDecoder, Measurement, Status, Overflow, parse_line,
+                    valid_device_id, FORMAT_REQUEST, REQUEST_BINARY)
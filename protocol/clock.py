@@ -0,0 +1,44 @@
+import time
+
+# MicroPython time.ticks_ms() 2^30'da basa sarar
+TICKS_PERIOD = 1 << 30
+# AP ile PC saatleri arasindaki kaymaya izin (100 ppm)
+DRIFT_ALLOWANCE = 1e-4
+
+
+def ticks_diff(a, b):
+    # MicroPython time.ticks_diff ile ayni: sarmaya dayanikli a - b (ms)
+    half = TICKS_PERIOD // 2
+    return (a - b + half) % TICKS_PERIOD - half
+
+
+class ApClock:
+
+    # AP'nin DATA satirlarindaki ticks_ms damgasini PC unix zamanina cevirir.
+    # Tick sarmasi acilir; AP ile PC saati arasindaki fark, gelen satirlarda
+    # gorulen en kucuk (alinma zamani - AP zamani) degeridir, yani ag ve
+    # tampon gecikmesi en az olan olcum. Saat kaymasi icin bu fark zamanla
+    # DRIFT_ALLOWANCE kadar artabilir. AP yeniden baslayinca tick sifirlandigi
+    # icin her AP baglantisinda yeni nesne kullanilir.
+
+    def __init__(self):
+        self.last_tick = None
+        # ilk tick'ten beri gecen AP zamani (s)
+        self.elapsed = 0.0
+        self.offset = None
+        self.offset_elapsed = 0.0
+
+    def to_unix(self, tick, received=None):
+        received = time.time() if received is None else received
+        if self.last_tick is not None:
+            self.elapsed += ticks_diff(tick, self.last_tick) / 1000.0
+        self.last_tick = tick
+
+        offset = received - self.elapsed
+        if self.offset is not None:
+            limit = self.offset + (self.elapsed - self.offset_elapsed) * DRIFT_ALLOWANCE
+            if offset > limit:
+                return self.elapsed + limit
+        self.offset = offset
+        self.offset_elapsed = self.elapsed
+        return received
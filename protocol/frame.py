@@ -0,0 +1,328 @@
+import os
+import re
+import struct
+from binascii import crc32
+from collections import namedtuple
+
+# AP -> PC ikili cerceve (surum 2). Her cerceve:
+#   baslik  <BBBB  0xA5, surum, tur, govde uzunlugu
+#   govde   DATA:     <IIhiH sayac, AP tick (ms), rssi, rtt (ms, isaretli), jitter (0.1 ms) + cihaz kimligi
+#           STATUS:   <B durum (1 bagli, 0 koptu) + cihaz kimligi
+#           OVERFLOW: <II atlanan, toplam
+#   CRC32   <I     baslik + govde
+# Metin satirlari ASCII oldugundan 0xA5 ile baslamaz; ayni akista metin ve
+# ikili cerceve birlikte cozulur. ap/main.py ayni duzeni kendi kodlar.
+# Surum 1 DATA'da rtt isaretsiz 16 bitti (negatif deger 0'a kirpilirdi);
+# eski AP'lerin surum 1 cerceveleri de cozulur.
+MAGIC = 0xA5
+MAGIC_BYTE = bytes((MAGIC,))
+VERSION = 2
+LEGACY_VERSION = 1
+FRAME_DATA = 1
+FRAME_STATUS = 2
+FRAME_OVERFLOW = 3
+
+HEADER = struct.Struct('<BBBB')
+DATA_BODY = struct.Struct('<IIhiH')
+LEGACY_DATA_BODY = struct.Struct('<IIhHH')
+OVERFLOW_BODY = struct.Struct('<II')
+CRC = struct.Struct('<I')
+FRAME_OVERHEAD = HEADER.size + CRC.size
+JITTER_UNKNOWN = 0xFFFF
+
+# PC baglanir baglanmaz gonderir; AP ayni satirla onaylayip bu surumun
+# ikili cercevesine gecer. Eski AP istegi okumaz ya da tanimaz, metin
+# gondermeye devam eder.
+FORMAT_REQUEST = b'FORMAT:BIN%d\n' % VERSION
+REQUEST_BINARY = os.environ.get('RSSI_AP_FORMAT', 'binary') == 'binary'
+
+# Satir sonu gelmeden bu kadar bayt birikirse tampon atilir
+MAX_LINE = 4096
+# Cihaz kimligi onbellegi bu boyutu asarsa bosaltilir
+MAX_NAMES = 1024
+# Cihaz kimligi oturum dosyasi adinda kullanilir; bu kalibin disindaki
+# kimlikler (yol ayiraci, '..', bosluk vb.) reddedilir. ap/main.py ayni
+# kurali kendi uygular.
+DEVICE_ID = re.compile(rb'[A-Za-z0-9_.:-]{1,32}\Z')
+# Akistaki metin satirlari: AP'nin yazdigi bicimdeki DATA satiri alanlara
+# ayrilmis olarak eslesir (gruplar 1-6, rssi hep dolu), diger her satir son
+# grupta aynen doner ve parse_line ile cozulur
+TEXT_LINE = re.compile(
+    rb'DATA:(-?\d+),(-?\d+),(\d+)'
+    rb'(?:,([A-Za-z0-9_.:-]{0,32})(?:,(\d*)(?:,(\d+(?:\.\d*)?)?)?)?)?\r?\n'
+    rb'|([^\n]*)\n'
+)
+
+Measurement = namedtuple('Measurement', ('device', 'rssi', 'rtt', 'count', 'tick', 'jitter'))
+Status = namedtuple('Status', ('device', 'connected'))
+Overflow = namedtuple('Overflow', ('dropped', 'total'))
+# namedtuple'in kendi __new__'i yerine (anahtar kelime islemesi yok)
+_new = tuple.__new__
+
+
+# Ayni uzunluktaki ardisik DATA cerceveleri (ayni uzunlukta cihaz kimligi)
+# tek Struct.iter_unpack ile okunur: baslik tek <I, govde, cihaz, CRC.
+# Govde uzunluguna gore onbellekte tutulur.
+_DATA_FRAMES = {}
+
+
+def _data_frame(length):
+    frame = _DATA_FRAMES[length] = struct.Struct('<I{}{}sI'.format(
+        DATA_BODY.format.lstrip('<'), length - DATA_BODY.size))
+    return frame
+
+
+def _frame(kind, body):
+    data = HEADER.pack(MAGIC, VERSION, kind, len(body)) + body
+    return data + CRC.pack(crc32(data))
+
+
+def encode_data(device, rssi, rtt, count, tick, jitter=None):
+    jitter = JITTER_UNKNOWN if jitter is None else min(int(jitter * 10 + 0.5), JITTER_UNKNOWN - 1)
+    body = DATA_BODY.pack(count, tick, rssi, rtt, jitter)
+    return _frame(FRAME_DATA, body + device.encode())
+
+
+def encode_status(device, connected):
+    return _frame(FRAME_STATUS, bytes((1 if connected else 0,)) + device.encode())
+
+
+def encode_overflow(dropped, total):
+    return _frame(FRAME_OVERFLOW, OVERFLOW_BODY.pack(dropped, total))
+
+
+def parse_line(line, names=None):
+    # Tek metin satiri (bayt, satir sonu olmadan) -> olay; tanimsiz satir None.
+    #   DATA:<rssi>,<rtt>,<sayac>[,<cihaz>[,<AP tick ms>[,<jitter>]]]
+    #   STATUS:<CONNECTED|DISCONNECTED>[,<cihaz>]
+    #   OVERFLOW:<atlanan>,<toplam>
+    # Sayi hatasinda ya da gecersiz cihaz kimliginde ValueError.
+    if isinstance(line, str):
+        line = line.encode()
+    line = line.strip()
+
+    if line.startswith(b'DATA:'):
+        parts = line[5:].split(b',')
+        if len(parts) < 3:
+            return None
+        device = _name(parts[3].strip(), names) if len(parts) >= 4 else None
+        tick = int(parts[4]) if len(parts) >= 5 and parts[4].strip() else None
+        jitter = float(parts[5]) if len(parts) >= 6 and parts[5].strip() else None
+        return _new(Measurement, (device, int(parts[0]), int(parts[1]), int(parts[2]), tick, jitter))
+
+    if line.startswith(b'STATUS:'):
+        status, _, device = line[7:].partition(b',')
+        if status not in (b'CONNECTED', b'DISCONNECTED'):
+            return None
+        return Status(_name(device.strip(), names), status == b'CONNECTED')
+
+    if line.startswith(b'OVERFLOW:'):
+        parts = line[9:].split(b',')
+        return Overflow(int(parts[0]), int(parts[1]) if len(parts) >= 2 else 0)
+
+    return None
+
+
+def valid_device_id(device_id):
+    if isinstance(device_id, str):
+        device_id = device_id.encode()
+    return DEVICE_ID.match(device_id) is not None
+
+
+def _name(raw, names):
+    # Cihaz kimligi baytlari -> str (bos kimlik None); tekrar eden kimlikler
+    # onbellekten doner, onbellege sadece gecerli kimlikler girer
+    if not raw:
+        return None
+    raw = bytes(raw)
+    if names is not None:
+        name = names.get(raw)
+        if name is not None:
+            return name
+    if DEVICE_ID.match(raw) is None:
+        raise ValueError('Gecersiz cihaz kimligi: {!r}'.format(raw[:40]))
+    if names is None:
+        return raw.decode(errors='replace')
+    if len(names) >= MAX_NAMES:
+        names.clear()
+    name = names[raw] = raw.decode(errors='replace')
+    return name
+
+
+class StreamDecoder:
+
+    # AP akisini olaylara (Measurement, Status, Overflow) cevirir. Gelen
+    # parcalar tek bir bytearray'e eklenir ve yerinde cozulur: ikili
+    # cerceveler struct.unpack_from ile okunur, CRC memoryview uzerinden
+    # hesaplanir; metin satirlari str'ye cevrilmeden derlenmis bir regex ile
+    # tampon uzerinde alanlarina ayrilir.
+    # Tamamlanmamis son mesaj bir sonraki parcaya kalir. CRC hatasinda bir
+    # bayt ilerlenip sonraki cerceve aranir.
+
+    def __init__(self, max_line=MAX_LINE):
+        self.buffer = bytearray()
+        self.max_line = max_line
+        self.names = {}
+        self.binary = False
+        self.frames = 0
+        self.lines = 0
+        self.errors = 0
+        self.unknown = 0
+
+    def feed(self, data):
+        buffer = self.buffer
+        buffer += data
+        events = []
+        with memoryview(buffer) as view:
+            consumed = self._parse(buffer, view, events)
+        del buffer[:consumed]
+        return events
+
+    def _parse(self, buffer, view, events):
+        end = len(buffer)
+        pos = 0
+        names = self.names
+        append = events.append
+        while pos < end:
+            if buffer[pos] == MAGIC:
+                if end - pos < HEADER.size:
+                    break
+                length = buffer[pos + 3]
+                frame_end = pos + FRAME_OVERHEAD + length
+                if frame_end > end:
+                    break
+
+                if buffer[pos + 2] == FRAME_DATA and buffer[pos + 1] == VERSION and length >= DATA_BODY.size:
+                    # En sik durum: ayni cihaz uzunlugundaki DATA cerceveleri
+                    # bir seferde; baslik ya da CRC uymayan ilk cercevede durur
+                    start = pos
+                    pos = self._data_run(buffer, view, pos, end, length, append)
+                    if pos != start:
+                        continue
+
+                body = pos + HEADER.size
+                if crc32(view[pos:body + length]) != CRC.unpack_from(buffer, body + length)[0]:
+                    self.errors += 1
+                    pos += 1
+                    continue
+                self.frames += 1
+                event = self._frame(buffer[pos + 1], buffer[pos + 2], buffer, view, body, length)
+                pos = frame_end
+                if event is not None:
+                    append(event)
+                continue
+
+            # Metin satirlarinda 0xA5 olamaz: bir sonraki cerceveye kadar
+            # olan tum tamamlanmis satirlar tamponun uzerinde tek findall ile
+            # alanlarina ayrilir; satir ve alan basina ayri bolme yapilmaz
+            magic = buffer.find(MAGIC_BYTE, pos)
+            stop = end if magic < 0 else magic
+            last = buffer.rfind(b'\n', pos, stop)
+            if last >= 0:
+                lines = TEXT_LINE.findall(buffer, pos, last + 1)
+                self.lines += len(lines)
+                for rssi, rtt, count, raw, tick, jitter, line in lines:
+                    if rssi:
+                        device = names.get(raw) if raw else None
+                        if device is None and raw:
+                            device = _name(raw, names)
+                        append(_new(Measurement, (device, int(rssi), int(rtt), int(count),
+                                                  int(tick) if tick else None,
+                                                  float(jitter) if jitter else None)))
+                        continue
+                    try:
+                        event = parse_line(line, names)
+                    except (ValueError, IndexError):
+                        self.errors += 1
+                        continue
+                    if event is not None:
+                        append(event)
+                    elif line.startswith(b'FORMAT:'):
+                        self.binary = True
+                pos = last + 1
+            if magic >= 0:
+                if pos < magic:
+                    # Satir sonu olmadan cerceveye ulasildi: bozuk veri
+                    self.errors += 1
+                    pos = magic
+                continue
+            if end - pos > self.max_line:
+                self.errors += 1
+                pos = end
+            break
+        return pos
+
+    def _data_run(self, buffer, view, pos, end, length, append):
+        # pos'tan baslayan ve tampona tam sigan ayni uzunluktaki cerceveler;
+        # ilk uymayan cercevenin konumu doner (hic cozulmediyse pos)
+        frame = _DATA_FRAMES.get(length) or _data_frame(length)
+        size = frame.size
+        header = MAGIC | VERSION << 8 | FRAME_DATA << 16 | length << 24
+        names = self.names
+        start = pos
+        errors = 0
+        for head, count, tick, rssi, rtt, jitter, raw, crc in frame.iter_unpack(
+                view[pos:pos + (end - pos) // size * size]):
+            if head != header or crc32(view[pos:pos + size - CRC.size]) != crc:
+                break
+            pos += size
+            device = names.get(raw)
+            if device is None:
+                try:
+                    device = _name(raw, names)
+                except ValueError:
+                    errors += 1
+                    continue
+            append(_new(Measurement, (device, rssi, rtt, count, tick,
+                                      None if jitter == JITTER_UNKNOWN else jitter / 10.0)))
+        self.frames += (pos - start) // size
+        self.errors += errors
+        return pos
+
+    def _frame(self, version, kind, buffer, view, body, length):
+        if version != VERSION and version != LEGACY_VERSION:
+            # Bilinmeyen surum: uzunluk alaniyla atlanir
+            self.unknown += 1
+            return None
+
+        if kind == FRAME_DATA:
+            # Surum 1 (eski AP): STATUS ve OVERFLOW ayni, DATA'da rtt <H
+            if version != LEGACY_VERSION or length < LEGACY_DATA_BODY.size:
+                self.errors += 1
+                return None
+            count, tick, rssi, rtt, jitter = LEGACY_DATA_BODY.unpack_from(buffer, body)
+            try:
+                device = _name(view[body + LEGACY_DATA_BODY.size:body + length], self.names)
+            except ValueError:
+                self.errors += 1
+                return None
+            return _new(Measurement, (device, rssi, rtt, count, tick,
+                                      None if jitter == JITTER_UNKNOWN else jitter / 10.0))
+
+        if kind == FRAME_STATUS:
+            if length < 1:
+                self.errors += 1
+                return None
+            try:
+                device = _name(view[body + 1:body + length], self.names)
+            except ValueError:
+                self.errors += 1
+                return None
+            return Status(device, buffer[body] == 1)
+        if kind == FRAME_OVERFLOW:
+            if length < OVERFLOW_BODY.size:
+                self.errors += 1
+                return None
+            return Overflow(*OVERFLOW_BODY.unpack_from(buffer, body))
+
+        self.unknown += 1
+        return None
+
+    def get_stats(self):
+        return {
+            'binary': self.binary,
+            'frames': self.frames,
+            'lines': self.lines,
+            'errors': self.errors,
+            'unknown': self.unknown
+        }
@@ -0,0 +1,63 @@
+import os
+
+from .csv_store import CSVStore, CSV_HEADERS
+from .writer import BackgroundWriter
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CSV_FILE = os.path.join(DATA_DIR, 'rssi_data.csv')
+COLUMNAR_DIR = os.path.join(DATA_DIR, 'columnar')
+
+# Virgulle ayrilmis backend listesi: csv, columnar veya csv,columnar
+STORAGE_BACKENDS = os.environ.get('RSSI_STORAGE', 'csv')
+
+# Arka plan yazici: N satirda veya M ms'de bir toplu yazma, istege bagli fsync
+FLUSH_ROWS = int(os.environ.get('RSSI_FLUSH_ROWS', '50'))
+FLUSH_INTERVAL_MS = int(os.environ.get('RSSI_FLUSH_MS', '500'))
+FSYNC = os.environ.get('RSSI_FSYNC', '0') == '1'
+WRITE_QUEUE_SIZE = int(os.environ.get('RSSI_WRITE_QUEUE', '10000'))
+
+
+class StoreGroup:
+
+    def __init__(self, stores):
+        self.stores = stores
+
+    def append(self, *args, **kwargs):
+        for store in self.stores:
+            store.append(*args, **kwargs)
+
+    def flush(self, fsync=False):
+        for store in self.stores:
+            store.flush(fsync=fsync)
+
+    def close(self):
+        for store in self.stores:
+            store.close()
+
+
+def open_store(backends=None, csv_file=CSV_FILE, columnar_dir=COLUMNAR_DIR, buffer_rows=1):
+    backends = backends or STORAGE_BACKENDS
+    stores = []
+
+    for name in [b.strip() for b in backends.split(',') if b.strip()]:
+        if name == 'csv':
+            stores.append(CSVStore(csv_file, buffer_rows=buffer_rows))
+        elif name == 'columnar':
+            from .columnar import ColumnarStore
+            stores.append(ColumnarStore(columnar_dir, buffer_rows=buffer_rows))
+        else:
+            raise ValueError('Bilinmeyen depolama: {}'.format(name))
+
+    if len(stores) == 1:
+        return stores[0]
+    return StoreGroup(stores)
+
+
+def open_background_store(backends=None, csv_file=CSV_FILE, columnar_dir=COLUMNAR_DIR):
+    store = open_store(backends, csv_file=csv_file, columnar_dir=columnar_dir, buffer_rows=FLUSH_ROWS)
+    return BackgroundWriter(store, max_queue=WRITE_QUEUE_SIZE, flush_rows=FLUSH_ROWS,
+                            flush_interval=FLUSH_INTERVAL_MS / 1000, fsync=FSYNC)
+
+
+__all__ = ['CSVStore', 'CSV_HEADERS', 'StoreGroup', 'BackgroundWriter', 'open_store',
+           'open_background_store', 'CSV_FILE', 'COLUMNAR_DIR']
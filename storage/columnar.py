@@ -0,0 +1,355 @@
+import os
+import glob
+from datetime import datetime
+
+import numpy as np
+
+from .csv_store import CSV_HEADERS
+
+# Dosya duzeni: data/columnar/<session_id>.rec
+#   16 bayt baslik (MAGIC + kayit boyutu) + sabit genislikli kayitlar.
+# Dosyaya yalnizca sona eklenir; okuma tarafi np.memmap ile kopyasiz yapilir.
+# Surum 1 dosyalarda kalite etiketi yoktur; okunurken bellekte surum 2'ye
+# cevrilir, sona ekleme yapilacaksa once yerinde yukseltilir.
+MAGIC = b'RSSIREC2'
+LEGACY_MAGIC = b'RSSIREC1'
+HEADER_SIZE = 16
+FILE_SUFFIX = '.rec'
+
+# Seyrek zaman indeksi: data/columnar/<session_id>.idx
+#   16 bayt baslik (INDEX_MAGIC + adim) + her INDEX_STRIDE kayitta bir
+#   kaydin unix_time degeri (<f8). Zaman araligi sorgulari once bu dizide
+#   arama yapar, sonra yalnizca ilgili bloklari okur.
+INDEX_MAGIC = b'RSSIIDX1'
+INDEX_SUFFIX = '.idx'
+INDEX_STRIDE = 4096
+
+LEGACY_RECORD_DTYPE = np.dtype([
+    ('unix_time', '<f8'),
+    ('measurement_id', '<i8'),
+    ('event_type', 'u1'),
+    ('quality_score', 'i1'),
+    ('rssi', '<f4'),
+    ('rtt', '<f4'),
+    ('latency', '<f4'),
+    ('disconnect_duration', '<f8'),
+])
+
+RECORD_DTYPE = np.dtype(LEGACY_RECORD_DTYPE.descr + [('quality', 'u1')])
+
+# Tabloda olmayan olay turleri UNKNOWN olarak yazilir
+EVENT_TYPES = ['DATA', 'PACKET_LOST', 'DISCONNECTED', 'CONNECTED', 'UNKNOWN']
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+UNKNOWN_EVENT = EVENT_CODES['UNKNOWN']
+
+# Kalite puani -> pc/main.py etiketi (surum 1 dosyalarin etiketi buradan)
+QUALITY_NAMES = ['Cok Zayif', 'Zayif', 'Orta', 'Iyi', 'Mukemmel']
+QUALITY_LABELS = {score: name for score, name in enumerate(QUALITY_NAMES)}
+# Kayittaki 'quality' kodu: 0 etiket yok, 1.. QUALITY_TABLE[kod - 1]. pc
+# ASCII, web Turkce etiket yazar; ikisi de aynen geri okunur.
+QUALITY_TABLE = QUALITY_NAMES + ['Çok Zayıf', 'Zayıf', 'İyi', 'Mükemmel']
+QUALITY_CODES = {name: code + 1 for code, name in enumerate(QUALITY_TABLE)}
+
+
+def _header():
+    return MAGIC + int(RECORD_DTYPE.itemsize).to_bytes(8, 'little')
+
+
+def _legacy_header():
+    return LEGACY_MAGIC + int(LEGACY_RECORD_DTYPE.itemsize).to_bytes(8, 'little')
+
+
+def _upgrade(records):
+    # Surum 1 kayitlari: etiket kalite puanindan (pc etiketleri) turetilir
+    upgraded = np.zeros(len(records), dtype=RECORD_DTYPE)
+    for name in LEGACY_RECORD_DTYPE.names:
+        upgraded[name] = records[name]
+    score = records['quality_score']
+    upgraded['quality'] = np.where((score >= 0) & (score < len(QUALITY_NAMES)), score + 1, 0)
+    return upgraded
+
+
+def upgrade_session(path):
+    # Surum 1 oturum dosyasini yerinde surum 2'ye cevirir
+    records = _upgrade(map_session(path))
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(_header())
+        f.write(records.tobytes())
+    os.replace(temp, path)
+
+
+def _index_header(stride=INDEX_STRIDE):
+    return INDEX_MAGIC + int(stride).to_bytes(8, 'little')
+
+
+def _optional(value):
+    return np.nan if value is None else value
+
+
+def index_path(path):
+    return path[:-len(FILE_SUFFIX)] + INDEX_SUFFIX
+
+
+def read_index(path, stride=INDEX_STRIDE):
+    # Indeks dosyasi yoksa ya da farkli adimla yazilmissa None doner
+    try:
+        with open(index_path(path), 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if header != _index_header(stride):
+        return None
+    return np.frombuffer(data[:len(data) // 8 * 8], dtype='<f8')
+
+
+def write_index(path, records, stride=INDEX_STRIDE):
+    with open(index_path(path), 'wb') as f:
+        f.write(_index_header(stride))
+        f.write(np.ascontiguousarray(records['unix_time'][::stride], dtype='<f8').tobytes())
+
+
+class _SessionFile:
+
+    def __init__(self, path, buffer_rows):
+        self.path = path
+        if _is_legacy(path):
+            upgrade_session(path)
+        self.buffer = np.zeros(buffer_rows, dtype=RECORD_DTYPE)
+        self.pending = 0
+        self.file = self.index_file = None
+        self._open()
+
+    def _open(self):
+        # Cokme ya da yazma hatasindan kalan yarim son kayit kesilir; sona
+        # eklenen kayitlar hep kayit sinirindan baslar
+        path = self.path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(_header())
+            self.file.flush()
+        self.rows = (self.file.tell() - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        size = HEADER_SIZE + self.rows * RECORD_DTYPE.itemsize
+        if self.file.tell() != size:
+            self.file.truncate(size)
+
+        # Indeksi eksik ya da kayitlarla uyusmayan dosyalarinki acilista
+        # bastan yazilir; yarim kalmis son deger kesilir
+        index = read_index(path)
+        if index is None or len(index) != -(-self.rows // INDEX_STRIDE):
+            write_index(path, map_session(path)[:self.rows])
+        else:
+            with open(index_path(path), 'r+b') as f:
+                f.truncate(HEADER_SIZE + len(index) * 8)
+        self.index_file = open(index_path(path), 'ab')
+
+    def _close_files(self):
+        for f in (self.file, self.index_file):
+            try:
+                if f is not None:
+                    f.close()
+            except OSError:
+                pass
+        self.file = self.index_file = None
+
+    def flush(self, fsync=False):
+        if not self.pending:
+            return
+        try:
+            if self.file is None:
+                self._open()
+            self.file.write(self.buffer[:self.pending].tobytes())
+            self.file.flush()
+
+            # Bu toplu yazmada INDEX_STRIDE katina denk gelen kayitlar
+            first = -self.rows % INDEX_STRIDE
+            if first < self.pending:
+                times = self.buffer['unix_time'][first:self.pending:INDEX_STRIDE]
+                self.index_file.write(times.astype('<f8').tobytes())
+                self.index_file.flush()
+            self.rows += self.pending
+
+            if fsync:
+                os.fsync(self.file.fileno())
+        except Exception:
+            # Tampondaki satirlar atilir (yazici hatayi sayar); dosya sonraki
+            # yazmada yeniden acilip son tam kayda kesilir
+            if self.file is not None:
+                self._close_files()
+            raise
+        finally:
+            self.pending = 0
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self._close_files()
+
+
+class ColumnarStore:
+
+    # Her oturum (cihaz) kendi dosyasina ve tamponuna yazar; farkli
+    # cihazlardan karisik gelen satirlar dosya ac/kapa yapmadan eklenir.
+
+    def __init__(self, directory, buffer_rows=1):
+        self.directory = directory
+        self.buffer_rows = max(1, buffer_rows)
+        self.rows_written = 0
+        self.sessions = {}
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _open_session(self, session_id):
+        path = os.path.join(self.directory, '{}{}'.format(session_id, FILE_SUFFIX))
+        session = _SessionFile(path, self.buffer_rows)
+        self.sessions[session_id] = session
+        return session
+
+    def append(self, session_id, unix_time, measurement_id, event_type, rssi=None, rtt=None,
+               latency=None, quality=None, quality_score=None, disconnect_duration=None):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self._open_session(session_id)
+
+        session.buffer[session.pending] = (
+            unix_time,
+            measurement_id if measurement_id else -1,
+            EVENT_CODES.get(event_type, UNKNOWN_EVENT),
+            quality_score if quality_score is not None else -1,
+            _optional(rssi),
+            _optional(rtt),
+            _optional(latency),
+            _optional(disconnect_duration),
+            QUALITY_CODES.get(quality, 0),
+        )
+        self.rows_written += 1
+
+        session.pending += 1
+        if session.pending >= self.buffer_rows:
+            session.flush()
+
+    def flush(self, fsync=False):
+        for session in self.sessions.values():
+            session.flush(fsync=fsync)
+
+    def close(self):
+        for session in self.sessions.values():
+            if session.file is not None:
+                session.close()
+
+
+def _is_legacy(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(HEADER_SIZE) == _legacy_header()
+    except FileNotFoundError:
+        return False
+
+
+def map_session(path):
+    size = os.path.getsize(path)
+
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    legacy = header == _legacy_header()
+    if header and header != _header() and not legacy:
+        raise ValueError('Bilinmeyen kayit formati: {}'.format(path))
+
+    dtype = LEGACY_RECORD_DTYPE if legacy else RECORD_DTYPE
+    count = (size - HEADER_SIZE) // dtype.itemsize if size > HEADER_SIZE else 0
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+
+    # Yazim sirasinda yarim kalmis son kayit okunmaz
+    records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+    return _upgrade(records) if legacy else records
+
+
+def session_files(directory):
+    return sorted(glob.glob(os.path.join(directory, '*' + FILE_SUFFIX)))
+
+
+def _local_offsets(unix_time):
+    # Yerel saat farki (s); saat degisimleri ceyrek saat sinirlarinda
+    # oldugundan her 15 dakikalik blok icin bir kez hesaplanir
+    if len(unix_time) == 0:
+        return np.zeros(0)
+    blocks, inverse = np.unique(np.floor_divide(unix_time, 900), return_inverse=True)
+    offsets = np.array([datetime.fromtimestamp(block * 900).astimezone().utcoffset().total_seconds()
+                        for block in blocks])
+    return offsets[inverse]
+
+
+def load_columnar(directory):
+    # Tum oturumlari CSV ile ayni sutunlara sahip bir DataFrame olarak yukler.
+    import pandas as pd
+
+    frames = []
+    for path in session_files(directory):
+        records = map_session(path)
+        session_id = os.path.basename(path)[:-len(FILE_SUFFIX)]
+
+        measurement_id = records['measurement_id'].astype(float)
+        measurement_id[measurement_id < 0] = np.nan
+        quality_codes = records['quality_score'].astype(np.int8)
+
+        frames.append(pd.DataFrame({
+            'session_id': pd.Categorical.from_codes(np.zeros(len(records), dtype=np.int8), [session_id]),
+            'unix_time': records['unix_time'],
+            'measurement_id': measurement_id,
+            'event_type': pd.Categorical.from_codes(records['event_type'], EVENT_TYPES),
+            'rssi': records['rssi'].astype(float),
+            'rtt': records['rtt'].astype(float),
+            'latency': records['latency'].astype(float),
+            'quality': pd.Categorical.from_codes(records['quality'].astype(np.int16) - 1, QUALITY_TABLE),
+            'quality_score': np.where(quality_codes >= 0, quality_codes, np.nan),
+            'disconnect_duration': records['disconnect_duration'],
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=CSV_HEADERS)
+
+    # Metin sutunlari kategorik olarak doner; session_id sutunu concat
+    # sirasinda birlestirilir.
+    df = pd.concat(frames, ignore_index=True)
+    df['session_id'] = df['session_id'].astype('category')
+    # CSV'deki ISO zaman damgasi gibi yerel saat, milisaniyeye kesilmis
+    unix_time = df['unix_time'].to_numpy()
+    df['timestamp'] = pd.to_datetime(unix_time + _local_offsets(unix_time), unit='s').floor('ms')
+    return df[CSV_HEADERS]
+
+
+def csv_to_columnar(csv_path, directory):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    written = 0
+
+    for session_id, session in df.groupby('session_id', sort=False):
+        path = os.path.join(directory, '{}{}'.format(session_id, FILE_SUFFIX))
+        if os.path.exists(path):
+            print('Atlandi (zaten var):', path)
+            continue
+
+        records = np.zeros(len(session), dtype=RECORD_DTYPE)
+        records['unix_time'] = session['unix_time'].to_numpy(dtype=float)
+        records['measurement_id'] = session['measurement_id'].fillna(-1).to_numpy(dtype=np.int64)
+        records['event_type'] = session['event_type'].map(EVENT_CODES).fillna(UNKNOWN_EVENT).to_numpy(dtype=np.uint8)
+        records['quality_score'] = session['quality_score'].fillna(-1).to_numpy(dtype=np.int8)
+        records['rssi'] = session['rssi'].to_numpy(dtype=float)
+        records['rtt'] = session['rtt'].to_numpy(dtype=float)
+        records['latency'] = session['latency'].to_numpy(dtype=float)
+        records['disconnect_duration'] = session['disconnect_duration'].to_numpy(dtype=float)
+        records['quality'] = session['quality'].map(QUALITY_CODES).fillna(0).to_numpy(dtype=np.uint8)
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'wb') as f:
+            f.write(_header())
+            f.write(records.tobytes())
+        write_index(path, records)
+        written += len(records)
+
+    return written
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CSV_FILE, COLUMNAR_DIR
+from storage.columnar import csv_to_columnar
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else CSV_FILE
+    directory = sys.argv[2] if len(sys.argv) > 2 else COLUMNAR_DIR
+
+    if not os.path.exists(csv_path):
+        print('HATA: CSV dosyasi bulunamadi:', csv_path)
+        sys.exit(1)
+
+    print('CSV:', csv_path)
+    print('Hedef:', directory)
+
+    written = csv_to_columnar(csv_path, directory)
+    print('Donusturulen kayit:', written)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import csv
+import os
+from datetime import datetime
+
+CSV_HEADERS = ['session_id', 'timestamp', 'unix_time', 'measurement_id', 'event_type',
+               'rssi', 'rtt', 'latency', 'quality', 'quality_score', 'disconnect_duration']
+
+
+class CSVStore:
+
+    def __init__(self, path, buffer_rows=1):
+        self.path = path
+        self.buffer_rows = max(1, buffer_rows)
+        self.pending = 0
+        self.rows_written = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.created = not os.path.exists(path)
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+
+        if self.created:
+            self.writer.writerow(CSV_HEADERS)
+            self.file.flush()
+
+    def append(self, session_id, unix_time, measurement_id, event_type, rssi=None, rtt=None,
+               latency=None, quality=None, quality_score=None, disconnect_duration=None):
+        timestamp = datetime.fromtimestamp(unix_time).isoformat(timespec='milliseconds')
+
+        self.writer.writerow([
+            session_id,
+            timestamp,
+            unix_time,
+            measurement_id if measurement_id else '',
+            event_type,
+            rssi if rssi is not None else '',
+            rtt if rtt is not None else '',
+            latency if latency is not None else '',
+            quality if quality else '',
+            quality_score if quality_score is not None and quality_score != -1 else '',
+            disconnect_duration if disconnect_duration is not None else ''
+        ])
+        self.rows_written += 1
+
+        self.pending += 1
+        if self.pending >= self.buffer_rows:
+            self.flush()
+
+    def flush(self, fsync=False):
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def close(self):
+        if self.file and not self.file.closed:
+            self.flush()
+            self.file.close()
@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+
+# Olcum bayraklari
+FLAG_PACKET_LOSS = 1
+FLAG_WARNING = 2
+
+HISTORY_DTYPE = np.dtype([
+    ('unix_time', '<f8'),
+    ('rssi', '<f4'),
+    ('rtt', '<f4'),
+    ('latency', '<f4'),
+    ('quality_score', 'i1'),
+    ('flags', 'u1'),
+])
+
+
+class MeasurementHistory:
+
+    # Son N olcumun sabit boyutlu halka tamponu. Her kayit dizide iki kez
+    # (i ve i + capacity) yazilir; boylece en eski kayittan en yeniye her
+    # pencere tek bir bitisik dilimdir ve okuma kopyasiz yapilir. Nokta
+    # basina Python nesnesi tutulmaz, JSON listeleri istek aninda dizilerden
+    # uretilir.
+
+    def __init__(self, capacity=300):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=HISTORY_DTYPE)
+        self.position = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.position = 0
+        self.size = 0
+
+    def append(self, unix_time, rssi, rtt, latency, quality_score=-1, flags=0):
+        row = (unix_time, rssi, rtt, latency, quality_score, flags)
+        self.data[self.position] = row
+        self.data[self.position + self.capacity] = row
+
+        self.position += 1
+        if self.position == self.capacity:
+            self.position = 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def view(self, last=None):
+        # Eskiden yeniye son `last` kayit; kopya degil, tampona bakan dilim
+        count = self.size if last is None else min(last, self.size)
+        end = self.position + self.capacity
+        return self.data[end - count:end]
+
+    def iso_times(self, records=None):
+        # Yerel saat, milisaniye hassasiyetli ISO metinleri (eski
+        # datetime.now().isoformat() bicimiyle ayni)
+        records = self.view() if records is None else records
+        if not len(records):
+            return []
+        offset = time.localtime(float(records['unix_time'][-1])).tm_gmtoff
+        local = ((records['unix_time'] + offset) * 1000).astype('datetime64[ms]')
+        return np.datetime_as_string(local, unit='ms').tolist()
+
+    def copy(self):
+        # Eskiden yeniye kayitlarin bagimsiz kopyasi; yayinlanan salt okunur
+        # durum goruntuleri bunu tasir, sonraki eklemeler onu degistirmez.
+        # Paketli yapili dizinin alan alan kopyasi yerine bayt kopyasi
+        # (~10 kat hizli); bytes uzerindeki dizi zaten salt okunurdur.
+        # tobytes GIL'i birakmaz: cok sayida okuyucu thread varken olcum
+        # thread'i GIL'i geri almak icin tekrar sira beklemez.
+        return np.frombuffer(self.view().tobytes(), dtype=HISTORY_DTYPE)
+
+    def points(self, *fields, records=None):
+        # Grafik bicimi: alan basina [{'time': iso, 'value': v}, ...]
+        records = self.view() if records is None else records
+        times = self.iso_times(records)
+        result = {}
+        for field in fields:
+            values = records[field].astype(np.int64).tolist()
+            result[field] = [{'time': t, 'value': v} for t, v in zip(times, values)]
+        return result
+
+    def memory_bytes(self):
+        return self.data.nbytes
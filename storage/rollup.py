@@ -0,0 +1,315 @@
+import numpy as np
+
+# Bellekte tutulan ozet katmanlari: (ad, kova genisligi s, saklanan kova)
+# Ham veri diskteki kolonlu oturum dosyalarindadir.
+ROLLUP_TIERS = [
+    ('10s', 10, 2160),      # 6 saat
+    ('1m', 60, 2880),       # 2 gun
+    ('10m', 600, 4320),     # 30 gun
+    ('1h', 3600, 8760),     # 365 gun
+]
+
+FIELDS = ('rssi', 'rtt', 'latency')
+INITIAL_CAPACITY = 64
+# Ortalama kova bu kadar noktadan buyukse LTTB adimi numpy ile yapilir
+LTTB_NUMPY_BUCKET = 32
+
+# Acik kova: [anahtar, sayi, rssi_min, rssi_max, rssi_toplam, rtt_min, ...]
+_STAT_COUNT = 3 * len(FIELDS)
+
+
+def lttb(x, y, n):
+    # Largest-Triangle-Three-Buckets: egrinin seklini koruyacak n noktanin
+    # indekslerini secer. Ilk ve son nokta her zaman korunur.
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bounds = (np.arange(n - 1) * ((size - 2) / (n - 2))).astype(np.int64) + 1
+    bounds[-1] = size - 1
+
+    # Sonraki kovanin ortalamasi kumulatif toplamlardan
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    ends = np.append(bounds[2:], size)
+    lengths = ends - bounds[1:]
+    avg_x = ((cx[ends] - cx[bounds[1:]]) / lengths).tolist()
+    avg_y = ((cy[ends] - cy[bounds[1:]]) / lengths).tolist()
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    a = 0
+
+    if size < LTTB_NUMPY_BUCKET * n:
+        # Kucuk kovalarda numpy cagri maliyeti baskin; duz Python ile
+        xl = x.tolist()
+        yl = y.tolist()
+        bl = bounds.tolist()
+        for i in range(n - 2):
+            ax, ay = xl[a], yl[a]
+            dx = ax - avg_x[i]
+            dy = avg_y[i] - ay
+            best = -1.0
+            for j in range(bl[i], bl[i + 1]):
+                area = abs(dx * (yl[j] - ay) - (ax - xl[j]) * dy)
+                if area > best:
+                    best = area
+                    a = j
+            selected[i + 1] = a
+        return selected
+
+    for i in range(n - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        xs = x[lo:hi]
+        ys = y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+class RollupTier:
+
+    # Tek bir cozunurluk katmani. Kapanan kovalar sabit kapasiteli bir
+    # halka tamponda numpy dizileri olarak saklanir; kapasite ihtiyac
+    # oldukca iki katina cikar, retention'a ulasinca en eski kova silinir.
+
+    def __init__(self, name, width, retention):
+        self.name = name
+        self.width = width
+        self.retention = retention
+
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int32)
+        # Her alan icin min, maks, ortalama
+        self.values = np.zeros((0, _STAT_COUNT), dtype=np.float32)
+        self.start = 0
+        self.size = 0
+        self.open = None
+
+    def _grow(self):
+        capacity = min(self.retention, max(INITIAL_CAPACITY, len(self.keys) * 2))
+        order = self._order()
+        keys = np.zeros(capacity, dtype=np.int64)
+        counts = np.zeros(capacity, dtype=np.int32)
+        values = np.zeros((capacity, _STAT_COUNT), dtype=np.float32)
+        keys[:self.size] = self.keys[order]
+        counts[:self.size] = self.counts[order]
+        values[:self.size] = self.values[order]
+        self.keys, self.counts, self.values = keys, counts, values
+        self.start = 0
+
+    def _order(self):
+        return (self.start + np.arange(self.size)) % max(1, len(self.keys))
+
+    def store(self, bucket):
+        if self.size == len(self.keys) and self.size < self.retention:
+            self._grow()
+
+        if self.size < len(self.keys):
+            position = (self.start + self.size) % len(self.keys)
+            self.size += 1
+        else:
+            # Dolu: en eski kovanin yerine yazilir
+            position = self.start
+            self.start = (self.start + 1) % len(self.keys)
+
+        count = bucket[1]
+        self.keys[position] = bucket[0]
+        self.counts[position] = count
+        row = self.values[position]
+        for i in range(len(FIELDS)):
+            row[3 * i] = bucket[2 + 3 * i]
+            row[3 * i + 1] = bucket[3 + 3 * i]
+            row[3 * i + 2] = bucket[4 + 3 * i] / count
+
+    @property
+    def first_time(self):
+        if self.size:
+            return float(self.keys[self.start] * self.width)
+        if self.open is not None:
+            return float(self.open[0] * self.width)
+        return None
+
+    def select(self, t_from, t_to, open_buckets=()):
+        # Araliga dusen kapali ve acik kovalar; kopya doner
+        order = self._order()
+        keys = self.keys[order]
+        lo = int(np.searchsorted(keys, t_from // self.width, 'left'))
+        hi = int(np.searchsorted(keys, t_to // self.width, 'right'))
+        keys = keys[lo:hi]
+        counts = self.counts[order[lo:hi]]
+        values = self.values[order[lo:hi]].astype(np.float64)
+
+        for bucket in open_buckets:
+            if not t_from // self.width <= bucket[0] <= t_to // self.width:
+                continue
+            row = []
+            for i in range(len(FIELDS)):
+                row += [bucket[2 + 3 * i], bucket[3 + 3 * i], bucket[4 + 3 * i] / bucket[1]]
+            keys = np.append(keys, bucket[0])
+            counts = np.append(counts, bucket[1])
+            values = np.vstack([values, row])
+        return keys * self.width, counts, values
+
+    def memory_bytes(self):
+        return self.keys.nbytes + self.counts.nbytes + self.values.nbytes
+
+
+def _merge(target, bucket):
+    target[1] += bucket[1]
+    for i in range(2, 2 + _STAT_COUNT, 3):
+        if bucket[i] < target[i]:
+            target[i] = bucket[i]
+        if bucket[i + 1] > target[i + 1]:
+            target[i + 1] = bucket[i + 1]
+        target[i + 2] += bucket[i + 2]
+
+
+class Rollups:
+
+    # Bir cihazin olcumlerinin katmanli min/maks/ortalama/sayi ozetleri.
+    # add() sadece en ince katmanin acik kovasini gunceller; kapanan kova bir
+    # ust katmanin acik kovasina eklenir. Boylece olcum basina maliyet katman
+    # sayisindan bagimsizdir.
+
+    def __init__(self, tiers=ROLLUP_TIERS):
+        self.tiers = [RollupTier(name, width, retention) for name, width, retention in tiers]
+        self.first_sample = None
+
+    def add(self, t, rssi, rtt, latency):
+        tier = self.tiers[0]
+        key = int(t // tier.width)
+        bucket = tier.open
+
+        if bucket is None or key > bucket[0]:
+            if bucket is None:
+                self.first_sample = t
+            else:
+                self._close(0)
+            tier.open = [key, 1, rssi, rssi, rssi, rtt, rtt, rtt, latency, latency, latency]
+            return
+
+        # Saat geri giderse olcum acik kovaya yazilir
+        bucket[1] += 1
+        if rssi < bucket[2]:
+            bucket[2] = rssi
+        if rssi > bucket[3]:
+            bucket[3] = rssi
+        bucket[4] += rssi
+        if rtt < bucket[5]:
+            bucket[5] = rtt
+        if rtt > bucket[6]:
+            bucket[6] = rtt
+        bucket[7] += rtt
+        if latency < bucket[8]:
+            bucket[8] = latency
+        if latency > bucket[9]:
+            bucket[9] = latency
+        bucket[10] += latency
+
+    def _close(self, level):
+        tier = self.tiers[level]
+        bucket = tier.open
+        tier.open = None
+        tier.store(bucket)
+
+        if level + 1 >= len(self.tiers):
+            return
+        upper = self.tiers[level + 1]
+        key = bucket[0] * tier.width // upper.width
+        if upper.open is not None and key > upper.open[0]:
+            self._close(level + 1)
+        if upper.open is None:
+            upper.open = [key] + bucket[1:]
+        else:
+            _merge(upper.open, bucket)
+
+    def _open_buckets(self, level):
+        # Katmanin acik kovasi alt katmanlarin henuz kapanmamis kovalariyla
+        # birlestirilir. Alt katmandaki acik kova bir sonraki ust kovaya
+        # dusebildigi icin en fazla iki kova doner.
+        merged = {}
+        width = self.tiers[level].width
+        for tier in self.tiers[:level + 1]:
+            if tier.open is None:
+                continue
+            key = tier.open[0] * tier.width // width
+            if key in merged:
+                _merge(merged[key], tier.open)
+            else:
+                merged[key] = [key] + tier.open[1:]
+        return [merged[key] for key in sorted(merged)]
+
+    def pick_tier(self, resolution, t_from, exact=False):
+        # Genisligi istenen cozunurlugu asmayan en kaba katman. Aralik o
+        # katmanda silinmisse (exact degilse) daha kaba katmana gecilir.
+        level = None
+        for i, tier in enumerate(self.tiers):
+            if tier.width <= resolution:
+                level = i
+        if level is None:
+            return None
+
+        for i in range(level, level + 1 if exact else len(self.tiers)):
+            if self.covers(i, t_from):
+                return i
+        return None
+
+    def covers(self, level, t_from):
+        # Aralik bu katmanda eksiksiz mi: cihaz t_from'dan once olcum
+        # almaya baslamis ve o kisim henuz silinmemis olmali
+        tier = self.tiers[level]
+        if self.first_sample is None or self.first_sample > t_from:
+            return False
+        if tier.size == tier.retention:
+            return tier.first_time <= t_from
+        return True
+
+    def select(self, level, t_from, t_to):
+        return self.tiers[level].select(t_from, t_to, self._open_buckets(level))
+
+    def memory_bytes(self):
+        return sum(tier.memory_bytes() for tier in self.tiers)
+
+    def get_status(self):
+        return {tier.name: tier.size for tier in self.tiers}
+
+
+def rebucket(times, counts, values, resolution):
+    # Katman kovalarini daha genis kovalarda toplar (min/maks/agirlikli ortalama)
+    keys = np.floor(times / resolution).astype(np.int64)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1]) if len(keys) else np.zeros(0, dtype=np.int64)
+    if not len(starts):
+        return times, counts, values
+
+    merged = np.empty((len(starts), values.shape[1]))
+    merged_counts = np.add.reduceat(counts, starts)
+    for i in range(len(FIELDS)):
+        merged[:, 3 * i] = np.minimum.reduceat(values[:, 3 * i], starts)
+        merged[:, 3 * i + 1] = np.maximum.reduceat(values[:, 3 * i + 1], starts)
+        merged[:, 3 * i + 2] = np.add.reduceat(values[:, 3 * i + 2] * counts, starts) / merged_counts
+    return keys[starts] * resolution, merged_counts, merged
+
+
+def bucket_result(times, counts, values, max_points):
+    # Kovalari yanit sozlugune cevirir; max_points'i asarsa RSSI ortalamasi
+    # uzerinden LTTB ile seyreltilir (secilen kovalarin min/maks'i korunur).
+    if len(times) > max_points:
+        selected = lttb(times, values[:, 2], max_points)
+        times, counts, values = times[selected], counts[selected], values[selected]
+
+    result = {
+        'time': times.tolist(),
+        'count': counts.tolist(),
+        'min': {},
+        'max': {}
+    }
+    for i, name in enumerate(FIELDS):
+        result[name] = np.round(values[:, 3 * i + 2], 1).tolist()
+        result['min'][name] = values[:, 3 * i].tolist()
+        result['max'][name] = values[:, 3 * i + 1].tolist()
+    return result
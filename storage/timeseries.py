@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from .columnar import (EVENT_CODES, FILE_SUFFIX, INDEX_STRIDE, RECORD_DTYPE, map_session,
+                       read_index, session_files)
+from .rollup import FIELDS, bucket_result, lttb
+
+# Yanittaki varsayilan ve en fazla nokta sayisi; kova hesabi da en fazla
+# HISTORY_POINT_LIMIT kova ile yapilir
+HISTORY_POINTS = 2000
+HISTORY_POINT_LIMIT = 20000
+# Bu kadar satira kadar ham veri dogrudan LTTB ile seyreltilir; daha
+# buyuk araliklar once max_points * LTTB_OVERSAMPLE kovaya toplanir
+RAW_LTTB_ROWS = 100000
+LTTB_OVERSAMPLE = 4
+# Kova ortalamalari bu kadar satirlik parcalarla hesaplanir (bellek siniri)
+CHUNK_ROWS = 1 << 20
+# Dizin listesi en fazla bu siklikla yenilenir (s)
+SCAN_INTERVAL = 1.0
+
+DATA_CODE = EVENT_CODES['DATA']
+SESSION_TIME_LENGTH = len('YYYYMMDD_HHMMSS')
+
+
+def session_device(session_id, default_device='default'):
+    # YYYYMMDD_HHMMSS -> varsayilan cihaz, YYYYMMDD_HHMMSS_<cihaz> -> <cihaz>
+    if len(session_id) > SESSION_TIME_LENGTH and session_id[SESSION_TIME_LENGTH] == '_':
+        return session_id[SESSION_TIME_LENGTH + 1:]
+    return default_device
+
+
+class _Segment:
+
+    # Tek bir oturum dosyasi: memmap edilmis kayitlar ve seyrek zaman indeksi.
+    # Dosya buyudukce yeniden eslenir; indeksin diske henuz yazilmamis kismi
+    # kayitlardan tamamlanir.
+
+    def __init__(self, path):
+        self.path = path
+        self.size = -1
+        self.records = None
+        self.index = None
+        self.first_time = None
+        self.last_time = None
+
+    def refresh(self):
+        size = os.path.getsize(self.path)
+        if size == self.size:
+            return
+        self.size = size
+
+        records = map_session(self.path)
+        index = read_index(self.path)
+        if index is None:
+            index = np.zeros(0, dtype='<f8')
+        covered = len(index) * INDEX_STRIDE
+        if covered < len(records):
+            index = np.concatenate([index, records['unix_time'][covered::INDEX_STRIDE]])
+
+        self.records = records
+        self.index = index[:-(-len(records) // INDEX_STRIDE)]
+        if len(records):
+            self.first_time = float(self.index[0])
+            self.last_time = float(records['unix_time'][-1])
+
+    def _find(self, t, side):
+        # Indeksten t'nin dustugu blok bulunur; tam konum sadece o blokta aranir
+        block = max(0, int(np.searchsorted(self.index, t, 'right')) - 1) * INDEX_STRIDE
+        times = self.records['unix_time'][block:block + INDEX_STRIDE]
+        return block + int(np.searchsorted(times, t, side))
+
+    def locate(self, t_from, t_to):
+        # [t_from, t_to] araligindaki satirlarin [start, end) sinirlari
+        if not len(self.records) or self.last_time < t_from or self.first_time > t_to:
+            return 0, 0
+        return self._find(t_from, 'left'), self._find(t_to, 'right')
+
+
+class _Buckets:
+
+    # Parca parca gelen kayitlari sabit genislikli zaman kovalarinda toplar.
+    # Kova anahtari floor(t / cozunurluk) oldugu icin parca ve oturum
+    # sinirlarina denk gelen kovalar sonda birlestirilir. DATA disindaki
+    # satirlar kopyalanip ayiklanmak yerine toplama dahil edilmez (sifir
+    # agirlik, min/maks icin +/-inf).
+
+    def __init__(self, resolution):
+        self.resolution = resolution
+        self.keys = []
+        self.counts = []
+        self.stats = []
+
+    def add(self, records):
+        if not len(records):
+            return
+        keys = np.floor(records['unix_time'] / self.resolution).astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+        mask = records['event_type'] == DATA_CODE
+
+        stats = np.empty((len(starts), 3 * len(FIELDS)))
+        for i, name in enumerate(FIELDS):
+            values = records[name]
+            stats[:, 3 * i] = np.minimum.reduceat(np.where(mask, values, np.inf), starts)
+            stats[:, 3 * i + 1] = np.maximum.reduceat(np.where(mask, values, -np.inf), starts)
+            stats[:, 3 * i + 2] = np.add.reduceat(np.where(mask, values, 0.0), starts)
+
+        self.keys.append(keys[starts])
+        self.counts.append(np.add.reduceat(mask, starts, dtype=np.int64))
+        self.stats.append(stats)
+
+    def result(self):
+        # Kova baslangic zamani, olcum sayisi ve alan basina min/maks/ortalama
+        if not self.keys:
+            return np.zeros(0), np.zeros(0, dtype=np.int64), np.zeros((0, 3 * len(FIELDS)))
+
+        keys = np.concatenate(self.keys)
+        stats = np.concatenate(self.stats)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+        counts = np.add.reduceat(np.concatenate(self.counts), starts)
+
+        values = np.empty((len(starts), stats.shape[1]))
+        for i in range(len(FIELDS)):
+            values[:, 3 * i] = np.minimum.reduceat(stats[:, 3 * i], starts)
+            values[:, 3 * i + 1] = np.maximum.reduceat(stats[:, 3 * i + 1], starts)
+            values[:, 3 * i + 2] = np.add.reduceat(stats[:, 3 * i + 2], starts)
+
+        # Sadece olay satiri iceren kovalar atlanir
+        filled = counts > 0
+        counts = counts[filled]
+        values = values[filled]
+        for i in range(len(FIELDS)):
+            values[:, 3 * i + 2] /= counts
+        return keys[starts][filled] * self.resolution, counts, values
+
+
+class TimeSeriesIndex:
+
+    # Kolonlu oturum dosyalari uzerinde cihaz ve zaman araligi sorgulari.
+    # Sadece okur; dosyalar ColumnarStore tarafindan yazilir. Sorgu, aralikla
+    # kesismeyen oturumlari atlar ve tam log taramasi yapmaz.
+
+    def __init__(self, directory, default_device='default'):
+        self.directory = directory
+        self.default_device = default_device
+        self.lock = threading.Lock()
+        self.segments = {}
+        self.last_scan = 0.0
+        self.queries = 0
+
+    def _scan(self):
+        now = time.monotonic()
+        if now - self.last_scan < SCAN_INTERVAL:
+            return
+        self.last_scan = now
+
+        for path in session_files(self.directory):
+            if path not in self.segments:
+                self.segments[path] = _Segment(path)
+
+    def _device_segments(self, device_id):
+        with self.lock:
+            self._scan()
+            result = []
+            for path, segment in self.segments.items():
+                session_id = os.path.basename(path)[:-len(FILE_SUFFIX)]
+                if session_device(session_id, self.default_device) != device_id:
+                    continue
+                try:
+                    segment.refresh()
+                except (OSError, ValueError) as e:
+                    print('[TimeSeriesIndex] Okunamadi:', path, e)
+                    continue
+                if len(segment.records):
+                    result.append(segment)
+            self.queries += 1
+
+        # Ayni cihazin oturumlari zamanda ardisiktir
+        result.sort(key=lambda s: s.first_time)
+        return result
+
+    def devices(self):
+        with self.lock:
+            self._scan()
+            return sorted({session_device(os.path.basename(p)[:-len(FILE_SUFFIX)], self.default_device)
+                           for p in self.segments})
+
+    def query(self, device_id, t_from, t_to, resolution=None, max_points=HISTORY_POINTS):
+        # resolution None: aralik max_points'e sigiyorsa ham veri; RAW_LTTB_ROWS
+        # satira kadar ham veri LTTB ile, daha fazlasi once kovalanip sonra
+        # LTTB ile seyreltilir. Yanit en fazla max_points noktadir.
+        ranges = []
+        rows = 0
+        for segment in self._device_segments(device_id):
+            start, end = segment.locate(t_from, t_to)
+            if end > start:
+                ranges.append((segment.records, start, end))
+                rows += end - start
+
+        span = max(t_to - t_from, 1e-3)
+        if resolution is None and rows > RAW_LTTB_ROWS:
+            resolution = span / (max_points * LTTB_OVERSAMPLE)
+        if resolution is not None:
+            resolution = max(float(resolution), span / HISTORY_POINT_LIMIT)
+
+        result = {
+            'device': device_id,
+            'from': t_from,
+            'to': t_to,
+            'resolution': resolution,
+            'source': 'raw' if resolution is None else 'disk',
+            'rows': rows
+        }
+
+        if resolution is None:
+            parts = [records[start:end] for records, start, end in ranges]
+            data = np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+            data = data[data['event_type'] == DATA_CODE]
+            if len(data) > max_points:
+                data = data[lttb(data['unix_time'], data['rssi'], max_points)]
+            result.update({
+                'time': data['unix_time'].tolist(),
+                'rssi': data['rssi'].astype(int).tolist(),
+                'rtt': data['rtt'].astype(int).tolist(),
+                'latency': data['latency'].astype(int).tolist(),
+                'count': [1] * len(data)
+            })
+            return result
+
+        buckets = _Buckets(resolution)
+        for records, start, end in ranges:
+            for chunk_start in range(start, end, CHUNK_ROWS):
+                buckets.add(records[chunk_start:min(end, chunk_start + CHUNK_ROWS)])
+
+        result.update(bucket_result(*buckets.result(), max_points=max_points))
+        return result
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'segments': len(self.segments),
+                'queries': self.queries
+            }
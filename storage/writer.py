@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class BackgroundWriter:
+
+    # Kayitlari sinirli bir kuyruk uzerinden ayri bir thread'de yazar.
+    # Satirlar flush_rows satira ya da flush_interval saniyeye ulasinca
+    # toplu olarak diske verilir (istege bagli fsync). Kuyruk doluysa
+    # append() yer acilana kadar bekler; veri dusurulmez.
+
+    def __init__(self, store, max_queue=10000, flush_rows=50, flush_interval=0.5, fsync=False):
+        self.store = store
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_queue = max_queue
+        self.closed = False
+
+        self.stats_lock = threading.Lock()
+        self.rows_written = 0
+        self.commits = 0
+        self.queue_full_waits = 0
+        self.max_queue_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_commit_time = 0.0
+        self.errors = 0
+        # Diske verildigi dogrulanamayan satirlar (kayit ya da flush hatasi)
+        self.rows_failed = 0
+        self.commit_failures = 0
+
+        self._thread = threading.Thread(target=self._run, name='BackgroundWriter', daemon=True)
+        self._thread.start()
+
+    def append(self, *args, **kwargs):
+        if self.closed:
+            raise RuntimeError('BackgroundWriter kapatildi')
+
+        item = (time.monotonic(), args, kwargs)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            with self.stats_lock:
+                self.queue_full_waits += 1
+            self.queue.put(item)
+
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def flush(self):
+        # Kuyruktaki tum satirlar diske yazilana kadar bekler
+        self.queue.join()
+
+    def _commit(self, pending):
+        start = time.monotonic()
+        try:
+            self.store.flush(fsync=self.fsync)
+            ok = True
+        except Exception as e:
+            ok = False
+            print('[BackgroundWriter] Yazma hatasi:', e)
+        now = time.monotonic()
+
+        with self.stats_lock:
+            self.last_commit_time = now - start
+            if ok:
+                self.commits += 1
+                self.rows_written += len(pending)
+                for enqueued in pending:
+                    latency = now - enqueued
+                    self.total_latency += latency
+                    if latency > self.max_latency:
+                        self.max_latency = latency
+            else:
+                self.errors += 1
+                self.commit_failures += 1
+                self.rows_failed += len(pending)
+
+        for _ in pending:
+            self.queue.task_done()
+
+    def _run(self):
+        # pending: yazilmis ama henuz diske verilmemis satirlarin kuyruga
+        # girme zamanlari. Zaman siniri en eski bekleyen satirdan olculur.
+        pending = []
+
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - pending[0]))
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._commit(pending)
+                self.queue.task_done()
+                return
+
+            if item is not None:
+                enqueued, args, kwargs = item
+                try:
+                    self.store.append(*args, **kwargs)
+                    pending.append(enqueued)
+                except Exception as e:
+                    with self.stats_lock:
+                        self.errors += 1
+                        self.rows_failed += 1
+                    print('[BackgroundWriter] Kayit hatasi:', e)
+                    self.queue.task_done()
+
+            # Kuyrukta bekleyen satir varsa once onlar alinir; birikme
+            # durumunda toplu yazma satir sayisina gore yapilir.
+            if pending and (len(pending) >= self.flush_rows or
+                            (self.queue.empty() and time.monotonic() - pending[0] >= self.flush_interval)):
+                self._commit(pending)
+                pending = []
+
+    def get_stats(self):
+        with self.stats_lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'queue_max': self.max_queue,
+                'max_queue_depth': self.max_queue_depth,
+                'queue_full_waits': self.queue_full_waits,
+                'rows_written': self.rows_written,
+                'commits': self.commits,
+                'errors': self.errors,
+                'rows_failed': self.rows_failed,
+                'commit_failures': self.commit_failures,
+                'avg_write_latency_ms': round(self.total_latency / self.rows_written * 1000, 2) if self.rows_written else 0,
+                'max_write_latency_ms': round(self.max_latency * 1000, 2),
+                'last_commit_ms': round(self.last_commit_time * 1000, 3),
+                'flush_rows': self.flush_rows,
+                'flush_interval_ms': int(self.flush_interval * 1000),
+                'fsync': self.fsync
+            }
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        self.queue.put(_STOP)
+        self._thread.join()
+        self.store.close()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.features import FEATURE_NAMES
+
+
+def random_measurements(rng, count, missing=0.1):
+    # (rssi, rtt, quality_score) listeleri; eksik degerler None, rtt bazen 0
+    rssi = [None if rng.random() < missing else int(rng.integers(-95, -30)) for _ in range(count)]
+    rtt = [None if rng.random() < missing else int(rng.integers(0, 300)) for _ in range(count)]
+    quality = [None if rng.random() < missing else int(rng.integers(0, 5)) for _ in range(count)]
+    return rssi, rtt, quality
+
+
+def as_float(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+@pytest.fixture(scope='session')
+def trained_model():
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, len(FEATURE_NAMES))) * 20
+    y = (X[:, 0] + X[:, 6] * 0.5 > 0).astype(int)
+    return RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+
+
+@pytest.fixture
+def model_path(tmp_path, trained_model):
+    import joblib
+
+    path = str(tmp_path / 'model.pkl')
+    joblib.dump(trained_model, path)
+    return path
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pytest
+
+from storage.columnar import (HEADER_SIZE, RECORD_DTYPE, ColumnarStore, index_path, load_columnar,
+                              map_session, read_index)
+
+
+def write_rows(directory, count, start=0, buffer_rows=4):
+    store = ColumnarStore(directory, buffer_rows=buffer_rows)
+    for i in range(start, start + count):
+        store.append('dev1', 1700000000.0 + i, i + 1, 'DATA', rssi=-50 - i % 10, rtt=10,
+                     latency=5, quality='Iyi', quality_score=3)
+    store.close()
+    return os.path.join(directory, 'dev1.rec')
+
+
+def test_round_trip(tmp_path):
+    path = write_rows(str(tmp_path), 10)
+    records = map_session(path)
+    assert len(records) == 10
+    assert records['measurement_id'].tolist() == list(range(1, 11))
+
+    df = load_columnar(str(tmp_path))
+    assert len(df) == 10
+    assert df['quality'].iloc[0] == 'Iyi'
+    assert df['rssi'].tolist() == [-50.0 - i % 10 for i in range(10)]
+
+
+def test_missing_values_are_nan(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    store.append('dev1', 1.0, None, 'DISCONNECTED', disconnect_duration=2.5)
+    store.close()
+
+    records = map_session(os.path.join(str(tmp_path), 'dev1.rec'))
+    assert np.isnan(records['rssi'][0])
+    assert records['measurement_id'][0] == -1
+    assert records['disconnect_duration'][0] == 2.5
+
+
+def test_partial_trailing_record_is_truncated_on_open(tmp_path):
+    path = write_rows(str(tmp_path), 6)
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    path = write_rows(str(tmp_path), 3, start=6)
+
+    assert (os.path.getsize(path) - HEADER_SIZE) % RECORD_DTYPE.itemsize == 0
+    records = map_session(path)
+    assert records['measurement_id'].tolist() == list(range(1, 10))
+    assert len(read_index(path)) == 1
+
+
+def test_partial_index_value_is_truncated(tmp_path):
+    path = write_rows(str(tmp_path), 5)
+    with open(index_path(path), 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    write_rows(str(tmp_path), 1, start=5)
+
+    assert (os.path.getsize(index_path(path)) - HEADER_SIZE) % 8 == 0
+    assert read_index(path).tolist() == [1700000000.0]
+
+
+def test_failed_flush_does_not_block_later_appends(tmp_path):
+    store = ColumnarStore(str(tmp_path), buffer_rows=2)
+    store.append('dev1', 1.0, 1, 'DATA', rssi=-50)
+    session = store.sessions['dev1']
+
+    class FailingFile:
+        def write(self, data):
+            raise OSError('disk dolu')
+
+        def close(self):
+            pass
+
+    session.file.close()
+    session.file = FailingFile()
+    with pytest.raises(OSError):
+        store.append('dev1', 2.0, 2, 'DATA', rssi=-51)
+
+    assert session.pending == 0
+    for i in range(3, 7):
+        store.append('dev1', float(i), i, 'DATA', rssi=-50)
+    store.close()
+
+    assert map_session(session.path)['measurement_id'].tolist() == [3, 4, 5, 6]
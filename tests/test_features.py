@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from conftest import as_float, random_measurements
+from ml.features import (FEATURE_NAMES, RollingFeatures, extract_features, extract_window_features,
+                         features_to_array)
+
+
+def window_dicts(rssi, rtt, quality):
+    return [{'rssi': r, 'rtt': t, 'quality_score': q} for r, t, q in zip(rssi, rtt, quality)]
+
+
+@pytest.mark.parametrize('window_size', [1, 2, 5, 10])
+def test_rolling_matches_extract_features(window_size):
+    rng = np.random.default_rng(window_size)
+    rssi, rtt, quality = random_measurements(rng, 500, missing=0.2)
+    rolling = RollingFeatures(window_size)
+
+    for i in range(len(rssi)):
+        rolling.update(rssi[i], rtt[i], quality[i])
+        start = max(0, i + 1 - window_size)
+        expected = features_to_array(extract_features(window_dicts(
+            rssi[start:i + 1], rtt[start:i + 1], quality[start:i + 1])))
+        np.testing.assert_allclose(rolling.as_array(), expected, rtol=1e-9, atol=1e-9)
+
+    assert len(rolling) == window_size
+    assert rolling.is_full()
+
+
+def test_window_features_match_extract_features():
+    rng = np.random.default_rng(1)
+    rssi, rtt, quality = random_measurements(rng, 300, missing=0.3)
+    window_size = 10
+
+    matrix = extract_window_features(as_float(rssi), as_float(rtt), as_float(quality), window_size)
+
+    assert matrix.shape == (len(rssi) - window_size + 1, len(FEATURE_NAMES))
+    for j in range(len(matrix)):
+        expected = features_to_array(extract_features(window_dicts(
+            rssi[j:j + window_size], rtt[j:j + window_size], quality[j:j + window_size])))
+        np.testing.assert_array_equal(matrix[j], expected)
+
+
+def test_empty_and_one_point_windows():
+    assert np.all(features_to_array(extract_features([])) == 0)
+
+    rolling = RollingFeatures(5)
+    assert len(rolling) == 0
+    assert not rolling.is_full()
+    assert np.all(rolling.as_array() == 0)
+
+    rolling.update(-60, 20, 3)
+    expected = features_to_array(extract_features([{'rssi': -60, 'rtt': 20, 'quality_score': 3}]))
+    np.testing.assert_array_equal(rolling.as_array(), expected)
+    assert rolling.as_array()[FEATURE_NAMES.index('rssi_mean')] == -60
+    assert rolling.as_array()[FEATURE_NAMES.index('rssi_std')] == 0
+
+    # Pencereden kisa seri: pencere yok
+    assert extract_window_features([-60] * 4, [10] * 4, [3] * 4, 5).shape == (0, len(FEATURE_NAMES))
+
+
+def test_all_missing_window_is_zero():
+    matrix = extract_window_features([np.nan] * 5, [np.nan] * 5, [np.nan] * 5, 5)
+    np.testing.assert_array_equal(matrix, np.zeros((1, len(FEATURE_NAMES))))
+
+    rolling = RollingFeatures(5)
+    for _ in range(7):
+        rolling.update(None, None, None)
+    assert np.all(rolling.as_array() == 0)
+
+
+def test_clear_resets_window():
+    rolling = RollingFeatures(3)
+    for value in (-40, -50, -60, -70):
+        rolling.update(value, 10, 2)
+    rolling.clear()
+    rolling.update(-80, 10, 2)
+    assert len(rolling) == 1
+    assert rolling.as_array()[FEATURE_NAMES.index('rssi_mean')] == -80
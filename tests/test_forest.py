@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from ml.forest import PackedForest, export_forest, load_model, packed_path, verification_inputs
+
+
+def test_packed_forest_matches_sklearn(trained_model):
+    forest = PackedForest.from_sklearn(trained_model)
+    X = verification_inputs(forest, rows=3000)
+
+    assert np.isnan(X).any()
+    np.testing.assert_array_equal(forest.predict_proba(X), trained_model.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict(X), trained_model.predict(X))
+
+
+def test_single_row_and_chunked_rows(trained_model):
+    forest = PackedForest.from_sklearn(trained_model)
+    X = verification_inputs(forest, rows=1300, seed=1)
+
+    np.testing.assert_array_equal(forest.predict_proba(X[0]), trained_model.predict_proba(X[:1]))
+    np.testing.assert_array_equal(forest.predict_proba(X), trained_model.predict_proba(X))
+
+
+def test_all_nan_row(trained_model):
+    forest = PackedForest.from_sklearn(trained_model)
+    X = np.full((1, trained_model.n_features_in_), np.nan)
+    np.testing.assert_array_equal(forest.predict_proba(X), trained_model.predict_proba(X))
+
+
+def test_wrong_feature_count(trained_model):
+    forest = PackedForest.from_sklearn(trained_model)
+    with pytest.raises(ValueError):
+        forest.predict_proba(np.zeros((2, trained_model.n_features_in_ + 1)))
+
+
+def test_depth_zero_forest():
+    # Tum agaclar tek yaprak: derinlik 1 olarak paketlenir
+    rng = np.random.default_rng(0)
+    X = rng.random((60, 3))
+    y = np.zeros(60, dtype=int)
+    y[:12] = 1
+    model = RandomForestClassifier(n_estimators=4, min_samples_leaf=40, random_state=0).fit(X, y)
+    assert all(estimator.tree_.max_depth == 0 for estimator in model.estimators_)
+
+    forest = PackedForest.from_sklearn(model)
+    assert forest.depth == 1
+    assert forest.n_estimators == 4
+    X_test = rng.random((20, 3))
+    X_test[0, 1] = np.nan
+    np.testing.assert_array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+
+
+def test_depth_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        PackedForest(np.zeros(0), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=bool),
+                     np.zeros((1, 2)), np.arange(2), 3, 0)
+
+
+def test_save_and_load(tmp_path, trained_model, model_path):
+    path = packed_path(model_path)
+    forest = export_forest(trained_model, path, source_path=model_path)
+    loaded = load_model(model_path)
+
+    assert isinstance(loaded, PackedForest)
+    assert loaded.source_digest == forest.source_digest
+    X = verification_inputs(forest, rows=500)
+    np.testing.assert_array_equal(loaded.predict_proba(X), trained_model.predict_proba(X))
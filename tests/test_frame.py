@@ -0,0 +1,152 @@
+import struct
+from binascii import crc32
+
+import numpy as np
+import pytest
+
+from protocol.frame import (CRC, FORMAT_REQUEST, HEADER, LEGACY_DATA_BODY, LEGACY_VERSION, MAGIC, VERSION,
+                            FRAME_DATA, Measurement, Overflow, Status, StreamDecoder, encode_data,
+                            encode_overflow, encode_status, parse_line)
+
+
+def sample_events(count=200, seed=0):
+    rng = np.random.default_rng(seed)
+    events = []
+    for i in range(count):
+        device = 'dev-{}'.format(i % 7)
+        roll = rng.random()
+        if roll < 0.05:
+            events.append(Status(device, bool(i % 2)))
+        elif roll < 0.08:
+            events.append(Overflow(int(rng.integers(1, 50)), i))
+        else:
+            jitter = None if rng.random() < 0.2 else round(float(rng.integers(0, 500)) / 10, 1)
+            events.append(Measurement(device, int(rng.integers(-95, -20)), int(rng.integers(-5, 400)),
+                                      i, int(rng.integers(0, 2 ** 30)), jitter))
+    return events
+
+
+def as_text(event):
+    if isinstance(event, Measurement):
+        return 'DATA:{},{},{},{},{},{}\n'.format(
+            event.rssi, event.rtt, event.count, event.device, event.tick,
+            '' if event.jitter is None else '{:.1f}'.format(event.jitter)).encode()
+    if isinstance(event, Status):
+        return 'STATUS:{},{}\n'.format('CONNECTED' if event.connected else 'DISCONNECTED', event.device).encode()
+    return 'OVERFLOW:{},{}\n'.format(event.dropped, event.total).encode()
+
+
+def as_frame(event):
+    if isinstance(event, Measurement):
+        return encode_data(event.device, event.rssi, event.rtt, event.count, event.tick, event.jitter)
+    if isinstance(event, Status):
+        return encode_status(event.device, event.connected)
+    return encode_overflow(event.dropped, event.total)
+
+
+def decode(data, chunks=None):
+    decoder = StreamDecoder()
+    events = []
+    if chunks is None:
+        events += decoder.feed(data)
+    else:
+        cuts = [0] + sorted(chunks) + [len(data)]
+        for start, end in zip(cuts, cuts[1:]):
+            events += decoder.feed(data[start:end])
+    return events, decoder
+
+
+def test_binary_and_text_decode_the_same_events():
+    events = sample_events()
+    text, _ = decode(b''.join(as_text(event) for event in events))
+    binary, decoder = decode(b''.join(as_frame(event) for event in events))
+
+    assert text == events
+    assert binary == events
+    assert decoder.get_stats()['frames'] == len(events)
+    assert decoder.get_stats()['errors'] == 0
+
+
+@pytest.mark.parametrize('encode', [as_text, as_frame])
+def test_torn_messages_across_chunks(encode):
+    events = sample_events(60, seed=1)
+    data = b''.join(encode(event) for event in events)
+
+    # Her bayt ayri parca
+    assert decode(data, chunks=range(1, len(data)))[0] == events
+
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        cuts = rng.choice(np.arange(1, len(data)), size=15, replace=False)
+        assert decode(data, chunks=cuts.tolist())[0] == events
+
+
+def test_incomplete_frame_waits_for_rest():
+    frame = as_frame(sample_events(1)[0])
+    decoder = StreamDecoder()
+    assert decoder.feed(frame[:-1]) == []
+    assert len(decoder.feed(frame[-1:])) == 1
+
+
+def test_bad_crc_is_skipped_and_stream_resyncs():
+    events = sample_events(30, seed=3)
+    frames = [as_frame(event) for event in events]
+    broken = bytearray(frames[10])
+    broken[HEADER.size] ^= 0xFF
+    frames[10] = bytes(broken)
+
+    decoded, decoder = decode(b''.join(frames))
+
+    assert decoded == events[:10] + events[11:]
+    assert decoder.get_stats()['errors'] >= 1
+
+
+def test_garbage_between_frames():
+    events = sample_events(10, seed=4)
+    data = b'\xa5\x02\x01' + b''.join(as_frame(event) + b'\xa5' for event in events)
+    assert decode(data)[0] == events
+
+
+def test_mixed_text_and_binary():
+    events = sample_events(40, seed=5)
+    data = b''.join(as_frame(event) if i % 3 else as_text(event) for i, event in enumerate(events))
+    assert decode(data, chunks=[7, 100, 101, 555])[0] == events
+
+
+def test_legacy_version_data_frame():
+    body = LEGACY_DATA_BODY.pack(5, 1000, -61, 12, 25) + b'old-ap'
+    data = HEADER.pack(MAGIC, LEGACY_VERSION, FRAME_DATA, len(body)) + body
+    frame = data + CRC.pack(crc32(data))
+    assert decode(frame)[0] == [Measurement('old-ap', -61, 12, 5, 1000, 2.5)]
+
+
+def test_invalid_device_id_is_dropped():
+    good = encode_data('ok', -50, 10, 1, 0)
+    bad = encode_data('../x', -50, 10, 2, 0)
+    events, decoder = decode(bad + good + b'DATA:-50,10,3,a/b,0,\n')
+    assert [event.count for event in events] == [1]
+    assert decoder.get_stats()['errors'] == 2
+
+
+def test_malformed_and_unknown_lines():
+    events, decoder = decode(b'DATA:x,1,2\nHELLO\n\nDATA:-50,10,7\n')
+    assert events == [Measurement(None, -50, 10, 7, None, None)]
+    assert decoder.get_stats()['errors'] == 1
+
+
+def test_overlong_line_is_dropped():
+    decoder = StreamDecoder(max_line=64)
+    assert decoder.feed(b'X' * 100) == []
+    assert decoder.feed(b'\nDATA:-50,10,1\n') == [Measurement(None, -50, 10, 1, None, None)]
+
+
+def test_parse_line_fields():
+    assert parse_line('DATA:-50,-3,9,dev,120,1.5') == Measurement('dev', -50, -3, 9, 120, 1.5)
+    assert parse_line(b'STATUS:DISCONNECTED,dev') == Status('dev', False)
+    assert parse_line(b'OVERFLOW:4') == Overflow(4, 0)
+    assert parse_line(b'NOPE') is None
+
+
+def test_format_request_names_frame_version():
+    assert FORMAT_REQUEST == 'FORMAT:BIN{}\n'.format(VERSION).encode()
+    assert struct.unpack('<BBBB', encode_overflow(1, 1)[:4])[1] == VERSION
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from conftest import as_float, random_measurements
+from ml.predictor import ConnectionPredictor
+
+
+def stream(predictor, rssi, rtt, latency, quality):
+    levels, sources, probabilities = [], [], []
+    for r, t, l, q in zip(rssi, rtt, latency, quality):
+        result = predictor.predict(rssi=r, rtt=t, latency=l, quality_score=q)
+        levels.append(result['warning_level'])
+        sources.append(result['source'])
+        probabilities.append(np.nan if result['ml_probability'] is None else result['ml_probability'])
+    return levels, sources, np.array(probabilities)
+
+
+@pytest.mark.parametrize('with_model', [False, True])
+def test_batch_matches_per_sample(with_model, request):
+    model_path = request.getfixturevalue('model_path') if with_model else None
+    rng = np.random.default_rng(7)
+    rssi, rtt, quality = random_measurements(rng, 400, missing=0.05)
+    latency = [None if t is None else t // 2 for t in rtt]
+
+    predictor = ConnectionPredictor(model_path=model_path)
+    assert predictor.ml_enabled == with_model
+    levels, sources, probabilities = stream(predictor, rssi, rtt, latency, quality)
+
+    result = ConnectionPredictor(model_path=model_path).predict_batch(
+        as_float(rssi), as_float(rtt), as_float(latency), as_float(quality))
+
+    np.testing.assert_array_equal(result['warning_level'], levels)
+    assert list(result['source']) == sources
+    np.testing.assert_allclose(result['ml_probability'], probabilities, rtol=0, atol=1e-12)
+    if with_model:
+        assert np.isnan(probabilities[:predictor.window_size - 1]).all()
+        assert not np.isnan(probabilities[predictor.window_size - 1:]).any()
+
+
+def test_batch_shorter_than_window(model_path):
+    predictor = ConnectionPredictor(model_path=model_path)
+    result = predictor.predict_batch([-60.0] * 3, [10.0] * 3, [5.0] * 3, [3.0] * 3)
+    assert np.isnan(result['ml_probability']).all()
+    assert list(result['source']) == ['rules'] * 3
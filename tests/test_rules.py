@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from conftest import as_float, random_measurements
+from ml.rules import WARNING_LEVEL_NONE, RuleBasedPredictor
+
+
+def stream_levels(predictor, rssi, rtt, latency, quality):
+    return [predictor.predict(r, t, l, q)[0] for r, t, l, q in zip(rssi, rtt, latency, quality)]
+
+
+@pytest.mark.parametrize('window_size', [2, 5, 10, 25])
+def test_batch_matches_per_sample(window_size):
+    rng = np.random.default_rng(window_size)
+    rssi, rtt, quality = random_measurements(rng, 600, missing=0.15)
+    latency = [None if t is None else t // 2 for t in rtt]
+    thresholds = {'window_size': window_size}
+
+    expected = stream_levels(RuleBasedPredictor(thresholds), rssi, rtt, latency, quality)
+    levels = RuleBasedPredictor(thresholds).predict_batch(
+        as_float(rssi), as_float(rtt), as_float(latency), as_float(quality))
+
+    np.testing.assert_array_equal(levels, expected)
+
+
+def test_batch_of_nothing():
+    assert len(RuleBasedPredictor().predict_batch([])) == 0
+
+
+def test_nan_only_batch_has_no_warnings():
+    levels = RuleBasedPredictor().predict_batch([np.nan] * 8, [np.nan] * 8, [np.nan] * 8, [np.nan] * 8)
+    assert np.all(levels == WARNING_LEVEL_NONE)
+
+
+def test_single_measurement_has_no_trend():
+    predictor = RuleBasedPredictor()
+    predictor.predict(-45, 10, 5, 4)
+    assert predictor.get_rssi_trend() == 0
+    assert predictor.get_rssi_std() == 0
+
+
+def window_stats(predictor):
+    return (predictor.get_rssi_trend(), predictor.get_rssi_delta(), predictor.get_rssi_std(),
+            predictor.get_rtt_trend(), predictor.get_quality_trend())
+
+
+@pytest.mark.parametrize('old_size,new_size', [(3, 8), (8, 3), (5, 20)])
+def test_window_resize_restores_history(old_size, new_size):
+    rng = np.random.default_rng(old_size * 100 + new_size)
+    rssi, rtt, quality = random_measurements(rng, 60)
+    resized = RuleBasedPredictor({'window_size': old_size})
+    fresh = RuleBasedPredictor({'window_size': new_size})
+
+    for i in range(len(rssi)):
+        if i == 30:
+            resized.thresholds['window_size'] = new_size
+        resized.predict(rssi[i], rtt[i], None, quality[i])
+        fresh.predict(rssi[i], rtt[i], None, quality[i])
+        if i >= 30:
+            assert window_stats(resized) == pytest.approx(window_stats(fresh))
+
+
+def test_window_beyond_history_never_ready():
+    predictor = RuleBasedPredictor({'window_size': 25})
+    for i in range(40):
+        predictor.predict(-40 - i, 10, None, 4)
+    assert predictor.max_history < 25
+    assert predictor.get_rssi_delta() == 0
@@ -0,0 +1,53 @@
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+from ml.stats import LatencyHistogram, OnlineStats
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 10, 501])
+def test_online_stats_match_statistics(count):
+    rng = np.random.default_rng(count)
+    values = rng.integers(-95, -20, count).tolist()
+    stats = OnlineStats()
+
+    for i, value in enumerate(values, 1):
+        stats.add(value)
+        seen = values[:i]
+        summary = stats.summary()
+        assert summary['min'] == min(seen)
+        assert summary['max'] == max(seen)
+        assert summary['avg'] == pytest.approx(statistics.mean(seen))
+        assert summary['std'] == pytest.approx(statistics.pstdev(seen), abs=1e-9)
+        assert summary['median'] == statistics.median(seen)
+
+    assert len(stats) == count
+
+
+def test_online_stats_float_values():
+    values = [0.5, 2.25, 2.25, -1.0, 7.5, 0.5]
+    stats = OnlineStats()
+    for value in values:
+        stats.add(value)
+    assert stats.median() == statistics.median(values)
+    assert stats.summary()['std'] == pytest.approx(statistics.pstdev(values))
+
+
+def test_empty_online_stats():
+    stats = OnlineStats()
+    assert stats.summary() == {'min': 0, 'max': 0, 'avg': 0, 'std': 0, 'median': 0}
+    stats.add(3)
+    stats.clear()
+    assert len(stats) == 0
+    assert stats.median() == 0
+
+
+def test_latency_histogram_buckets():
+    histogram = LatencyHistogram(buckets=(0.001, 0.01))
+    for seconds in (0.0005, 0.001, 0.005, 2.0):
+        histogram.observe(seconds)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert math.isclose(histogram.sum, 2.0065)
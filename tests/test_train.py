@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from ml.train import CV_FOLDS, make_splits
+
+
+def test_session_folds_exclude_test_sessions():
+    groups = np.repeat(np.arange(12), 10)
+    y = np.arange(len(groups)) % 2
+    train, test, folds = make_splits(y, groups, 'session')
+
+    test_sessions = set(groups[test])
+    assert test_sessions == {10, 11}
+    assert not set(groups[train]) & test_sessions
+    assert len(folds) == CV_FOLDS
+    for fold_train, fold_test in folds:
+        assert not (set(groups[fold_train]) | set(groups[fold_test])) & test_sessions
+        # Ileri zincirleme: her kat yalnizca onceki oturumlarla egitilir
+        assert groups[fold_train].max() < groups[fold_test].min()
+
+
+def test_too_few_sessions_fall_back_to_random():
+    groups = np.repeat(np.arange(CV_FOLDS + 1), 20)
+    y = np.arange(len(groups)) % 2
+    train, test, folds = make_splits(y, groups, 'session')
+
+    assert len(train) + len(test) == len(groups)
+    assert len(folds) == CV_FOLDS
+    assert len(set(groups[test])) > 1
+
+
+@pytest.mark.parametrize('split', ['session', 'random'])
+def test_train_and_test_are_disjoint(split):
+    groups = np.repeat(np.arange(20), 5)
+    y = np.arange(len(groups)) % 2
+    train, test, _ = make_splits(y, groups, split)
+    assert not set(train) & set(test)
+    assert len(train) + len(test) == len(groups)
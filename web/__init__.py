@@ -1,6 +1,8 @@
 from flask import Flask
 from flask_socketio import SocketIO
 
+from .serialization import SocketIOJSON
+
 socketio = SocketIO()
 
 
@@ -8,7 +10,9 @@ def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'lopy4-rssi-monitor-secret'
 
-    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading')
+    # Socket.IO yukleri orjson (kuruluysa) ile, onbellekteki CachedJSON
+    # goruntuleri yeniden serilestirilmeden yazilir
+    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading', json=SocketIOJSON)
 
     from .routes import main_bp
     app.register_blueprint(main_bp)
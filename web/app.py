@@ -4,12 +4,12 @@
 import sys
 import os
 import signal
-import threading
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from web import create_app, socketio
 from web.socket_client import APSocketClient, set_client
+from web.ingest import AsyncAPClient, parse_ap_list
 from web.data_manager import DataManager
 
 
@@ -35,23 +35,24 @@ def main():
 
     AP_IP = os.environ.get('AP_IP', '192.168.4.1')
     AP_PORT = int(os.environ.get('AP_PORT', '12346'))
+    # Birden fazla AP: AP_HOSTS=192.168.4.1,10.0.0.2:12400
+    AP_HOSTS = parse_ap_list(os.environ.get('AP_HOSTS', '{}:{}'.format(AP_IP, AP_PORT)), AP_PORT)
 
     print('=' * 60)
     print('       Wi-Fi RSSI/RTT Monitor - Web Dashboard')
     print('=' * 60)
     print()
-    print(f'  AP Baglanti: {AP_IP}:{AP_PORT}')
+    for host, port in AP_HOSTS:
+        print(f'  AP Baglanti: {host}:{port}')
     print(f'  Web Arayuz:  http://localhost:5001')
     print()
     print('  Kapatmak icin: Ctrl+C')
     print('=' * 60)
     print()
 
-    client = APSocketClient(AP_IP, AP_PORT)
+    client = AsyncAPClient(AP_HOSTS)
     set_client(client)
-
-    client_thread = threading.Thread(target=client.start, daemon=True)
-    client_thread.start()
+    client.start()
 
     try:
         socketio.run(
@@ -2,20 +2,32 @@ import threading
 import time
 import os
 import sys
-import csv
-from collections import deque
+from collections import deque, namedtuple
+from functools import partial
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ml.predictor import ConnectionPredictor
+from ml.predictor import ConnectionPredictor, warm_up_model
+from ml.stats import OnlineStats
+from protocol import valid_device_id
+from storage import open_background_store, CSV_HEADERS, STORAGE_BACKENDS
+from storage.history import MeasurementHistory, FLAG_PACKET_LOSS, FLAG_WARNING
+from storage.rollup import Rollups, rebucket, bucket_result
+from storage.timeseries import TimeSeriesIndex, HISTORY_POINTS, HISTORY_POINT_LIMIT
+from web.serialization import CachedJSON
+from web.metrics import get_metrics
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
 CSV_FILE = os.path.join(DATA_DIR, 'rssi_data.csv')
-CSV_HEADERS = ['session_id', 'timestamp', 'unix_time', 'measurement_id', 'event_type',
-               'rssi', 'rtt', 'latency', 'quality', 'quality_score', 'disconnect_duration']
+COLUMNAR_DIR = os.path.join(DATA_DIR, 'columnar')
 
 ML_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ml', 'model.pkl')
+# 1: ML tahmini inference thread'inde (kurallar hemen uygulanir), 0: olcum
+# thread'inde senkron
+ML_ASYNC = os.environ.get('RSSI_ML_ASYNC', '1') != '0'
+# model.pkl degisince yeni model yeniden baslatmadan devreye alinir
+ML_RELOAD = os.environ.get('RSSI_MODEL_RELOAD', '1') != '0'
 
 
 def get_signal_quality(rssi):
@@ -42,32 +54,75 @@ def get_quality_score(quality):
     return scores.get(quality, -1)
 
 
-class DataManager:
+DEFAULT_DEVICE = 'default'
 
-    _instance = None
-    _lock = threading.Lock()
+# Bellekte tutulan son olcum sayisi (grafikler)
+HISTORY_SIZE = 300
 
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+# Zaman araligi verilmeyen gecmis sorgularinda varsayilan pencere (s)
+HISTORY_WINDOW = 3600
 
-    def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
 
-        self.data_lock = threading.Lock()
+# Okuyucularin gordugu degismez oturum durumu. Olcum thread'i her degisiklikte
+# yenisini olusturup tek atamayla yayinlar; okuyucular kilit almaz.
+SessionState = namedtuple('SessionState', [
+    'version', 'connection_status', 'current_rssi', 'current_rtt', 'current_latency',
+    'current_quality', 'measurement_count', 'last_seen', 'stats', 'quality_distribution',
+    'issues', 'warnings', 'warning_counts', 'predictor', 'history'
+])
 
-        self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+def history_range(args):
+    # from/to (unix saniye), resolution (saniye) ve points parametrelerini
+    # cozer; gecersiz degerde ValueError firlatir.
+    t_to = float(args['to']) if args.get('to') not in (None, '') else time.time()
+    t_from = float(args['from']) if args.get('from') not in (None, '') else t_to - HISTORY_WINDOW
+    resolution = args.get('resolution')
+    resolution = float(resolution) if resolution not in (None, '', 'auto') else None
+    points = int(args['points']) if args.get('points') not in (None, '') else HISTORY_POINTS
+
+    if t_from > t_to:
+        raise ValueError('from, to degerinden buyuk olamaz')
+    if resolution is not None and resolution <= 0:
+        raise ValueError('resolution pozitif olmali')
+    if not 3 <= points <= HISTORY_POINT_LIMIT:
+        raise ValueError('points 3-{} arasinda olmali'.format(HISTORY_POINT_LIMIT))
+    return t_from, t_to, resolution, points
+
+
+class DeviceSession:
+
+    # Tek bir LoPy4 istemcisinin oturum durumu: gecmis, istatistikler,
+    # kayip takibi ve tahminleyici. Degisiklikler (olcum, baglanti durumu)
+    # cihazin data_lock'u altinda yapilir ve sonunda self.state yeni bir
+    # SessionState ile degistirilir. Okuma yollari (API, Socket.IO, yayin
+    # zamanlayicisi) sadece self.state'i okur; olcum thread'ini beklemez,
+    # onu da bekletmez.
+
+    def __init__(self, device_id, session_id, store, on_warning=None):
+        self.device_id = device_id
+        self.session_id = session_id
+        self.store = store
+        # Olcumden sonra gelen (arka plan ML) uyarilar: on_warning(cihaz, uyari)
+        self.on_warning = on_warning
         self.start_time = time.time()
 
-        self.rssi_history = deque(maxlen=300)
-        self.rtt_history = deque(maxlen=300)
-        self.time_history = deque(maxlen=300)
+        # Yazicilari siralar; okuyucular almaz
+        self.data_lock = threading.Lock()
+        # Ozet katmanlari yerinde guncellenir; sadece rollups.add ve aralik
+        # secimi sirasinda tutulur
+        self.rollup_lock = threading.Lock()
+        # Olcum hatti asama sureleri (lock_wait, predict, store, stats)
+        self.metrics = get_metrics()
+
+        # Her durum degisikliginde artar; onbellekteki JSON goruntuleri
+        # (get_current_snapshot vb.) bu surume gore yenilenir
+        self.version = 0
+        self.snapshots = {}
+        self.snapshot_lock = threading.Lock()
+
+        # Son HISTORY_SIZE olcum; grafik ve parametresiz /api/history icin
+        self.history = MeasurementHistory(HISTORY_SIZE)
 
         self.current_rssi = None
         self.current_rtt = None
@@ -75,10 +130,13 @@ class DataManager:
         self.current_quality = None
         self.connection_status = 'DISCONNECTED'
         self.measurement_count = 0
+        self.last_seen = None
 
-        self.rssi_values = []
-        self.rtt_values = []
-        self.latency_values = []
+        self.rssi_stats = OnlineStats()
+        self.rtt_stats = OnlineStats()
+        self.latency_stats = OnlineStats()
+        # Grafik sorgulari icin 10s/1m/10m/1h min/maks/ortalama ozetleri
+        self.rollups = Rollups()
         self.quality_counts = {
             'Mükemmel': 0,
             'İyi': 0,
@@ -100,51 +158,59 @@ class DataManager:
             'KRITIK': 0
         }
 
-        self.predictor = ConnectionPredictor(model_path=ML_MODEL_PATH)
-
-        self._init_csv()
-
-        print('[DataManager] Baslatildi - Session:', self.session_id)
-
-    def _init_csv(self):
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
-
-        file_exists = os.path.exists(CSV_FILE)
-        self.csv_file = open(CSV_FILE, 'a', newline='', encoding='utf-8')
-        self.csv_writer = csv.writer(self.csv_file)
-
-        if not file_exists:
-            self.csv_writer.writerow(CSV_HEADERS)
-            self.csv_file.flush()
+        self.predictor = ConnectionPredictor(model_path=ML_MODEL_PATH, background=True, watch=ML_RELOAD)
+
+        self.state = None
+        self._publish(warnings_changed=True)
+
+    def _publish(self, warnings_changed=False):
+        # data_lock altinda cagrilir. Yeni durumdaki sozluk ve diziler bir
+        # daha degistirilmez; degismeyen uyari listesi onceki durumdan aynen
+        # devralinir.
+        warnings = tuple(self.warnings) if warnings_changed else self.state.warnings
+        self.state = SessionState(
+            version=self.version,
+            connection_status=self.connection_status,
+            current_rssi=self.current_rssi,
+            current_rtt=self.current_rtt,
+            current_latency=self.current_latency,
+            current_quality=self.current_quality,
+            measurement_count=self.measurement_count,
+            last_seen=self.last_seen,
+            stats={
+                'rssi': self.calculate_stats(self.rssi_stats),
+                'rtt': self.calculate_stats(self.rtt_stats),
+                'latency': self.calculate_stats(self.latency_stats)
+            },
+            quality_distribution=dict(self.quality_counts),
+            issues=self._get_issues(),
+            warnings=warnings,
+            warning_counts=dict(self.warning_counts),
+            predictor=self.predictor.get_status(inference=False),
+            history=self.history.copy()
+        )
+
+    def has_data(self):
+        return self.state.last_seen is not None
 
     def _write_csv_row(self, measurement_id, event_type, rssi=None, rtt=None,
-                       latency=None, quality=None, disconnect_duration=None):
-        now = datetime.now()
-        timestamp = now.isoformat(timespec='milliseconds')
-        unix_time = time.time()
-        quality_score = get_quality_score(quality) if quality else ''
-
-        row = [
-            self.session_id,
-            timestamp,
-            unix_time,
-            measurement_id if measurement_id else '',
-            event_type,
-            rssi if rssi is not None else '',
-            rtt if rtt is not None else '',
-            latency if latency is not None else '',
-            quality if quality else '',
-            quality_score if quality_score != -1 else '',
-            disconnect_duration if disconnect_duration is not None else ''
-        ]
-
-        self.csv_writer.writerow(row)
-        self.csv_file.flush()
-
-    def add_measurement(self, rssi, rtt, count):
+                       latency=None, quality=None, disconnect_duration=None, unix_time=None):
+        quality_score = get_quality_score(quality) if quality else None
+
+        self.store.append(self.session_id, time.time() if unix_time is None else unix_time,
+                          measurement_id, event_type,
+                          rssi=rssi, rtt=rtt, latency=latency, quality=quality,
+                          quality_score=quality_score, disconnect_duration=disconnect_duration)
+
+    def add_measurement(self, rssi, rtt, count, unix_time=None):
+        # unix_time: AP'nin olcumu aldigi an (AP tick damgasindan); yoksa alinma zamani
+        stages = self.metrics.stages
+        start = time.perf_counter()
         with self.data_lock:
-            timestamp = datetime.now().isoformat(timespec='milliseconds')
+            stages['lock_wait'].observe(time.perf_counter() - start)
+            self.version += 1
+            self.last_seen = time.time() if unix_time is None else unix_time
+            timestamp = datetime.fromtimestamp(self.last_seen).isoformat(timespec='milliseconds')
             latency = rtt // 2
             quality = get_signal_quality(rssi)
             quality_score = get_quality_score(quality)
@@ -160,21 +226,22 @@ class DataManager:
             self.current_quality = quality
             self.measurement_count = count
 
-            self.rssi_history.append({'time': timestamp, 'value': rssi})
-            self.rtt_history.append({'time': timestamp, 'value': rtt})
-            self.time_history.append(timestamp)
-
-            self.rssi_values.append(rssi)
-            self.rtt_values.append(rtt)
-            self.latency_values.append(latency)
+            self.rssi_stats.add(rssi)
+            self.rtt_stats.add(rtt)
+            self.latency_stats.add(latency)
             self.quality_counts[quality] = self.quality_counts.get(quality, 0) + 1
+            with self.rollup_lock:
+                self.rollups.add(self.last_seen, rssi, rtt, latency)
 
+            start = time.perf_counter()
             prediction = self.predictor.predict(
                 rssi=rssi,
                 rtt=rtt,
                 latency=latency,
-                quality_score=quality_score
+                quality_score=quality_score,
+                on_ml_result=partial(self._merge_ml_result, timestamp) if ML_ASYNC else None
             )
+            stages['predict'].observe(time.perf_counter() - start)
 
             warning_data = None
             if prediction['warning_level'] > 0:
@@ -187,8 +254,16 @@ class DataManager:
                 self.warnings.appendleft(warning_data)
                 self._update_warning_counts(prediction['warning_level'])
 
+            flags = (FLAG_PACKET_LOSS if packet_loss else 0) | (FLAG_WARNING if warning_data else 0)
+            self.history.append(self.last_seen, rssi, rtt, latency, quality_score, flags)
+
+            start = time.perf_counter()
             self._write_csv_row(count, 'DATA', rssi=rssi, rtt=rtt,
-                               latency=latency, quality=quality)
+                               latency=latency, quality=quality, unix_time=self.last_seen)
+            stored = time.perf_counter()
+            self._publish(warnings_changed=warning_data is not None)
+            stages['store'].observe(stored - start)
+            stages['stats'].observe(time.perf_counter() - stored)
 
             return {
                 'rssi': rssi,
@@ -202,18 +277,55 @@ class DataManager:
                 'warning': warning_data
             }
 
-    def _update_warning_counts(self, warning_level):
+    def _merge_ml_result(self, timestamp, prediction):
+        # Inference thread'inden, ML kural seviyesini yukselttiginde cagrilir.
+        # Kurallar ayni olcumde uyardiysa o uyari yerinde yukseltilir (kural
+        # ve ML mesajlari birlikte); sayaclarda her olcum son seviyesiyle bir
+        # kez yer alir, predictor'un warnings_given'i ile ayni
+        rule_level = prediction['rule_level']
+        with self.data_lock:
+            self.version += 1
+            index = None
+            messages = prediction['messages']
+            if rule_level > 0:
+                for i, warning in enumerate(self.warnings):
+                    if warning['timestamp'] == timestamp and warning['source'] != 'system':
+                        index = i
+                        messages = warning['messages'] + messages
+                        break
+                self._update_warning_counts(rule_level, -1)
+
+            warning_data = {
+                'timestamp': timestamp,
+                'level': prediction['warning_level'],
+                'messages': messages,
+                'source': prediction['source']
+            }
+            # Yayinlanmis durumlar eski sozlugu tutar; yerine yenisi konur
+            if index is None:
+                self.warnings.appendleft(warning_data)
+            else:
+                self.warnings[index] = warning_data
+            self._update_warning_counts(prediction['warning_level'])
+            self._publish(warnings_changed=True)
+
+        if self.on_warning is not None:
+            self.on_warning(self.device_id, warning_data)
+
+    def _update_warning_counts(self, warning_level, delta=1):
         if warning_level == 4:
-            self.warning_counts['KRITIK'] += 1
+            self.warning_counts['KRITIK'] += delta
         elif warning_level == 3:
-            self.warning_counts['UYARI'] += 1
+            self.warning_counts['UYARI'] += delta
         elif warning_level == 2:
-            self.warning_counts['DIKKAT'] += 1
+            self.warning_counts['DIKKAT'] += delta
         elif warning_level == 1:
-            self.warning_counts['BILGI'] += 1
+            self.warning_counts['BILGI'] += delta
 
     def set_disconnected(self):
         with self.data_lock:
+            self.version += 1
+            self.last_seen = time.time()
             self.connection_status = 'DISCONNECTED'
             self.disconnects += 1
             self.last_disconnect_time = time.time()
@@ -229,6 +341,7 @@ class DataManager:
             }
             self.warnings.appendleft(warning_data)
             self._update_warning_counts(4)
+            self._publish(warnings_changed=True)
 
             return {
                 'status': 'DISCONNECTED',
@@ -239,6 +352,8 @@ class DataManager:
 
     def set_connected(self):
         with self.data_lock:
+            self.version += 1
+            self.last_seen = time.time()
             duration = None
             if self.last_disconnect_time:
                 duration = time.time() - self.last_disconnect_time
@@ -249,6 +364,7 @@ class DataManager:
             timestamp = datetime.now().isoformat(timespec='milliseconds')
 
             self._write_csv_row(None, 'CONNECTED', disconnect_duration=duration)
+            self._publish()
 
             return {
                 'status': 'CONNECTED',
@@ -269,61 +385,300 @@ class DataManager:
         else:
             return '{:02d}:{:02d}'.format(minutes, seconds)
 
-    def calculate_stats(self, values):
-        if not values:
-            return {'min': 0, 'max': 0, 'avg': 0, 'std': 0, 'median': 0}
+    def calculate_stats(self, stats):
+        summary = stats.summary()
+
+        return {
+            'min': summary['min'],
+            'max': summary['max'],
+            'avg': round(summary['avg'], 1),
+            'std': round(summary['std'], 2),
+            'median': round(summary['median'], 1)
+        }
+
+    def _get_issues(self):
+        total_measurements = len(self.rssi_stats) + self.lost_packets
+        return {
+            'packet_loss': self.lost_packets,
+            'packet_loss_rate': round(self.lost_packets / total_measurements * 100, 2) if total_measurements > 0 else 0,
+            'disconnects': self.disconnects,
+            'total_downtime': round(sum(self.disconnect_durations), 1) if self.disconnect_durations else 0,
+            'avg_disconnect': round(sum(self.disconnect_durations) / len(self.disconnect_durations), 1) if self.disconnect_durations else 0
+        }
 
-        n = len(values)
-        sorted_vals = sorted(values)
-        avg = sum(values) / n
-        variance = sum((x - avg) ** 2 for x in values) / n
-        std = variance ** 0.5
-        median = sorted_vals[n // 2] if n % 2 == 1 else (sorted_vals[n // 2 - 1] + sorted_vals[n // 2]) / 2
+    def get_stats_snapshot(self, state=None):
+        # stats_update olayinin tam hali; yayin zamanlayicisi bunun farkini gonderir
+        state = state or self.state
+        return {
+            'quality_distribution': state.quality_distribution,
+            'warning_counts': state.warning_counts,
+            'stats': state.stats,
+            'issues': state.issues
+        }
 
+    def get_current_data(self, state=None):
+        state = state or self.state
         return {
-            'min': min(values),
-            'max': max(values),
-            'avg': round(avg, 1),
-            'std': round(std, 2),
-            'median': round(median, 1)
+            'device': self.device_id,
+            'session_id': self.session_id,
+            # Sure istemcide start_time'dan hesaplanir; govde yalnizca yeni
+            # veriyle degisir, ETag saniyede bir eskimez
+            'start_time': self.start_time,
+            'connection_status': state.connection_status,
+            'current': {
+                'rssi': state.current_rssi,
+                'rtt': state.current_rtt,
+                'latency': state.current_latency,
+                'quality': state.current_quality,
+                'count': state.measurement_count
+            },
+            'stats': state.stats,
+            'quality_distribution': state.quality_distribution,
+            'issues': state.issues,
+            'warnings': list(state.warnings),
+            'warning_counts': state.warning_counts,
+            'predictor': state.predictor,
+            'chart_data': self.history.points('rssi', 'rtt', records=state.history)
+        }
+
+    def query_rollups(self, t_from, t_to, resolution=None, max_points=HISTORY_POINTS):
+        # Aralik bellekteki ozet katmanlarindan karsilanabiliyorsa sonuc,
+        # karsilanamiyorsa (cok ince cozunurluk ya da bu oturumdan onceki
+        # zaman) None doner.
+        target = resolution or max(t_to - t_from, 1e-3) / max_points
+        with self.rollup_lock:
+            level = self.rollups.pick_tier(target, t_from, exact=resolution is not None)
+            if level is None:
+                return None
+            times, counts, values = self.rollups.select(level, t_from, t_to)
+
+        # Kopyalar uzerinde; kilit disinda
+        tier = self.rollups.tiers[level]
+        if resolution is not None and resolution > tier.width:
+            times, counts, values = rebucket(times, counts, values, resolution)
+
+        result = {
+            'device': self.device_id,
+            'from': t_from,
+            'to': t_to,
+            'resolution': resolution or tier.width,
+            'source': tier.name,
+            'rows': int(counts.sum())
         }
+        result.update(bucket_result(times, counts, values, max_points))
+        return result
+
+    def _cached(self, name, key, build):
+        # Surum degismediyse ayni CachedJSON doner; degistiyse sadece bir
+        # thread yeniden olusturur, digerleri onu bekleyip paylasir. build
+        # anahtarin alindigi durumla cagrilir; arada gelen olcum karismaz.
+        snapshot = self.snapshots.get(name)
+        if snapshot is not None and snapshot.key == key:
+            return snapshot
+
+        with self.snapshot_lock:
+            snapshot = self.snapshots.get(name)
+            if snapshot is None or snapshot.key != key:
+                etag = '{}-{}-{}'.format(self.session_id, name, '-'.join(str(k) for k in key))
+                snapshot = CachedJSON(build(), key=key, etag=etag)
+                self.snapshots[name] = snapshot
+            return snapshot
+
+    def get_current_snapshot(self):
+        state = self.state
+        return self._cached('current', (state.version,), lambda: self.get_current_data(state))
+
+    def get_stats_snapshot_cached(self):
+        state = self.state
+        return self._cached('stats', (state.version,), lambda: self.get_stats_snapshot(state))
+
+    def get_history_snapshot(self):
+        state = self.state
+        return self._cached('history', (state.version,),
+                            lambda: self.history.points('rssi', 'rtt', records=state.history))
 
-    def get_current_data(self):
+    def close(self):
         with self.data_lock:
-            return {
-                'session_id': self.session_id,
-                'duration': self.get_duration_formatted(),
-                'duration_seconds': self.get_session_duration(),
-                'connection_status': self.connection_status,
-                'current': {
-                    'rssi': self.current_rssi,
-                    'rtt': self.current_rtt,
-                    'latency': self.current_latency,
-                    'quality': self.current_quality,
-                    'count': self.measurement_count
-                },
-                'stats': {
-                    'rssi': self.calculate_stats(self.rssi_values),
-                    'rtt': self.calculate_stats(self.rtt_values),
-                    'latency': self.calculate_stats(self.latency_values)
-                },
-                'quality_distribution': dict(self.quality_counts),
-                'issues': {
-                    'packet_loss': self.lost_packets,
-                    'packet_loss_rate': round(self.lost_packets / (len(self.rssi_values) + self.lost_packets) * 100, 2) if (len(self.rssi_values) + self.lost_packets) > 0 else 0,
-                    'disconnects': self.disconnects,
-                    'total_downtime': round(sum(self.disconnect_durations), 1) if self.disconnect_durations else 0,
-                    'avg_disconnect': round(sum(self.disconnect_durations) / len(self.disconnect_durations), 1) if self.disconnect_durations else 0
-                },
-                'warnings': list(self.warnings),
-                'warning_counts': dict(self.warning_counts),
-                'predictor': self.predictor.get_status(),
-                'chart_data': {
-                    'rssi': list(self.rssi_history),
-                    'rtt': list(self.rtt_history)
-                }
-            }
+            self.on_warning = None
+            self.predictor.close()
+
+    def get_summary(self):
+        state = self.state
+        return {
+            'device': self.device_id,
+            'session_id': self.session_id,
+            'connection_status': state.connection_status,
+            'measurement_count': state.measurement_count,
+            'current_rssi': state.current_rssi,
+            'lost_packets': state.issues['packet_loss'],
+            'disconnects': state.issues['disconnects'],
+            'last_seen': state.last_seen
+        }
+
+
+class DataManager:
+
+    # Cihaz kayit defteri. Her cihaz (DATA: satirindaki 4. alan) icin ayri
+    # bir DeviceSession tutulur; disk yazicisi ve oturum zamani ortaktir.
+    # Cihaz kimligi gondermeyen eski istemciler DEFAULT_DEVICE altinda toplanir.
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.registry_lock = threading.Lock()
+
+        self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.start_time = time.time()
+
+        self._init_csv()
+
+        # Ilk olcumu beklemeden model arka planda yuklenmeye baslar
+        if ML_MODEL_PATH:
+            warm_up_model(ML_MODEL_PATH, watch=ML_RELOAD)
+
+        # Olcumden sonra uretilen uyarilari dinleyenler (Socket.IO yayini)
+        self.warning_listeners = []
+
+        self.devices = {}
+        self.devices[DEFAULT_DEVICE] = DeviceSession(DEFAULT_DEVICE, self.session_id, self.store,
+                                                     on_warning=self._notify_warning)
+        # Cihaz belirtmeyen tarayici ve API istekleri bu cihazi gosterir
+        self.primary_device_id = DEFAULT_DEVICE
+
+        print('[DataManager] Baslatildi - Session:', self.session_id)
+
+    def _init_csv(self):
+        if not os.path.exists(DATA_DIR):
+            os.makedirs(DATA_DIR)
+
+        # Zaman araligi gecmisi kolonlu oturum dosyalarindan okundugu icin
+        # kolonlu kayit RSSI_STORAGE'dan bagimsiz olarak her zaman acik
+        backends = [b.strip() for b in STORAGE_BACKENDS.split(',') if b.strip()]
+        if 'columnar' not in backends:
+            backends.append('columnar')
+
+        # Disk yazimi arka plan thread'inde toplu yapilir; data_lock altinda
+        # sadece kuyruga ekleme kalir.
+        self.store = open_background_store(','.join(backends), csv_file=CSV_FILE, columnar_dir=COLUMNAR_DIR)
+        self.timeseries = TimeSeriesIndex(COLUMNAR_DIR, default_device=DEFAULT_DEVICE)
+
+    def _device_session_id(self, device_id):
+        if device_id == DEFAULT_DEVICE:
+            return self.session_id
+        return '{}_{}'.format(self.session_id, device_id)
+
+    def get_device(self, device_id=None):
+        # Olcum tarafi: cihaz yoksa olusturulur
+        device_id = device_id or DEFAULT_DEVICE
+        device = self.devices.get(device_id)
+        if device is not None:
+            return device
+
+        # Kimlik oturum dosyasi adina girer; alimda dogrulanmayan kimlik
+        # buraya ulasirsa da dosya acilmaz
+        if not valid_device_id(device_id):
+            raise ValueError('Gecersiz cihaz kimligi: {!r}'.format(device_id[:40]))
+
+        with self.registry_lock:
+            device = self.devices.get(device_id)
+            if device is None:
+                device = DeviceSession(device_id, self._device_session_id(device_id), self.store,
+                                       on_warning=self._notify_warning)
+                self.devices[device_id] = device
+
+                # Hic veri almamis varsayilan cihaz ilk gercek cihaza yerini birakir
+                default = self.devices.get(DEFAULT_DEVICE)
+                if self.primary_device_id == DEFAULT_DEVICE and default is not None and not default.has_data():
+                    del self.devices[DEFAULT_DEVICE]
+                    self.primary_device_id = device_id
+                    # Her yazim last_seen'i ayarladigindan veri almamis
+                    # oturum dosya acmamistir; tahminleyicisi birakilir
+                    default.close()
+
+                print('[DataManager] Yeni cihaz:', device_id)
+            return device
+
+    def add_warning_listener(self, callback):
+        self.warning_listeners.append(callback)
+
+    def _notify_warning(self, device_id, warning_data):
+        for callback in list(self.warning_listeners):
+            try:
+                callback(device_id, warning_data)
+            except Exception as e:
+                print('[DataManager] Uyari dinleyici hatasi:', e)
+
+    def find_device(self, device_id=None):
+        # Okuma tarafi: bilinmeyen cihaz icin None doner
+        return self.devices.get(device_id or self.primary_device_id)
+
+    def list_devices(self):
+        return [device.get_summary() for device in list(self.devices.values())]
+
+    def add_measurement(self, rssi, rtt, count, device_id=None, unix_time=None):
+        return self.get_device(device_id).add_measurement(rssi, rtt, count, unix_time)
+
+    def set_disconnected(self, device_id=None):
+        return self.get_device(device_id).set_disconnected()
+
+    def set_connected(self, device_id=None):
+        return self.get_device(device_id).set_connected()
+
+    def get_current_data(self, device_id=None):
+        # Bilinmeyen cihaz icin find_device gibi None doner (API 404 verir,
+        # Socket.IO olay gondermez)
+        device = self.find_device(device_id)
+        return device.get_current_data() if device is not None else None
+
+    def get_stats_snapshot(self, device_id=None):
+        device = self.find_device(device_id)
+        return device.get_stats_snapshot() if device is not None else None
+
+    def query_history(self, device_id=None, t_from=None, t_to=None, resolution=None, max_points=HISTORY_POINTS):
+        # Once cihazin bellekteki ozet katmanlari denenir; aralik onlarla
+        # karsilanamazsa diskteki tum oturumlardan okunur (son RSSI_FLUSH_MS
+        # icindeki olcumler henuz yazilmamis olabilir).
+        device_id = device_id or self.primary_device_id
+        t_to = time.time() if t_to is None else t_to
+        t_from = t_to - HISTORY_WINDOW if t_from is None else t_from
+        if resolution is not None:
+            resolution = max(resolution, max(t_to - t_from, 1e-3) / HISTORY_POINT_LIMIT)
+
+        device = self.devices.get(device_id)
+        if device is not None:
+            result = device.query_rollups(t_from, t_to, resolution, max_points)
+            if result is not None:
+                return result
+        return self.timeseries.query(device_id, t_from, t_to, resolution, max_points)
+
+    def get_session_duration(self):
+        return time.time() - self.start_time
+
+    def get_duration_formatted(self):
+        duration = self.get_session_duration()
+        hours = int(duration // 3600)
+        minutes = int((duration % 3600) // 60)
+        seconds = int(duration % 60)
+        if hours > 0:
+            return '{:02d}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+        else:
+            return '{:02d}:{:02d}'.format(minutes, seconds)
 
     def close(self):
-        if hasattr(self, 'csv_file') and self.csv_file:
-            self.csv_file.close()
+        for device in list(getattr(self, 'devices', {}).values()):
+            device.close()
+        if hasattr(self, 'store') and self.store:
+            self.store.close()
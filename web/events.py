@@ -1,37 +1,59 @@
 from flask import request
+from flask_socketio import join_room
 from . import socketio
-from .data_manager import DataManager
+from .data_manager import DataManager, history_range
+from .socket_client import get_broadcaster
+
+
+def _selected_device():
+    # Tarayici ?device=<id> ile baglanir; belirtilmezse ana cihaz izlenir
+    return request.args.get('device') or None
 
 
 @socketio.on('connect')
 def handle_connect():
     print('[SocketIO] Tarayici baglandi:', request.sid)
 
-    dm = DataManager()
-    current_data = dm.get_current_data()
-    socketio.emit('initial_data', current_data, room=request.sid)
+    device_id = _selected_device()
+    join_room('device:' + device_id if device_id else 'primary')
+
+    device = DataManager().find_device(device_id)
+    if device is not None:
+        socketio.emit('initial_data', device.get_current_snapshot(), room=request.sid)
+    get_broadcaster().add_client(request.sid, device_id)
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     print('[SocketIO] Tarayici ayrildi:', request.sid)
+    get_broadcaster().remove_client(request.sid)
 
 
 @socketio.on('request_stats')
 def handle_request_stats():
-    dm = DataManager()
-    current_data = dm.get_current_data()
-    socketio.emit('stats_update', current_data, room=request.sid)
+    device = DataManager().find_device(_selected_device())
+    if device is None:
+        return
+    socketio.emit('stats_update', device.get_current_snapshot(), room=request.sid)
 
 
 @socketio.on('request_history')
-def handle_request_history():
-    dm = DataManager()
-    current_data = dm.get_current_data()
-    socketio.emit('history_data', {
-        'rssi': current_data['chart_data']['rssi'],
-        'rtt': current_data['chart_data']['rtt']
-    }, room=request.sid)
+def handle_request_history(data=None):
+    # {from, to, resolution} verilirse diskteki zaman indeksinden okunur
+    if data:
+        try:
+            t_from, t_to, resolution, points = history_range(data)
+        except (AttributeError, TypeError, ValueError) as e:
+            socketio.emit('history_error', {'error': str(e)}, room=request.sid)
+            return
+        result = DataManager().query_history(_selected_device(), t_from, t_to, resolution, points)
+        socketio.emit('history_data', result, room=request.sid)
+        return
+
+    device = DataManager().find_device(_selected_device())
+    if device is None:
+        return
+    socketio.emit('history_data', device.get_history_snapshot(), room=request.sid)
 
 
 @socketio.on('ping')
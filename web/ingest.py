@@ -0,0 +1,244 @@
+import asyncio
+import queue
+import socket
+import threading
+import time
+
+from protocol import ApClock, StreamDecoder, FORMAT_REQUEST, REQUEST_BINARY
+
+from . import socketio
+from .data_manager import DEFAULT_DEVICE
+from .socket_client import APSocketClient
+
+# AP mesajlarinin bekledigi kuyruk; doluysa okuma durur (TCP geri basinci)
+INGEST_QUEUE_SIZE = 10000
+LINE_LIMIT = 4096
+READ_SIZE = 65536
+
+
+def parse_ap_list(value, default_port=12346):
+    # "192.168.4.1,10.0.0.2:12400" -> [('192.168.4.1', 12346), ('10.0.0.2', 12400)]
+    addresses = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(':')
+        addresses.append((host, int(port) if port else default_port))
+    return addresses
+
+
+class APConnection:
+
+    # Tek bir AP baglantisinin durumu ve sayaclari
+
+    def __init__(self, host, port, default_device):
+        self.host = host
+        self.port = port
+        self.default_device = default_device
+        self.clock = ApClock()
+        self.decoder = StreamDecoder(max_line=LINE_LIMIT)
+        self.connected = False
+        # Cozulen mesaj (DATA, STATUS, OVERFLOW) sayisi; satir ve cerceve
+        # sayilari 'stream' altindadir
+        self.events = 0
+        self.connects = 0
+        self.backoff = 0
+        self.last_error = None
+
+    def get_status(self):
+        return {
+            'host': self.host,
+            'port': self.port,
+            'connected': self.connected,
+            'events': self.events,
+            'stream': self.decoder.get_stats(),
+            'connects': self.connects,
+            'backoff': self.backoff,
+            'last_error': self.last_error
+        }
+
+
+class AsyncAPClient(APSocketClient):
+
+    # Birden fazla AP'ye asyncio ile ayni anda baglanir. Her AP kendi
+    # gorevinde buyuk parcalar halinde okunup kendi StreamDecoder'i ile
+    # mesajlara ayrilir ve kendi geri cekilme suresiyle yeniden baglanir.
+    # Mesajlar sinirli bir kuyruk
+    # uzerinden tek bir isleyici thread'ine aktarilir; boylece olcum isleme
+    # (tahmin, istatistik, Socket.IO yayini) event loop'u bloklamaz ve her
+    # cihazin satir sirasi korunur.
+
+    def __init__(self, addresses, max_queue=INGEST_QUEUE_SIZE):
+        host, port = addresses[0]
+        super().__init__(host, port)
+
+        # Cihaz kimligi gondermeyen eski AP yazilimi: tek AP'de 'default',
+        # birden fazla AP'de her AP ayri cihaz sayilir
+        single = len(addresses) == 1
+        self.connections = [
+            APConnection(h, p, DEFAULT_DEVICE if single else '{}:{}'.format(h, p))
+            for h, p in addresses
+        ]
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_queue = max_queue
+        self.max_queue_depth = 0
+        self.queue_full_waits = 0
+        self.processed = 0
+        self.errors = 0
+
+        self._loop = None
+        self._tasks = []
+        self._worker = None
+
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self._worker = threading.Thread(target=self._process_queue, name='IngestWorker', daemon=True)
+        self._worker.start()
+        self._thread = threading.Thread(target=self._run_loop, name='AsyncAPClient', daemon=True)
+        self._thread.start()
+        print('[AsyncAPClient] {} AP icin baslatildi'.format(len(self.connections)))
+
+    def stop(self):
+        self.running = False
+        for device_id in list(self.disconnected_devices):
+            self._stop_alarm(device_id)
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel_tasks)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+        # Kuyrukta kalan mesajlar islenir
+        self.queue.put(None)
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+        print('[AsyncAPClient] Durduruldu')
+
+    def _cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._tasks = [asyncio.ensure_future(self._ap_loop(conn)) for conn in self.connections]
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _ap_loop(self, conn):
+        backoff = 1
+        max_backoff = 30
+
+        while self.running:
+            try:
+                await self._connect_and_read(conn)
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                conn.last_error = str(e)
+                print('[AsyncAPClient] {}:{} hata: {}'.format(conn.host, conn.port, e))
+                socketio.emit('connection_error', {'host': conn.host, 'port': conn.port, 'error': str(e)})
+
+            if self.running:
+                conn.backoff = backoff
+                print('[AsyncAPClient] {}:{} {} saniye sonra tekrar deneniyor...'.format(conn.host, conn.port, backoff))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+
+    async def _connect_and_read(self, conn):
+        print('[AsyncAPClient] Baglaniyor: {}:{}'.format(conn.host, conn.port))
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(conn.host, conn.port, limit=READ_SIZE), timeout=5)
+
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            # AP sadece degisiklikte yazar; olu baglanti keepalive ile anlasilir
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        conn.connected = True
+        conn.clock = ApClock()
+        conn.decoder = StreamDecoder(max_line=LINE_LIMIT)
+        if REQUEST_BINARY:
+            writer.write(FORMAT_REQUEST)
+        conn.connects += 1
+        conn.backoff = 0
+        self.metrics.counters['connects'] += 1
+        if conn.connects > 1:
+            self.metrics.counters['reconnects'] += 1
+        self._update_connected()
+        print('[AsyncAPClient] Baglanti kuruldu: {}:{}'.format(conn.host, conn.port))
+        socketio.emit('ap_connected', {'host': conn.host, 'port': conn.port})
+
+        try:
+            while self.running:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    print('[AsyncAPClient] Baglanti kapandi: {}:{}'.format(conn.host, conn.port))
+                    break
+
+                # LINE_LIMIT'i asan satir cozucude atlanir (errors sayaci)
+                received = time.time()
+                arrived = time.perf_counter()
+                for event in self._decode(conn.decoder, data, arrived):
+                    conn.events += 1
+                    item = (event, conn.default_device, conn.clock, received, arrived)
+                    try:
+                        self.queue.put_nowait(item)
+                    except queue.Full:
+                        # Isleyici yetismiyor: okuma beklerken AP'nin gonderimi
+                        # TCP penceresiyle yavaslar, mesaj dusurulmez
+                        self.queue_full_waits += 1
+                        self.metrics.counters['queue_full_waits'] += 1
+                        await asyncio.get_running_loop().run_in_executor(None, self.queue.put, item)
+
+                depth = self.queue.qsize()
+                if depth > self.max_queue_depth:
+                    self.max_queue_depth = depth
+        finally:
+            conn.connected = False
+            self._update_connected()
+            writer.close()
+            socketio.emit('ap_disconnected', {'host': conn.host, 'port': conn.port})
+
+    def _update_connected(self):
+        self.connected = any(conn.connected for conn in self.connections)
+
+    def _process_queue(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+
+            event, default_device, clock, received, arrived = item
+            self.metrics.stages['queue'].observe(time.perf_counter() - arrived)
+            try:
+                self._process_event(event, default_device, clock, received, arrived)
+                self.processed += 1
+            except Exception as e:
+                self.errors += 1
+                print('[AsyncAPClient] Isleme hatasi:', e)
+
+    def get_status(self):
+        status = super().get_status()
+        # Cozucu istatistikleri AP bazinda 'aps' altindadir
+        del status['stream']
+        status.update({
+            'aps': [conn.get_status() for conn in self.connections],
+            'queue_depth': self.queue.qsize(),
+            'queue_max': self.max_queue,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_full_waits': self.queue_full_waits,
+            'processed': self.processed,
+            'errors': self.errors
+        })
+        return status
@@ -0,0 +1,137 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.stats import LatencyHistogram
+from ml.predictor import PREDICT_STAGES
+
+# Olcum hattinin asamalari (AP'den gelen parcadan new_measurement yayinina):
+#   parse      okunan parcanin cozulmesi (parca basina)
+#   queue      AsyncAPClient'ta parcanin alinmasindan isleyicinin mesaji
+#              kuyruktan almasina
+#   lock_wait  cihazin data_lock'unu bekleme
+#   predict    ConnectionPredictor.predict (kural + ML ayrimi predictor'da)
+#   store      _write_csv_row (arka plan yazicisinin kuyruguna ekleme)
+#   stats      _publish (istatistik goruntusunun kurulmasi)
+#   emit       new_measurement Socket.IO yayini
+#   total      parcanin alinmasindan yayinin bitisine
+STAGES = ('parse', 'queue', 'lock_wait', 'predict', 'store', 'stats', 'emit', 'total')
+
+COUNTERS = (
+    ('measurements', 'Islenen DATA olcumleri'),
+    ('status_messages', 'Islenen STATUS mesajlari'),
+    ('emits', 'Olcum hattindan yapilan Socket.IO yayinlari'),
+    ('bytes', 'AP baglantilarindan okunan bayt'),
+    ('connects', 'Kurulan AP baglantilari'),
+    ('reconnects', 'Kopan baglantidan sonra yeniden kurulan AP baglantilari'),
+    ('decode_errors', 'Cozulemeyip atlanan AP mesajlari'),
+    ('ap_dropped', 'AP tamponu tastigi icin gonderilmeyen olcumler'),
+    ('queue_full_waits', 'Alim kuyrugu dolu oldugu icin bekleyen okumalar'),
+)
+
+PREFIX = 'rssi_'
+
+
+class PipelineMetrics:
+
+    # Olcum hatti asama sureleri (sabit kovali histogram) ve sayaclar. Her
+    # asama tek bir thread'de olculur (APSocketClient thread'i ya da
+    # AsyncAPClient'in event loop ve isleyici thread'leri); sayac ve kova
+    # artirimi kilitsizdir, okuyucular kopya uzerinden calisir. Sicak yol
+    # metod cagrisi yerine stages/counters sozluklerini dogrudan kullanir.
+
+    def __init__(self):
+        self.stages = {name: LatencyHistogram() for name in STAGES}
+        self.counters = dict.fromkeys(name for name, _ in COUNTERS)
+        self.clear()
+
+    def clear(self):
+        for histogram in self.stages.values():
+            histogram.clear()
+        for name in self.counters:
+            self.counters[name] = 0
+
+    def get_stats(self):
+        return {
+            'stages': {name: histogram.summary() for name, histogram in self.stages.items()},
+            'counters': dict(self.counters)
+        }
+
+
+_metrics = PipelineMetrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram_lines(name, label, histograms):
+    lines = []
+    for key, histogram in histograms.items():
+        labels = '{}="{}"'.format(label, key)
+        for bound, total in histogram.cumulative():
+            lines.append('{}_bucket{{{},le="{}"}} {}'.format(name, labels, _format(bound), total))
+        lines.append('{}_sum{{{}}} {}'.format(name, labels, _format(histogram.sum)))
+        lines.append('{}_count{{{}}} {}'.format(name, labels, histogram.count))
+    return lines
+
+
+def render_prometheus(metrics, devices=(), client=None):
+    # Prometheus metin bicimi (0.0.4). Tahmin asamalari tum cihazlarin
+    # histogramlari toplanarak tek seri olarak verilir.
+    lines = [
+        '# HELP {}pipeline_stage_seconds Olcum hatti asama sureleri'.format(PREFIX),
+        '# TYPE {}pipeline_stage_seconds histogram'.format(PREFIX),
+    ]
+    lines += _histogram_lines(PREFIX + 'pipeline_stage_seconds', 'stage', metrics.stages)
+
+    predict = {name: LatencyHistogram() for name in PREDICT_STAGES}
+    ml_dropped = 0
+    for device in devices:
+        predictor = device.predictor
+        for name, histogram in predictor.stage_latency.items():
+            predict[name].merge(histogram)
+        ml_dropped += predictor.ml_dropped
+
+    lines += [
+        '# HELP {}predict_stage_seconds Tahmin asama sureleri (kurallar, ML)'.format(PREFIX),
+        '# TYPE {}predict_stage_seconds histogram'.format(PREFIX),
+    ]
+    lines += _histogram_lines(PREFIX + 'predict_stage_seconds', 'stage', predict)
+
+    counters = dict(metrics.counters)
+    for name, description in COUNTERS:
+        lines += [
+            '# HELP {}{}_total {}'.format(PREFIX, name, description),
+            '# TYPE {}{}_total counter'.format(PREFIX, name),
+            '{}{}_total {}'.format(PREFIX, name, counters[name]),
+        ]
+    lines += [
+        '# HELP {}ml_dropped_total Suresi dolan ya da kuyruk dolu oldugu icin atilan ML tahminleri'.format(PREFIX),
+        '# TYPE {}ml_dropped_total counter'.format(PREFIX),
+        '{}ml_dropped_total {}'.format(PREFIX, ml_dropped),
+        '# HELP {}devices Kayitli cihaz sayisi'.format(PREFIX),
+        '# TYPE {}devices gauge'.format(PREFIX),
+        '{}devices {}'.format(PREFIX, len(devices)),
+    ]
+    if client is not None:
+        lines += [
+            '# HELP {}ap_connected AP baglantisi var mi (1/0)'.format(PREFIX),
+            '# TYPE {}ap_connected gauge'.format(PREFIX),
+            '{}ap_connected {}'.format(PREFIX, int(client.connected)),
+        ]
+        queue = getattr(client, 'queue', None)
+        if queue is not None:
+            lines += [
+                '# HELP {}ingest_queue_depth Alim kuyrugunda bekleyen mesajlar'.format(PREFIX),
+                '# TYPE {}ingest_queue_depth gauge'.format(PREFIX),
+                '{}ingest_queue_depth {}'.format(PREFIX, queue.qsize()),
+            ]
+    return '\n'.join(lines) + '\n'
@@ -1,6 +1,10 @@
-from flask import Blueprint, render_template, jsonify
-from .data_manager import DataManager
-from .socket_client import get_client
+import hashlib
+
+from flask import Blueprint, render_template, jsonify, request, abort, Response
+from .data_manager import DataManager, history_range
+from .socket_client import get_client, get_broadcaster
+from .serialization import dumps
+from .metrics import get_metrics, render_prometheus
 
 main_bp = Blueprint('main', __name__)
 
@@ -10,44 +14,100 @@ def dashboard():
     return render_template('dashboard.html')
 
 
+def _get_device():
+    # ?device=<id> verilmezse ana cihaz kullanilir
+    device = DataManager().find_device(request.args.get('device'))
+    if device is None:
+        abort(404, description='Bilinmeyen cihaz')
+    return device
+
+
+def _json_response(body, etag):
+    # If-None-Match ayni ETag'i tasiyorsa govdesiz 304 doner
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def _cached_response(snapshot):
+    return _json_response(snapshot.body, snapshot.etag)
+
+
 @main_bp.route('/api/stats')
 def get_stats():
-    dm = DataManager()
-    return jsonify(dm.get_current_data())
+    return _cached_response(_get_device().get_current_snapshot())
 
 
 @main_bp.route('/api/status')
 def get_status():
     dm = DataManager()
+    device = _get_device()
+    state = device.state
     client = get_client()
 
     return jsonify({
         'session': {
-            'id': dm.session_id,
+            'id': device.session_id,
+            'device': device.device_id,
             'duration': dm.get_duration_formatted(),
-            'measurement_count': dm.measurement_count
+            'measurement_count': state.measurement_count
         },
         'connection': {
             'ap_connected': client.connected if client else False,
-            'client_status': dm.connection_status
+            'client_status': state.connection_status
         },
-        'predictor': dm.predictor.get_status()
+        'ingest': client.get_status() if client else None,
+        'devices': len(dm.devices),
+        'predictor': device.predictor.get_status(),
+        'storage': dm.store.get_stats(),
+        'broadcast': get_broadcaster().get_stats(),
+        'pipeline': get_metrics().get_stats()
     })
 
 
-@main_bp.route('/api/history')
-def get_history():
+@main_bp.route('/api/metrics')
+def get_pipeline_metrics():
+    # Prometheus metin bicimi; asama histogramlari ve sayaclar
+    client = get_client()
+    body = render_prometheus(get_metrics(), list(DataManager().devices.values()), client)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+
+@main_bp.route('/api/devices')
+def get_devices():
     dm = DataManager()
     return jsonify({
-        'rssi': list(dm.rssi_history),
-        'rtt': list(dm.rtt_history)
+        'primary': dm.primary_device_id,
+        'devices': dm.list_devices()
     })
 
 
+@main_bp.route('/api/history')
+def get_history():
+    if any(key in request.args for key in ('from', 'to', 'resolution', 'points')):
+        return _get_history_range()
+
+    return _cached_response(_get_device().get_history_snapshot())
+
+
+def _get_history_range():
+    # Bellekteki son 300 olcum yerine diskteki zaman indeksinden okunur;
+    # artik bagli olmayan cihazlarin gecmisi de sorgulanabilir.
+    try:
+        t_from, t_to, resolution, points = history_range(request.args)
+    except ValueError as e:
+        abort(400, description='Gecersiz parametre: {}'.format(e))
+    result = DataManager().query_history(request.args.get('device'), t_from, t_to, resolution, points)
+    # Aralik sonucu onbellekte tutulmaz; ETag govdenin ozetidir
+    body = dumps(result)
+    return _json_response(body, hashlib.blake2b(body, digest_size=12).hexdigest())
+
+
 @main_bp.route('/api/warnings')
 def get_warnings():
-    dm = DataManager()
+    state = _get_device().state
     return jsonify({
-        'warnings': list(dm.warnings),
-        'counts': dm.warning_counts
+        'warnings': list(state.warnings),
+        'counts': state.warning_counts
     })
@@ -0,0 +1,58 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, CachedJSON):
+        return obj.data
+    raise TypeError('JSON olarak yazilamaz: {}'.format(type(obj).__name__))
+
+
+def dumps(obj):
+    # UTF-8 JSON baytlari; orjson kuruluysa onunla, degilse stdlib ile
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CachedJSON:
+
+    # Bir kez serilestirilmis yuk. HTTP yanitlari body'yi, Socket.IO
+    # SocketIOJSON uzerinden text'i dogrudan kullanir; icerik degismedikce
+    # tum istemciler ayni metni paylasir. Sozluk olmadigi icin
+    # python-socketio'nun ikili veri taramasi da yapiya girmez.
+
+    __slots__ = ('key', 'data', 'body', 'text', 'etag')
+
+    def __init__(self, data, key=None, etag=None):
+        self.key = key
+        self.data = data
+        self.body = dumps(data)
+        self.text = self.body.decode()
+        self.etag = etag
+
+
+class SocketIOJSON:
+
+    # python-socketio / engine.io icin json modulu yerine gecer
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        if isinstance(obj, list) and any(isinstance(item, CachedJSON) for item in obj):
+            return '[' + ','.join(item.text if isinstance(item, CachedJSON) else dumps(item).decode()
+                                  for item in obj) + ']'
+        return dumps(obj).decode()
+
+    @staticmethod
+    def loads(data, *args, **kwargs):
+        return loads(data)
@@ -1,9 +1,251 @@
+import os
 import socket
 import threading
 import time
 
+from protocol import ApClock, StreamDecoder, Measurement, Status, Overflow, parse_line, FORMAT_REQUEST, REQUEST_BINARY
+
 from . import socketio
-from .data_manager import DataManager
+from .data_manager import DataManager, DEFAULT_DEVICE
+from .metrics import get_metrics
+
+# stats_update en fazla bu siklikta (Hz) gonderilir; 0 = her degisiklikte
+BROADCAST_HZ = float(os.environ.get('RSSI_BROADCAST_HZ', '2'))
+ALARM_INTERVAL = 5
+
+
+def diff_fields(old, new):
+    # new icinde old'a gore degisen alanlar (ic ice sozlukler dahil)
+    changed = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_fields(previous, value)
+            if nested:
+                changed[key] = nested
+        elif key not in old or value != previous:
+            changed[key] = value
+    return changed
+
+
+def measurement_event(result):
+    # new_measurement her olcumde gider; grafik ve gostergeler icin gereken
+    # alanlar disindakiler (bos uyari, sifir kayip) gonderilmez
+    event = {
+        'rssi': result['rssi'],
+        'rtt': result['rtt'],
+        'latency': result['latency'],
+        'quality': result['quality'],
+        'count': result['count'],
+        'timestamp': result['timestamp']
+    }
+    if result.get('packet_loss'):
+        event['packet_loss'] = result['packet_loss']
+    if result.get('warning'):
+        event['warning'] = result['warning']
+    return event
+
+
+class BroadcastScheduler:
+
+    # Istatistik yayinlarini tek thread'de birlestirir. Olcumler sadece
+    # cihazi "degisti" olarak isaretler; thread her cihazin odasina en fazla
+    # max_rate Hz ile o cihazin istatistiklerinin son gonderilene gore
+    # farkini stats_update olarak yayar. Hiz siniri oda basinadir; sik
+    # degisen bir cihaz diger odalarin yayinini geciktirmez. Yeni baglanan tarayicilar
+    # ilk turda tam istatistik alir. Kopukluk alarmlari da ayni thread'den
+    # ALARM_INTERVAL saniyede bir gonderilir.
+
+    def __init__(self, data_manager, max_rate=BROADCAST_HZ):
+        self.data_manager = data_manager
+        self.max_rate = max_rate
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.dirty = set()
+        self.last_sent = {}
+        self.new_clients = {}
+        self.clients = {}
+
+        # cihaz -> bir sonraki alarm zamani
+        self.alarms = {}
+        # cihaz -> odasina bir sonraki stats_update'in gidebilecegi an
+        self.next_send = {}
+
+        self.updates = 0
+        self.updates_sent = 0
+        self.full_sent = 0
+        self.alarms_sent = 0
+
+        self.running = False
+        self._thread = None
+
+        # Arka plan ML tahmininden gelen uyarilar olcum olayindan sonra ayrica yayinlanir
+        data_manager.add_warning_listener(self.send_warning)
+
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name='BroadcastScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def rooms(self, device_id):
+        # Cihaz secmeden baglanan tarayicilar 'primary' odasindadir
+        rooms = ['device:' + device_id]
+        if device_id == self.data_manager.primary_device_id:
+            rooms.append('primary')
+        return rooms
+
+    def mark_dirty(self, device_id):
+        # Zaten isaretli cihaz icin thread uyandirilmaz; yayini zaten bekliyor
+        with self.lock:
+            new = device_id not in self.dirty
+            self.dirty.add(device_id)
+            self.updates += 1
+        if new:
+            self.wakeup.set()
+
+    def add_client(self, sid, device_id=None):
+        with self.lock:
+            self.clients[sid] = device_id
+            self.new_clients[sid] = device_id
+        self.wakeup.set()
+
+    def remove_client(self, sid):
+        with self.lock:
+            self.clients.pop(sid, None)
+            self.new_clients.pop(sid, None)
+
+    def set_alarm(self, device_id, active):
+        with self.lock:
+            if active:
+                if device_id not in self.alarms:
+                    self.alarms[device_id] = time.monotonic() + ALARM_INTERVAL
+            else:
+                self.alarms.pop(device_id, None)
+        self.wakeup.set()
+
+    def send_warning(self, device_id, warning_data):
+        socketio.emit('warning', warning_data, to=self.rooms(device_id))
+        self.mark_dirty(device_id)
+
+    def _send_alarm(self, device_id):
+        from datetime import datetime
+
+        timestamp = datetime.now().isoformat(timespec='milliseconds')
+        warning_data = {
+            'timestamp': timestamp,
+            'level': 4,
+            'messages': ['BAĞLANTI HALA KOPUK! Client ile iletişim yok.'],
+            'source': 'system'
+        }
+
+        socketio.emit('warning', warning_data, to=self.rooms(device_id))
+        self.alarms_sent += 1
+        print('[APSocketClient] Tekrar eden kritik alarm gonderildi:', device_id)
+
+    def flush(self):
+        # Hiz siniri dolmamis odalar isaretli kalir ve sonraki turda gider
+        now = time.monotonic()
+        with self.lock:
+            dirty = {device_id for device_id in self.dirty if self.next_send.get(device_id, 0) <= now}
+            self.dirty -= dirty
+            new_clients = self.new_clients
+            self.new_clients = {}
+
+        for device_id in dirty:
+            if self.interval:
+                self.next_send[device_id] = now + self.interval
+            device = self.data_manager.find_device(device_id)
+            if device is None:
+                continue
+
+            snapshot = device.get_stats_snapshot_cached().data
+            delta = diff_fields(self.last_sent.get(device_id, {}), snapshot)
+            self.last_sent[device_id] = snapshot
+
+            if delta:
+                socketio.emit('stats_update', delta, to=self.rooms(device_id))
+                self.updates_sent += 1
+
+        # initial_data ile son yayin arasinda degisip geri donen alanlar
+        # fark icinde olmaz; yeni tarayicilar bu yuzden tam hali alir
+        for sid, device_id in new_clients.items():
+            device = self.data_manager.find_device(device_id)
+            if device is not None:
+                socketio.emit('stats_update', device.get_stats_snapshot_cached(), to=sid)
+                self.full_sent += 1
+
+    def _check_alarms(self):
+        now = time.monotonic()
+        with self.lock:
+            due = [device_id for device_id, at in self.alarms.items() if now >= at]
+            for device_id in due:
+                self.alarms[device_id] += ALARM_INTERVAL
+
+        for device_id in due:
+            self._send_alarm(device_id)
+
+    def _next_wakeup(self):
+        # lock altinda: en yakin alarm ya da hiz siniri bekleyen oda
+        times = list(self.alarms.values())
+        if self.dirty:
+            times.append(min(self.next_send.get(device_id, 0) for device_id in self.dirty))
+        if not times:
+            return None
+        return max(0.0, min(times) - time.monotonic())
+
+    def _run(self):
+        while self.running:
+            with self.lock:
+                timeout = self._next_wakeup()
+
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+            if not self.running:
+                break
+
+            self._check_alarms()
+
+            if self.dirty or self.new_clients:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print('[BroadcastScheduler] Yayin hatasi:', e)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'max_rate_hz': self.max_rate,
+                'clients': len(self.clients),
+                'devices': len(self.last_sent),
+                'active_alarms': len(self.alarms),
+                'updates': self.updates,
+                'stats_updates_sent': self.updates_sent,
+                'full_updates_sent': self.full_sent,
+                'alarms_sent': self.alarms_sent
+            }
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = BroadcastScheduler(DataManager())
+                _broadcaster.start()
+    return _broadcaster
 
 
 class APSocketClient:
@@ -18,12 +260,20 @@ class APSocketClient:
         self._thread = None
         self._socket = None
         self.data_manager = DataManager()
-
-        self.is_client_disconnected = False
-        self.last_count = 0
-
-        self._alarm_thread = None
-        self._alarm_running = False
+        self.broadcaster = get_broadcaster()
+
+        # Cihaz bazinda kayip takibi ve kopukluk durumu
+        self.last_counts = {}
+        self.disconnected_devices = set()
+        # AP tick damgalarinin PC zamanina cevrimi (her baglantida yeniden)
+        self.clock = ApClock()
+        # AP akisinin cozucusu (her baglantida yeniden); metin ve ikili
+        # cerceveleri birlikte okur
+        self.decoder = StreamDecoder()
+        self.ap_overflows = 0
+        self.connects = 0
+        # Olcum hatti asama sureleri ve sayaclari (/api/metrics)
+        self.metrics = get_metrics()
 
     def start(self):
         if self.running:
@@ -36,7 +286,8 @@ class APSocketClient:
 
     def stop(self):
         self.running = False
-        self._stop_alarm()
+        for device_id in list(self.disconnected_devices):
+            self._stop_alarm(device_id)
         if self._socket:
             try:
                 self._socket.close()
@@ -44,38 +295,24 @@ class APSocketClient:
                 pass
         print('[APSocketClient] Durduruldu')
 
-    def _start_alarm(self):
-        if self._alarm_running:
-            return
-
-        self._alarm_running = True
-        self._alarm_thread = threading.Thread(target=self._alarm_loop, daemon=True)
-        self._alarm_thread.start()
-        print('[APSocketClient] Kritik alarm baslatildi')
+    def _start_alarm(self, device_id):
+        self.broadcaster.set_alarm(device_id, True)
+        print('[APSocketClient] Kritik alarm baslatildi:', device_id)
 
-    def _stop_alarm(self):
-        self._alarm_running = False
-        print('[APSocketClient] Kritik alarm durduruldu')
+    def _stop_alarm(self, device_id):
+        self.broadcaster.set_alarm(device_id, False)
+        print('[APSocketClient] Kritik alarm durduruldu:', device_id)
 
-    def _alarm_loop(self):
-        from datetime import datetime
-
-        while self._alarm_running and self.is_client_disconnected:
-            time.sleep(5)
-
-            if not self._alarm_running or not self.is_client_disconnected:
-                break
-
-            timestamp = datetime.now().isoformat(timespec='milliseconds')
-            warning_data = {
-                'timestamp': timestamp,
-                'level': 4,
-                'messages': ['BAĞLANTI HALA KOPUK! Client ile iletişim yok.'],
-                'source': 'system'
-            }
+    def _get_device(self, device_id):
+        dm = self.data_manager
+        primary = dm.primary_device_id
+        device = dm.get_device(device_id)
 
-            socketio.emit('warning', warning_data)
-            print('[APSocketClient] Tekrar eden kritik alarm gonderildi')
+        if dm.primary_device_id != primary:
+            # Hic veri almamis varsayilan cihazin yerini ilk gercek cihaz aldi;
+            # cihaz secmemis tarayicilar onun verisiyle yeniden baslar
+            socketio.emit('initial_data', device.get_current_snapshot(), to='primary')
+        return device
 
     def _run(self):
         backoff = 1
@@ -103,24 +340,30 @@ class APSocketClient:
         try:
             self._socket.connect((self.host, self.port))
             self.connected = True
+            self.clock = ApClock()
+            self.decoder = StreamDecoder()
+            if REQUEST_BINARY:
+                self._socket.sendall(FORMAT_REQUEST)
+            self.connects += 1
+            self.metrics.counters['connects'] += 1
+            if self.connects > 1:
+                self.metrics.counters['reconnects'] += 1
             print('[APSocketClient] Baglanti kuruldu!')
             socketio.emit('ap_connected', {'host': self.host, 'port': self.port})
 
-            buffer = ''
-
             while self.running:
                 try:
-                    data = self._socket.recv(1024)
+                    data = self._socket.recv(4096)
                     if not data:
                         print('[APSocketClient] Baglanti kapandi')
                         break
 
-                    buffer += data.decode()
-
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
-                        self._process_message(line)
+                    # Yarim kalan son mesaj cozucude bir sonraki okumaya kalir
+                    received = time.time()
+                    arrived = time.perf_counter()
+                    events = self._decode(self.decoder, data, arrived)
+                    for event in events:
+                        self._process_event(event, clock=self.clock, received=received, arrived=arrived)
 
                 except socket.timeout:
                     continue
@@ -130,84 +373,111 @@ class APSocketClient:
             self._socket.close()
             socketio.emit('ap_disconnected', {})
 
-    def _process_message(self, message):
-        if not message:
+    def _decode(self, decoder, data, arrived):
+        # arrived: parcanin alindigi an (perf_counter); parse suresi ve
+        # okunan bayt/cozme hatasi sayaclari buradan tutulur
+        errors = decoder.errors
+        events = decoder.feed(data)
+        metrics = self.metrics
+        metrics.stages['parse'].observe(time.perf_counter() - arrived)
+        counters = metrics.counters
+        counters['bytes'] += len(data)
+        if decoder.errors != errors:
+            counters['decode_errors'] += decoder.errors - errors
+        return events
+
+    def _process_message(self, message, default_device=DEFAULT_DEVICE, clock=None, received=None):
+        # Tek metin satiri (DATA/STATUS/OVERFLOW)
+        try:
+            event = parse_line(message)
+        except (ValueError, IndexError) as e:
+            print('[APSocketClient] Veri parse hatasi:', e)
             return
-
-        if message.startswith('STATUS:'):
-            status = message[7:]
-
-            if status == 'DISCONNECTED':
-                self.is_client_disconnected = True
-                result = self.data_manager.set_disconnected()
-                socketio.emit('status_change', result)
+        if event is not None:
+            self._process_event(event, default_device, clock, received)
+
+    def _process_event(self, event, default_device=DEFAULT_DEVICE, clock=None, received=None, arrived=None):
+        # arrived verilirse (parcanin alindigi perf_counter ani) olcumun
+        # hattaki toplam suresi 'total' asamasina yazilir
+        counters = self.metrics.counters
+        if isinstance(event, Status):
+            counters['status_messages'] += 1
+            device_id = event.device or default_device
+            device = self._get_device(device_id)
+            rooms = self.broadcaster.rooms(device_id)
+
+            if not event.connected:
+                self.disconnected_devices.add(device_id)
+                result = device.set_disconnected()
+                socketio.emit('status_change', result, to=rooms)
+                counters['emits'] += 1
                 if result.get('warning'):
-                    socketio.emit('warning', result['warning'])
-                    socketio.emit('stats_update', {
-                        'warning_counts': dict(self.data_manager.warning_counts)
-                    })
-                self._start_alarm()
-                print('[APSocketClient] Client koptu!')
-
-            elif status == 'CONNECTED':
-                self._stop_alarm()
-                result = self.data_manager.set_connected()
-                self.is_client_disconnected = False
-                socketio.emit('status_change', result)
-                print('[APSocketClient] Client baglandi!')
-
-        elif message.startswith('DATA:'):
-            parts = message[5:].split(',')
-            if len(parts) >= 3:
-                try:
-                    rssi = int(parts[0])
-                    rtt = int(parts[1])
-                    count = int(parts[2])
-
-                    if self.last_count > 0 and count > self.last_count + 1:
-                        missing = count - self.last_count - 1
-                        socketio.emit('packet_loss', {
-                            'count': missing,
-                            'from': self.last_count + 1,
-                            'to': count - 1
-                        })
-
-                    self.last_count = count
-
-                    result = self.data_manager.add_measurement(rssi, rtt, count)
-
-                    socketio.emit('new_measurement', result)
-
-                    dm = self.data_manager
-                    with dm.data_lock:
-                        total_measurements = len(dm.rssi_values) + dm.lost_packets
-                        stats_data = {
-                            'quality_distribution': dict(dm.quality_counts),
-                            'warning_counts': dict(dm.warning_counts),
-                            'stats': {
-                                'rssi': dm.calculate_stats(list(dm.rssi_values)),
-                                'rtt': dm.calculate_stats(list(dm.rtt_values)),
-                                'latency': dm.calculate_stats(list(dm.latency_values))
-                            },
-                            'issues': {
-                                'packet_loss': dm.lost_packets,
-                                'packet_loss_rate': round(dm.lost_packets / total_measurements * 100, 2) if total_measurements > 0 else 0,
-                                'disconnects': dm.disconnects,
-                                'total_downtime': round(sum(dm.disconnect_durations), 1) if dm.disconnect_durations else 0,
-                                'avg_disconnect': round(sum(dm.disconnect_durations) / len(dm.disconnect_durations), 1) if dm.disconnect_durations else 0
-                            }
-                        }
-                    socketio.emit('stats_update', stats_data)
-
-                except ValueError as e:
-                    print('[APSocketClient] Veri parse hatasi:', e)
+                    socketio.emit('warning', result['warning'], to=rooms)
+                    counters['emits'] += 1
+                self.broadcaster.mark_dirty(device_id)
+                self._start_alarm(device_id)
+                print('[APSocketClient] Client koptu!', device_id)
+
+            else:
+                self._stop_alarm(device_id)
+                result = device.set_connected()
+                self.disconnected_devices.discard(device_id)
+                socketio.emit('status_change', result, to=rooms)
+                counters['emits'] += 1
+                self.broadcaster.mark_dirty(device_id)
+                print('[APSocketClient] Client baglandi!', device_id)
+
+        elif isinstance(event, Overflow):
+            # AP tamponu bu baglanti icin tasti
+            self.ap_overflows += event.dropped
+            counters['ap_dropped'] += event.dropped
+            print('[APSocketClient] AP tamponu tasti, {} olcum atlandi'.format(event.dropped))
+
+        elif isinstance(event, Measurement):
+            device_id = event.device or default_device
+            count = event.count
+            unix_time = None
+            if event.tick is not None and clock is not None:
+                unix_time = clock.to_unix(event.tick, received)
+
+            device = self._get_device(device_id)
+            rooms = self.broadcaster.rooms(device_id)
+
+            last_count = self.last_counts.get(device_id, 0)
+            if last_count > 0 and count > last_count + 1:
+                missing = count - last_count - 1
+                socketio.emit('packet_loss', {
+                    'count': missing,
+                    'from': last_count + 1,
+                    'to': count - 1
+                }, to=rooms)
+                counters['emits'] += 1
+
+            self.last_counts[device_id] = count
+
+            result = device.add_measurement(event.rssi, event.rtt, count, unix_time)
+
+            start = time.perf_counter()
+            socketio.emit('new_measurement', measurement_event(result), to=rooms)
+            end = time.perf_counter()
+            stages = self.metrics.stages
+            stages['emit'].observe(end - start)
+            if arrived is not None:
+                stages['total'].observe(end - arrived)
+            counters['emits'] += 1
+            counters['measurements'] += 1
+            self.broadcaster.mark_dirty(device_id)
 
     def get_status(self):
         return {
             'connected': self.connected,
             'host': self.host,
             'port': self.port,
-            'running': self.running
+            'running': self.running,
+            'ap_overflows': self.ap_overflows,
+            'connects': self.connects,
+            'stream': self.decoder.get_stats(),
+            'broadcast': self.broadcaster.get_stats()
         }
 
 
@@ -21,6 +21,9 @@ class Dashboard {
         // Istatistik sekme
         this.currentStatsTab = 'rssi';
 
+        // stats_update sadece degisen alanlari gonderir; tam hal burada tutulur
+        this.statsState = {};
+
         // Baslangic zamani
         this.startTime = Date.now();
 
@@ -47,7 +50,11 @@ class Dashboard {
     }
 
     initSocketIO() {
+        // ?device=<id> ile belirli bir cihaz izlenir; yoksa ana cihaz
+        const device = new URLSearchParams(window.location.search).get('device');
+
         this.socket = io({
+            query: device ? { device: device } : {},
             transports: ['websocket', 'polling'],
             reconnection: true,
             reconnectionAttempts: Infinity,
@@ -165,6 +172,11 @@ class Dashboard {
     handleInitialData(data) {
         if (!data) return;
 
+        // Oturum suresi sunucunun baslangic zamanindan sayilir
+        if (data.start_time) {
+            this.startTime = data.start_time * 1000;
+        }
+
         // Guncel degerleri guncelle
         if (data.current) {
             this.updateCurrentValues(data.current);
@@ -188,9 +200,13 @@ class Dashboard {
             }
         }
 
+        // Istatistik durumunu sifirdan kur
+        this.statsState = {};
+        this.mergeStats(data);
+
         // Istatistikleri guncelle
         if (data.stats) {
-            this.updateStatsTable(data.stats);
+            this.updateStatsTable(this.statsState.stats);
         }
 
         // Kalite dagilimi
@@ -301,6 +317,14 @@ class Dashboard {
     handleWarning(data) {
         if (!data) return;
 
+        // ML ayni olcumun kural uyarisini yukselttiyse eski satir kaldirilir
+        const list = document.getElementById('warnings-list');
+        if (list && data.source !== 'system') {
+            const previous = Array.from(list.children).find(el =>
+                el.dataset.timestamp === data.timestamp && el.dataset.source !== 'system');
+            if (previous) previous.remove();
+        }
+
         // Listeye ekle
         this.addWarningToList(data);
 
@@ -312,23 +336,48 @@ class Dashboard {
         // Not: Sayaclar stats_update ile guncellenecek
     }
 
+    mergeStats(data) {
+        // Gelen (kismi) alanlari mevcut duruma ic ice isler
+        const merge = (target, source) => {
+            Object.keys(source).forEach(key => {
+                const value = source[key];
+                if (value && typeof value === 'object' && !Array.isArray(value)) {
+                    if (!target[key] || typeof target[key] !== 'object') target[key] = {};
+                    merge(target[key], value);
+                } else {
+                    target[key] = value;
+                }
+            });
+        };
+
+        ['stats', 'quality_distribution', 'issues', 'warning_counts'].forEach(key => {
+            if (data[key]) {
+                if (!this.statsState[key]) this.statsState[key] = {};
+                merge(this.statsState[key], data[key]);
+            }
+        });
+    }
+
     handleStatsUpdate(data) {
         if (!data) return;
 
+        this.mergeStats(data);
+        const state = this.statsState;
+
         if (data.stats) {
-            this.updateStatsTable(data.stats);
+            this.updateStatsTable(state.stats);
         }
 
         if (data.quality_distribution) {
-            updateQualityChart(this.qualityChart, data.quality_distribution);
+            updateQualityChart(this.qualityChart, state.quality_distribution);
         }
 
         if (data.issues) {
-            this.updateIssues(data.issues);
+            this.updateIssues(state.issues);
         }
 
         if (data.warning_counts) {
-            this.updateWarningCounts(data.warning_counts);
+            this.updateWarningCounts(state.warning_counts);
         }
 
         if (data.predictor) {
@@ -422,7 +471,10 @@ class Dashboard {
             t.classList.toggle('active', t.dataset.tab === tab);
         });
 
-        // Tabloyu guncelle
+        // Tabloyu once eldeki durumla, sonra sunucudan guncelle
+        if (this.statsState.stats) {
+            this.updateStatsTable(this.statsState.stats);
+        }
         this.socket.emit('request_stats');
     }
 
@@ -486,6 +538,8 @@ class Dashboard {
         // Uyari elementi olustur
         const item = document.createElement('div');
         item.className = `warning-item level-${warning.level}`;
+        item.dataset.timestamp = warning.timestamp;
+        item.dataset.source = warning.source;
 
         const time = this.formatTime(warning.timestamp);
         const messages = Array.isArray(warning.messages)